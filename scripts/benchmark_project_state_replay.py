@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark ProjectState replay, one event at a time versus in batches
+
+Generates a synthetic event stream shaped like a rebuild (mostly file
+modifications over a fixed set of paths, plus creations, validation
+requests/decisions and heartbeats that no handler consumes) and replays
+it through apply_event() and apply_events() with the projection runner's
+batch size. Reports the best of several runs for each.
+
+Usage:
+    benchmark_project_state_replay.py
+    benchmark_project_state_replay.py --events 1000000 --paths 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from lighthouse.bridge.event_store.project_state import ProjectState
+from lighthouse.event_store.models import Event, EventType
+
+
+def generate_events(count: int, paths: int, seed: int) -> List[Event]:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    files = [f"/src/pkg{i % 20}/module_{i}.py" for i in range(paths)]
+    created = set()
+    events = []
+
+    for sequence in range(1, count + 1):
+        roll = rng.random()
+        if roll < 0.70:
+            path = rng.choice(files)
+            event_type = EventType.FILE_MODIFIED if path in created else EventType.FILE_CREATED
+            created.add(path)
+            data = {'path': path, 'content_hash': f"{sequence:064x}", 'size': rng.randint(100, 10000)}
+        elif roll < 0.82:
+            event_type = EventType.VALIDATION_REQUEST_SUBMITTED
+            data = {'request_id': f"req-{sequence}", 'tool_name': 'Bash', 'command_hash': f"{sequence:x}"}
+        elif roll < 0.90:
+            event_type = EventType.VALIDATION_DECISION_MADE
+            data = {'request_id': f"req-{sequence - 1}", 'decision': 'approved'}
+        else:
+            event_type = EventType.AGENT_HEARTBEAT
+            data = {}
+
+        events.append(Event(
+            event_type=event_type,
+            aggregate_id="benchmark",
+            sequence=sequence,
+            timestamp=start + timedelta(milliseconds=sequence),
+            source_agent=f"agent-{sequence % 8}",
+            data=data
+        ))
+
+    return events
+
+
+def replay_single(events: List[Event]) -> ProjectState:
+    state = ProjectState("benchmark")
+    for event in events:
+        state.apply_event(event)
+    return state
+
+
+def replay_batched(events: List[Event], batch_size: int) -> ProjectState:
+    state = ProjectState("benchmark")
+    for i in range(0, len(events), batch_size):
+        state.apply_events(events[i:i + batch_size])
+    return state
+
+
+def best_of(runs: int, replay) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        started = time.perf_counter()
+        replay()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=40000, help="Events to replay")
+    parser.add_argument('--paths', type=int, default=500, help="Distinct file paths")
+    parser.add_argument('--batch-size', type=int, default=500, help="Events per apply_events() call")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per mode (best is reported)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the event stream")
+    args = parser.parse_args()
+
+    events = generate_events(args.events, args.paths, args.seed)
+
+    single_state = replay_single(events)
+    batched_state = replay_batched(events, args.batch_size)
+    if single_state.to_dict()['files'] != batched_state.to_dict()['files']:
+        sys.exit("Batched replay produced a different file state")
+
+    single = best_of(args.runs, lambda: replay_single(events))
+    batched = best_of(args.runs, lambda: replay_batched(events, args.batch_size))
+
+    print(f"Events:           {len(events)}")
+    print(f"apply_event():    {single * 1000:.1f} ms ({len(events) / single:,.0f} events/s)")
+    print(f"apply_events():   {batched * 1000:.1f} ms ({len(events) / batched:,.0f} events/s)")
+    print(f"Speed-up:         {single / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
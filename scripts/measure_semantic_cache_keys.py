@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Measure the memory cache hit rate gain from semantic cache keys
+
+Replays recorded validation requests (VALIDATION_REQUEST_SUBMITTED events
+from an event store data directory, or a JSONL file of
+{"tool_name", "tool_input", "agent_id"} objects) through simulated LRU
+caches keyed by the exact command hash and by the semantic hash.
+
+Usage:
+    measure_semantic_cache_keys.py --data-dir ./data/events
+    measure_semantic_cache_keys.py --jsonl recorded_requests.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from lighthouse.bridge.speed_layer.canonicalize import replay_cache_keys
+from lighthouse.bridge.speed_layer.models import ValidationRequest
+from lighthouse.event_store import EventStore
+from lighthouse.event_store.models import EventFilter, EventQuery, EventType
+
+
+def load_jsonl(path: str) -> List[ValidationRequest]:
+    requests = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                requests.append(ValidationRequest(
+                    tool_name=data['tool_name'],
+                    tool_input=data['tool_input'],
+                    agent_id=data.get('agent_id', 'unknown'),
+                    context=data.get('context', {})
+                ))
+    return requests
+
+
+async def load_event_store(data_dir: str) -> List[ValidationRequest]:
+    store = EventStore(data_dir=data_dir, allowed_base_dirs=[data_dir])
+    await store.initialize()
+    requests = []
+    offset = 0
+    try:
+        while True:
+            query = EventQuery(
+                filter=EventFilter(event_types=[EventType.VALIDATION_REQUEST_SUBMITTED]),
+                offset=offset,
+                limit=10000
+            )
+            result = await store.query(query)
+            for event in result.events:
+                requests.append(ValidationRequest(
+                    tool_name=event.data['tool_name'],
+                    tool_input=event.data['tool_input'],
+                    agent_id=event.source_agent or 'unknown'
+                ))
+            if not result.has_more or not result.events:
+                break
+            offset += len(result.events)
+    finally:
+        await store.shutdown()
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data-dir', help="Event store data directory")
+    source.add_argument('--jsonl', help="JSONL file of recorded requests")
+    parser.add_argument('--cache-size', type=int, default=10000, help="Simulated memory cache size")
+    args = parser.parse_args()
+    
+    if args.jsonl:
+        requests = load_jsonl(args.jsonl)
+    else:
+        requests = asyncio.run(load_event_store(args.data_dir))
+    
+    stats = replay_cache_keys(requests, max_size=args.cache_size)
+    canonicalized = sum(1 for request in requests if request.semantic_hash is not None)
+    
+    print(f"Requests:            {stats['requests']}")
+    print(f"Canonicalized:       {canonicalized}")
+    print(f"Distinct exact keys: {stats['exact_keys']}")
+    print(f"Distinct semantic:   {stats['semantic_keys']}")
+    print(f"Exact hit rate:      {stats['exact_hit_rate']:.1%}")
+    print(f"Semantic hit rate:   {stats['semantic_hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,12 @@ Core Components:
 from .project_aggregate import ProjectAggregate
 from lighthouse.event_store.models import Event, EventType, EventFilter
 from .project_state import ProjectState, FileVersion
+from .blob_store import ContentBlobStore
+from .bounded_cache import BoundedCache
 from .time_travel import TimeTravelDebugger, SessionReplay
+from .projection import ProjectionRunner
 from .event_stream import EventStream, EventSubscription
+from .shared_memory_ring import SharedMemoryRingReader
 
 __all__ = [
     'ProjectAggregate',
@@ -30,8 +34,12 @@ __all__ = [
     'EventFilter',
     'ProjectState',
     'FileVersion', 
+    'ContentBlobStore',
+    'BoundedCache',
     'TimeTravelDebugger',
     'SessionReplay',
+    'ProjectionRunner',
     'EventStream',
-    'EventSubscription'
+    'EventSubscription',
+    'SharedMemoryRingReader'
 ]
\ No newline at end of file
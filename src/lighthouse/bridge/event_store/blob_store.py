@@ -0,0 +1,360 @@
+"""
+Content-Addressed Blob Store
+
+File contents are stored once, keyed by the SHA-256 content hash that the
+project aggregate already computes. File events carry only the hash and
+size, and FileVersion objects resolve their content from here on demand,
+so repeated versions of the same content cost nothing extra and event
+payloads stay small.
+
+Successive versions of a file are stored as line deltas against the
+previous version, with a full keyframe every ``keyframe_interval``
+versions so reconstruction never replays more than a bounded chain.
+
+Features:
+- Deduplication by SHA-256 content hash
+- zlib compression of stored blobs (skipped when it does not help)
+- Line-delta encoding against the previous version with periodic keyframes
+- In-memory store with optional on-disk persistence
+- Atomic blob writes (temp file + rename), synced to disk under the same
+  policy as the event log so a durable event never references a lost blob
+"""
+
+import difflib
+import hashlib
+import logging
+import os
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import msgpack
+
+from lighthouse.event_store.models import Event
+
+logger = logging.getLogger(__name__)
+
+# Stored blob encodings (first byte of the stored record)
+_RAW = b'\x00'
+_ZLIB = b'\x01'
+_DELTA = b'\x02'  # Followed by the 64-char base hash and compressed ops
+
+_HASH_LENGTH = 64
+
+
+def hash_content(data: bytes) -> str:
+    """Content hash used as the blob key"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobNotFound(KeyError):
+    """Raised when a referenced blob is not present in the store"""
+    pass
+
+
+def encode_line_delta(base: bytes, target: bytes) -> List[Any]:
+    """
+    Encode target as line operations against base
+    
+    Returns:
+        List of ops: ``[i1, i2]`` copies base lines i1:i2, and
+        ``[lines]`` inserts literal lines
+    """
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    
+    ops: List[Any] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:  # replace / insert
+            ops.append([target_lines[j1:j2]])
+    return ops
+
+
+def apply_line_delta(base: bytes, ops: List[Any]) -> bytes:
+    """Rebuild content from base and line delta ops"""
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if len(op) == 2:
+            parts.extend(base_lines[op[0]:op[1]])
+        else:
+            parts.extend(op[0])
+    return b''.join(parts)
+
+
+class ContentBlobStore:
+    """Deduplicating, compressed store of file contents keyed by content hash"""
+    
+    def __init__(self,
+                 blob_dir: Optional[Union[str, Path]] = None,
+                 compression_level: int = 6,
+                 min_compress_size: int = 256,
+                 keyframe_interval: int = 16,
+                 decoded_cache_size: int = 32,
+                 sync_policy: Optional[str] = None):
+        """
+        Initialize blob store
+        
+        Args:
+            blob_dir: Optional directory for persistent blobs
+            compression_level: zlib compression level
+            min_compress_size: Blobs smaller than this are stored raw
+            keyframe_interval: Store a full version at least every N versions
+            decoded_cache_size: Recently reconstructed blobs kept decoded
+            sync_policy: "fsync" or "fdatasync" to sync blob files (and their
+                directory) before put() returns, as the event store does
+                for its log; None leaves flushing to the OS
+        """
+        self.blob_dir = Path(blob_dir) if blob_dir else None
+        self.compression_level = compression_level
+        self.min_compress_size = min_compress_size
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.decoded_cache_size = decoded_cache_size
+        self.sync_policy = sync_policy
+        
+        if self.blob_dir:
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+        
+        self._blobs: Dict[str, bytes] = {}
+        self._chain_depths: Dict[str, int] = {}  # 0 for keyframes
+        self._decoded: 'OrderedDict[str, bytes]' = OrderedDict()
+        
+        # Statistics
+        self.logical_bytes = 0
+        self.stored_bytes = 0
+        self.dedup_hits = 0
+        self.keyframes = 0
+        self.deltas = 0
+    
+    def put(self,
+            content: Union[str, bytes],
+            encoding: str = 'utf-8',
+            base_hash: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Store content (no-op if already present)
+        
+        Args:
+            content: Content to store
+            encoding: Text encoding for str content
+            base_hash: Hash of the previous version to delta-encode against
+        
+        Returns:
+            Tuple of (content_hash, size in bytes)
+        """
+        data = content.encode(encoding) if isinstance(content, str) else content
+        content_hash = hash_content(data)
+        
+        if self.contains(content_hash):
+            self.dedup_hits += 1
+            return content_hash, len(data)
+        
+        record = self._encode(data)
+        depth = 0
+        
+        if base_hash and base_hash != content_hash:
+            delta_record = self._encode_delta(data, base_hash)
+            if delta_record is not None and len(delta_record) < len(record):
+                record = delta_record
+                depth = self._chain_depths[base_hash] + 1
+        
+        if depth:
+            self.deltas += 1
+        else:
+            self.keyframes += 1
+        
+        self._blobs[content_hash] = record
+        self._chain_depths[content_hash] = depth
+        self._remember_decoded(content_hash, data)
+        if self.blob_dir:
+            self._write_blob_file(content_hash, record)
+        
+        self.logical_bytes += len(data)
+        self.stored_bytes += len(record)
+        
+        return content_hash, len(data)
+    
+    def contains(self, content_hash: str) -> bool:
+        """Check whether a blob is stored"""
+        if content_hash in self._blobs:
+            return True
+        return bool(self.blob_dir) and self._blob_path(content_hash).exists()
+    
+    def get_bytes(self, content_hash: str) -> bytes:
+        """
+        Load blob content
+        
+        Delta records are resolved by walking back to the nearest keyframe
+        (or recently decoded version) and applying deltas forward.
+        
+        Raises:
+            BlobNotFound: If the blob (or a blob in its delta chain) is not stored
+        """
+        chain = []
+        current = content_hash
+        
+        while True:
+            data = self._decoded.get(current)
+            if data is not None:
+                self._decoded.move_to_end(current)
+                break
+            
+            record = self._load_record(current)
+            if record[:1] != _DELTA:
+                data = self._decode(record)
+                break
+            
+            chain.append((current, record))
+            current = record[1:1 + _HASH_LENGTH].decode('ascii')
+        
+        for _, record in reversed(chain):
+            ops = msgpack.unpackb(zlib.decompress(record[1 + _HASH_LENGTH:]), raw=False)
+            data = apply_line_delta(data, ops)
+        
+        self._remember_decoded(content_hash, data)
+        return data
+    
+    def is_keyframe(self, content_hash: str) -> bool:
+        """Whether a blob is stored in full rather than as a delta"""
+        return self._load_record(content_hash)[:1] != _DELTA
+    
+    def get_text(self, content_hash: str, encoding: str = 'utf-8') -> str:
+        """Load blob content as text"""
+        return self.get_bytes(content_hash).decode(encoding)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get blob store statistics"""
+        return {
+            'blobs': len(self._blobs),
+            'logical_bytes': self.logical_bytes,
+            'stored_bytes': self.stored_bytes,
+            'compression_ratio': (
+                self.logical_bytes / self.stored_bytes if self.stored_bytes else 1.0
+            ),
+            'dedup_hits': self.dedup_hits,
+            'keyframes': self.keyframes,
+            'deltas': self.deltas,
+            'keyframe_interval': self.keyframe_interval,
+            'persistent': self.blob_dir is not None
+        }
+    
+    def _encode(self, data: bytes) -> bytes:
+        if len(data) >= self.min_compress_size:
+            compressed = zlib.compress(data, self.compression_level)
+            if len(compressed) < len(data):
+                return _ZLIB + compressed
+        return _RAW + data
+    
+    def _encode_delta(self, data: bytes, base_hash: str) -> Optional[bytes]:
+        """Encode data as a delta on base_hash, or None if a keyframe is due"""
+        try:
+            depth = self._chain_depth(base_hash)
+            if depth + 1 >= self.keyframe_interval:
+                return None
+            base = self.get_bytes(base_hash)
+        except BlobNotFound:
+            return None
+        
+        ops = encode_line_delta(base, data)
+        packed = msgpack.packb(ops, use_bin_type=True)
+        return _DELTA + base_hash.encode('ascii') + zlib.compress(packed, self.compression_level)
+    
+    def _chain_depth(self, content_hash: str) -> int:
+        """Number of deltas between a blob and its keyframe"""
+        depth = self._chain_depths.get(content_hash)
+        if depth is None:
+            record = self._load_record(content_hash)
+            if record[:1] == _DELTA:
+                depth = self._chain_depth(record[1:1 + _HASH_LENGTH].decode('ascii')) + 1
+            else:
+                depth = 0
+            self._chain_depths[content_hash] = depth
+        return depth
+    
+    def _load_record(self, content_hash: str) -> bytes:
+        record = self._blobs.get(content_hash)
+        
+        if record is None and self.blob_dir:
+            try:
+                record = self._blob_path(content_hash).read_bytes()
+            except FileNotFoundError:
+                record = None
+            else:
+                self._blobs[content_hash] = record
+        
+        if record is None:
+            raise BlobNotFound(content_hash)
+        
+        return record
+    
+    def _remember_decoded(self, content_hash: str, data: bytes):
+        if self.decoded_cache_size <= 0:
+            return
+        self._decoded[content_hash] = data
+        self._decoded.move_to_end(content_hash)
+        while len(self._decoded) > self.decoded_cache_size:
+            self._decoded.popitem(last=False)
+    
+    def _decode(self, record: bytes) -> bytes:
+        if record[:1] == _ZLIB:
+            return zlib.decompress(record[1:])
+        return record[1:]
+    
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.blob_dir / content_hash[:2] / content_hash
+    
+    def _write_blob_file(self, content_hash: str, record: bytes):
+        path = self._blob_path(content_hash)
+        new_directory = not path.parent.exists()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(record)
+            if self.sync_policy:
+                f.flush()
+                self._sync(f.fileno())
+        os.replace(temp_path, path)
+        
+        if self.sync_policy:
+            # The rename (and a new shard directory) must be durable too
+            self._sync_directory(path.parent)
+            if new_directory:
+                self._sync_directory(self.blob_dir)
+    
+    def _sync(self, fd: int):
+        if self.sync_policy == "fdatasync" and hasattr(os, 'fdatasync'):
+            os.fdatasync(fd)
+        else:
+            os.fsync(fd)
+    
+    def _sync_directory(self, directory: Path):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def resolve_event_content(event: Event, blob_store: Optional[ContentBlobStore]) -> str:
+    """
+    Get file content for a file event
+    
+    Handles both legacy events with inline content and events that only
+    reference a blob by content hash.
+    """
+    if 'content' in event.data:
+        return event.data.get('content') or ''
+    
+    content_hash = event.data.get('content_hash')
+    if not content_hash or blob_store is None:
+        return ''
+    
+    try:
+        return blob_store.get_text(content_hash, event.data.get('encoding', 'utf-8'))
+    except BlobNotFound:
+        logger.warning(f"Blob {content_hash} for event {event.event_id} not found")
+        return ''
@@ -0,0 +1,227 @@
+"""
+Bounded Cache
+
+Size-bounded LRU cache shared by the time travel debugger and the FUSE
+history views. Entries are charged by the bytes of content they hold
+rather than counted, so a handful of large reconstructed states cannot
+crowd out memory the way a fixed entry count allows.
+
+Each entry carries a sequence watermark: the last event sequence the
+cached value reflects. Readers pass the watermark they require and older
+entries are treated as misses, and writers can drop everything below a
+watermark after the underlying events change.
+
+Features:
+- LRU eviction under a byte budget (and an optional entry limit)
+- Watermark-based staleness checks and bulk invalidation
+- Optional per-entry TTL
+- Thread-safe (FUSE callbacks run on worker threads)
+- Hit, miss, eviction, expiration and invalidation metrics
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Approximate bookkeeping cost of one entry (key, entry object, dict slot),
+# charged on top of the value size so empty values still count
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'size', 'watermark', 'expires_at')
+    
+    def __init__(self, value: Any, size: int, watermark: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.watermark = watermark
+        self.expires_at = expires_at
+
+
+class BoundedCache:
+    """LRU cache bounded by content bytes with watermark invalidation"""
+    
+    def __init__(self,
+                 max_bytes: int,
+                 max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None,
+                 sizer: Optional[Callable[[Any], int]] = None,
+                 name: str = "cache"):
+        """
+        Initialize bounded cache
+        
+        Args:
+            max_bytes: Byte budget for all entries, including overhead
+            max_entries: Optional cap on the number of entries
+            ttl: Optional entry lifetime in seconds
+            sizer: Computes a value's size in bytes when put() is not given one
+            name: Name reported in statistics
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.sizer = sizer
+        self.name = name
+        
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.rejections = 0
+    
+    @property
+    def bytes(self) -> int:
+        """Bytes currently charged to the cache"""
+        return self._bytes
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry, time.monotonic())
+    
+    def get(self, key: Hashable, default: Any = None, min_watermark: Optional[int] = None) -> Any:
+        """
+        Look up a value and mark it most recently used
+        
+        Args:
+            key: Cache key
+            default: Returned on a miss
+            min_watermark: Treat entries reflecting an older sequence as stale
+        
+        Returns:
+            Cached value, or default if missing, expired or stale
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            if self._expired(entry, time.monotonic()):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            
+            if min_watermark is not None and entry.watermark < min_watermark:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return default
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+    
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None, watermark: int = 0) -> bool:
+        """
+        Insert or replace a value, evicting least recently used entries
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            size: Content size in bytes (computed with the sizer if omitted)
+            watermark: Last event sequence the value reflects
+        
+        Returns:
+            False if the value alone exceeds the byte budget and was not cached
+        """
+        if size is None:
+            size = self.sizer(value) if self.sizer else 0
+        charged = max(size, 0) + ENTRY_OVERHEAD_BYTES
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            
+            if charged > self.max_bytes:
+                self.rejections += 1
+                return False
+            
+            while self._entries and (
+                    self._bytes + charged > self.max_bytes or
+                    (self.max_entries is not None and len(self._entries) >= self.max_entries)):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+            
+            self._entries[key] = _CacheEntry(value, charged, watermark, expires_at)
+            self._bytes += charged
+            return True
+    
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one entry; returns True if it was present"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+    
+    def invalidate_below(self, watermark: int,
+                         predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Drop entries reflecting a sequence older than a watermark
+        
+        Args:
+            watermark: Minimum sequence entries must reflect to stay cached
+            predicate: Optional key filter limiting which entries are checked
+        
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry.watermark < watermark and (predicate is None or predicate(key))]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+    
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of unexpired entries, oldest first; does not affect recency"""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, entry.value) for key, entry in self._entries.items()
+                    if not self._expired(entry, now)]
+    
+    def clear(self):
+        """Drop all entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def _expired(self, entry: _CacheEntry, now: float) -> bool:
+        return entry.expires_at is not None and now >= entry.expires_at
+    
+    def _remove(self, key: Hashable):
+        self._bytes -= self._entries.pop(key).size
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'rejections': self.rejections
+        }
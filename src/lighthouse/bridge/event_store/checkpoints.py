@@ -0,0 +1,255 @@
+"""
+Project State Checkpoints
+
+Persistent ProjectState checkpoints for time travel. The debugger saves a
+checkpoint every N events or every snapshot interval of event time while
+replaying, and later rebuilds start from the latest checkpoint at or
+before the target time instead of from the beginning of the log.
+
+Features:
+- Compact checkpoints (msgpack + zlib, file contents by hash only)
+- Per-project index sorted by event time, binary searched
+- Optional on-disk persistence with index recovery on restart
+- Bounded number of checkpoints per project
+"""
+
+import bisect
+import logging
+import os
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import quote, unquote
+
+import msgpack
+
+from .blob_store import ContentBlobStore
+from .project_state import ProjectState
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_micros(timestamp: datetime) -> int:
+    """Convert a (naive UTC or aware) timestamp to microseconds since epoch"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    delta = timestamp - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+@dataclass(frozen=True)
+class StateCheckpoint:
+    """Index entry for a stored checkpoint"""
+    
+    project_id: str
+    sequence: int  # Last event sequence applied
+    time_key: int  # Event time of the last applied event (epoch microseconds)
+    size: int
+    
+    @property
+    def filename(self) -> str:
+        return f"{self.time_key:020d}_{self.sequence:012d}.ckpt"
+
+
+class CheckpointStore:
+    """Stores ProjectState checkpoints and finds the best one for a point in time"""
+    
+    def __init__(self,
+                 checkpoint_dir: Optional[Union[str, Path]] = None,
+                 max_checkpoints_per_project: int = 256,
+                 compression_level: int = 6):
+        """
+        Initialize checkpoint store
+        
+        Args:
+            checkpoint_dir: Optional directory for persistent checkpoints
+            max_checkpoints_per_project: Oldest checkpoints are dropped beyond this
+            compression_level: zlib compression level
+        """
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.max_checkpoints_per_project = max_checkpoints_per_project
+        self.compression_level = compression_level
+        
+        # Per-project index, sorted by (time_key, sequence)
+        self._index: Dict[str, List[StateCheckpoint]] = {}
+        self._time_keys: Dict[str, List[int]] = {}
+        self._payloads: Dict[StateCheckpoint, bytes] = {}
+        
+        # Statistics
+        self.checkpoints_saved = 0
+        self.checkpoints_loaded = 0
+        self.lookups = 0
+        self.lookup_hits = 0
+        
+        if self.checkpoint_dir:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            self._recover_index()
+    
+    def save(self, state: ProjectState) -> Optional[StateCheckpoint]:
+        """
+        Save a checkpoint of the state as of its last applied event
+        
+        Returns:
+            The checkpoint, or None if the state has no events or is already covered
+        """
+        if state.last_event_sequence <= 0:
+            return None
+        
+        latest = self.latest(state.project_id)
+        if latest and latest.sequence >= state.last_event_sequence:
+            return None
+        
+        payload = zlib.compress(
+            msgpack.packb(state.to_snapshot(), use_bin_type=True),
+            self.compression_level
+        )
+        checkpoint = StateCheckpoint(
+            project_id=state.project_id,
+            sequence=state.last_event_sequence,
+            time_key=to_epoch_micros(state.last_updated),
+            size=len(payload)
+        )
+        
+        if self.checkpoint_dir:
+            self._write_checkpoint_file(checkpoint, payload)
+        else:
+            self._payloads[checkpoint] = payload
+        
+        self._add_to_index(checkpoint)
+        self.checkpoints_saved += 1
+        
+        logger.debug(
+            f"Saved checkpoint for {state.project_id} at sequence {checkpoint.sequence} "
+            f"({checkpoint.size} bytes)"
+        )
+        
+        return checkpoint
+    
+    def find_at_or_before(self, project_id: str, timestamp: datetime) -> Optional[StateCheckpoint]:
+        """Binary search for the latest checkpoint whose event time is <= timestamp"""
+        self.lookups += 1
+        time_keys = self._time_keys.get(project_id)
+        if not time_keys:
+            return None
+        
+        position = bisect.bisect_right(time_keys, to_epoch_micros(timestamp))
+        if position == 0:
+            return None
+        
+        self.lookup_hits += 1
+        return self._index[project_id][position - 1]
+    
+    def latest(self, project_id: str) -> Optional[StateCheckpoint]:
+        """Most recent checkpoint for a project"""
+        checkpoints = self._index.get(project_id)
+        return checkpoints[-1] if checkpoints else None
+    
+    def load(self,
+             checkpoint: StateCheckpoint,
+             blob_store: Optional[ContentBlobStore] = None) -> ProjectState:
+        """Restore a fresh ProjectState from a checkpoint"""
+        if self.checkpoint_dir:
+            payload = self._checkpoint_path(checkpoint).read_bytes()
+        else:
+            payload = self._payloads[checkpoint]
+        
+        data = msgpack.unpackb(zlib.decompress(payload), raw=False, strict_map_key=False)
+        self.checkpoints_loaded += 1
+        return ProjectState.from_snapshot(data, blob_store=blob_store)
+    
+    def refresh(self):
+        """
+        Re-read the index from disk
+        
+        Picks up checkpoints written by other processes sharing the
+        checkpoint directory. No-op for in-memory stores.
+        """
+        if not self.checkpoint_dir:
+            return
+        
+        self._index.clear()
+        self._time_keys.clear()
+        self._recover_index()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get checkpoint store statistics"""
+        return {
+            'projects': len(self._index),
+            'checkpoints': sum(len(c) for c in self._index.values()),
+            'stored_bytes': sum(c.size for cps in self._index.values() for c in cps),
+            'checkpoints_saved': self.checkpoints_saved,
+            'checkpoints_loaded': self.checkpoints_loaded,
+            'lookups': self.lookups,
+            'lookup_hits': self.lookup_hits,
+            'persistent': self.checkpoint_dir is not None
+        }
+    
+    def _add_to_index(self, checkpoint: StateCheckpoint):
+        checkpoints = self._index.setdefault(checkpoint.project_id, [])
+        time_keys = self._time_keys.setdefault(checkpoint.project_id, [])
+        
+        position = bisect.bisect_right(time_keys, checkpoint.time_key)
+        checkpoints.insert(position, checkpoint)
+        time_keys.insert(position, checkpoint.time_key)
+        
+        while len(checkpoints) > self.max_checkpoints_per_project:
+            self._remove(checkpoints.pop(0))
+            time_keys.pop(0)
+    
+    def _remove(self, checkpoint: StateCheckpoint):
+        self._payloads.pop(checkpoint, None)
+        if self.checkpoint_dir:
+            try:
+                self._checkpoint_path(checkpoint).unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _project_dir(self, project_id: str) -> Path:
+        # Percent-encoded so _recover_index can map the directory back to the
+        # project id; a leading dot is escaped so '.' and '..' stay inside
+        name = quote(project_id, safe='')
+        if name.startswith('.'):
+            name = '%2E' + name[1:]
+        return self.checkpoint_dir / name
+    
+    def _checkpoint_path(self, checkpoint: StateCheckpoint) -> Path:
+        return self._project_dir(checkpoint.project_id) / checkpoint.filename
+    
+    def _write_checkpoint_file(self, checkpoint: StateCheckpoint, payload: bytes):
+        path = self._checkpoint_path(checkpoint)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Per-process temp name: several bridge workers may share the directory
+        temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
+    
+    def _recover_index(self):
+        """Rebuild the in-memory index from checkpoint filenames"""
+        for project_dir in self.checkpoint_dir.iterdir():
+            if not project_dir.is_dir():
+                continue
+            
+            for path in sorted(project_dir.glob('*.ckpt')):
+                try:
+                    time_key, sequence = (int(part) for part in path.stem.split('_'))
+                except ValueError:
+                    logger.warning(f"Ignoring unrecognized checkpoint file {path}")
+                    continue
+                
+                try:
+                    size = path.stat().st_size
+                except FileNotFoundError:
+                    continue  # Pruned by another process
+                
+                self._add_to_index(StateCheckpoint(
+                    project_id=unquote(project_dir.name),
+                    sequence=sequence,
+                    time_key=time_key,
+                    size=size
+                ))
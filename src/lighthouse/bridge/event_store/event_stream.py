@@ -7,9 +7,14 @@ Enables WebSocket connections and named pipe streams for expert agents.
 Features:
 - Real-time event broadcasting
 - Filtered subscriptions by event type, agent, or file path
+- Indexed fan-out so publishing only tests candidate subscriptions
+- Per-subscriber ring buffers drained by independent delivery tasks
+- Serialize-once frames shared by WebSocket, SSE and named pipe outputs
 - WebSocket integration for browser clients
-- Named pipe streams for FUSE filesystem
+- Named pipe streams for FUSE filesystem over persistent non-blocking FIFOs
 - Backpressure handling and connection management
+- Credit-based flow control with event-store catch-up for slow consumers
+- Optional shared-memory ring for co-located agent processes
 """
 
 import asyncio
@@ -18,13 +23,15 @@ import logging
 from collections import defaultdict, deque
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Union
 from uuid import uuid4
 
-import aiofiles
 from pathlib import Path
 
-from lighthouse.event_store.models import Event, EventFilter, EventType
+from lighthouse.event_store.models import Event, EventFilter, EventQuery, EventType
+from .frame_cache import EventFrame, EventFrameCache
+from .pipe_writer import NamedPipeWriter
+from .shared_memory_ring import SharedMemoryEventRing
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +45,25 @@ class EventSubscription:
     event_filter: EventFilter
     callback: Optional[Callable[[Event], None]] = None
     
-    # Stream settings
+    # Stream settings (buffer_size also bounds the delivery ring)
     buffer_size: int = 1000
-    backpressure_limit: int = 5000
+    
+    # Flow control (consumer grants credits; one credit per delivered event)
+    flow_control: bool = False
+    credits: int = 0
+    
+    # Sequence tracking for lag and catch-up
+    head_sequence: int = 0  # Newest matching sequence published
+    last_delivered_sequence: int = 0
+    last_acked_sequence: int = 0
+    catching_up: bool = False
+    catch_up_cursor: int = 0
     
     # Statistics
     events_sent: int = 0
     events_dropped: int = 0
+    catch_up_reads: int = 0
+    catch_up_events: int = 0
     last_event_time: Optional[datetime] = None
     created_at: datetime = None
     
@@ -55,6 +74,108 @@ class EventSubscription:
     def matches_event(self, event: Event) -> bool:
         """Check if event matches subscription filter"""
         return self.event_filter.matches_event(event)
+    
+    @property
+    def has_credit(self) -> bool:
+        """Whether the subscription may receive another event now"""
+        return not self.flow_control or self.credits > 0
+    
+    @property
+    def lag(self) -> int:
+        """
+        Consumer lag in sequence numbers
+        
+        Flow-controlled consumers are measured against their acknowledged
+        sequence; others against what has been delivered to them.
+        """
+        consumed = self.last_acked_sequence if self.flow_control else self.last_delivered_sequence
+        return max(0, self.head_sequence - consumed)
+    
+    @property
+    def delivery_lag(self) -> int:
+        """Delivery lag in sequence numbers (published head vs. delivered)"""
+        return max(0, self.head_sequence - self.last_delivered_sequence)
+
+
+class SubscriptionIndex:
+    """
+    Fan-out index over subscriptions
+    
+    Each subscription is filed under the most selective dimension of its
+    filter (aggregate ID, then agent ID, then event type). Subscriptions
+    without any of those constraints go into a wildcard bucket. A published
+    event only has to be tested against the buckets it can possibly hit, so
+    candidate selection is close to O(matches) rather than O(subscriptions).
+    
+    Buckets are keyed by a single event attribute, so a subscription can
+    appear at most once in the candidates for any given event.
+    """
+    
+    def __init__(self):
+        self._by_aggregate: Dict[str, Dict[str, EventSubscription]] = defaultdict(dict)
+        self._by_agent: Dict[str, Dict[str, EventSubscription]] = defaultdict(dict)
+        self._by_event_type: Dict[EventType, Dict[str, EventSubscription]] = defaultdict(dict)
+        self._wildcard: Dict[str, EventSubscription] = {}
+    
+    def add(self, subscription: EventSubscription):
+        """Index a subscription under its most selective filter dimension"""
+        bucket_map, keys = self._placement(subscription.event_filter)
+        if bucket_map is None:
+            self._wildcard[subscription.subscription_id] = subscription
+            return
+        for key in keys:
+            bucket_map[key][subscription.subscription_id] = subscription
+    
+    def remove(self, subscription: EventSubscription):
+        """Remove a subscription from the index"""
+        bucket_map, keys = self._placement(subscription.event_filter)
+        if bucket_map is None:
+            self._wildcard.pop(subscription.subscription_id, None)
+            return
+        for key in keys:
+            bucket = bucket_map.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(subscription.subscription_id, None)
+            if not bucket:
+                del bucket_map[key]
+    
+    def candidates(self, event: Event) -> List[EventSubscription]:
+        """Get subscriptions that may match an event (confirm with matches_event)"""
+        candidates = list(self._wildcard.values())
+        
+        bucket = self._by_aggregate.get(event.aggregate_id)
+        if bucket:
+            candidates.extend(bucket.values())
+        
+        agent_id = event.source_agent or event.metadata.get('agent_id')
+        if agent_id is not None:
+            bucket = self._by_agent.get(agent_id)
+            if bucket:
+                candidates.extend(bucket.values())
+        
+        bucket = self._by_event_type.get(event.event_type)
+        if bucket:
+            candidates.extend(bucket.values())
+        
+        return candidates
+    
+    def __len__(self) -> int:
+        indexed = set(self._wildcard)
+        for bucket_map in (self._by_aggregate, self._by_agent, self._by_event_type):
+            for bucket in bucket_map.values():
+                indexed.update(bucket)
+        return len(indexed)
+    
+    def _placement(self, event_filter: EventFilter):
+        """Pick the bucket map and keys a filter is indexed under"""
+        if event_filter.aggregate_ids:
+            return self._by_aggregate, set(event_filter.aggregate_ids)
+        if event_filter.agent_ids:
+            return self._by_agent, set(event_filter.agent_ids)
+        if event_filter.event_types:
+            return self._by_event_type, set(event_filter.event_types)
+        return None, ()
 
 
 @dataclass
@@ -67,6 +188,8 @@ class StreamStats:
     events_per_second: float = 0.0
     average_fanout: float = 0.0
     dropped_events: int = 0
+    catch_up_switches: int = 0
+    catch_up_events: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -75,7 +198,9 @@ class StreamStats:
             'active_subscriptions': self.active_subscriptions,
             'events_per_second': self.events_per_second,
             'average_fanout': self.average_fanout,
-            'dropped_events': self.dropped_events
+            'dropped_events': self.dropped_events,
+            'catch_up_switches': self.catch_up_switches,
+            'catch_up_events': self.catch_up_events
         }
 
 
@@ -84,31 +209,54 @@ class EventStream:
     
     def __init__(self, 
                  fuse_mount_path: Optional[str] = "/mnt/lighthouse/project/streams",
-                 websocket_port: int = 8766):
+                 websocket_port: int = 8766,
+                 event_store: Optional[Any] = None):
         """
         Initialize event stream
         
         Args:
             fuse_mount_path: Path for FUSE named pipe streams
             websocket_port: Port for WebSocket connections
+            event_store: Event store used for catch-up reads by
+                flow-controlled subscriptions that fall behind
         """
         self.fuse_mount_path = Path(fuse_mount_path) if fuse_mount_path else None
         self.websocket_port = websocket_port
+        self.event_store = event_store
+        self.catch_up_batch_size = 500
         
         # Subscriptions management
         self.subscriptions: Dict[str, EventSubscription] = {}
         self.subscriber_subscriptions: Dict[str, Set[str]] = defaultdict(set)
         
+        # Fan-out index used to find candidate subscriptions on publish
+        self._subscription_index = SubscriptionIndex()
+        
         # Event buffering for each subscription
         self.event_buffers: Dict[str, deque] = {}
         
+        # Decoupled delivery: bounded ring per subscription plus a drain task
+        self._delivery_rings: Dict[str, deque] = {}
+        self._delivery_signals: Dict[str, asyncio.Event] = {}
+        self._drain_tasks: Dict[str, asyncio.Task] = {}
+        # Subscriptions whose drain task is delivering an event right now
+        self._sending: Set[str] = set()
+        
+        # Encoded frames shared across subscribers until fully drained
+        self.frame_cache = EventFrameCache()
+        
         # Named pipe streams for FUSE integration
-        self.named_pipes: Dict[str, asyncio.Queue] = {}
+        self.named_pipes: Dict[str, NamedPipeWriter] = {}
         self.pipe_tasks: Dict[str, asyncio.Task] = {}
+        self._pipe_signals: Dict[str, asyncio.Event] = {}
+        self.pipe_retry_interval = 0.5  # Seconds between opens while no reader
         
         # WebSocket connections
         self.websocket_connections: Dict[str, Any] = {}  # Will store WebSocket objects
         
+        # Shared-memory transport for co-located agents (optional)
+        self.shared_memory_ring: Optional[SharedMemoryEventRing] = None
+        
         # Statistics
         self.stats = StreamStats()
         self._event_timestamps = deque(maxlen=1000)  # For calculating events/second
@@ -141,8 +289,19 @@ class EventStream:
         self._shutdown_event.set()
         
         # Close all named pipes
-        for task in self.pipe_tasks.values():
+        pipe_tasks = list(self.pipe_tasks.values())
+        for task in pipe_tasks:
             task.cancel()
+        if pipe_tasks:
+            await asyncio.gather(*pipe_tasks, return_exceptions=True)
+        
+        # Stop subscription delivery tasks
+        drain_tasks = list(self._drain_tasks.values())
+        for task in drain_tasks:
+            task.cancel()
+        if drain_tasks:
+            await asyncio.gather(*drain_tasks, return_exceptions=True)
+        self._drain_tasks.clear()
         
         # Cancel background tasks
         for task in self._background_tasks:
@@ -152,23 +311,33 @@ class EventStream:
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
         
+        # Remove the shared-memory segment
+        if self.shared_memory_ring:
+            self.shared_memory_ring.close()
+            self.shared_memory_ring = None
+        
         logger.info("Event Stream Manager stopped")
     
     async def publish_event(self, event: Event):
         """
         Publish event to all matching subscriptions
         
+        Publishing never waits on subscribers: each matching subscription
+        gets the event appended to its ring buffer and its drain task is
+        woken to deliver it.
+        
         Args:
             event: Event to publish
         """
         self.stats.total_events += 1
         self._event_timestamps.append(datetime.utcnow())
         
-        # Find matching subscriptions
-        matching_subscriptions = []
-        for subscription in self.subscriptions.values():
-            if subscription.matches_event(event):
-                matching_subscriptions.append(subscription)
+        # Find matching subscriptions among indexed candidates
+        matching_subscriptions = [
+            subscription
+            for subscription in self._subscription_index.candidates(event)
+            if subscription.matches_event(event)
+        ]
         
         # Update fanout statistics
         if matching_subscriptions:
@@ -177,23 +346,73 @@ class EventStream:
                  len(matching_subscriptions)) / self.stats.total_events
             )
         
-        # Send to matching subscriptions
-        send_tasks = []
+        # Co-located agents filter locally, so the ring gets every event
+        if self.shared_memory_ring:
+            try:
+                self.shared_memory_ring.publish(event)
+            except Exception as e:
+                logger.error(f"Shared-memory ring publish error: {e}")
+        
+        # Encode once for every matching subscriber, then hand off
+        if matching_subscriptions:
+            self.frame_cache.retain(event, len(matching_subscriptions))
+        
         for subscription in matching_subscriptions:
-            task = asyncio.create_task(
-                self._send_event_to_subscription(event, subscription)
-            )
-            send_tasks.append(task)
+            self._enqueue_event(event, subscription)
+    
+    async def flush(self, timeout: float = 1.0) -> bool:
+        """
+        Wait until every subscription ring has been drained and delivered
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if all rings drained and no send was in flight within the timeout
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        while self._sending or any(self._delivery_rings.values()):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.001)
         
-        # Wait for all sends to complete (with timeout to prevent blocking)
-        if send_tasks:
-            await asyncio.wait(send_tasks, timeout=1.0)
+        return True
+    
+    def enable_shared_memory_transport(self,
+                                       name: Optional[str] = None,
+                                       slot_count: int = 4096,
+                                       slot_size: int = 8192) -> str:
+        """
+        Publish every event into a shared-memory ring for local agents
+        
+        Agents on the same host attach with SharedMemoryRingReader using
+        the returned segment name.
+        
+        Args:
+            name: Shared memory segment name (generated if omitted)
+            slot_count: Number of slots in the ring
+            slot_size: Bytes per slot; larger events are fetched from the store
+            
+        Returns:
+            Name of the shared memory segment
+        """
+        if self.shared_memory_ring is None:
+            self.shared_memory_ring = SharedMemoryEventRing(
+                name=name,
+                slot_count=slot_count,
+                slot_size=slot_size
+            )
+        return self.shared_memory_ring.name
     
     def subscribe(self,
                  subscriber_id: str,
                  event_filter: EventFilter,
                  callback: Optional[Callable[[Event], None]] = None,
-                 buffer_size: int = 1000) -> str:
+                 buffer_size: int = 1000,
+                 flow_control: bool = False,
+                 initial_credits: int = 0) -> str:
         """
         Create event subscription
         
@@ -202,6 +421,10 @@ class EventStream:
             event_filter: Filter for events to receive
             callback: Optional callback function for events
             buffer_size: Size of event buffer
+            flow_control: Only deliver events the consumer has granted
+                credits for; overflow switches to catch-up from the event
+                store instead of dropping events
+            initial_credits: Credits granted at subscription time
             
         Returns:
             Subscription ID
@@ -213,13 +436,18 @@ class EventStream:
             subscriber_id=subscriber_id,
             event_filter=event_filter,
             callback=callback,
-            buffer_size=buffer_size
+            buffer_size=buffer_size,
+            flow_control=flow_control,
+            credits=initial_credits
         )
         
         # Store subscription
         self.subscriptions[subscription_id] = subscription
         self.subscriber_subscriptions[subscriber_id].add(subscription_id)
         self.event_buffers[subscription_id] = deque(maxlen=buffer_size)
+        self._delivery_rings[subscription_id] = deque()
+        self._delivery_signals[subscription_id] = asyncio.Event()
+        self._subscription_index.add(subscription)
         
         self.stats.total_subscriptions += 1
         self.stats.active_subscriptions += 1
@@ -237,11 +465,48 @@ class EventStream:
             del self.subscriptions[subscription_id]
             self.subscriber_subscriptions[subscription.subscriber_id].discard(subscription_id)
             del self.event_buffers[subscription_id]
+            self._subscription_index.remove(subscription)
+            
+            # Stop delivery for this subscription
+            drain_task = self._drain_tasks.pop(subscription_id, None)
+            if drain_task:
+                drain_task.cancel()
+            for pending_event in self._delivery_rings.pop(subscription_id, ()):
+                self.frame_cache.release(pending_event)
+            self._delivery_signals.pop(subscription_id, None)
             
             self.stats.active_subscriptions -= 1
             
             logger.info(f"Removed subscription {subscription_id}")
     
+    def grant_credits(self,
+                      subscription_id: str,
+                      credits: int,
+                      ack_sequence: Optional[int] = None):
+        """
+        Grant delivery credits to a flow-controlled subscription
+        
+        Args:
+            subscription_id: Subscription to grant credits to
+            credits: Number of additional events the consumer can accept
+            ack_sequence: Optional sequence the consumer has processed up to
+        """
+        subscription = self.subscriptions.get(subscription_id)
+        if subscription is None:
+            return
+        
+        if ack_sequence is not None:
+            self.acknowledge(subscription_id, ack_sequence)
+        
+        subscription.credits += max(0, credits)
+        self._wake_subscription(subscription)
+    
+    def acknowledge(self, subscription_id: str, sequence: int):
+        """Record that a consumer has processed events up to a sequence"""
+        subscription = self.subscriptions.get(subscription_id)
+        if subscription is not None and sequence > subscription.last_acked_sequence:
+            subscription.last_acked_sequence = sequence
+    
     def unsubscribe_all(self, subscriber_id: str):
         """Remove all subscriptions for a subscriber"""
         subscription_ids = list(self.subscriber_subscriptions[subscriber_id])
@@ -279,13 +544,15 @@ class EventStream:
         
         pipe_path = self.fuse_mount_path / stream_name
         
-        # Create queue for the stream
-        stream_queue = asyncio.Queue(maxsize=1000)
-        self.named_pipes[stream_name] = stream_queue
+        # Persistent writer for the stream
+        writer = NamedPipeWriter(pipe_path, max_pending=1000)
+        writer.ensure_fifo()
+        self.named_pipes[stream_name] = writer
+        self._pipe_signals[stream_name] = asyncio.Event()
         
         # Start background task to write to pipe
         pipe_task = asyncio.create_task(
-            self._write_to_named_pipe(pipe_path, stream_queue)
+            self._write_to_named_pipe(stream_name, writer)
         )
         self.pipe_tasks[stream_name] = pipe_task
         
@@ -293,31 +560,196 @@ class EventStream:
         
         return str(pipe_path)
     
-    async def write_to_stream(self, stream_name: str, data: Dict[str, Any]):
-        """Write data to a named pipe stream"""
+    def get_event_frame(self, event: Event) -> EventFrame:
+        """
+        Get the shared encoded frame for an event
+        
+        SSE handlers and other outputs should use this rather than
+        serializing the event themselves, so in-flight events are only
+        encoded once.
+        """
+        return self.frame_cache.get_frame(event)
+    
+    async def write_to_stream(self, stream_name: str, data: Union[Dict[str, Any], Event]):
+        """Write data (or an event, using its shared frame) to a named pipe stream"""
         if stream_name in self.named_pipes:
+            if isinstance(data, Event):
+                line = self.get_event_frame(data).ndjson_line
+            else:
+                line = json.dumps(data)
+            
+            if not self.named_pipes[stream_name].enqueue(line):
+                logger.debug(f"Stream {stream_name} is backed up, dropped oldest message")
+            self._pipe_signals[stream_name].set()
+    
+    def _enqueue_event(self, event: Event, subscription: EventSubscription):
+        """Append event to a subscription's ring and wake its drain task (O(1))"""
+        subscription_id = subscription.subscription_id
+        
+        # Recent-history buffer for polling clients
+        self.event_buffers[subscription_id].append(event)
+        
+        if event.sequence is not None and event.sequence > subscription.head_sequence:
+            subscription.head_sequence = event.sequence
+        
+        # Catching-up subscriptions read from the store; the head is enough
+        if subscription.catching_up:
+            self.frame_cache.release(event)
+            self._wake_subscription(subscription)
+            return
+        
+        ring = self._delivery_rings[subscription_id]
+        if len(ring) >= subscription.buffer_size:
+            if self._can_catch_up(subscription, event):
+                self._switch_to_catch_up(subscription)
+                self.frame_cache.release(event)
+                self._wake_subscription(subscription)
+                return
+            
+            # Bounded delivery ring - drop oldest when the subscriber falls behind
+            self.frame_cache.release(ring.popleft())
+            subscription.events_dropped += 1
+            self.stats.dropped_events += 1
+        ring.append(event)
+        
+        self._wake_subscription(subscription)
+    
+    def _wake_subscription(self, subscription: EventSubscription):
+        """Signal a subscription's drain task, starting it if needed"""
+        subscription_id = subscription.subscription_id
+        if subscription_id not in self._delivery_signals:
+            return
+        
+        if subscription_id not in self._drain_tasks:
             try:
-                await self.named_pipes[stream_name].put(data)
-            except asyncio.QueueFull:
-                logger.warning(f"Stream {stream_name} queue is full, dropping message")
+                self._drain_tasks[subscription_id] = asyncio.create_task(
+                    self._drain_subscription(subscription)
+                )
+            except RuntimeError:
+                pass  # No running loop yet; the first publish starts it
+        
+        self._delivery_signals[subscription_id].set()
     
-    async def _send_event_to_subscription(self, event: Event, subscription: EventSubscription):
-        """Send event to a specific subscription"""
+    def _can_catch_up(self, subscription: EventSubscription, event: Event) -> bool:
+        """Whether an overflowing subscription can recover from the store"""
+        return (
+            subscription.flow_control
+            and self.event_store is not None
+            and event.sequence is not None
+        )
+    
+    def _switch_to_catch_up(self, subscription: EventSubscription):
+        """Discard the ring and resume from the last acknowledged sequence"""
+        ring = self._delivery_rings[subscription.subscription_id]
+        while ring:
+            self.frame_cache.release(ring.popleft())
+        
+        subscription.catching_up = True
+        subscription.catch_up_cursor = subscription.last_acked_sequence
+        self.stats.catch_up_switches += 1
+        
+        logger.info(
+            f"Subscription {subscription.subscription_id} fell behind "
+            f"(lag {subscription.lag}); catching up from sequence "
+            f"{subscription.catch_up_cursor}"
+        )
+    
+    async def _drain_subscription(self, subscription: EventSubscription):
+        """Deliver events from a subscription's ring until unsubscribed"""
+        subscription_id = subscription.subscription_id
+        ring = self._delivery_rings[subscription_id]
+        signal = self._delivery_signals[subscription_id]
+        
+        try:
+            while not self._shutdown_event.is_set():
+                await signal.wait()
+                signal.clear()
+                
+                if subscription.catching_up:
+                    if subscription.has_credit:
+                        self._sending.add(subscription_id)
+                        try:
+                            if await self._catch_up_subscription(subscription):
+                                signal.set()  # More to read while credits last
+                        finally:
+                            self._sending.discard(subscription_id)
+                    continue
+                
+                while ring and subscription.has_credit:
+                    # Marked in flight before the ring can look empty to flush()
+                    event = ring.popleft()
+                    self._sending.add(subscription_id)
+                    try:
+                        if (subscription.flow_control and event.sequence is not None
+                                and event.sequence <= subscription.last_delivered_sequence):
+                            continue  # Already delivered during catch-up
+                        await self._send_event_to_subscription(event, subscription)
+                    finally:
+                        self._sending.discard(subscription_id)
+                        self.frame_cache.release(event)
+                    
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Delivery task error for subscription {subscription_id}: {e}")
+        finally:
+            if self._drain_tasks.get(subscription_id) is asyncio.current_task():
+                del self._drain_tasks[subscription_id]
+    
+    async def _catch_up_subscription(self, subscription: EventSubscription) -> bool:
+        """
+        Deliver one credit-bounded batch of missed events from the event store
+        
+        Returns:
+            True if more events may be available to read
+        """
+        batch_size = min(subscription.credits, self.catch_up_batch_size)
+        catch_up_filter = subscription.event_filter.model_copy(
+            update={'after_sequence': subscription.catch_up_cursor}
+        )
+        
         try:
-            # Check backpressure
-            buffer = self.event_buffers[subscription.subscription_id]
-            if len(buffer) >= subscription.backpressure_limit:
-                # Drop oldest events
-                while len(buffer) >= subscription.buffer_size:
-                    buffer.popleft()
-                    subscription.events_dropped += 1
-                    self.stats.dropped_events += 1
+            result = await self.event_store.query(
+                EventQuery(filter=catch_up_filter, limit=batch_size)
+            )
+        except Exception as e:
+            logger.error(f"Catch-up read failed for subscription {subscription.subscription_id}: {e}")
+            return False
+        
+        subscription.catch_up_reads += 1
+        
+        for event in result.events:
+            if event.sequence is None or event.sequence <= subscription.catch_up_cursor:
+                continue
             
-            # Add event to buffer
-            buffer.append(event)
+            subscription.catch_up_cursor = event.sequence
+            if not subscription.matches_event(event):
+                continue
+            
+            await self._send_event_to_subscription(event, subscription)
+            subscription.catch_up_events += 1
+            self.stats.catch_up_events += 1
+        
+        # Back to live delivery once the store read has reached the head
+        if subscription.catch_up_cursor >= subscription.head_sequence:
+            subscription.catching_up = False
+            logger.info(f"Subscription {subscription.subscription_id} caught up at sequence "
+                        f"{subscription.catch_up_cursor}")
+            return False
+        
+        return len(result.events) >= batch_size
+    
+    async def _send_event_to_subscription(self, event: Event, subscription: EventSubscription):
+        """Deliver event to a specific subscription"""
+        try:
             subscription.events_sent += 1
             subscription.last_event_time = datetime.utcnow()
             
+            if subscription.flow_control:
+                subscription.credits -= 1
+            if event.sequence is not None and event.sequence > subscription.last_delivered_sequence:
+                subscription.last_delivered_sequence = event.sequence
+            
             # Call callback if provided
             if subscription.callback:
                 try:
@@ -336,47 +768,39 @@ class EventStream:
         if subscriber_id in self.websocket_connections:
             try:
                 websocket = self.websocket_connections[subscriber_id]
-                message = {
-                    'type': 'event',
-                    'event': event.to_dict()
-                }
-                await websocket.send(json.dumps(message))
+                frame = self.frame_cache.get_frame(event)
+                await websocket.send(frame.websocket_text)
             except Exception as e:
                 logger.warning(f"WebSocket send error for {subscriber_id}: {e}")
                 # Remove broken connection
                 del self.websocket_connections[subscriber_id]
     
-    async def _write_to_named_pipe(self, pipe_path: Path, queue: asyncio.Queue):
-        """Write data from queue to named pipe"""
+    async def _write_to_named_pipe(self, stream_name: str, writer: NamedPipeWriter):
+        """Flush queued lines to a named pipe whenever new data arrives"""
+        signal = self._pipe_signals[stream_name]
+        
         try:
-            # Create parent directories
-            pipe_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create named pipe (FIFO)
-            if not pipe_path.exists():
-                import os
-                os.mkfifo(str(pipe_path))
-            
-            # Continuously write to pipe
             while not self._shutdown_event.is_set():
-                try:
-                    # Get data from queue with timeout
-                    data = await asyncio.wait_for(queue.get(), timeout=1.0)
-                    
-                    # Write to named pipe
-                    async with aiofiles.open(pipe_path, 'w') as f:
-                        await f.write(json.dumps(data) + '\n')
-                    
-                except asyncio.TimeoutError:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error writing to pipe {pipe_path}: {e}")
-                    await asyncio.sleep(1.0)
+                if not writer.pending:
+                    try:
+                        await asyncio.wait_for(signal.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        continue
+                
+                signal.clear()
+                writer.flush()
+                
+                if writer.pending:
+                    # No reader attached yet, or the reader is behind
+                    delay = 0.005 if writer.is_open else self.pipe_retry_interval
+                    await asyncio.sleep(delay)
             
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            logger.error(f"Named pipe task error for {pipe_path}: {e}")
+            logger.error(f"Named pipe task error for {writer.pipe_path}: {e}")
+        finally:
+            writer.close()
     
     async def _setup_fuse_streams(self):
         """Setup default FUSE stream directories"""
@@ -460,14 +884,27 @@ class EventStream:
     def get_stream_stats(self) -> Dict[str, Any]:
         """Get detailed stream statistics"""
         subscription_stats = []
+        lags = []
         
         for subscription in self.subscriptions.values():
+            lags.append(subscription.lag)
             subscription_stats.append({
                 'subscription_id': subscription.subscription_id,
                 'subscriber_id': subscription.subscriber_id,
                 'events_sent': subscription.events_sent,
                 'events_dropped': subscription.events_dropped,
                 'buffer_size': len(self.event_buffers.get(subscription.subscription_id, [])),
+                'pending_delivery': len(self._delivery_rings.get(subscription.subscription_id, [])),
+                'flow_control': subscription.flow_control,
+                'credits': subscription.credits,
+                'head_sequence': subscription.head_sequence,
+                'last_delivered_sequence': subscription.last_delivered_sequence,
+                'last_acked_sequence': subscription.last_acked_sequence,
+                'lag': subscription.lag,
+                'delivery_lag': subscription.delivery_lag,
+                'catching_up': subscription.catching_up,
+                'catch_up_reads': subscription.catch_up_reads,
+                'catch_up_events': subscription.catch_up_events,
                 'created_at': subscription.created_at.isoformat(),
                 'last_event_time': subscription.last_event_time.isoformat() if subscription.last_event_time else None
             })
@@ -475,6 +912,19 @@ class EventStream:
         return {
             'overall_stats': self.stats.to_dict(),
             'subscriptions': subscription_stats,
+            'consumer_lag': {
+                'max': max(lags, default=0),
+                'total': sum(lags),
+                'catching_up': sum(1 for s in self.subscriptions.values() if s.catching_up)
+            },
             'named_pipes': list(self.named_pipes.keys()),
+            'named_pipe_stats': {
+                stream_name: writer.get_stats()
+                for stream_name, writer in self.named_pipes.items()
+            },
+            'frame_cache': self.frame_cache.get_stats(),
+            'shared_memory_ring': (
+                self.shared_memory_ring.get_stats() if self.shared_memory_ring else None
+            ),
             'websocket_connections': len(self.websocket_connections)
         }
\ No newline at end of file
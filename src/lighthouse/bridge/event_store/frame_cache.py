@@ -0,0 +1,155 @@
+"""
+Event Frame Cache
+
+Serialize-once encoding for fanned-out events. When an event is delivered
+to many subscribers, the JSON encoding is produced once and the same
+bytes are reused for every WebSocket and named-pipe output.
+
+Features:
+- One JSON encoding per event regardless of fan-out
+- Transport-specific framings derived from the shared encoding
+- Reference-counted entries evicted once every subscriber has drained
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from lighthouse.event_store.models import Event
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EventFrame:
+    """Pre-encoded representations of a single event"""
+    
+    event_id: str
+    event_json: str
+    event_type: str
+    sequence: Optional[int] = None
+    served: int = 0
+    
+    # Lazily derived encodings
+    _websocket_text: Optional[str] = field(default=None, repr=False)
+    _ndjson_line: Optional[str] = field(default=None, repr=False)
+    
+    @classmethod
+    def from_event(cls, event: Event) -> 'EventFrame':
+        """Encode an event once"""
+        return cls(
+            event_id=str(event.event_id),
+            event_json=json.dumps(event.to_dict()),
+            event_type=event.event_type.value,
+            sequence=event.sequence
+        )
+    
+    @property
+    def websocket_text(self) -> str:
+        """WebSocket message envelope (same shape as json.dumps of the dict)"""
+        if self._websocket_text is None:
+            self._websocket_text = '{"type": "event", "event": ' + self.event_json + '}'
+        return self._websocket_text
+    
+    @property
+    def ndjson_line(self) -> str:
+        """Newline-delimited JSON line for named pipes"""
+        if self._ndjson_line is None:
+            self._ndjson_line = self.event_json + '\n'
+        return self._ndjson_line
+    
+    @property
+    def size_bytes(self) -> int:
+        """Size of the shared JSON encoding"""
+        return len(self.event_json)
+
+
+class EventFrameCache:
+    """
+    Reference-counted cache of encoded event frames
+    
+    Publishers retain an event once per subscriber it is queued for, and
+    each delivery releases it. The frame is evicted when the last holder
+    releases, so the cache only ever holds in-flight events.
+    """
+    
+    def __init__(self):
+        """Initialize frame cache"""
+        self._frames: Dict[str, EventFrame] = {}
+        self._holders: Dict[str, int] = {}
+        
+        # Statistics
+        self.encodes = 0
+        self.hits = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+    
+    def retain(self, event: Event, holders: int = 1) -> EventFrame:
+        """
+        Register pending deliveries for an event
+        
+        Args:
+            event: Event being fanned out
+            holders: Number of deliveries that will later release the frame
+        
+        Returns:
+            Cached frame for the event
+        """
+        event_id = str(event.event_id)
+        frame = self._frames.get(event_id)
+        if frame is None:
+            frame = self._encode(event)
+            self._frames[event_id] = frame
+            self._holders[event_id] = 0
+        
+        self._holders[event_id] += holders
+        return frame
+    
+    def release(self, event: Event, holders: int = 1):
+        """Drop pending deliveries; evicts the frame once none remain"""
+        event_id = str(event.event_id)
+        if event_id not in self._holders:
+            return
+        
+        remaining = self._holders[event_id] - holders
+        if remaining > 0:
+            self._holders[event_id] = remaining
+            return
+        
+        del self._holders[event_id]
+        del self._frames[event_id]
+        self.evictions += 1
+    
+    def get_frame(self, event: Event) -> EventFrame:
+        """
+        Get the encoded frame for an event
+        
+        Events that were not retained are encoded without being cached.
+        """
+        frame = self._frames.get(str(event.event_id))
+        if frame is not None:
+            self.hits += 1
+            if frame.served:
+                self.bytes_saved += frame.size_bytes
+            frame.served += 1
+            return frame
+        return self._encode(event)
+    
+    def _encode(self, event: Event) -> EventFrame:
+        frame = EventFrame.from_event(event)
+        self.encodes += 1
+        return frame
+    
+    def __len__(self) -> int:
+        return len(self._frames)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get frame cache statistics"""
+        return {
+            'cached_frames': len(self._frames),
+            'encodes': self.encodes,
+            'hits': self.hits,
+            'evictions': self.evictions,
+            'bytes_saved': self.bytes_saved
+        }
@@ -0,0 +1,353 @@
+"""
+Persistent Maps
+
+Hash array mapped trie (HAMT) with path copying, used by ProjectState so
+that forked states (e.g. cached time travel states) share every entry
+that has not changed since the fork.
+
+A PersistentMap behaves like a mutable dict. Internally each map holds an
+owner token: trie nodes created under the current token are updated in
+place, while nodes shared with a fork are copied along the path to the
+change. fork() is O(1), writes are O(log32 n), and diff() only walks
+subtrees that differ between two maps.
+
+Features:
+- Dict-compatible MutableMapping API
+- O(1) fork with structural sharing
+- In-place updates for nodes owned by the map (no copying without forks)
+- Diff that skips shared subtrees by identity
+"""
+
+from collections.abc import MutableMapping, MutableSet
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+_MISSING = object()
+
+
+class _Node:
+    """Bitmap-indexed trie node; slots hold (hash, key, value) leaves or child nodes"""
+    
+    __slots__ = ('bitmap', 'slots', 'owner')
+    
+    def __init__(self, bitmap: int, slots: List[Any], owner: object):
+        self.bitmap = bitmap
+        self.slots = slots
+        self.owner = owner
+
+
+class _Collision:
+    """Leaves whose full hashes are equal"""
+    
+    __slots__ = ('hash', 'slots', 'owner')
+    
+    def __init__(self, key_hash: int, slots: List[Tuple[int, Any, Any]], owner: object):
+        self.hash = key_hash
+        self.slots = slots
+        self.owner = owner
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _index(bitmap: int, bit: int) -> int:
+    return (bitmap & (bit - 1)).bit_count()
+
+
+def _get(node: Any, key_hash: int, key: Any, default: Any) -> Any:
+    shift = 0
+    while True:
+        if isinstance(node, _Collision):
+            for leaf in node.slots:
+                if leaf[1] == key:
+                    return leaf[2]
+            return default
+        
+        bitmap = node.bitmap
+        bit = 1 << ((key_hash >> shift) & _MASK)
+        if not bitmap & bit:
+            return default
+        
+        # Inlined _index(): this is the hottest lookup path
+        slot = node.slots[(bitmap & (bit - 1)).bit_count()]
+        if isinstance(slot, tuple):
+            if slot[0] == key_hash and slot[1] == key:
+                return slot[2]
+            return default
+        
+        node = slot
+        shift += _BITS
+
+
+def _editable(node: Any, owner: object) -> Any:
+    """Return node itself if owned, otherwise an owned copy"""
+    if node.owner is owner:
+        return node
+    if isinstance(node, _Collision):
+        return _Collision(node.hash, list(node.slots), owner)
+    return _Node(node.bitmap, list(node.slots), owner)
+
+
+def _merge(leaf1: Tuple, leaf2: Tuple, shift: int, owner: object) -> Any:
+    """Build the smallest subtree holding two leaves with different keys"""
+    if shift >= _HASH_BITS:
+        return _Collision(leaf1[0], [leaf1, leaf2], owner)
+    
+    frag1 = (leaf1[0] >> shift) & _MASK
+    frag2 = (leaf2[0] >> shift) & _MASK
+    
+    if frag1 == frag2:
+        return _Node(1 << frag1, [_merge(leaf1, leaf2, shift + _BITS, owner)], owner)
+    
+    slots = [leaf1, leaf2] if frag1 < frag2 else [leaf2, leaf1]
+    return _Node((1 << frag1) | (1 << frag2), slots, owner)
+
+
+def _assoc(node: Any, leaf: Tuple, shift: int, owner: object) -> Tuple[Any, bool]:
+    """Insert or replace; returns (node, added)"""
+    key_hash, key, value = leaf
+    
+    if isinstance(node, _Collision):
+        for i, existing in enumerate(node.slots):
+            if existing[1] == key:
+                if existing[2] is value:
+                    return node, False
+                node = _editable(node, owner)
+                node.slots[i] = leaf
+                return node, False
+        node = _editable(node, owner)
+        node.slots.append(leaf)
+        return node, True
+    
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    idx = _index(node.bitmap, bit)
+    
+    if not node.bitmap & bit:
+        node = _editable(node, owner)
+        node.bitmap |= bit
+        node.slots.insert(idx, leaf)
+        return node, True
+    
+    slot = node.slots[idx]
+    
+    if isinstance(slot, tuple):
+        if slot[0] == key_hash and slot[1] == key:
+            if slot[2] is value:
+                return node, False
+            new_slot, added = leaf, False
+        else:
+            new_slot, added = _merge(slot, leaf, shift + _BITS, owner), True
+    else:
+        new_slot, added = _assoc(slot, leaf, shift + _BITS, owner)
+        if new_slot is slot:
+            return node, added
+    
+    node = _editable(node, owner)
+    node.slots[idx] = new_slot
+    return node, added
+
+
+def _dissoc(node: Any, key_hash: int, key: Any, shift: int, owner: object) -> Tuple[Any, bool]:
+    """
+    Remove a key; returns (node, removed)
+    
+    Below the root, a node left with a single leaf collapses to that leaf
+    and an emptied node to None, so the parent can inline it.
+    """
+    if isinstance(node, _Collision):
+        for i, existing in enumerate(node.slots):
+            if existing[1] == key:
+                if len(node.slots) == 2:
+                    return node.slots[1 - i], True
+                node = _editable(node, owner)
+                del node.slots[i]
+                return node, True
+        return node, False
+    
+    bit = 1 << ((key_hash >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return node, False
+    
+    idx = _index(node.bitmap, bit)
+    slot = node.slots[idx]
+    
+    if isinstance(slot, tuple):
+        if not (slot[0] == key_hash and slot[1] == key):
+            return node, False
+        new_slot = None
+    else:
+        new_slot, removed = _dissoc(slot, key_hash, key, shift + _BITS, owner)
+        if not removed:
+            return node, False
+    
+    if new_slot is None:
+        if shift and len(node.slots) == 1:
+            return None, True
+        if shift and len(node.slots) == 2 and isinstance(node.slots[1 - idx], tuple):
+            return node.slots[1 - idx], True
+        node = _editable(node, owner)
+        node.bitmap &= ~bit
+        del node.slots[idx]
+        return node, True
+    
+    if shift and len(node.slots) == 1 and isinstance(new_slot, tuple):
+        return new_slot, True
+    
+    node = _editable(node, owner)
+    node.slots[idx] = new_slot
+    return node, True
+
+
+def _iter_leaves(node: Any) -> Iterator[Tuple[int, Any, Any]]:
+    for slot in node.slots:
+        if isinstance(slot, tuple):
+            yield slot
+        else:
+            yield from _iter_leaves(slot)
+
+
+def _subtree_items(slot: Any) -> dict:
+    if slot is None:
+        return {}
+    if isinstance(slot, tuple):
+        return {slot[1]: slot[2]}
+    return {leaf[1]: leaf[2] for leaf in _iter_leaves(slot)}
+
+
+def _diff(a: Any, b: Any) -> Iterator[Tuple[Any, Any, Any]]:
+    """Yield (key, old, new) for differing entries, skipping shared subtrees"""
+    if a is b:
+        return
+    
+    if isinstance(a, _Node) and isinstance(b, _Node):
+        bitmap = a.bitmap | b.bitmap
+        while bitmap:
+            bit = bitmap & -bitmap
+            bitmap ^= bit
+            slot_a = a.slots[_index(a.bitmap, bit)] if a.bitmap & bit else None
+            slot_b = b.slots[_index(b.bitmap, bit)] if b.bitmap & bit else None
+            yield from _diff(slot_a, slot_b)
+        return
+    
+    # Leaves, collisions or mixed shapes: compare the (small) subtrees directly
+    items_a = _subtree_items(a)
+    items_b = _subtree_items(b)
+    for key, old in items_a.items():
+        new = items_b.get(key, _MISSING)
+        if new is _MISSING:
+            yield key, old, None
+        elif new is not old and new != old:
+            yield key, old, new
+    for key, new in items_b.items():
+        if key not in items_a:
+            yield key, None, new
+
+
+class PersistentMap(MutableMapping):
+    """Dict-like HAMT with O(1) copy-on-write forks"""
+    
+    __slots__ = ('_root', '_size', '_owner')
+    
+    def __init__(self, items: Optional[Iterable] = None):
+        self._owner = object()
+        self._root = _Node(0, [], self._owner)
+        self._size = 0
+        if items is not None:
+            self.update(items)
+    
+    def __getitem__(self, key: Any) -> Any:
+        value = _get(self._root, _hash(key), key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        return _get(self._root, _hash(key), key, default)
+    
+    def __contains__(self, key: Any) -> bool:
+        return _get(self._root, _hash(key), key, _MISSING) is not _MISSING
+    
+    def __setitem__(self, key: Any, value: Any):
+        self._root, added = _assoc(self._root, (_hash(key), key, value), 0, self._owner)
+        if added:
+            self._size += 1
+    
+    def __delitem__(self, key: Any):
+        root, removed = _dissoc(self._root, _hash(key), key, 0, self._owner)
+        if not removed:
+            raise KeyError(key)
+        self._root = root
+        self._size -= 1
+    
+    def __iter__(self) -> Iterator[Any]:
+        for leaf in _iter_leaves(self._root):
+            yield leaf[1]
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
+    
+    def fork(self) -> 'PersistentMap':
+        """
+        O(1) copy sharing all nodes with this map
+        
+        Both maps get fresh owner tokens, so neither can modify the
+        shared nodes in place afterwards.
+        """
+        clone = PersistentMap.__new__(PersistentMap)
+        clone._root = self._root
+        clone._size = self._size
+        clone._owner = object()
+        self._owner = object()
+        return clone
+    
+    def diff(self, other: 'PersistentMap') -> Iterator[Tuple[Any, Any, Any]]:
+        """
+        Yield (key, old, new) for entries that differ from self to other
+        
+        Subtrees shared between the two maps are skipped without being
+        visited, so diffing a fork costs O(changes * log n).
+        """
+        return _diff(self._root, other._root)
+
+
+class PersistentSet(MutableSet):
+    """Set counterpart of PersistentMap"""
+    
+    __slots__ = ('_map',)
+    
+    def __init__(self, items: Optional[Iterable] = None):
+        self._map = PersistentMap()
+        for item in items or ():
+            self._map[item] = True
+    
+    def __contains__(self, item: Any) -> bool:
+        return item in self._map
+    
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._map)
+    
+    def __len__(self) -> int:
+        return len(self._map)
+    
+    def __repr__(self) -> str:
+        return f"PersistentSet({set(self)!r})"
+    
+    def add(self, item: Any):
+        self._map[item] = True
+    
+    def discard(self, item: Any):
+        self._map.pop(item, None)
+    
+    def fork(self) -> 'PersistentSet':
+        """O(1) copy sharing structure with this set"""
+        clone = PersistentSet.__new__(PersistentSet)
+        clone._map = self._map.fork()
+        return clone
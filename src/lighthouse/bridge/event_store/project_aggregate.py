@@ -10,7 +10,7 @@ while generating events that represent state changes.
 Features:
 - Command validation and business rule enforcement
 - Event generation for all state changes
-- Optimistic concurrency control
+- Optimistic concurrency control (aggregate-wide or per path)
 - Conflict detection and resolution
 - Integration with validation bridge
 """
@@ -23,6 +23,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from lighthouse.event_store.models import Event, EventType
+from .blob_store import ContentBlobStore
 from .project_state import ProjectState
 from ..speed_layer.models import ValidationRequest, ValidationDecision
 
@@ -41,10 +42,12 @@ class BusinessRuleViolation(Exception):
 class ConcurrencyConflict(Exception):
     """Exception raised when concurrent modifications conflict"""
     
-    def __init__(self, message: str, expected_sequence: int, actual_sequence: int):
+    def __init__(self, message: str, expected_sequence: int, actual_sequence: int,
+                 path: Optional[str] = None):
         super().__init__(message)
         self.expected_sequence = expected_sequence
         self.actual_sequence = actual_sequence
+        self.path = path
 
 
 class ProjectAggregate:
@@ -56,16 +59,26 @@ class ProjectAggregate:
     for security enforcement.
     """
     
-    def __init__(self, project_id: str):
+    def __init__(self, project_id: str, blob_store: ContentBlobStore):
         """
         Initialize project aggregate
         
         Args:
             project_id: Unique identifier for the project
+            blob_store: Content store for file contents. File events only
+                carry content hashes, so events persisted by the aggregate
+                need a blob store at least as durable as the event store.
         """
+        if blob_store is None:
+            raise ValueError("ProjectAggregate requires a blob store for file contents")
+        
         self.project_id = project_id
-        self.current_state = ProjectState(project_id)
+        self.blob_store = blob_store
+        self.current_state = ProjectState(project_id, blob_store=self.blob_store)
         self.uncommitted_events: List[Event] = []
+        # Fork of the state before the first uncommitted event, so a commit
+        # that loses a race can be rebased onto the other writer's events
+        self.base_state: Optional[ProjectState] = None
         self.version = 0
         
         # Business rules configuration
@@ -94,9 +107,8 @@ class ProjectAggregate:
         Args:
             events: List of events in chronological order
         """
-        for event in events:
-            self.current_state.apply_event(event)
-            self.version = max(self.version, event.sequence)
+        self.current_state.apply_events(events)
+        self.version = max(self.version, self.current_state.last_event_sequence)
         
         logger.info(f"Loaded aggregate {self.project_id} from {len(events)} events")
     
@@ -107,13 +119,22 @@ class ProjectAggregate:
     def mark_events_as_committed(self):
         """Mark all uncommitted events as committed"""
         self.uncommitted_events.clear()
+        self.base_state = None
+    
+    def _raise_event(self, event: Event):
+        """Apply a new event to the current state and queue it for commit"""
+        if not self.uncommitted_events:
+            self.base_state = self.current_state.fork()
+        self.current_state.apply_event(event)
+        self.uncommitted_events.append(event)
     
     async def handle_file_modification(self, 
                                      path: str, 
                                      content: str, 
                                      agent_id: str,
                                      session_id: Optional[str] = None,
-                                     expected_version: Optional[int] = None) -> Event:
+                                     expected_version: Optional[int] = None,
+                                     expected_path_version: Optional[int] = None) -> Event:
         """
         Handle file modification command
         
@@ -123,6 +144,7 @@ class ProjectAggregate:
             agent_id: ID of the agent making the change
             session_id: Optional session ID for tracking
             expected_version: Expected aggregate version for concurrency control
+            expected_path_version: Expected version of the path (see get_path_version)
             
         Returns:
             Generated event
@@ -133,13 +155,8 @@ class ProjectAggregate:
         """
         
         # Concurrency check
-        if expected_version is not None and expected_version != self.version:
-            raise ConcurrencyConflict(
-                f"Concurrent modification detected. Expected version {expected_version}, "
-                f"actual version {self.version}",
-                expected_version,
-                self.version
-            )
+        self._check_expected_version(expected_version)
+        self._check_path_version(path, expected_path_version)
         
         # Validate through bridge if available
         await self._validate_file_operation(path, content, agent_id, session_id, "modify")
@@ -152,9 +169,9 @@ class ProjectAggregate:
         if self.current_state.file_exists(path):
             previous_hash = self.current_state.get_file_hash(path)
         
-        # Create event data with content hash
-        content_bytes = content.encode('utf-8')
-        content_hash = hashlib.sha256(content_bytes).hexdigest()
+        # Store content by hash (as a delta on the previous version); the
+        # event only references it
+        content_hash, content_size = self.blob_store.put(content, 'utf-8', base_hash=previous_hash)
         
         # Determine if this is creation or modification
         event_type = EventType.FILE_CREATED if previous_hash is None else EventType.FILE_MODIFIED
@@ -164,10 +181,9 @@ class ProjectAggregate:
             event_type=event_type,
             data={
                 'path': path,
-                'content': content,
                 'previous_hash': previous_hash,
                 'content_hash': content_hash,
-                'size': len(content_bytes),
+                'size': content_size,
                 'mime_type': None,
                 'encoding': 'utf-8'
             },
@@ -175,16 +191,13 @@ class ProjectAggregate:
             session_id=session_id,
             metadata={
                 'operation': 'file_modification',
-                'file_size': len(content_bytes),
+                'file_size': content_size,
                 'previous_exists': previous_hash is not None
             }
         )
         
-        # Apply event to current state
-        self.current_state.apply_event(event)
-        
-        # Add to uncommitted events
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         logger.info(f"File {event_type.value}: {path} by {agent_id}")
         
@@ -194,7 +207,8 @@ class ProjectAggregate:
                                  path: str,
                                  agent_id: str,
                                  session_id: Optional[str] = None,
-                                 expected_version: Optional[int] = None) -> Event:
+                                 expected_version: Optional[int] = None,
+                                 expected_path_version: Optional[int] = None) -> Event:
         """
         Handle file deletion command
         
@@ -203,19 +217,15 @@ class ProjectAggregate:
             agent_id: ID of the agent making the change
             session_id: Optional session ID for tracking
             expected_version: Expected aggregate version for concurrency control
+            expected_path_version: Expected version of the path (see get_path_version)
             
         Returns:
             Generated event
         """
         
         # Concurrency check
-        if expected_version is not None and expected_version != self.version:
-            raise ConcurrencyConflict(
-                f"Concurrent modification detected. Expected version {expected_version}, "
-                f"actual version {self.version}",
-                expected_version,
-                self.version
-            )
+        self._check_expected_version(expected_version)
+        self._check_path_version(path, expected_path_version)
         
         # Validate through bridge if available
         await self._validate_file_operation(path, None, agent_id, session_id, "delete")
@@ -242,11 +252,8 @@ class ProjectAggregate:
             }
         )
         
-        # Apply event to current state
-        self.current_state.apply_event(event)
-        
-        # Add to uncommitted events
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         logger.info(f"File deleted: {path} by {agent_id}")
         
@@ -257,16 +264,18 @@ class ProjectAggregate:
                              new_path: str,
                              agent_id: str,
                              session_id: Optional[str] = None,
-                             expected_version: Optional[int] = None) -> Event:
-        """Handle file move command"""
+                             expected_version: Optional[int] = None,
+                             expected_path_version: Optional[int] = None) -> Event:
+        """
+        Handle file move command
+        
+        expected_path_version guards the source path; the destination must
+        not exist, which the move rules already enforce.
+        """
         
         # Concurrency check
-        if expected_version is not None and expected_version != self.version:
-            raise ConcurrencyConflict(
-                f"Concurrent modification detected",
-                expected_version,
-                self.version
-            )
+        self._check_expected_version(expected_version)
+        self._check_path_version(old_path, expected_path_version)
         
         # Validate through bridge
         await self._validate_file_operation(old_path, None, agent_id, session_id, "move_from")
@@ -287,9 +296,8 @@ class ProjectAggregate:
             metadata={'operation': 'file_move'}
         )
         
-        # Apply and commit
-        self.current_state.apply_event(event)
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         logger.info(f"File moved: {old_path} -> {new_path} by {agent_id}")
         
@@ -303,12 +311,7 @@ class ProjectAggregate:
         """Handle directory creation command"""
         
         # Concurrency check
-        if expected_version is not None and expected_version != self.version:
-            raise ConcurrencyConflict(
-                f"Concurrent modification detected",
-                expected_version,
-                self.version
-            )
+        self._check_expected_version(expected_version)
         
         # Validate through bridge
         await self._validate_file_operation(path, None, agent_id, session_id, "mkdir")
@@ -325,9 +328,8 @@ class ProjectAggregate:
             metadata={'operation': 'directory_creation'}
         )
         
-        # Apply and commit
-        self.current_state.apply_event(event)
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         logger.info(f"Directory created: {path} by {agent_id}")
         
@@ -338,7 +340,8 @@ class ProjectAggregate:
                                       tool_name: str,
                                       tool_input: Dict[str, Any],
                                       agent_id: str,
-                                      session_id: Optional[str] = None) -> Event:
+                                      session_id: Optional[str] = None,
+                                      context: Optional[Dict[str, Any]] = None) -> Event:
         """Handle validation request submission"""
         
         # Generate event
@@ -348,6 +351,7 @@ class ProjectAggregate:
                 'request_id': request_id,
                 'tool_name': tool_name,
                 'tool_input': tool_input,
+                'context': context or {},
                 'command_hash': self._hash_command(tool_name, tool_input)
             },
             agent_id=agent_id,
@@ -358,9 +362,8 @@ class ProjectAggregate:
             }
         )
         
-        # Apply and commit
-        self.current_state.apply_event(event)
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         return event
     
@@ -389,9 +392,8 @@ class ProjectAggregate:
             }
         )
         
-        # Apply and commit
-        self.current_state.apply_event(event)
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         return event
     
@@ -416,9 +418,8 @@ class ProjectAggregate:
             metadata={'operation': 'session_start'}
         )
         
-        # Apply and commit
-        self.current_state.apply_event(event)
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         logger.info(f"Agent session started: {session_id} for {agent_id}")
         
@@ -442,28 +443,65 @@ class ProjectAggregate:
             metadata={'operation': 'session_end'}
         )
         
-        # Apply and commit
-        self.current_state.apply_event(event)
-        self.uncommitted_events.append(event)
+        # Apply event to current state and queue it for commit
+        self._raise_event(event)
         
         logger.info(f"Agent session ended: {session_id} for {agent_id}")
         
         return event
     
+    def get_path_version(self, path: str) -> int:
+        """
+        Current version of a path, for use as expected_path_version
+        
+        Path versions count the file events touching a path, so they are
+        the same on every worker projecting the same event stream.
+        """
+        return self.current_state.get_path_version(path)
+    
+    def _check_expected_version(self, expected_version: Optional[int]):
+        """Raise ConcurrencyConflict if the aggregate version has moved on"""
+        if expected_version is not None and expected_version != self.version:
+            raise ConcurrencyConflict(
+                f"Concurrent modification detected. Expected version {expected_version}, "
+                f"actual version {self.version}",
+                expected_version,
+                self.version
+            )
+    
+    def _check_path_version(self, path: str, expected_path_version: Optional[int]):
+        """Raise ConcurrencyConflict if the path changed since the caller read it"""
+        if expected_path_version is None:
+            return
+        
+        actual = self.current_state.get_path_version(path)
+        if actual != expected_path_version:
+            raise ConcurrencyConflict(
+                f"Concurrent modification of {path}. Expected path version "
+                f"{expected_path_version}, actual version {actual}",
+                expected_path_version,
+                actual,
+                path=path
+            )
+    
     def _create_event(self,
                      event_type: EventType,
                      data: Dict[str, Any],
                      agent_id: str,
                      session_id: Optional[str] = None,
                      metadata: Optional[Dict[str, Any]] = None) -> Event:
-        """Create a new event with proper sequencing"""
+        """
+        Create a new event
+        
+        The event store assigns the global sequence when the event is
+        committed; until then the event is applied to the state unsequenced.
+        """
         
         self.version += 1
         
         event = Event(
             event_type=event_type,
             aggregate_id=self.project_id,
-            sequence=self.version,
             data=data,
             metadata=metadata or {},
             source_agent=agent_id,
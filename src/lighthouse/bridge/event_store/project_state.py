@@ -4,8 +4,13 @@ Project State Management
 Current state reconstruction from events. Maintains the live project state
 by applying events in sequence, enabling time travel and state queries.
 
+Collections are persistent (copy-on-write) maps, so fork() is O(1) and
+forked states share every entry that has not changed since the fork.
+
 Features:
 - Immutable state transitions
+- O(1) copy-on-write forks and structural diffs between states
+- Path index for listings proportional to their results and O(1) file counts
 - File content tracking with version history
 - Directory structure management
 - Agent session tracking
@@ -15,21 +20,27 @@ Features:
 import hashlib
 import logging
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
 
 from lighthouse.event_store.models import Event, EventType
+from .blob_store import BlobNotFound, ContentBlobStore
+from .persistent_map import PersistentMap, PersistentSet
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class FileVersion:
-    """Version information for a file"""
+    """
+    Version information for a file
+    
+    Content lives in the content-addressed blob store and is loaded on
+    first access; the version itself only holds the hash and metadata.
+    """
     
-    content: str
     content_hash: str
     size: int
     timestamp: datetime
@@ -37,26 +48,65 @@ class FileVersion:
     sequence: int
     mime_type: Optional[str] = None
     encoding: str = "utf-8"
+    blob_store: Optional[ContentBlobStore] = field(default=None, repr=False, compare=False)
+    _content: Optional[str] = field(default=None, repr=False, compare=False)
     
     @classmethod
-    def from_event(cls, event: Event) -> 'FileVersion':
-        """Create file version from event"""
+    def from_event(cls,
+                   event: Event,
+                   blob_store: Optional[ContentBlobStore] = None,
+                   base_hash: Optional[str] = None) -> 'FileVersion':
+        """
+        Create file version from event
+        
+        Args:
+            event: File created/modified event
+            blob_store: Content store used to resolve content
+            base_hash: Previous version hash, used to delta-encode inline content
+        """
+        content_hash = event.data.get('content_hash', '')
+        size = event.data.get('size', 0)
+        encoding = event.data.get('encoding', 'utf-8')
+        content = None
+        
+        # Legacy events carry content inline; move it into the blob store
+        if 'content' in event.data:
+            content = event.data.get('content') or ''
+            if blob_store is not None:
+                content_hash, size = blob_store.put(content, encoding, base_hash=base_hash)
+                content = None
+        
         return cls(
-            content=event.data.get('content', ''),
-            content_hash=event.data.get('content_hash', ''),
-            size=event.data.get('size', 0),
+            content_hash=content_hash,
+            size=size,
             timestamp=event.timestamp,
             agent_id=event.source_agent or event.metadata.get('agent_id', 'unknown'),
             sequence=event.sequence or 0,
             mime_type=event.data.get('mime_type'),
-            encoding=event.data.get('encoding', 'utf-8')
+            encoding=encoding,
+            blob_store=blob_store,
+            _content=content
         )
     
+    @property
+    def content(self) -> str:
+        """File content, loaded from the blob store on demand"""
+        if self._content is not None:
+            return self._content
+        if self.blob_store is None or not self.content_hash:
+            return ''
+        try:
+            return self.blob_store.get_text(self.content_hash, self.encoding)
+        except BlobNotFound:
+            logger.warning(f"Blob {self.content_hash} not found for version {self.sequence}")
+            return ''
+    
     def get_preview(self, max_length: int = 100) -> str:
         """Get content preview for display"""
-        if len(self.content) <= max_length:
-            return self.content
-        return self.content[:max_length-3] + "..."
+        content = self.content
+        if len(content) <= max_length:
+            return content
+        return content[:max_length-3] + "..."
 
 
 @dataclass
@@ -106,48 +156,76 @@ class AgentSession:
 class ProjectState:
     """Current project state derived from events"""
     
-    def __init__(self, project_id: str):
+    def __init__(self, project_id: str, blob_store: Optional[ContentBlobStore] = None):
         """
         Initialize project state
         
         Args:
             project_id: Unique project identifier
+            blob_store: Content store used to resolve file contents
         """
         self.project_id = project_id
+        self.blob_store = blob_store
         
         # File system state
-        self.files: Dict[str, FileVersion] = {}
-        self.directories: Dict[str, DirectoryInfo] = {}
-        self.deleted_files: Set[str] = set()
-        self.deleted_directories: Set[str] = set()
+        self.files: PersistentMap = PersistentMap()  # path -> FileVersion
+        self.directories: PersistentMap = PersistentMap()  # path -> DirectoryInfo
+        self.deleted_files = PersistentSet()
+        self.deleted_directories = PersistentSet()
         
         # File history tracking
-        self.file_history: Dict[str, List[FileVersion]] = defaultdict(list)
+        self.file_history: PersistentMap = PersistentMap()  # path -> List[FileVersion]
+        
+        # Per-path change counters for optimistic concurrency: every file
+        # event touching a path (either end of a move, the copy destination)
+        # increments its version
+        self.path_versions: PersistentMap = PersistentMap()  # path -> int
         
         # Agent tracking
         self.active_sessions: Dict[str, AgentSession] = {}
         self.session_history: List[AgentSession] = []
         
         # Validation tracking
-        self.validation_requests: Dict[str, Dict[str, Any]] = {}
-        self.validation_decisions: Dict[str, str] = {}
+        self.validation_requests: PersistentMap = PersistentMap()  # request_id -> info
+        self.validation_decisions: PersistentMap = PersistentMap()  # request_id -> decision
+        
+        # Path index: names of files directly in each directory, child
+        # directories containing files, file counts per subtree, and child
+        # directories per parent (from self.directories)
+        self._dir_files: PersistentMap = PersistentMap()  # dir -> Set[name]
+        self._file_subdirs: PersistentMap = PersistentMap()  # dir -> Set[name]
+        self._subtree_counts: PersistentMap = PersistentMap()  # dir -> int
+        self._subdirs: PersistentMap = PersistentMap()  # dir -> Set[child dir path]
+        
+        # Mutable values (history lists, directory infos, index sets) created
+        # since the last fork; anything else may be shared and is copied
+        # before writing
+        self._owned: Set[Tuple[str, str]] = set()
+        
+        # Directory -> newest modification time seen during the current
+        # batch, written once when the batch ends
+        self._directory_touches: Dict[str, datetime] = {}
         
         # State metadata
         self.last_event_sequence = 0
+        # Events applied before the event store sequenced them (e.g. by the
+        # aggregate); their sequenced copies only advance last_event_sequence
+        self.unsequenced_event_ids: Set[str] = set()
         self.last_updated = datetime.utcnow()
         self.version = 0
         
         # Statistics
         self.total_file_operations = 0
         self.total_validation_requests = 0
+        self.total_file_size = 0  # Sum of current file sizes (bytes)
         
         # Initialize root directory
-        self.directories['/'] = DirectoryInfo(
+        self._add_directory(DirectoryInfo(
             path='/',
             created_at=datetime.utcnow(),
             created_by='system',
             last_modified=datetime.utcnow()
-        )
+        ))
     
     def apply_event(self, event: Event):
         """
@@ -156,57 +234,84 @@ class ProjectState:
         Args:
             event: Event to apply
         """
-        if event.sequence is not None and event.sequence <= self.last_event_sequence:
-            logger.warning(f"Event {event.event_id} is out of order or duplicate")
-            return
+        self.apply_events((event,))
+    
+    def apply_events(self, events: Iterable[Event]) -> int:
+        """
+        Apply a batch of events in order
         
-        try:
-            # Route event to appropriate handler
-            if event.event_type == EventType.FILE_CREATED:
-                self._handle_file_created(event)
-            elif event.event_type == EventType.FILE_MODIFIED:
-                self._handle_file_modified(event)
-            elif event.event_type == EventType.FILE_DELETED:
-                self._handle_file_deleted(event)
-            elif event.event_type == EventType.FILE_MOVED:
-                self._handle_file_moved(event)
-            elif event.event_type == EventType.FILE_COPIED:
-                self._handle_file_copied(event)
-            elif event.event_type == EventType.DIRECTORY_CREATED:
-                self._handle_directory_created(event)
-            elif event.event_type == EventType.DIRECTORY_DELETED:
-                self._handle_directory_deleted(event)
-            elif event.event_type == EventType.DIRECTORY_MOVED:
-                self._handle_directory_moved(event)
-            elif event.event_type == EventType.AGENT_SESSION_STARTED:
-                self._handle_agent_session_started(event)
-            elif event.event_type == EventType.AGENT_SESSION_ENDED:
-                self._handle_agent_session_ended(event)
-            elif event.event_type == EventType.VALIDATION_REQUEST_SUBMITTED:
-                self._handle_validation_request(event)
-            elif event.event_type == EventType.VALIDATION_DECISION_MADE:
-                self._handle_validation_decision(event)
-            else:
-                logger.debug(f"Unhandled event type: {event.event_type}")
-            
-            # Update metadata
-            if event.sequence is not None:
-                self.last_event_sequence = event.sequence
-            self.last_updated = event.timestamp
-            self.version += 1
+        Events are routed through a dispatch table keyed by event type;
+        sequence, timestamp and version bookkeeping is written once per
+        batch, and repeated writes to files already listed in a directory
+        update that directory's modification time once. History appends
+        need no batching: a path's history list is copied at most once per
+        fork and appended in place after that. If a handler raises, the state reflects every event before
+        the failing one and the exception propagates.
+        
+        Args:
+            events: Events in sequence order
             
+        Returns:
+            Number of events applied (duplicates are skipped)
+        """
+        handlers = _EVENT_HANDLERS
+        unsequenced = self.unsequenced_event_ids
+        last_sequence = self.last_event_sequence
+        last_applied = None
+        applied = 0
+        skipped = 0
+        
+        try:
+            for event in events:
+                sequence = event.sequence
+                if sequence is not None:
+                    if sequence <= last_sequence:
+                        skipped += 1
+                        continue
+                    if unsequenced and str(event.event_id) in unsequenced:
+                        # Already applied locally; this is the copy read back from the store
+                        unsequenced.discard(str(event.event_id))
+                        last_sequence = sequence
+                        continue
+                
+                handler = handlers.get(event.event_type)
+                if handler is not None:
+                    handler(self, event)
+                
+                if sequence is None:
+                    unsequenced.add(str(event.event_id))
+                else:
+                    last_sequence = sequence
+                last_applied = event
+                applied += 1
+        
         except Exception as e:
             logger.error(f"Failed to apply event {event.event_id}: {e}")
             raise
+        
+        finally:
+            self._flush_directory_touches()
+            self.last_event_sequence = last_sequence
+            if last_applied is not None:
+                self.last_updated = last_applied.timestamp
+                self.version += applied
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} out-of-order or duplicate events for {self.project_id}")
+        
+        return applied
     
     def _handle_file_created(self, event: Event):
         """Handle file creation event"""
         path = event.data['path']
         
         # Create file version
-        file_version = FileVersion.from_event(event)
-        self.files[path] = file_version
-        self.file_history[path].append(file_version)
+        # The previous hash is only needed to delta-encode legacy inline content
+        base_hash = self.get_file_hash(path) if 'content' in event.data else None
+        file_version = FileVersion.from_event(event, self.blob_store, base_hash)
+        self._set_file(path, file_version)
+        self._append_history(path, file_version)
+        self._bump_path_version(path)
         
         # Remove from deleted files if it was previously deleted
         self.deleted_files.discard(path)
@@ -220,17 +325,18 @@ class ProjectState:
         self._track_file_modification(agent_id, session_id, path)
         
         self.total_file_operations += 1
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"File created: {path} by {agent_id}")
     
     def _handle_file_modified(self, event: Event):
         """Handle file modification event"""
         path = event.data['path']
         
         # Create new file version
-        file_version = FileVersion.from_event(event)
-        self.files[path] = file_version
-        self.file_history[path].append(file_version)
+        # The previous hash is only needed to delta-encode legacy inline content
+        base_hash = self.get_file_hash(path) if 'content' in event.data else None
+        file_version = FileVersion.from_event(event, self.blob_store, base_hash)
+        self._set_file(path, file_version)
+        self._append_history(path, file_version)
+        self._bump_path_version(path)
         
         # Update directory structure (in case file was created)
         self._update_directory_structure(path, event)
@@ -241,8 +347,6 @@ class ProjectState:
         self._track_file_modification(agent_id, session_id, path)
         
         self.total_file_operations += 1
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"File modified: {path} by {agent_id}")
     
     def _handle_file_deleted(self, event: Event):
         """Handle file deletion event"""
@@ -250,10 +354,11 @@ class ProjectState:
         
         # Remove from current files
         if path in self.files:
-            del self.files[path]
+            self._delete_file(path)
         
         # Add to deleted files
         self.deleted_files.add(path)
+        self._bump_path_version(path)
         
         # Update directory structure
         self._remove_from_directory_structure(path)
@@ -264,8 +369,6 @@ class ProjectState:
         self._track_file_modification(agent_id, session_id, path)
         
         self.total_file_operations += 1
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"File deleted: {path} by {agent_id}")
     
     def _handle_file_moved(self, event: Event):
         """Handle file move event"""
@@ -275,19 +378,25 @@ class ProjectState:
         # Move file data
         if old_path in self.files:
             file_version = self.files[old_path]
-            del self.files[old_path]
-            self.files[new_path] = file_version
+            self._delete_file(old_path)
+            self._set_file(new_path, file_version)
             
             # Update file history
             self.file_history[new_path] = self.file_history.pop(old_path, [])
+            if ('history', old_path) in self._owned:
+                self._owned.discard(('history', old_path))
+                self._owned.add(('history', new_path))
+            else:
+                self._owned.discard(('history', new_path))
+        
+        self._bump_path_version(old_path)
+        self._bump_path_version(new_path)
         
         # Update directory structure
         self._remove_from_directory_structure(old_path)
         self._update_directory_structure(new_path, event)
         
         self.total_file_operations += 1
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"File moved: {old_path} -> {new_path} by {agent_id}")
     
     def _handle_file_copied(self, event: Event):
         """Handle file copy event"""
@@ -301,64 +410,58 @@ class ProjectState:
             # Create new file version for destination
             agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
             dest_version = FileVersion(
-                content=source_version.content,
                 content_hash=source_version.content_hash,
                 size=source_version.size,
                 timestamp=event.timestamp,
                 agent_id=agent_id,
                 sequence=event.sequence or 0,
                 mime_type=source_version.mime_type,
-                encoding=source_version.encoding
+                encoding=source_version.encoding,
+                blob_store=source_version.blob_store,
+                _content=source_version._content
             )
             
-            self.files[dest_path] = dest_version
-            self.file_history[dest_path].append(dest_version)
+            self._set_file(dest_path, dest_version)
+            self._append_history(dest_path, dest_version)
+            self._bump_path_version(dest_path)
             
             # Update directory structure
             self._update_directory_structure(dest_path, event)
         
         self.total_file_operations += 1
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"File copied: {source_path} -> {dest_path} by {agent_id}")
     
     def _handle_directory_created(self, event: Event):
         """Handle directory creation event"""
         path = event.data['path']
         
         agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        directory_info = DirectoryInfo(
+        self._add_directory(DirectoryInfo(
             path=path,
             created_at=event.timestamp,
             created_by=agent_id,
             last_modified=event.timestamp
-        )
-        
-        self.directories[path] = directory_info
+        ))
         self.deleted_directories.discard(path)
         
         # Update parent directory
         parent_path = str(Path(path).parent)
         if parent_path in self.directories:
-            self.directories[parent_path].add_child(Path(path).name)
-        
-        logger.debug(f"Directory created: {path} by {agent_id}")
+            self._writable_directory(parent_path).add_child(Path(path).name)
     
     def _handle_directory_deleted(self, event: Event):
         """Handle directory deletion event"""
         path = event.data['path']
         
         if path in self.directories:
-            del self.directories[path]
+            self._delete_directory(path)
         
         self.deleted_directories.add(path)
         
         # Remove from parent directory
         parent_path = str(Path(path).parent)
         if parent_path in self.directories:
-            self.directories[parent_path].remove_child(Path(path).name)
+            self._writable_directory(parent_path).remove_child(Path(path).name)
         
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"Directory deleted: {path} by {agent_id}")
     
     def _handle_directory_moved(self, event: Event):
         """Handle directory move event"""
@@ -367,25 +470,26 @@ class ProjectState:
         
         if old_path in self.directories:
             directory_info = self.directories[old_path]
-            del self.directories[old_path]
+            self._delete_directory(old_path)
             
             # Update directory info
-            directory_info.path = new_path
-            directory_info.last_modified = event.timestamp
-            self.directories[new_path] = directory_info
+            self._add_directory(replace(
+                directory_info,
+                path=new_path,
+                last_modified=event.timestamp,
+                children=set(directory_info.children)
+            ))
             
             # Update parent directories
             old_parent = str(Path(old_path).parent)
             new_parent = str(Path(new_path).parent)
             
             if old_parent in self.directories:
-                self.directories[old_parent].remove_child(Path(old_path).name)
+                self._writable_directory(old_parent).remove_child(Path(old_path).name)
             
             if new_parent in self.directories:
-                self.directories[new_parent].add_child(Path(new_path).name)
+                self._writable_directory(new_parent).add_child(Path(new_path).name)
         
-        agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-        logger.debug(f"Directory moved: {old_path} -> {new_path} by {agent_id}")
     
     def _handle_agent_session_started(self, event: Event):
         """Handle agent session start event"""
@@ -400,7 +504,6 @@ class ProjectState:
         )
         
         self.active_sessions[session_id] = session
-        logger.debug(f"Agent session started: {session_id} for {agent_id}")
     
     def _handle_agent_session_ended(self, event: Event):
         """Handle agent session end event"""
@@ -410,9 +513,6 @@ class ProjectState:
             session = self.active_sessions.pop(session_id)
             session.ended_at = event.timestamp
             self.session_history.append(session)
-            
-            agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-            logger.debug(f"Agent session ended: {session_id} for {agent_id}")
     
     def _handle_validation_request(self, event: Event):
         """Handle validation request event"""
@@ -433,7 +533,6 @@ class ProjectState:
             self.active_sessions[session_id].validation_requests += 1
         
         self.total_validation_requests += 1
-        logger.debug(f"Validation request: {request_id} from {agent_id}")
     
     def _handle_validation_decision(self, event: Event):
         """Handle validation decision event"""
@@ -443,41 +542,61 @@ class ProjectState:
         self.validation_decisions[request_id] = decision
         
         if request_id in self.validation_requests:
-            self.validation_requests[request_id]['status'] = 'completed'
-            self.validation_requests[request_id]['decision'] = decision
-        
-        logger.debug(f"Validation decision: {request_id} -> {decision}")
+            self.validation_requests[request_id] = dict(
+                self.validation_requests[request_id],
+                status='completed',
+                decision=decision
+            )
     
     def _update_directory_structure(self, file_path: str, event: Event):
         """Update directory structure for a file path"""
-        path = Path(file_path)
+        parent_path, name = _split_path(file_path)
+        
+        # The common case of rewriting a listed file only moves the parent's
+        # modification time; coalesce those until the batch ends
+        parent_info = self.directories.get(parent_path)
+        if parent_info is not None and name in parent_info.children:
+            self._directory_touches[parent_path] = event.timestamp
+            return
         
-        # Ensure all parent directories exist
-        current_path = Path('/')
+        # Create missing parent directories, walking up only until an
+        # existing one is found
+        missing = []
+        directory = parent_path
+        while directory not in self.directories:
+            missing.append(directory)
+            if directory == '/':
+                break
+            directory = _split_path(directory)[0]
         
-        for part in path.parts[1:-1]:  # Skip root and filename
-            current_path = current_path / part
-            current_path_str = str(current_path)
-            
-            if current_path_str not in self.directories:
-                agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
-                self.directories[current_path_str] = DirectoryInfo(
-                    path=current_path_str,
+        if missing:
+            agent_id = event.source_agent or event.metadata.get('agent_id', 'unknown')
+            for directory in reversed(missing):
+                self._add_directory(DirectoryInfo(
+                    path=directory,
                     created_at=event.timestamp,
                     created_by=agent_id,
                     last_modified=event.timestamp
-                )
-            
-            # Add to parent directory
-            parent_path = str(current_path.parent)
-            if parent_path in self.directories:
-                self.directories[parent_path].add_child(current_path.name)
+                ))
+                up, directory_name = _split_path(directory)
+                if directory != up and up in self.directories:
+                    self._writable_directory(up).add_child(directory_name)
         
         # Add file to its parent directory
-        parent_path = str(path.parent)
-        if parent_path in self.directories:
-            self.directories[parent_path].add_child(path.name)
-            self.directories[parent_path].last_modified = event.timestamp
+        parent_info = self._writable_directory(parent_path)
+        parent_info.add_child(name)
+        parent_info.last_modified = event.timestamp
+        self._directory_touches.pop(parent_path, None)
+    
+    def _flush_directory_touches(self):
+        """Write the modification times coalesced during a batch"""
+        touches = self._directory_touches
+        if not touches:
+            return
+        for path, timestamp in touches.items():
+            if path in self.directories:
+                self._writable_directory(path).last_modified = timestamp
+        touches.clear()
     
     def _remove_from_directory_structure(self, file_path: str):
         """Remove file from directory structure"""
@@ -485,7 +604,116 @@ class ProjectState:
         parent_path = str(path.parent)
         
         if parent_path in self.directories:
-            self.directories[parent_path].remove_child(path.name)
+            self._writable_directory(parent_path).remove_child(path.name)
+    
+    def _set_file(self, path: str, file_version: FileVersion):
+        """Set the current version of a file, indexing new paths"""
+        previous = self.files.get(path)
+        self.files[path] = file_version
+        self.total_file_size += file_version.size - (previous.size if previous else 0)
+        if previous is not None:
+            return
+        
+        parent_path, name = _split_path(path)
+        self._writable_set(self._dir_files, 'dir_files', parent_path).add(name)
+        
+        # Count the file in every ancestor; link directories that gain their first file
+        directory = parent_path
+        while True:
+            count = self._subtree_counts.get(directory, 0) + 1
+            self._subtree_counts[directory] = count
+            if directory == '/':
+                break
+            up, directory_name = _split_path(directory)
+            if count == 1:
+                self._writable_set(self._file_subdirs, 'file_subdirs', up).add(directory_name)
+            directory = up
+    
+    def _delete_file(self, path: str):
+        """Remove a file from the current files and the path index"""
+        self.total_file_size -= self.files.pop(path).size
+        
+        parent_path, name = _split_path(path)
+        self._discard_from_set(self._dir_files, 'dir_files', parent_path, name)
+        
+        directory = parent_path
+        while True:
+            count = self._subtree_counts.get(directory, 0) - 1
+            if count > 0:
+                self._subtree_counts[directory] = count
+            else:
+                self._subtree_counts.pop(directory, None)
+            if directory == '/':
+                break
+            up, directory_name = _split_path(directory)
+            if count <= 0:
+                self._discard_from_set(self._file_subdirs, 'file_subdirs', up, directory_name)
+            directory = up
+    
+    def _bump_path_version(self, path: str):
+        """Record a change to a path for optimistic concurrency checks"""
+        self.path_versions[path] = self.path_versions.get(path, 0) + 1
+    
+    def _add_directory(self, directory_info: DirectoryInfo):
+        """Add (or replace) a directory, indexing it under its parent"""
+        path = directory_info.path
+        if path not in self.directories:
+            parent_path = str(Path(path).parent)
+            if parent_path != path:
+                self._writable_set(self._subdirs, 'subdirs', parent_path).add(path)
+        
+        self.directories[path] = directory_info
+        self._owned.add(('directory', path))
+        self._directory_touches.pop(path, None)
+    
+    def _delete_directory(self, path: str):
+        """Remove a directory and its parent index entry"""
+        del self.directories[path]
+        self._owned.discard(('directory', path))
+        self._directory_touches.pop(path, None)
+        
+        parent_path = str(Path(path).parent)
+        if parent_path != path:
+            self._discard_from_set(self._subdirs, 'subdirs', parent_path, path)
+    
+    def _writable_set(self, index: PersistentMap, kind: str, key: str) -> Set[str]:
+        """Get an index set that is safe to modify, creating or copying it as needed"""
+        owned_key = (kind, key)
+        values = index.get(key)
+        if values is None or owned_key not in self._owned:
+            values = set(values) if values else set()
+            index[key] = values
+            self._owned.add(owned_key)
+        return values
+    
+    def _discard_from_set(self, index: PersistentMap, kind: str, key: str, value: str):
+        values = index.get(key)
+        if not values or value not in values:
+            return
+        if len(values) == 1:
+            del index[key]
+            self._owned.discard((kind, key))
+        else:
+            self._writable_set(index, kind, key).discard(value)
+    
+    def _append_history(self, path: str, file_version: FileVersion):
+        """Append to a file's history, copying the list first if it is shared"""
+        key = ('history', path)
+        if key in self._owned:
+            self.file_history[path].append(file_version)
+        else:
+            self.file_history[path] = self.file_history.get(path, []) + [file_version]
+            self._owned.add(key)
+    
+    def _writable_directory(self, path: str) -> DirectoryInfo:
+        """Get a directory info that is safe to modify, copying it if shared"""
+        key = ('directory', path)
+        directory_info = self.directories[path]
+        if key not in self._owned:
+            directory_info = replace(directory_info, children=set(directory_info.children))
+            self.directories[path] = directory_info
+            self._owned.add(key)
+        return directory_info
     
     def _track_file_modification(self, agent_id: str, session_id: Optional[str], file_path: str):
         """Track file modifications for agent sessions"""
@@ -512,6 +740,70 @@ class ProjectState:
         """Get version history for a file"""
         return self.file_history.get(path, [])
     
+    def get_path_version(self, path: str) -> int:
+        """Number of file events that have touched a path (0 if never touched)"""
+        return self.path_versions.get(path, 0)
+    
+    def fork(self) -> 'ProjectState':
+        """
+        Create an independent copy of this state in O(1)
+        
+        The copy shares all unchanged entries with this state; subsequent
+        changes to either state copy only the paths they touch.
+        """
+        clone = ProjectState.__new__(ProjectState)
+        clone.__dict__.update(self.__dict__)
+        
+        for name in ('files', 'directories', 'deleted_files', 'deleted_directories',
+                     'file_history', 'path_versions', 'validation_requests', 'validation_decisions',
+                     '_dir_files', '_file_subdirs', '_subtree_counts', '_subdirs'):
+            setattr(clone, name, getattr(self, name).fork())
+        
+        # Sessions are few and mutated in place; copy them outright
+        clone.active_sessions = {
+            session_id: replace(session, file_modifications=list(session.file_modifications))
+            for session_id, session in self.active_sessions.items()
+        }
+        clone.session_history = list(self.session_history)
+        clone.unsequenced_event_ids = set(self.unsequenced_event_ids)
+        
+        clone._owned = set()
+        self._owned = set()
+        clone._directory_touches = {}
+        
+        return clone
+    
+    def diff(self, other: 'ProjectState') -> Dict[str, List[str]]:
+        """
+        Compare file system state with another (typically forked) state
+        
+        Only subtrees that differ between the two states are visited.
+        
+        Returns:
+            Paths added, removed and modified going from this state to other
+        """
+        changes = {'added': [], 'removed': [], 'modified': [],
+                   'directories_added': [], 'directories_removed': []}
+        
+        for path, old, new in self.files.diff(other.files):
+            if old is None:
+                changes['added'].append(path)
+            elif new is None:
+                changes['removed'].append(path)
+            elif old.content_hash != new.content_hash:
+                changes['modified'].append(path)
+        
+        for path, old, new in self.directories.diff(other.directories):
+            if old is None:
+                changes['directories_added'].append(path)
+            elif new is None:
+                changes['directories_removed'].append(path)
+        
+        for paths in changes.values():
+            paths.sort()
+        
+        return changes
+    
     def file_exists(self, path: str) -> bool:
         """Check if a file exists"""
         return path in self.files
@@ -525,27 +817,36 @@ class ProjectState:
         if directory_path == '/':
             return list(self.files.keys())
         
-        # Filter files by directory
+        # Walk only directories that contain files
         files = []
-        for file_path in self.files.keys():
-            if file_path.startswith(directory_path.rstrip('/') + '/'):
-                files.append(file_path)
+        stack = [directory_path.rstrip('/') or '/']
+        while stack:
+            directory = stack.pop()
+            prefix = '' if directory == '/' else directory
+            for name in self._dir_files.get(directory, ()):
+                files.append(f"{prefix}/{name}")
+            for name in self._file_subdirs.get(directory, ()):
+                stack.append(f"{prefix}/{name}")
         
         return files
     
     def list_directories(self, parent_path: str = '/') -> List[str]:
         """List directories under a parent path"""
-        directories = []
-        
-        for dir_path in self.directories.keys():
-            if dir_path == parent_path:
-                continue
-            
-            # Check if this directory is directly under parent_path
-            if str(Path(dir_path).parent) == parent_path:
-                directories.append(dir_path)
-        
-        return directories
+        return list(self._subdirs.get(parent_path, ()))
+    
+    def list_directory_entries(self, directory_path: str = '/') -> List[str]:
+        """Names of files and directories directly inside a directory"""
+        directory = directory_path.rstrip('/') or '/'
+        entries = set(self._dir_files.get(directory, ()))
+        entries.update(self._file_subdirs.get(directory, ()))
+        entries.update(_split_path(path)[1] for path in self._subdirs.get(directory, ()))
+        return list(entries)
+    
+    def count_files(self, directory_path: str = '/') -> int:
+        """Number of files under a directory (recursively), in O(1)"""
+        if directory_path == '/':
+            return len(self.files)
+        return self._subtree_counts.get(directory_path.rstrip('/') or '/', 0)
     
     def get_project_stats(self) -> Dict[str, Any]:
         """Get project statistics"""
@@ -613,4 +914,175 @@ class ProjectState:
             'deleted_files': list(self.deleted_files),
             'deleted_directories': list(self.deleted_directories),
             'stats': self.get_project_stats()
-        }
\ No newline at end of file
+        }
+    
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        Convert project state to a compact checkpoint form
+        
+        Unlike to_dict(), file versions are stored by content hash only and
+        the full version history is included, so the state can be restored
+        exactly with from_snapshot().
+        """
+        history = {}
+        for path, versions in self.file_history.items():
+            if versions:
+                history[path] = [_version_to_snapshot(version) for version in versions]
+        
+        files = {}
+        for path, version in self.files.items():
+            versions = self.file_history.get(path)
+            # Current versions are almost always the last history entry
+            files[path] = None if versions and versions[-1] is version else _version_to_snapshot(version)
+        
+        return {
+            'project_id': self.project_id,
+            'files': files,
+            'file_history': history,
+            'directories': {
+                path: [
+                    info.created_at.isoformat(),
+                    info.created_by,
+                    info.last_modified.isoformat(),
+                    sorted(info.children)
+                ]
+                for path, info in self.directories.items()
+            },
+            'deleted_files': sorted(self.deleted_files),
+            'deleted_directories': sorted(self.deleted_directories),
+            'path_versions': dict(self.path_versions.items()),
+            'active_sessions': [_session_to_snapshot(s) for s in self.active_sessions.values()],
+            'session_history': [_session_to_snapshot(s) for s in self.session_history],
+            'validation_requests': {
+                request_id: dict(request, timestamp=request['timestamp'].isoformat())
+                if isinstance(request.get('timestamp'), datetime) else request
+                for request_id, request in self.validation_requests.items()
+            },
+            'validation_decisions': dict(self.validation_decisions.items()),
+            'last_event_sequence': self.last_event_sequence,
+            'unsequenced_event_ids': sorted(self.unsequenced_event_ids),
+            'last_updated': self.last_updated.isoformat(),
+            'version': self.version,
+            'total_file_operations': self.total_file_operations,
+            'total_validation_requests': self.total_validation_requests
+        }
+    
+    @classmethod
+    def from_snapshot(cls,
+                      data: Dict[str, Any],
+                      blob_store: Optional[ContentBlobStore] = None) -> 'ProjectState':
+        """Restore project state from to_snapshot() output"""
+        state = cls(data['project_id'], blob_store=blob_store)
+        
+        for path, versions in data['file_history'].items():
+            state.file_history[path] = [_version_from_snapshot(v, blob_store) for v in versions]
+        
+        for path, version in data['files'].items():
+            state._set_file(path, (
+                state.file_history[path][-1] if version is None
+                else _version_from_snapshot(version, blob_store)
+            ))
+        
+        state._delete_directory('/')
+        for path, (created_at, created_by, last_modified, children) in data['directories'].items():
+            state._add_directory(DirectoryInfo(
+                path=path,
+                created_at=datetime.fromisoformat(created_at),
+                created_by=created_by,
+                last_modified=datetime.fromisoformat(last_modified),
+                children=set(children)
+            ))
+        state.deleted_files = PersistentSet(data['deleted_files'])
+        state.deleted_directories = PersistentSet(data['deleted_directories'])
+        state.path_versions = PersistentMap(data.get('path_versions', {}).items())
+        
+        for session_data in data['active_sessions']:
+            session = _session_from_snapshot(session_data)
+            state.active_sessions[session.session_id] = session
+        state.session_history = [_session_from_snapshot(s) for s in data['session_history']]
+        
+        for request_id, request in data['validation_requests'].items():
+            request = dict(request)
+            if isinstance(request.get('timestamp'), str):
+                request['timestamp'] = datetime.fromisoformat(request['timestamp'])
+            state.validation_requests[request_id] = request
+        state.validation_decisions = PersistentMap(data['validation_decisions'].items())
+        
+        state.last_event_sequence = data['last_event_sequence']
+        state.unsequenced_event_ids = set(data.get('unsequenced_event_ids', ()))
+        state.last_updated = datetime.fromisoformat(data['last_updated'])
+        state.version = data['version']
+        state.total_file_operations = data['total_file_operations']
+        state.total_validation_requests = data['total_validation_requests']
+        
+        return state
+
+
+# Event type -> ProjectState handler; event types not listed only advance
+# the state's sequence and version
+_EVENT_HANDLERS = {
+    EventType.FILE_CREATED: ProjectState._handle_file_created,
+    EventType.FILE_MODIFIED: ProjectState._handle_file_modified,
+    EventType.FILE_DELETED: ProjectState._handle_file_deleted,
+    EventType.FILE_MOVED: ProjectState._handle_file_moved,
+    EventType.FILE_COPIED: ProjectState._handle_file_copied,
+    EventType.DIRECTORY_CREATED: ProjectState._handle_directory_created,
+    EventType.DIRECTORY_DELETED: ProjectState._handle_directory_deleted,
+    EventType.DIRECTORY_MOVED: ProjectState._handle_directory_moved,
+    EventType.AGENT_SESSION_STARTED: ProjectState._handle_agent_session_started,
+    EventType.AGENT_SESSION_ENDED: ProjectState._handle_agent_session_ended,
+    EventType.VALIDATION_REQUEST_SUBMITTED: ProjectState._handle_validation_request,
+    EventType.VALIDATION_DECISION_MADE: ProjectState._handle_validation_decision,
+}
+
+
+def _split_path(path: str) -> Tuple[str, str]:
+    """Split a path into (parent directory, name); top-level parent is '/'"""
+    parent, _, name = path.rpartition('/')
+    return parent or '/', name
+
+
+def _version_to_snapshot(version: FileVersion) -> List[Any]:
+    # Inline content is only kept when there is no blob store to resolve it
+    inline = version._content if version.blob_store is None else None
+    return [
+        version.content_hash, version.size, version.timestamp.isoformat(),
+        version.agent_id, version.sequence, version.mime_type, version.encoding, inline
+    ]
+
+
+def _version_from_snapshot(data: List[Any], blob_store: Optional[ContentBlobStore]) -> FileVersion:
+    content_hash, size, timestamp, agent_id, sequence, mime_type, encoding, inline = data
+    return FileVersion(
+        content_hash=content_hash,
+        size=size,
+        timestamp=datetime.fromisoformat(timestamp),
+        agent_id=agent_id,
+        sequence=sequence,
+        mime_type=mime_type,
+        encoding=encoding,
+        blob_store=blob_store,
+        _content=inline
+    )
+
+
+def _session_to_snapshot(session: AgentSession) -> List[Any]:
+    return [
+        session.session_id, session.agent_id, session.agent_type,
+        session.started_at.isoformat(),
+        session.ended_at.isoformat() if session.ended_at else None,
+        session.file_modifications, session.validation_requests
+    ]
+
+
+def _session_from_snapshot(data: List[Any]) -> AgentSession:
+    session_id, agent_id, agent_type, started_at, ended_at, file_modifications, validation_requests = data
+    return AgentSession(
+        session_id=session_id,
+        agent_id=agent_id,
+        agent_type=agent_type,
+        started_at=datetime.fromisoformat(started_at),
+        ended_at=datetime.fromisoformat(ended_at) if ended_at else None,
+        file_modifications=list(file_modifications),
+        validation_requests=validation_requests
+    )
@@ -0,0 +1,472 @@
+"""
+Live Projection Runner
+
+Keeps a ProjectAggregate's read model (its current ProjectState) up to date
+with the event store. The runner tails the store from the last applied
+sequence, applies new events incrementally, and periodically persists a
+state checkpoint. On restart it resumes from the latest checkpoint and
+replays only the events after it.
+
+Because the cursor lives in the event store's sequence space and the
+checkpoints are shared on disk, several bridge workers reading the same
+store converge on the same read model, and a restarting worker can pick
+up a checkpoint written by any of them.
+
+Features:
+- Incremental tailing by sequence with batched reads
+- Commits events raised by the local aggregate to the shared store with
+  compare-and-append on the aggregate stream version, rebasing local
+  events past concurrent appends that touched other paths
+- Immediate wake-up on local appends, polling for appends by other workers
+- Failed commits roll the read model back to the state before the events
+- Committed events handed to a publisher once the store has sequenced them
+- Checkpoints every N events or T seconds through the shared CheckpointStore,
+  written only while the read model holds no uncommitted local events
+- Resume from checkpoint + replay of the remaining tail
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from lighthouse.event_store.models import Event, EventFilter, EventQuery
+from lighthouse.event_store.store import StreamVersionConflict
+from .checkpoints import CheckpointStore
+from .project_aggregate import ProjectAggregate
+from .project_state import ProjectState
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectionRunner:
+    """Tails the event store into a project aggregate's state"""
+    
+    def __init__(self,
+                 event_store: Any,
+                 aggregate: ProjectAggregate,
+                 checkpoint_store: CheckpointStore,
+                 batch_size: int = 500,
+                 poll_interval: float = 0.25,
+                 checkpoint_every_events: int = 1000,
+                 checkpoint_interval: float = 30.0,
+                 max_commit_retries: int = 3,
+                 publisher: Optional[Callable[[Event], Awaitable[Any]]] = None):
+        """
+        Initialize projection runner
+        
+        Args:
+            event_store: Event store to tail
+            aggregate: Aggregate whose current_state is the read model
+            checkpoint_store: Shared store for state checkpoints
+            batch_size: Maximum events read per store query
+            poll_interval: Seconds between polls when idle
+            checkpoint_every_events: Checkpoint after this many applied events
+            checkpoint_interval: ... or after this many seconds with new events
+            max_commit_retries: Rebase attempts when a commit loses a version race
+            publisher: Coroutine called with each committed event, in order,
+                after the store has assigned its sequence
+        """
+        self.event_store = event_store
+        self.aggregate = aggregate
+        self.checkpoint_store = checkpoint_store
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.checkpoint_every_events = checkpoint_every_events
+        self.checkpoint_interval = checkpoint_interval
+        self.max_commit_retries = max_commit_retries
+        self.publisher = publisher
+        
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        # Uncommitted chunks of the commit in progress
+        self._in_flight: List[Event] = []
+        
+        self._events_since_checkpoint = 0
+        self._last_checkpoint_time = time.monotonic()
+        
+        # Statistics
+        self.events_applied = 0
+        self.events_skipped = 0
+        self.events_committed = 0
+        self.commit_errors = 0
+        self.commit_conflicts = 0
+        self.commit_retries = 0
+        self.publish_errors = 0
+        self.batches_read = 0
+        self.checkpoints_written = 0
+        self.checkpoints_deferred = 0
+        self.resumed_from_sequence = 0
+        self.apply_errors = 0
+    
+    @property
+    def project_id(self) -> str:
+        return self.aggregate.project_id
+    
+    @property
+    def cursor(self) -> int:
+        """Last event sequence applied to the read model"""
+        return self.aggregate.current_state.last_event_sequence
+    
+    async def start(self):
+        """Resume from the latest checkpoint, catch up, and start tailing"""
+        if self._running:
+            return
+        
+        self.resume_from_checkpoint()
+        await self.catch_up()
+        
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        
+        logger.info(f"Projection runner for {self.project_id} started at sequence {self.cursor}")
+    
+    async def stop(self):
+        """Stop tailing and write a final checkpoint"""
+        if not self._running:
+            return
+        
+        self._running = False
+        self._wakeup.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        try:
+            await self.commit_pending()
+            await self.catch_up()
+        except Exception as e:
+            logger.error(f"Projection runner for {self.project_id} failed to drain: {e}")
+        
+        self._write_checkpoint()
+        logger.info(f"Projection runner for {self.project_id} stopped at sequence {self.cursor}")
+    
+    def notify(self):
+        """Wake the runner after a local append"""
+        self._wakeup.set()
+    
+    def resume_from_checkpoint(self) -> bool:
+        """
+        Adopt the latest checkpoint if it is ahead of the current state
+        
+        Returns:
+            True if a checkpoint was loaded
+        """
+        self.checkpoint_store.refresh()
+        checkpoint = self.checkpoint_store.latest(self.project_id)
+        if checkpoint is None or checkpoint.sequence <= self.cursor:
+            return False
+        
+        state = self.checkpoint_store.load(checkpoint, blob_store=self.aggregate.blob_store)
+        self.aggregate.current_state = state
+        self.aggregate.version = max(self.aggregate.version, state.last_event_sequence)
+        self.resumed_from_sequence = checkpoint.sequence
+        
+        logger.info(f"Resumed {self.project_id} read model from checkpoint at sequence {checkpoint.sequence}")
+        return True
+    
+    async def commit_pending(self) -> int:
+        """
+        Append events raised by the local aggregate to the event store
+        
+        These events are already applied to the state; when they are read
+        back with their store sequence, the state only advances its cursor.
+        
+        Stores supporting compare-and-append only accept the events if no
+        other writer has appended to the project since the state they were
+        decided on. On a lost race the read model is rebuilt from the state
+        before the local events: the other writer's events are applied, then
+        the local events on paths it did not touch, which are retried.
+        Local events on paths it did touch are rejected. Events the store
+        fails to append are rejected the same way, so the read model never
+        shows changes the store does not have. Only committed events reach
+        the publisher.
+        
+        Returns:
+            Number of events committed
+        """
+        pending = self.aggregate.get_uncommitted_events()
+        if not pending:
+            return 0
+        
+        base = self.aggregate.base_state
+        self.aggregate.mark_events_as_committed()
+        
+        committed = 0
+        if hasattr(self.event_store, 'compare_and_append') and base is not None:
+            self._in_flight = pending
+            while self._in_flight:
+                events = self._in_flight[:self.batch_size]
+                self._in_flight = self._in_flight[self.batch_size:]
+                events, base = await self._compare_and_append(events, base)
+                committed += len(events)
+                await self._publish(events)
+                if self._in_flight:
+                    # The next chunk was decided on top of this one
+                    base = base.fork()
+                    base.apply_events(events)
+        else:
+            for event in pending:
+                try:
+                    await self.event_store.append(event)
+                    committed += 1
+                except Exception as e:
+                    failed = pending[committed:]
+                    self.commit_errors += len(failed)
+                    logger.error(f"Failed to commit {len(failed)} events for {self.project_id}: {e}")
+                    if base is not None:
+                        # Keep the appended events as local events awaiting read-back
+                        base = base.fork()
+                        base.apply_events([appended.model_copy(update={'sequence': None})
+                                           for appended in pending[:committed]])
+                        self._rebase(base, [], failed, reject_all=True)
+                    break
+            await self._publish(pending[:committed])
+        
+        self.events_committed += committed
+        return committed
+    
+    async def _publish(self, events: List[Event]):
+        """Hand committed events to the publisher; its failures never undo a commit"""
+        if self.publisher is None:
+            return
+        for event in events:
+            try:
+                await self.publisher(event)
+            except Exception as e:
+                self.publish_errors += 1
+                logger.error(f"Failed to publish event {event.event_id} for {self.project_id}: {e}")
+    
+    async def _compare_and_append(self,
+                                  events: List[Event],
+                                  base: ProjectState) -> Tuple[List[Event], ProjectState]:
+        """Commit events decided on `base`; returns the events committed and their base"""
+        for attempt in range(self.max_commit_retries + 1):
+            try:
+                await self.event_store.compare_and_append(events, expected_version=self.cursor)
+            except StreamVersionConflict:
+                if attempt == self.max_commit_retries:
+                    break
+                self.commit_retries += 1
+                foreign = await self._read_tail()
+                events, base = self._rebase(base, foreign, events)
+                if not events:
+                    return [], base
+                continue
+            except Exception as e:
+                self.commit_errors += len(events)
+                logger.error(f"Failed to commit {len(events)} events for {self.project_id}: {e}")
+                self._rebase(base, [], events, reject_all=True)
+                return [], base
+            
+            # The store sequenced the events in place; move the cursor past
+            # them so the next commit expects the new stream version
+            self.aggregate.current_state.apply_events([e for e in events if e.sequence is not None])
+            return events, base
+        
+        logger.error(f"Giving up on {len(events)} events for {self.project_id} after "
+                     f"{self.max_commit_retries} retries")
+        self.commit_conflicts += len(events)
+        self._rebase(base, [], events, reject_all=True)
+        return [], base
+    
+    def _rebase(self,
+                base: ProjectState,
+                foreign: List[Event],
+                events: List[Event],
+                reject_all: bool = False) -> Tuple[List[Event], ProjectState]:
+        """
+        Rebuild the read model as base + foreign events + surviving local events
+        
+        Runs without awaiting, so no command observes a partial rebuild.
+        Later chunks of the commit and events the aggregate raised while it
+        was in flight are kept on top unless they touch a conflicting path.
+        
+        Returns:
+            Surviving events from `events` and the state they now apply to
+        """
+        conflicts: Set[str] = set()
+        for event in foreign:
+            conflicts.update(event.get_file_paths())
+        
+        kept = self._reject_conflicts(events, conflicts, reject_all)
+        self._in_flight = self._reject_conflicts(self._in_flight, conflicts)
+        
+        state = base.fork()
+        self.aggregate.current_state = state
+        self._apply_batch(foreign)
+        new_base = state.fork()
+        state.apply_events(kept)
+        state.apply_events(self._in_flight)
+        
+        newer = self.aggregate.get_uncommitted_events()
+        if newer:
+            survivors = self._reject_conflicts(newer, conflicts)
+            self.aggregate.uncommitted_events[:] = survivors
+            self.aggregate.base_state = state.fork() if survivors else None
+            state.apply_events(survivors)
+        
+        return kept, new_base
+    
+    def _reject_conflicts(self,
+                          events: List[Event],
+                          conflicts: Set[str],
+                          reject_all: bool = False) -> List[Event]:
+        """
+        Drop local events on conflicting paths
+        
+        Paths of rejected events are added to `conflicts`, so later events
+        building on a rejected one are rejected as well. With `reject_all`
+        every event is dropped; the caller accounts for them.
+        """
+        kept = []
+        for event in events:
+            paths = event.get_file_paths()
+            if not reject_all and conflicts.isdisjoint(paths):
+                kept.append(event)
+                continue
+            conflicts.update(paths)
+            if reject_all:
+                logger.warning(f"Rejected event {event.event_id} for {self.project_id}: not committed")
+                continue
+            self.commit_conflicts += 1
+            logger.warning(f"Rejected event {event.event_id} for {self.project_id}: "
+                           f"{', '.join(paths) or 'stream'} changed concurrently")
+        return kept
+    
+    async def catch_up(self) -> int:
+        """
+        Apply all available events after the cursor
+        
+        Returns:
+            Number of events applied
+        """
+        applied = 0
+        while True:
+            events = await self._read_batch()
+            applied += self._apply_batch(events)
+            if len(events) < self.batch_size:
+                break
+        
+        self._maybe_checkpoint()
+        return applied
+    
+    async def _run(self):
+        while self._running:
+            try:
+                await self.commit_pending()
+                await self.catch_up()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Projection runner for {self.project_id} failed to read events: {e}")
+            
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+    
+    async def _read_batch(self, after_sequence: Optional[int] = None) -> List[Event]:
+        if after_sequence is None:
+            after_sequence = self.cursor
+        event_filter = EventFilter(
+            aggregate_ids=[self.project_id],
+            after_sequence=after_sequence or None
+        )
+        result = await self.event_store.query(
+            EventQuery(filter=event_filter, limit=self.batch_size, order_by="sequence")
+        )
+        self.batches_read += 1
+        return result.events
+    
+    async def _read_tail(self) -> List[Event]:
+        """Read all events after the cursor without applying them"""
+        events: List[Event] = []
+        after_sequence = self.cursor
+        while True:
+            batch = await self._read_batch(after_sequence)
+            events.extend(batch)
+            if len(batch) < self.batch_size:
+                return events
+            after_sequence = batch[-1].sequence
+    
+    def _apply_batch(self, events: List[Event]) -> int:
+        state = self.aggregate.current_state
+        pending = [e for e in events if e.sequence is not None and e.sequence > state.last_event_sequence]
+        self.events_skipped += len(events) - len(pending)
+        applied = 0
+        
+        while pending:
+            try:
+                applied += state.apply_events(pending)
+                break
+            except Exception as e:
+                # A malformed event must not stall the projection: step over
+                # it and continue with the rest of the batch
+                failed = next(i for i, event in enumerate(pending)
+                              if event.sequence > state.last_event_sequence)
+                self.apply_errors += 1
+                applied += failed
+                logger.error(f"Projection of event {pending[failed].event_id} failed: {e}")
+                state.last_event_sequence = pending[failed].sequence
+                pending = pending[failed + 1:]
+        
+        if applied:
+            self.aggregate.version = max(self.aggregate.version, state.last_event_sequence)
+            self.events_applied += applied
+            self._events_since_checkpoint += applied
+        
+        return applied
+    
+    def _maybe_checkpoint(self):
+        if not self._events_since_checkpoint:
+            return
+        
+        if (self._events_since_checkpoint >= self.checkpoint_every_events or
+                time.monotonic() - self._last_checkpoint_time >= self.checkpoint_interval):
+            self._write_checkpoint()
+    
+    def _write_checkpoint(self):
+        # Checkpoints are shared between workers and labelled with the
+        # cursor, so they may only hold events the store has sequenced
+        if (self.aggregate.uncommitted_events or self._in_flight or
+                self.aggregate.current_state.unsequenced_event_ids):
+            self.checkpoints_deferred += 1
+            return
+        
+        try:
+            if self.checkpoint_store.save(self.aggregate.current_state):
+                self.checkpoints_written += 1
+        except Exception as e:
+            logger.error(f"Failed to checkpoint {self.project_id} read model: {e}")
+            return
+        
+        self._events_since_checkpoint = 0
+        self._last_checkpoint_time = time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get projection runner statistics"""
+        return {
+            'project_id': self.project_id,
+            'running': self._running,
+            'cursor': self.cursor,
+            'events_applied': self.events_applied,
+            'events_skipped': self.events_skipped,
+            'events_committed': self.events_committed,
+            'commit_errors': self.commit_errors,
+            'commit_conflicts': self.commit_conflicts,
+            'commit_retries': self.commit_retries,
+            'publish_errors': self.publish_errors,
+            'batches_read': self.batches_read,
+            'checkpoints_written': self.checkpoints_written,
+            'checkpoints_deferred': self.checkpoints_deferred,
+            'resumed_from_sequence': self.resumed_from_sequence,
+            'apply_errors': self.apply_errors,
+            'pending_checkpoint_events': self._events_since_checkpoint
+        }
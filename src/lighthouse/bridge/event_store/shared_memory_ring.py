@@ -0,0 +1,432 @@
+"""
+Shared-Memory Event Ring
+
+Optional local transport for agent processes co-located with the bridge.
+Events are written once into a single-producer, multi-consumer ring in
+POSIX shared memory as MessagePack frames. Each consumer keeps its own
+read cursor and tails the ring without any syscalls on the hot path.
+
+Layout:
+- Header: magic, geometry, write sequence and a table of published
+  consumer cursors (so the producer can report per-consumer lag)
+- Slots: [ring_seq:8][event_seq:8][length:4][flags:4][payload...]
+
+Slots use a sequence-lock protocol: the producer zeroes a slot's ring
+sequence before overwriting it and stores the new sequence last, so a
+reader that sees the same expected sequence before and after copying the
+payload knows the copy is intact. The producer never waits for readers;
+a reader that falls a full ring behind is lapped and falls back to the
+event store from the last event sequence it delivered.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+from multiprocessing import shared_memory
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import uuid4
+
+from lighthouse.event_store.models import Event, EventFilter, EventQuery
+
+logger = logging.getLogger(__name__)
+
+RING_MAGIC = b'LHSR'
+RING_VERSION = 1
+
+# magic, version, header_size, slot_count, slot_size, max_consumers, reserved
+_HEADER = struct.Struct('<4sHHIIII')
+_WRITE_SEQUENCE_OFFSET = 24
+_CURSOR_TABLE_OFFSET = 64
+_U64 = struct.Struct('<Q')
+
+# ring_seq, event_seq, length, flags
+_SLOT_HEADER = struct.Struct('<QQII')
+
+# Slot flags
+FLAG_OVERSIZE = 0x1  # Payload did not fit; readers load the event from the store
+
+
+class RingOverrun(Exception):
+    """Raised when a reader has been lapped by the producer"""
+    
+    def __init__(self, message: str, cursor: int, oldest_available: int):
+        super().__init__(message)
+        self.cursor = cursor
+        self.oldest_available = oldest_available
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without handing it to the resource tracker"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached segments and would unlink them on
+        # exit, so suppress registration while attaching
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedMemoryEventRing:
+    """Producer side of the shared-memory event ring (single writer)"""
+    
+    def __init__(self,
+                 name: Optional[str] = None,
+                 slot_count: int = 4096,
+                 slot_size: int = 8192,
+                 max_consumers: int = 64):
+        """
+        Create shared-memory event ring
+        
+        Args:
+            name: Shared memory segment name (generated if omitted)
+            slot_count: Number of slots in the ring
+            slot_size: Bytes per slot, including the slot header
+            max_consumers: Size of the published consumer cursor table
+        """
+        if slot_size <= _SLOT_HEADER.size:
+            raise ValueError(f"slot_size must exceed {_SLOT_HEADER.size} bytes")
+        
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.max_consumers = max_consumers
+        self.header_size = _CURSOR_TABLE_OFFSET + 8 * max_consumers
+        self.header_size = (self.header_size + 63) // 64 * 64
+        
+        name = name or f"lighthouse_events_{os.getpid()}_{uuid4().hex[:8]}"
+        self._shm = shared_memory.SharedMemory(
+            name=name,
+            create=True,
+            size=self.header_size + slot_count * slot_size
+        )
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        
+        _HEADER.pack_into(
+            self._buf, 0, RING_MAGIC, RING_VERSION, self.header_size,
+            slot_count, slot_size, max_consumers, 0
+        )
+        _U64.pack_into(self._buf, _WRITE_SEQUENCE_OFFSET, 0)
+        
+        self.write_sequence = 0
+        
+        # Statistics
+        self.events_published = 0
+        self.bytes_published = 0
+        self.oversize_events = 0
+        
+        logger.info(f"Created shared-memory event ring {self.name} "
+                    f"({slot_count} slots x {slot_size} bytes)")
+    
+    def publish(self, event: Event) -> int:
+        """
+        Write an event into the next slot
+        
+        Returns:
+            Ring sequence assigned to the event
+        """
+        payload = event.to_msgpack()
+        flags = 0
+        
+        if len(payload) > self.slot_size - _SLOT_HEADER.size:
+            flags |= FLAG_OVERSIZE
+            payload = b''
+            self.oversize_events += 1
+        
+        sequence = self.write_sequence + 1
+        offset = self.header_size + ((sequence - 1) % self.slot_count) * self.slot_size
+        buf = self._buf
+        
+        # Invalidate, write payload, then publish the slot sequence
+        _U64.pack_into(buf, offset, 0)
+        payload_offset = offset + _SLOT_HEADER.size
+        buf[payload_offset:payload_offset + len(payload)] = payload
+        _SLOT_HEADER.pack_into(buf, offset, sequence, event.sequence or 0, len(payload), flags)
+        _U64.pack_into(buf, _WRITE_SEQUENCE_OFFSET, sequence)
+        
+        self.write_sequence = sequence
+        self.events_published += 1
+        self.bytes_published += len(payload)
+        
+        return sequence
+    
+    def get_consumer_cursors(self) -> Dict[int, int]:
+        """Get published cursors of attached consumers by slot index"""
+        cursors = {}
+        for index in range(self.max_consumers):
+            (cursor,) = _U64.unpack_from(self._buf, _CURSOR_TABLE_OFFSET + 8 * index)
+            if cursor:
+                cursors[index] = cursor
+        return cursors
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ring statistics including per-consumer lag"""
+        cursors = self.get_consumer_cursors()
+        
+        return {
+            'name': self.name,
+            'slot_count': self.slot_count,
+            'slot_size': self.slot_size,
+            'write_sequence': self.write_sequence,
+            'events_published': self.events_published,
+            'bytes_published': self.bytes_published,
+            'oversize_events': self.oversize_events,
+            'consumer_lag': {
+                index: self.write_sequence - cursor
+                for index, cursor in cursors.items()
+            }
+        }
+    
+    def close(self, unlink: bool = True):
+        """Release the segment (and remove it unless other owners remain)"""
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedMemoryRingReader:
+    """
+    Consumer side of the shared-memory event ring
+    
+    Co-located agents tail the ring with their own cursor. When the
+    producer laps the reader, events are re-read from the event store
+    after the last event sequence delivered, then tailing resumes.
+    """
+    
+    def __init__(self,
+                 name: str,
+                 event_store: Optional[Any] = None,
+                 event_filter: Optional[EventFilter] = None,
+                 consumer_slot: Optional[int] = None,
+                 start_at_head: bool = True):
+        """
+        Attach to a shared-memory event ring
+        
+        Args:
+            name: Shared memory segment name published by the bridge
+            event_store: Event store for lap recovery and oversize events
+            event_filter: Optional filter applied to delivered events
+            consumer_slot: Cursor table slot to publish this reader's cursor in
+            start_at_head: Skip events already in the ring when attaching;
+                lap recovery then starts after the newest of them (or after
+                the store's head if the ring is empty) rather than replaying
+                the whole store
+        """
+        self._shm = _attach_shared_memory(name)
+        self._buf = self._shm.buf
+        
+        magic, version, header_size, slot_count, slot_size, max_consumers, _ = (
+            _HEADER.unpack_from(self._buf, 0)
+        )
+        if magic != RING_MAGIC or version != RING_VERSION:
+            self.close()
+            raise ValueError(f"Shared memory segment {name} is not a Lighthouse event ring")
+        
+        if consumer_slot is not None and not 0 <= consumer_slot < max_consumers:
+            self.close()
+            raise ValueError(f"consumer_slot must be in [0, {max_consumers})")
+        
+        self.name = name
+        self.header_size = header_size
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.event_store = event_store
+        self.event_filter = event_filter
+        self.consumer_slot = consumer_slot
+        
+        self.cursor = self._write_sequence() if start_at_head else 0
+        self.last_event_sequence = self._newest_event_sequence() if start_at_head else 0
+        # Lower bound for lap recovery only: events the store already had
+        # when attaching to an empty ring may still be published afterwards,
+        # so they are not treated as delivered
+        self._recovery_floor = self.last_event_sequence
+        if start_at_head and not self._recovery_floor and event_store is not None:
+            self._recovery_floor = getattr(event_store, 'current_sequence', 0) or 0
+        self.pending_oversize: Optional[int] = None  # Event sequence to load from the store
+        self._recovering = False
+        
+        # Statistics
+        self.events_read = 0
+        self.overruns = 0
+        self.store_reads = 0
+        
+        self._publish_cursor()
+    
+    def read_nowait(self, max_events: int = 256) -> List[Event]:
+        """
+        Read available events without blocking
+        
+        Reading stops at an oversize slot and records it in
+        pending_oversize; read() resolves those from the event store.
+        
+        Raises:
+            RingOverrun: If the producer has lapped this reader
+        """
+        head = self._write_sequence()
+        oldest = max(1, head - self.slot_count + 1)
+        
+        if self.cursor + 1 < oldest:
+            raise RingOverrun(
+                f"Reader at {self.cursor} lapped (oldest available {oldest})",
+                self.cursor, oldest
+            )
+        
+        events = []
+        
+        while self.cursor < head and len(events) < max_events:
+            sequence = self.cursor + 1
+            offset = self.header_size + ((sequence - 1) % self.slot_count) * self.slot_size
+            
+            ring_seq, event_seq, length, flags = _SLOT_HEADER.unpack_from(self._buf, offset)
+            if ring_seq != sequence:
+                raise RingOverrun(f"Slot {sequence} overwritten while reading", self.cursor, oldest)
+            
+            payload_offset = offset + _SLOT_HEADER.size
+            payload = bytes(self._buf[payload_offset:payload_offset + length])
+            
+            # Seqlock check: slot must be unchanged after the copy
+            (ring_seq_after,) = _U64.unpack_from(self._buf, offset)
+            if ring_seq_after != sequence:
+                raise RingOverrun(f"Slot {sequence} overwritten while reading", self.cursor, oldest)
+            
+            self.cursor = sequence
+            
+            if event_seq and event_seq <= self.last_event_sequence:
+                continue  # Already delivered from the store
+            
+            if flags & FLAG_OVERSIZE:
+                # Stop here to keep ordering; read() loads it from the store
+                self.pending_oversize = event_seq
+                break
+            
+            event = Event.from_msgpack(payload)
+            self._accept(event, events)
+        
+        self._publish_cursor()
+        return events
+    
+    async def read(self, max_events: int = 256) -> List[Event]:
+        """Read available events, recovering from the store if lapped"""
+        if not self._recovering:
+            try:
+                events = self.read_nowait(max_events)
+            except RingOverrun as e:
+                self.overruns += 1
+                if self.event_store is None:
+                    raise
+                logger.warning(f"Shared-memory reader lapped on {self.name}: {e}")
+                
+                # Rejoin the ring at the current head once the store has
+                # delivered everything up to it
+                self._recovering = True
+                self.cursor = self._write_sequence()
+                self._publish_cursor()
+        
+        if self._recovering:
+            return await self._recover_from_store(max_events)
+        
+        if self.pending_oversize is not None:
+            event_seq, self.pending_oversize = self.pending_oversize, None
+            if self.event_store is not None and event_seq:
+                for event in await self._read_store(event_seq - 1, 1):
+                    self._accept(event, events)
+            else:
+                logger.warning(f"Dropped oversize event {event_seq} on {self.name}: no event store")
+        
+        return events
+    
+    async def tail(self,
+                   poll_interval: float = 0.0005,
+                   max_events: int = 256) -> AsyncIterator[Event]:
+        """
+        Yield events as they are published
+        
+        Busy batches are returned back-to-back; when idle the reader
+        sleeps for poll_interval between checks.
+        """
+        while True:
+            events = await self.read(max_events)
+            for event in events:
+                yield event
+            if not events:
+                await asyncio.sleep(poll_interval)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reader statistics"""
+        return {
+            'name': self.name,
+            'cursor': self.cursor,
+            'lag': self._write_sequence() - self.cursor,
+            'last_event_sequence': self.last_event_sequence,
+            'events_read': self.events_read,
+            'overruns': self.overruns,
+            'store_reads': self.store_reads,
+            'recovering': self._recovering
+        }
+    
+    def close(self):
+        """Detach from the ring"""
+        if self._buf is not None and self.consumer_slot is not None:
+            _U64.pack_into(self._buf, _CURSOR_TABLE_OFFSET + 8 * self.consumer_slot, 0)
+        self._buf = None
+        self._shm.close()
+    
+    async def _recover_from_store(self, max_events: int) -> List[Event]:
+        """Re-read missed events from the store in batches"""
+        store_events = await self._read_store(max(self.last_event_sequence, self._recovery_floor), max_events)
+        if len(store_events) < max_events:
+            self._recovering = False  # Ring events beyond this are deduplicated
+        
+        events = []
+        for event in store_events:
+            self._accept(event, events)
+        return events
+    
+    async def _read_store(self, after_sequence: int, limit: int) -> List[Event]:
+        event_filter = (
+            self.event_filter.model_copy(update={'after_sequence': after_sequence})
+            if self.event_filter else EventFilter(after_sequence=after_sequence)
+        )
+        result = await self.event_store.query(EventQuery(filter=event_filter, limit=limit))
+        self.store_reads += 1
+        return result.events
+    
+    def _accept(self, event: Event, events: List[Event]):
+        if event.sequence is not None:
+            if event.sequence <= self.last_event_sequence:
+                return
+            self.last_event_sequence = event.sequence
+        
+        if self.event_filter is None or self.event_filter.matches_event(event):
+            events.append(event)
+            self.events_read += 1
+    
+    def _newest_event_sequence(self) -> int:
+        """Event sequence of the newest sequenced event still in the ring (0 if none)"""
+        head = self._write_sequence()
+        for sequence in range(head, max(1, head - self.slot_count + 1) - 1, -1):
+            offset = self.header_size + ((sequence - 1) % self.slot_count) * self.slot_size
+            ring_seq, event_seq, _, _ = _SLOT_HEADER.unpack_from(self._buf, offset)
+            if ring_seq != sequence:
+                break  # Overwritten by a newer event; the newer slots were checked first
+            if event_seq:
+                return event_seq
+        return 0
+    
+    def _write_sequence(self) -> int:
+        (sequence,) = _U64.unpack_from(self._buf, _WRITE_SEQUENCE_OFFSET)
+        return sequence
+    
+    def _publish_cursor(self):
+        if self.consumer_slot is not None:
+            _U64.pack_into(self._buf, _CURSOR_TABLE_OFFSET + 8 * self.consumer_slot,
+                           max(self.cursor, 1))
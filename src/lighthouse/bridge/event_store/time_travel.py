@@ -6,19 +6,24 @@ Enables debugging by reconstructing project state at any point in history.
 
 Features:
 - Point-in-time state reconstruction
-- File history tracking and diff generation
+- File history tracking and diff generation (path-indexed when the store supports it)
 - Session replay with complete audit trails
 - Event correlation and causality tracking
 - Performance-optimized snapshot and rebuild
+- Byte-bounded LRU caches with sequence watermark invalidation
 """
 
+import difflib
 import logging
 from collections import defaultdict
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from lighthouse.event_store.models import Event, EventFilter, EventType
+from .blob_store import BlobNotFound, ContentBlobStore, resolve_event_content
+from .bounded_cache import BoundedCache
+from .checkpoints import CheckpointStore, StateCheckpoint, to_epoch_micros
 from .project_state import ProjectState, FileVersion
 # Note: event_store will be injected via constructor
 
@@ -43,6 +48,9 @@ class SessionReplay:
     decisions_made: Dict[str, str]
     operation_summary: Dict[str, int]
     
+    # Content store used to resolve file contents referenced by hash
+    blob_store: Optional[ContentBlobStore] = field(default=None, repr=False)
+    
     @property
     def duration(self) -> Optional[timedelta]:
         """Get session duration"""
@@ -63,12 +71,19 @@ class SessionReplay:
                 after_content = ""
                 
                 if event.event_type in [EventType.FILE_MODIFIED, EventType.FILE_CREATED]:
-                    after_content = event.data.get('content', '')
+                    after_content = resolve_event_content(event, self.blob_store)
                     
-                    # Find previous content from event history
-                    if event.data.get('previous_hash'):
-                        # Would lookup previous content by hash
+                    # Previous content is addressable by its hash
+                    previous_hash = event.data.get('previous_hash')
+                    if previous_hash:
                         before_content = "[Previous version]"
+                        if self.blob_store is not None:
+                            try:
+                                before_content = self.blob_store.get_text(
+                                    previous_hash, event.data.get('encoding', 'utf-8')
+                                )
+                            except BlobNotFound:
+                                pass
                 
                 changes.append((event, before_content, after_content))
         
@@ -81,11 +96,16 @@ class FileHistoryEntry:
     
     timestamp: datetime
     event: Event
-    content: str
     content_hash: str
     agent_id: str
     operation: str  # created, modified, deleted, moved
     size: int
+    blob_store: Optional[ContentBlobStore] = field(default=None, repr=False)
+    
+    @property
+    def content(self) -> str:
+        """File content at this entry, loaded on demand"""
+        return resolve_event_content(self.event, self.blob_store)
     
     def get_diff_summary(self, previous: Optional['FileHistoryEntry'] = None) -> str:
         """Get summary of changes from previous version"""
@@ -109,23 +129,47 @@ class FileHistoryEntry:
 class TimeTravelDebugger:
     """Time travel debugging and historical analysis"""
     
-    def __init__(self, event_store):
+    def __init__(self,
+                 event_store,
+                 blob_store: Optional[ContentBlobStore] = None,
+                 checkpoint_store: Optional[CheckpointStore] = None,
+                 snapshot_cache_bytes: int = 256 * 1024 * 1024,
+                 history_cache_bytes: int = 64 * 1024 * 1024):
         """
         Initialize time travel debugger
         
         Args:
             event_store: Event store instance for querying events
+            blob_store: Content store used to resolve file contents
+            checkpoint_store: State checkpoint store (in-memory if not given)
+            snapshot_cache_bytes: Content byte budget for rebuilt states
+            history_cache_bytes: Content byte budget for file histories
         """
         self.event_store = event_store
-        
-        # Caching for performance
-        self._snapshot_cache: Dict[str, Tuple[datetime, ProjectState]] = {}
-        self._file_history_cache: Dict[str, List[FileHistoryEntry]] = {}
+        self.blob_store = blob_store
+        self.checkpoint_store = checkpoint_store or CheckpointStore()
         
         # Performance settings
-        self.snapshot_interval = timedelta(hours=1)  # Create snapshots every hour
+        self.snapshot_interval = timedelta(hours=1)  # Checkpoint every hour of event time
+        self.checkpoint_event_interval = 1000  # ... or every N replayed events
         self.cache_ttl = timedelta(minutes=30)  # Cache TTL
         
+        # Caching for performance. Rebuilt states are charged by the size of
+        # the files they hold; forks share unchanged files, so this is an
+        # upper bound on what the cache actually keeps alive.
+        self._snapshot_cache = BoundedCache(
+            max_bytes=snapshot_cache_bytes,
+            ttl=self.cache_ttl.total_seconds(),
+            sizer=lambda state: state.total_file_size,
+            name="snapshots"
+        )
+        self._file_history_cache = BoundedCache(
+            max_bytes=history_cache_bytes,
+            ttl=self.cache_ttl.total_seconds(),
+            sizer=lambda history: sum(entry.size for entry in history),
+            name="file_history"
+        )
+        
     async def rebuild_at_timestamp(self, 
                                  timestamp: datetime,
                                  project_id: str) -> ProjectState:
@@ -140,50 +184,80 @@ class TimeTravelDebugger:
             Project state at the specified timestamp
         """
         
-        # Check cache first
-        cache_key = f"{project_id}:{timestamp.isoformat()}"
-        if cache_key in self._snapshot_cache:
-            cached_time, cached_state = self._snapshot_cache[cache_key]
-            if datetime.utcnow() - cached_time < self.cache_ttl:
-                logger.debug(f"Using cached state for {timestamp}")
-                return cached_state
-        
-        # Find the best starting snapshot
-        snapshot_state, snapshot_time = await self._find_best_snapshot(
-            project_id, timestamp
-        )
+        # Find the best starting checkpoint
+        checkpoint = await self._find_best_snapshot(project_id, timestamp)
+        checkpoint_sequence = checkpoint.sequence if checkpoint else 0
         
-        # Get events from snapshot time to target time
+        # Get events from the checkpoint to target time
         event_filter = EventFilter(
             aggregate_ids=[project_id],
-            after_timestamp=snapshot_time,
+            after_sequence=checkpoint_sequence or None,
             before_timestamp=timestamp
         )
         
         events = await self.event_store.query_events(event_filter)
         
-        # Rebuild state from snapshot
-        state = snapshot_state or ProjectState(project_id)
-        
-        for event in events:
-            state.apply_event(event)
-        
-        # Cache the result
-        self._snapshot_cache[cache_key] = (datetime.utcnow(), state)
-        
-        # Limit cache size
-        if len(self._snapshot_cache) > 100:
-            # Remove oldest entries
-            sorted_items = sorted(
-                self._snapshot_cache.items(),
-                key=lambda x: x[1][0]  # Sort by cached time
-            )
-            self._snapshot_cache = dict(sorted_items[-80:])
+        # Key the cache by the last event the state reflects, so every
+        # timestamp between the same two events shares one entry
+        last_sequence = events[-1].sequence if events else checkpoint_sequence
+        cache_key = f"{project_id}:{last_sequence}"
+        cached_state = self._snapshot_cache.get(cache_key)
+        if cached_state is not None:
+            logger.debug(f"Using cached state for {timestamp}")
+            return cached_state
+        
+        # Rebuild from the closest earlier cached state if it is ahead of the
+        # checkpoint; the fork shares everything the new events don't touch
+        base_state = self._closest_cached_state(project_id, checkpoint_sequence, last_sequence)
+        if base_state:
+            state = base_state.fork()
+            events = [e for e in events if (e.sequence or 0) > base_state.last_event_sequence]
+        elif checkpoint:
+            state = self.checkpoint_store.load(checkpoint, blob_store=self.blob_store)
+        else:
+            state = ProjectState(project_id, blob_store=self.blob_store)
+        
+        self._apply_with_checkpoints(state, events)
+        
+        # Cache the result (least recently used states are evicted)
+        self._snapshot_cache.put(cache_key, state, watermark=last_sequence)
         
         logger.info(f"Rebuilt state for {project_id} at {timestamp}")
         
         return state
     
+    async def compare_states(self,
+                           project_id: str,
+                           from_time: datetime,
+                           to_time: datetime) -> Dict[str, List[str]]:
+        """
+        List file and directory changes between two points in time
+        
+        The later state is derived from the earlier one, so the comparison
+        only walks the parts of the state that actually changed.
+        """
+        from_state = await self.rebuild_at_timestamp(from_time, project_id)
+        to_state = await self.rebuild_at_timestamp(to_time, project_id)
+        return from_state.diff(to_state)
+    
+    def _closest_cached_state(self,
+                              project_id: str,
+                              min_sequence: int,
+                              max_sequence: int) -> Optional[ProjectState]:
+        """Latest unexpired cached state within a sequence range"""
+        best = None
+        prefix = f"{project_id}:"
+        
+        for cache_key, cached_state in self._snapshot_cache.items():
+            if not cache_key.startswith(prefix):
+                continue
+            sequence = cached_state.last_event_sequence
+            if min_sequence <= sequence <= max_sequence and (
+                    best is None or sequence > best.last_event_sequence):
+                best = cached_state
+        
+        return best
+    
     async def get_file_history(self, 
                              file_path: str,
                              project_id: str,
@@ -200,27 +274,34 @@ class TimeTravelDebugger:
             List of file history entries in chronological order
         """
         
-        # Check cache
+        # Check cache. Complete histories are cached and serve limited
+        # requests too; with path postings available an entry is only valid
+        # while no newer event has touched the path.
         cache_key = f"{project_id}:{file_path}"
-        if (cache_key in self._file_history_cache and 
-            limit is None):  # Only cache complete histories
-            return self._file_history_cache[cache_key]
-        
-        # Query file events
-        event_filter = EventFilter(
-            aggregate_ids=[project_id],
-            event_types=[
-                EventType.FILE_CREATED,
-                EventType.FILE_MODIFIED,
-                EventType.FILE_DELETED,
-                EventType.FILE_MOVED,
-                EventType.FILE_COPIED
-            ],
-            file_paths=[file_path],
-            limit=limit
-        )
-        
-        events = await self.event_store.query_events(event_filter)
+        watermark = self._path_watermark(project_id, file_path)
+        cached = self._file_history_cache.get(cache_key, min_watermark=watermark)
+        if cached is not None:
+            return cached if limit is None else cached[:limit]
+        
+        if hasattr(self.event_store, 'get_path_events'):
+            # Path postings: only the events touching this path are read,
+            # including moves and copies to or from it
+            events = await self.event_store.get_path_events(project_id, file_path, limit=limit)
+        else:
+            event_filter = EventFilter(
+                aggregate_ids=[project_id],
+                event_types=[
+                    EventType.FILE_CREATED,
+                    EventType.FILE_MODIFIED,
+                    EventType.FILE_DELETED,
+                    EventType.FILE_MOVED,
+                    EventType.FILE_COPIED
+                ],
+                file_paths=[file_path],
+                limit=limit
+            )
+            
+            events = await self.event_store.query_events(event_filter)
         
         # Convert events to history entries
         history = []
@@ -230,21 +311,28 @@ class TimeTravelDebugger:
             entry = FileHistoryEntry(
                 timestamp=event.timestamp,
                 event=event,
-                content=event.data.get('content', ''),
                 content_hash=event.data.get('content_hash', ''),
                 agent_id=event.source_agent or event.metadata.get('agent_id', 'unknown'),
                 operation=operation,
-                size=event.data.get('size', 0)
+                size=event.data.get('size', 0),
+                blob_store=self.blob_store
             )
             
             history.append(entry)
         
         # Cache complete histories
         if limit is None:
-            self._file_history_cache[cache_key] = history
+            self._file_history_cache.put(cache_key, history, watermark=watermark or 0)
         
         return history
     
+    def _path_watermark(self, project_id: str, file_path: str) -> Optional[int]:
+        """Sequence of the latest event touching a path, if the store indexes paths"""
+        if not hasattr(self.event_store, 'get_path_sequences'):
+            return None
+        sequences = self.event_store.get_path_sequences(project_id, file_path)
+        return sequences[-1] if sequences else 0
+    
     async def replay_session(self, 
                            session_id: str,
                            project_id: str) -> SessionReplay:
@@ -329,7 +417,8 @@ class TimeTravelDebugger:
             files_modified=files_modified,
             validation_requests=validation_requests,
             decisions_made=decisions_made,
-            operation_summary=dict(operation_summary)
+            operation_summary=dict(operation_summary),
+            blob_store=self.blob_store
         )
     
     async def get_project_timeline(self,
@@ -374,26 +463,39 @@ class TimeTravelDebugger:
         """
         
         # Get recent file operations
-        recent_time = datetime.utcnow() - time_window
-        event_filter = EventFilter(
-            aggregate_ids=[project_id],
-            after_timestamp=recent_time,
-            event_types=[
-                EventType.FILE_CREATED,
-                EventType.FILE_MODIFIED,
-                EventType.FILE_DELETED,
-                EventType.FILE_MOVED
-            ]
-        )
-        
-        events = await self.event_store.query_events(event_filter)
+        recent_time = datetime.now(timezone.utc) - time_window
+        event_types = [
+            EventType.FILE_CREATED,
+            EventType.FILE_MODIFIED,
+            EventType.FILE_DELETED,
+            EventType.FILE_MOVED
+        ]
         
-        # Group events by file path
         file_events = defaultdict(list)
-        for event in events:
-            file_path = event.get_file_path()
-            if file_path:
-                file_events[file_path].append(event)
+        if hasattr(self.event_store, 'get_recent_path_postings'):
+            # Group by path in the index; only paths touched more than once
+            # in the window have their events loaded
+            postings = self.event_store.get_recent_path_postings(project_id, recent_time)
+            for file_path, sequences in postings.items():
+                if len(sequences) < 2:
+                    continue
+                for event in await self.event_store.get_events_by_sequence(sequences):
+                    if event.event_type in event_types and event.timestamp >= recent_time:
+                        file_events[file_path].append(event)
+        else:
+            event_filter = EventFilter(
+                aggregate_ids=[project_id],
+                after_timestamp=recent_time,
+                event_types=event_types
+            )
+            
+            events = await self.event_store.query_events(event_filter)
+            
+            # Group events by file path
+            for event in events:
+                file_path = event.get_file_path()
+                if file_path:
+                    file_events[file_path].append(event)
         
         # Look for potential conflicts
         conflicts = []
@@ -434,26 +536,31 @@ class TimeTravelDebugger:
             Diff information
         """
         
-        # Get states at both times
-        from_state = await self.rebuild_at_timestamp(from_time, project_id)
-        to_state = await self.rebuild_at_timestamp(to_time, project_id)
-        
-        # Get file content at both times
-        from_content = from_state.get_file_content(file_path) or ""
-        to_content = to_state.get_file_content(file_path) or ""
-        
-        # Simple diff calculation (could use difflib for more sophisticated diffs)
-        from_lines = from_content.splitlines()
-        to_lines = to_content.splitlines()
-        
-        import difflib
-        diff = list(difflib.unified_diff(
-            from_lines,
-            to_lines,
-            fromfile=f"{file_path} @ {from_time.isoformat()}",
-            tofile=f"{file_path} @ {to_time.isoformat()}",
-            lineterm=""
-        ))
+        # Resolve the file's versions from its own history; contents come
+        # from the blob store's delta chains, no project state rebuild needed
+        history = await self.get_file_history(file_path, project_id)
+        
+        if history and not self._arrives_by_move_or_copy(history, file_path):
+            from_entry = self._history_entry_at(history, from_time)
+            to_entry = self._history_entry_at(history, to_time)
+            from_content = from_entry.content if from_entry else ""
+            to_content = to_entry.content if to_entry else ""
+        else:
+            # File reached this path via a move/copy; rebuild states
+            from_state = await self.rebuild_at_timestamp(from_time, project_id)
+            to_state = await self.rebuild_at_timestamp(to_time, project_id)
+            from_content = from_state.get_file_content(file_path) or ""
+            to_content = to_state.get_file_content(file_path) or ""
+        
+        diff = []
+        if from_content != to_content:
+            diff = list(difflib.unified_diff(
+                from_content.splitlines(),
+                to_content.splitlines(),
+                fromfile=f"{file_path} @ {from_time.isoformat()}",
+                tofile=f"{file_path} @ {to_time.isoformat()}",
+                lineterm=""
+            ))
         
         return {
             'file_path': file_path,
@@ -466,19 +573,73 @@ class TimeTravelDebugger:
             'unified_diff': diff
         }
     
+    def _history_entry_at(self,
+                          history: List[FileHistoryEntry],
+                          timestamp: datetime) -> Optional[FileHistoryEntry]:
+        """Latest content-bearing history entry at a point in time (None if absent)"""
+        current = None
+        
+        for entry in history:
+            if entry.timestamp > timestamp:
+                break
+            if entry.operation == "copied":
+                continue  # Copied elsewhere; this path is unchanged
+            current = None if entry.operation in ("deleted", "moved") else entry
+        
+        return current
+    
+    def _arrives_by_move_or_copy(self, history: List[FileHistoryEntry], file_path: str) -> bool:
+        """Whether any version of the file was moved or copied in from another path"""
+        return any(
+            entry.event.data.get('new_path') == file_path or
+            entry.event.data.get('dest_path') == file_path
+            for entry in history
+            if entry.operation in ("moved", "copied")
+        )
+    
     async def _find_best_snapshot(self,
                                 project_id: str,
-                                target_time: datetime) -> Tuple[Optional[ProjectState], datetime]:
+                                target_time: datetime) -> Optional[StateCheckpoint]:
         """
         Find the best snapshot to start rebuilding from
         
         Returns:
-            Tuple of (snapshot_state, snapshot_time)
+            Latest checkpoint at or before target_time, or None to replay from the start
         """
+        return self.checkpoint_store.find_at_or_before(project_id, target_time)
+    
+    def _apply_with_checkpoints(self, state: ProjectState, events: List[Event]):
+        """Apply events, saving checkpoints at the configured cadence"""
+        latest = self.checkpoint_store.latest(state.project_id)
+        latest_sequence = latest.sequence if latest else 0
+        last_time_key = latest.time_key if latest else None
+        interval_micros = self.snapshot_interval // timedelta(microseconds=1)
+        events_since_checkpoint = 0
+        batch_start = 0
+        
+        for position, event in enumerate(events):
+            events_since_checkpoint += 1
+            
+            # Only extend checkpoints past the latest one
+            if event.sequence is None or event.sequence <= latest_sequence:
+                continue
+            
+            time_key = to_epoch_micros(event.timestamp)
+            if last_time_key is None:
+                last_time_key = time_key
+            
+            if (events_since_checkpoint >= self.checkpoint_event_interval or
+                    time_key - last_time_key >= interval_micros):
+                state.apply_events(events[batch_start:position + 1])
+                batch_start = position + 1
+                
+                checkpoint = self.checkpoint_store.save(state)
+                if checkpoint:
+                    latest_sequence = checkpoint.sequence
+                    last_time_key = checkpoint.time_key
+                events_since_checkpoint = 0
         
-        # For now, always rebuild from beginning
-        # In a production system, this would look for stored snapshots
-        return None, datetime.min
+        state.apply_events(events[batch_start:])
     
     def _get_operation_from_event_type(self, event_type: EventType) -> str:
         """Convert event type to operation string"""
@@ -495,4 +656,11 @@ class TimeTravelDebugger:
         """Clear all caches"""
         self._snapshot_cache.clear()
         self._file_history_cache.clear()
-        logger.info("Time travel debugger cache cleared")
\ No newline at end of file
+        logger.info("Time travel debugger cache cleared")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get snapshot and file history cache statistics"""
+        return {
+            'snapshots': self._snapshot_cache.get_stats(),
+            'file_history': self._file_history_cache.get_stats()
+        }
\ No newline at end of file
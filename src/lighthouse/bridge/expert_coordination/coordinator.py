@@ -11,6 +11,7 @@ Features:
 - FUSE filesystem integration for expert tools
 - Real-time communication channels with proper authorization
 - Context sharing and collaboration session management
+- Expert verdicts on escalated validations, recorded as validation decisions
 """
 
 import asyncio
@@ -22,9 +23,10 @@ import os
 import secrets
 import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -157,6 +159,11 @@ class SecureExpertCoordinator:
         # Command delegation tracking
         self.pending_delegations: Dict[str, Dict[str, Any]] = {}  # delegation_id -> delegation_info
         
+        # Validation escalations awaiting an expert verdict
+        self.pending_escalations: OrderedDict = OrderedDict()  # request_id -> requesting agent_id
+        self.max_pending_escalations = 10000
+        self._decision_recorder: Optional[Callable[..., Awaitable[Any]]] = None
+        
         # Security and performance
         self.failed_auth_attempts: Dict[str, List[datetime]] = {}  # agent_id -> attempt_times
         self.rate_limits: Dict[str, List[datetime]] = {}  # agent_id -> request_times
@@ -171,6 +178,7 @@ class SecureExpertCoordinator:
             'active_sessions': 0,
             'commands_delegated': 0,
             'commands_completed': 0,
+            'escalations_resolved': 0,
             'authentication_failures': 0
         }
     
@@ -509,6 +517,69 @@ class SecureExpertCoordinator:
             logger.error(f"Failed to complete delegation: {e}")
             return False, f"Failed to complete delegation: {e}"
     
+    def set_decision_recorder(self, recorder: Callable[..., Awaitable[Any]]):
+        """Set the coroutine that records expert verdicts as validation decisions"""
+        self._decision_recorder = recorder
+    
+    def register_escalation(self, request_id: str, agent_id: str):
+        """Track a validation request escalated to expert review"""
+        self.pending_escalations[request_id] = agent_id
+        if len(self.pending_escalations) > self.max_pending_escalations:
+            self.pending_escalations.popitem(last=False)
+    
+    async def resolve_escalation(self,
+                                 request_id: str,
+                                 decision: str,
+                                 reason: str,
+                                 expert_token: str) -> Tuple[bool, str]:
+        """
+        Record an expert's verdict on an escalated validation request
+        
+        Args:
+            request_id: ID of the escalated validation request
+            decision: "approved" or "blocked"
+            reason: Expert's reasoning
+            expert_token: Authentication token of the expert
+            
+        Returns:
+            (success, message)
+        """
+        try:
+            expert = await self.authenticate_expert(expert_token)
+            if not expert:
+                return False, "Authentication failed"
+            
+            requester_id = self.pending_escalations.get(request_id)
+            if requester_id is None:
+                return False, "Escalation not found"
+            
+            if expert.agent_id == requester_id:
+                return False, "Experts cannot decide their own requests"
+            
+            if decision not in ('approved', 'blocked'):
+                return False, f"Invalid decision: {decision}"
+            
+            if self._decision_recorder is None:
+                return False, "No decision recorder configured"
+            
+            await self._decision_recorder(
+                request_id=request_id,
+                decision=decision,
+                reason=reason,
+                validator_id=expert.agent_id
+            )
+            
+            del self.pending_escalations[request_id]
+            self.stats['escalations_resolved'] += 1
+            
+            logger.info(f"Expert {expert.agent_id} {decision} escalated request {request_id}")
+            
+            return True, "Decision recorded"
+            
+        except Exception as e:
+            logger.error(f"Failed to resolve escalation {request_id}: {e}")
+            return False, f"Failed to resolve escalation: {e}"
+    
     async def start_collaboration_session(self,
                                         coordinator_token: str,
                                         participant_ids: List[str],
@@ -46,6 +46,7 @@ from lighthouse.event_store.models import Event, EventType
 from .authentication import FUSEAuthenticationManager, FUSEAuthenticationContext
 from ..event_store.project_aggregate import ProjectAggregate
 from ..event_store.time_travel import TimeTravelDebugger
+from ..event_store.bounded_cache import BoundedCache
 from ..event_store.event_stream import EventStream
 from ..ast_anchoring.anchor_manager import ASTAnchorManager
 
@@ -146,9 +147,14 @@ class CompleteLighthouseFUSE(Operations):
         self._content_cache: Dict[str, Tuple[bytes, float]] = {}
         self._cache_ttl = 5.0  # 5 second TTL for performance
         
-        # History state cache (expensive to compute)
-        self._history_cache: Dict[str, Tuple[Any, float]] = {}
+        # History state cache (expensive to compute), bounded by file content bytes
         self._history_cache_ttl = 60.0  # 1 minute for history states
+        self._history_cache = BoundedCache(
+            max_bytes=128 * 1024 * 1024,
+            ttl=self._history_cache_ttl,
+            sizer=lambda state: state.total_file_size,
+            name="fuse_history"
+        )
         
         # Context packages for expert agents
         self._context_packages: Dict[str, ContextPackage] = {}
@@ -218,27 +224,17 @@ class CompleteLighthouseFUSE(Operations):
         if all_times:
             self._performance_stats['avg_response_time_ms'] = sum(all_times) / len(all_times)
     
-    def _get_cached_or_compute(self, cache_dict: Dict, key: str, ttl: float, compute_func):
-        """Generic cache helper with TTL"""
-        current_time = time.time()
-        
-        if key in cache_dict:
-            value, cached_time = cache_dict[key]
-            if current_time - cached_time < ttl:
-                self._performance_stats['cache_hits'] += 1
-                return value
+    def _get_cached_or_compute(self, cache: BoundedCache, key: str, compute_func):
+        """Generic cache helper; TTL, size limits and eviction belong to the cache"""
+        value = cache.get(key)
+        if value is not None:
+            self._performance_stats['cache_hits'] += 1
+            return value
         
         # Compute new value
         self._performance_stats['cache_misses'] += 1
         value = compute_func()
-        cache_dict[key] = (value, current_time)
-        
-        # Limit cache size
-        if len(cache_dict) > 1000:
-            # Remove oldest 20% of entries
-            sorted_items = sorted(cache_dict.items(), key=lambda x: x[1][1])
-            cache_dict.clear()
-            cache_dict.update(sorted_items[-800:])  # Keep newest 800
+        cache.put(key, value)
         
         return value
     
@@ -520,38 +516,8 @@ class CompleteLighthouseFUSE(Operations):
         try:
             project_state = self.project_aggregate.current_state
             
-            if subpath == '/':
-                # List top-level items
-                items = set(['.', '..'])
-                
-                # Add all files and directories
-                for file_path in project_state.list_files():
-                    if '/' in file_path[1:]:  # Has subdirectories
-                        top_level = file_path.split('/')[1]
-                        items.add(top_level)
-                    else:
-                        items.add(file_path[1:])  # Remove leading slash
-                
-                for dir_path in project_state.list_directories():
-                    if dir_path != '/' and '/' not in dir_path[1:]:
-                        items.add(dir_path[1:])  # Remove leading slash
-                
-                return list(items)
-            else:
-                # List subdirectory contents
-                items = ['.', '..']
-                
-                for file_path in project_state.list_files(subpath):
-                    relative = file_path[len(subpath):].lstrip('/')
-                    if '/' not in relative:  # Direct child
-                        items.append(relative)
-                
-                for dir_path in project_state.list_directories(subpath):
-                    relative = dir_path[len(subpath):].lstrip('/')
-                    if '/' not in relative:  # Direct child
-                        items.append(relative)
-                
-                return items
+            # Direct children only, straight from the path index
+            return ['.', '..'] + project_state.list_directory_entries(subpath)
                 
         except Exception as e:
             logger.error(f"Error in _readdir_current({subpath}): {e}")
@@ -658,7 +624,6 @@ class CompleteLighthouseFUSE(Operations):
             historical_state = self._get_cached_or_compute(
                 self._history_cache, 
                 f"{timestamp_str}:{self.project_aggregate.project_id}",
-                self._history_cache_ttl,
                 get_historical_state
             )
             
@@ -724,25 +689,10 @@ class CompleteLighthouseFUSE(Operations):
                 historical_state = self._get_cached_or_compute(
                     self._history_cache,
                     f"{timestamp_str}:{self.project_aggregate.project_id}",
-                    self._history_cache_ttl,
                     get_historical_state
                 )
                 
-                items = set(['.', '..'])
-                
-                # Add files and directories from historical state
-                for file_path in historical_state.list_files():
-                    if '/' in file_path[1:]:
-                        top_level = file_path.split('/')[1]
-                        items.add(top_level)
-                    else:
-                        items.add(file_path[1:])
-                
-                for dir_path in historical_state.list_directories():
-                    if dir_path != '/' and '/' not in dir_path[1:]:
-                        items.add(dir_path[1:])
-                
-                return list(items)
+                return ['.', '..'] + historical_state.list_directory_entries('/')
             
             return ['.', '..']  # Deeper nesting not yet implemented
             
@@ -771,7 +721,6 @@ class CompleteLighthouseFUSE(Operations):
             historical_state = self._get_cached_or_compute(
                 self._history_cache,
                 f"{timestamp_str}:{self.project_aggregate.project_id}",
-                self._history_cache_ttl,
                 get_historical_state
             )
             
@@ -1028,7 +977,8 @@ class CompleteLighthouseFUSE(Operations):
                     'attr_cache_size': len(self._attr_cache),
                     'dir_cache_size': len(self._dir_cache),
                     'content_cache_size': len(self._content_cache),
-                    'history_cache_size': len(self._history_cache)
+                    'history_cache_size': len(self._history_cache),
+                    'history_cache': self._history_cache.get_stats()
                 }
             }
             return json.dumps(perf_data, indent=2).encode('utf-8')
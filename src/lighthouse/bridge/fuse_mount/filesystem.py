@@ -506,41 +506,12 @@ class LighthouseFUSE(Operations):
         """List /current directory contents"""
         project_state = self.project_aggregate.current_state
         
-        if subpath == '/':
-            # List root files and directories
-            entries = ['.', '..']
-            
-            # Add files in root
-            for file_path in project_state.list_files('/'):
-                if file_path.count('/') == 1:  # Only direct children
-                    entries.append(file_path[1:])  # Remove leading /
-            
-            # Add directories in root
-            for dir_path in project_state.list_directories('/'):
-                if dir_path.count('/') == 1:  # Only direct children
-                    entries.append(dir_path[1:])  # Remove leading /
-            
-            return list(set(entries))  # Remove duplicates
-        
         # List directory contents
-        if not project_state.directory_exists(subpath):
+        if subpath != '/' and not project_state.directory_exists(subpath):
             raise FuseOSError(errno.ENOTDIR)
         
-        entries = ['.', '..']
-        
-        # Add files in directory
-        for file_path in project_state.list_files(subpath):
-            rel_path = os.path.relpath(file_path, subpath)
-            if '/' not in rel_path:  # Only direct children
-                entries.append(rel_path)
-        
-        # Add subdirectories
-        for dir_path in project_state.list_directories(subpath):
-            rel_path = os.path.relpath(dir_path, subpath)
-            if '/' not in rel_path:  # Only direct children
-                entries.append(rel_path)
-        
-        return entries
+        # Direct children only, straight from the path index
+        return ['.', '..'] + project_state.list_directory_entries(subpath)
     
     def _getattr_history(self, subpath: str) -> Dict[str, Any]:
         """Get attributes for /history files"""
@@ -75,7 +75,9 @@ class FUSEMountManager:
         self.event_stream_manager = event_stream_manager
         
         # Initialize time travel debugger
-        self.time_travel_debugger = TimeTravelDebugger(event_store)
+        self.time_travel_debugger = TimeTravelDebugger(
+            event_store, blob_store=getattr(project_aggregate, 'blob_store', None)
+        )
         
         # Create complete FUSE filesystem with authentication
         import secrets
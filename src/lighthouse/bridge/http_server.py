@@ -78,6 +78,11 @@ class ExpertDelegateRequest(BaseModel):
     session_token: str
     metadata: Optional[Dict[str, Any]] = None
 
+class ExpertDecisionRequest(BaseModel):
+    request_id: str
+    decision: str  # approved, blocked
+    reason: str
+
 class BridgeStatusResponse(BaseModel):
     status: str
     mode: str
@@ -534,6 +539,36 @@ async def delegate_to_expert(
         logger.error(f"Command delegation failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Expert verdicts on escalated validations require the expert's auth token
+@app.post("/expert/decision")
+async def record_expert_decision(
+    request: ExpertDecisionRequest,
+    token: str = Depends(require_auth)
+):
+    """Record an expert's decision on an escalated validation - REQUIRES AUTH TOKEN"""
+    if not bridge:
+        raise HTTPException(status_code=503, detail="Bridge not initialized")
+    
+    if not bridge.expert_coordinator:
+        raise HTTPException(status_code=503, detail="Expert coordinator not initialized")
+    
+    success, message = await bridge.expert_coordinator.resolve_escalation(
+        request_id=request.request_id,
+        decision=request.decision,
+        reason=request.reason,
+        expert_token=token
+    )
+    
+    if not success:
+        raise HTTPException(status_code=400, detail=message)
+    
+    return {
+        "status": "recorded",
+        "request_id": request.request_id,
+        "decision": request.decision,
+        "message": message
+    }
+
 # SECURITY FIX: Event store operations now require authentication
 @app.post("/event/store")
 async def store_event(
@@ -645,6 +680,11 @@ async def store_event(
         else:
             logger.info(f"Event stored: {event_type} for {aggregate_id}")
         
+        # Let the project read model pick the event up without waiting to poll
+        projection_runner = getattr(bridge, 'projection_runner', None)
+        if projection_runner and aggregate_id == bridge.project_id:
+            projection_runner.notify()
+        
         return {
             "event_id": event.event_id,
             "status": "stored",
@@ -19,7 +19,10 @@ from typing import Any, Dict, List, Optional, Set
 from pathlib import Path
 
 from .speed_layer import SpeedLayerDispatcher
-from .event_store import ProjectAggregate, EventStream, TimeTravelDebugger
+from .event_store import ProjectAggregate, EventStream, TimeTravelDebugger, ContentBlobStore
+from .event_store.blob_store import resolve_event_content
+from .event_store.checkpoints import CheckpointStore
+from .event_store.projection import ProjectionRunner
 
 # Optional FUSE support - only import if available
 try:
@@ -71,9 +74,33 @@ class LighthouseBridge:
         
         # Component initialization
         self.event_store = EventStore()
-        self.project_aggregate = ProjectAggregate(project_id)
-        self.event_stream = EventStream(fuse_mount_path=f"{mount_point}/streams")
-        self.time_travel_debugger = TimeTravelDebugger(self.event_store)
+        self.blob_store = ContentBlobStore(
+            blob_dir=self.config.get('blob_dir', self.event_store.data_dir / 'blobs'),
+            sync_policy=self.event_store.sync_policy
+        )
+        self.project_aggregate = ProjectAggregate(project_id, blob_store=self.blob_store)
+        self.event_stream = EventStream(
+            fuse_mount_path=f"{mount_point}/streams",
+            event_store=self.event_store
+        )
+        self.checkpoint_store = CheckpointStore(
+            checkpoint_dir=self.config.get(
+                'checkpoint_dir', self.event_store.data_dir / 'checkpoints'
+            )
+        )
+        self.projection_runner = ProjectionRunner(
+            self.event_store,
+            self.project_aggregate,
+            self.checkpoint_store,
+            poll_interval=self.config.get('projection_poll_interval', 0.25),
+            checkpoint_every_events=self.config.get('projection_checkpoint_events', 1000),
+            publisher=self.event_stream.publish_event
+        )
+        self.time_travel_debugger = TimeTravelDebugger(
+            self.event_store,
+            blob_store=self.blob_store,
+            checkpoint_store=self.checkpoint_store
+        )
         self.tree_sitter_parser = TreeSitterParser()
         self.ast_anchor_manager = ASTAnchorManager(self.tree_sitter_parser)
         
@@ -82,7 +109,12 @@ class LighthouseBridge:
             max_memory_cache_size=self.config.get('memory_cache_size', 10000),
             policy_config_path=self.config.get('policy_config_path'),
             ml_model_path=self.config.get('ml_model_path'),
-            expert_timeout=self.config.get('expert_timeout', 30.0)
+            expert_timeout=self.config.get('expert_timeout', 30.0),
+            event_store=self.event_store,
+            model_artifact_dir=str(self.config.get(
+                'model_artifact_dir', self.event_store.data_dir / 'pattern_models'
+            )),
+            rule_proposals_path=self.config.get('rule_proposals_path')
         )
         
         # FUSE filesystem (only if available)
@@ -149,8 +181,9 @@ class LighthouseBridge:
         # Connect project aggregate to validation bridge
         self.project_aggregate.set_validation_bridge(self.speed_layer_dispatcher)
         
-        # Connect speed layer to expert coordination
-        # This would involve more complex integration in a full implementation
+        # Expert verdicts on escalations are recorded as validation
+        # decisions, which the speed layer learns from
+        self.expert_coordinator.set_decision_recorder(self._record_expert_decision)
         
         logger.info("Bridge component integrations configured")
     
@@ -173,6 +206,9 @@ class LighthouseBridge:
             logger.info("Initializing event store")
             await self.event_store.initialize()
             
+            # Bring the project read model up to date before serving reads
+            await self._start_projection()
+            
             # Start core components in order
             await self._start_event_stream()
             await self._start_speed_layer()
@@ -217,6 +253,7 @@ class LighthouseBridge:
             await self._stop_fuse_filesystem()
             await self._stop_speed_layer()
             await self._stop_event_stream()
+            await self._stop_projection()
             
             self.is_running = False
             self.start_time = None
@@ -226,6 +263,11 @@ class LighthouseBridge:
         except Exception as e:
             logger.error(f"Error stopping Lighthouse Bridge: {e}")
     
+    async def _start_projection(self):
+        """Resume the project read model and start tailing the event store"""
+        logger.info("Starting projection runner")
+        await self.projection_runner.start()
+    
     async def _start_event_stream(self):
         """Start event streaming system"""
         logger.info("Starting event stream")
@@ -277,6 +319,10 @@ class LighthouseBridge:
         cleanup_task = asyncio.create_task(self._periodic_cleanup())
         self.background_tasks.add(cleanup_task)
     
+    async def _stop_projection(self):
+        """Stop tailing and checkpoint the read model"""
+        await self.projection_runner.stop()
+    
     async def _stop_event_stream(self):
         """Stop event streaming system"""
         await self.event_stream.stop()
@@ -302,7 +348,9 @@ class LighthouseBridge:
                 file_path = event.get_file_path()
                 if file_path and event.event_type in ['FILE_MODIFIED', 'FILE_CREATED']:
                     # Trigger AST anchor update (would be async in real implementation)
-                    self._update_ast_anchors_for_file(file_path, event.data.get('content', ''))
+                    self._update_ast_anchors_for_file(
+                        file_path, resolve_event_content(event, self.blob_store)
+                    )
             
             # Forward validation events to expert coordination
             if event.is_validation_operation():
@@ -426,7 +474,7 @@ class LighthouseBridge:
                     "response_time": 0.0
                 }
         
-        from .speed_layer.models import ValidationRequest
+        from .speed_layer.models import ValidationDecision, ValidationRequest
         
         request = ValidationRequest(
             tool_name=tool_name,
@@ -444,11 +492,30 @@ class LighthouseBridge:
             tool_name=tool_name,
             tool_input=tool_input,
             agent_id=agent_id,
-            session_id=session_id
+            session_id=session_id,
+            context=request.context
         )
+        self.projection_runner.notify()
+        
+        if result.decision == ValidationDecision.ESCALATE:
+            self.expert_coordinator.register_escalation(request.request_id, agent_id)
         
         return result.to_dict()
     
+    async def _record_expert_decision(self,
+                                      request_id: str,
+                                      decision: str,
+                                      reason: str,
+                                      validator_id: str):
+        """Record an expert verdict on an escalated request in the event store"""
+        await self.project_aggregate.handle_validation_decision(
+            request_id=request_id,
+            decision=decision,
+            reason=reason,
+            validator_id=validator_id
+        )
+        self.projection_runner.notify()
+    
     async def modify_file(self,
                         file_path: str,
                         content: str,
@@ -457,16 +524,15 @@ class LighthouseBridge:
         """Modify file through the bridge system"""
         
         try:
-            # Process through project aggregate
-            event = await self.project_aggregate.handle_file_modification(
+            # Process through project aggregate; the projection runner
+            # publishes the event once the store has sequenced it
+            await self.project_aggregate.handle_file_modification(
                 path=file_path,
                 content=content,
                 agent_id=agent_id,
                 session_id=session_id
             )
-            
-            # Publish event
-            await self.event_stream.publish_event(event)
+            self.projection_runner.notify()
             
             return True
             
@@ -494,7 +560,9 @@ class LighthouseBridge:
                 'fuse_mount': self.fuse_mount_manager.get_status() if self.fuse_mount_manager else {'status': 'disabled'},
                 'event_stream': self.event_stream.get_stream_stats(),
                 'ast_anchors': self.ast_anchor_manager.get_statistics(),
-                'project_state': self.project_aggregate.get_aggregate_stats()
+                'project_state': self.project_aggregate.get_aggregate_stats(),
+                'projection': self.projection_runner.get_stats(),
+                'time_travel_cache': self.time_travel_debugger.get_cache_stats()
             },
             
             # Performance metrics
@@ -0,0 +1,145 @@
+"""
+Counting Bloom Filter for Speed Layer Caches
+
+Fast negative lookups for the memory caches. The filter tracks the keys
+currently resident in a cache: keys are removed again when their entries
+are evicted or expire, so the filter does not saturate over hours of
+traffic the way an add-only filter does.
+
+Features:
+- 8-bit counters in a bytearray, supporting removal
+- All probes derived by double hashing from one 64-bit hash
+- Fill ratio and estimated false positive rate, so callers can bypass the
+  filter once it stops rejecting lookups
+"""
+
+import math
+from typing import Dict, List
+
+_COUNTER_MAX = 255
+_MASK_64 = (1 << 64) - 1
+
+
+class CountingBloomFilter:
+    """Bloom filter with per-slot counters so keys can be removed"""
+    
+    def __init__(self, capacity: int = 10000, error_rate: float = 0.01,
+                 max_hashes: int = 8, saturation_fp_rate: float = 0.5):
+        """
+        Initialize counting Bloom filter
+        
+        Args:
+            capacity: Expected number of resident keys
+            error_rate: Target false positive rate at capacity
+            max_hashes: Upper bound on probes per key
+            saturation_fp_rate: Estimated false positive rate above which
+                the filter reports itself saturated
+        """
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.saturation_fp_rate = saturation_fp_rate
+        
+        # Optimal slot count and number of probes
+        self.size = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(1, min(round(self.size * math.log(2) / self.capacity), max_hashes))
+        
+        self._counters = bytearray(self.size)
+        self._nonzero = 0  # Slots with a count above zero
+        self.item_count = 0
+        self.saturated_slots = 0  # Counters stuck at the maximum
+    
+    def _probes(self, item: str) -> List[int]:
+        """
+        Slot indexes for an item (Kirsch-Mitzenmacher double hashing)
+        
+        Uses the builtin string hash, which is cached on the string object
+        and stable within a process; the filter is never shared or persisted.
+        """
+        h = hash(item) & _MASK_64
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+    
+    def add(self, item: str):
+        """Add one occurrence of an item"""
+        counters = self._counters
+        for index in self._probes(item):
+            count = counters[index]
+            if count == 0:
+                self._nonzero += 1
+            if count < _COUNTER_MAX:
+                counters[index] = count + 1
+                if count + 1 == _COUNTER_MAX:
+                    self.saturated_slots += 1
+        self.item_count += 1
+    
+    def remove(self, item: str) -> bool:
+        """
+        Remove one occurrence of an item
+        
+        Callers must only remove items they added; removing anything else
+        can cause false negatives. Saturated counters are never decremented.
+        
+        Returns:
+            False if the item was certainly not in the filter
+        """
+        probes = self._probes(item)
+        counters = self._counters
+        if not all(counters[index] for index in probes):
+            return False
+        
+        for index in probes:
+            count = counters[index]
+            if count == _COUNTER_MAX:
+                continue
+            counters[index] = count - 1
+            if count == 1:
+                self._nonzero -= 1
+        self.item_count = max(self.item_count - 1, 0)
+        return True
+    
+    def might_contain(self, item: str) -> bool:
+        """Check if item might be in the set (no false negatives)"""
+        counters = self._counters
+        h = hash(item) & _MASK_64
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        size = self.size
+        for i in range(self.hash_count):
+            if not counters[(h1 + i * h2) % size]:
+                return False
+        return True
+    
+    @property
+    def fill_ratio(self) -> float:
+        """Fraction of slots with a non-zero count"""
+        return self._nonzero / self.size
+    
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        return self.fill_ratio ** self.hash_count
+    
+    @property
+    def is_saturated(self) -> bool:
+        """True when the filter would reject too few lookups to pay off"""
+        return self.estimated_false_positive_rate > self.saturation_fp_rate
+    
+    def clear(self):
+        """Clear the Bloom filter"""
+        self._counters = bytearray(self.size)
+        self._nonzero = 0
+        self.item_count = 0
+        self.saturated_slots = 0
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Get filter statistics"""
+        return {
+            'items': self.item_count,
+            'size': self.size,
+            'hash_count': self.hash_count,
+            'fill_ratio': self.fill_ratio,
+            'estimated_false_positive_rate': self.estimated_false_positive_rate,
+            'saturated': self.is_saturated,
+            'saturated_slots': self.saturated_slots
+        }
@@ -0,0 +1,290 @@
+"""
+Command Canonicalization for Speed Layer Caches
+
+Produces a semantic cache key for a validation request alongside its exact
+command hash, so requests that differ only in whitespace, quoting, flag
+order, temp-file names or path spelling share cached decisions.
+
+Canonicalizers are pluggable per tool. Each either returns a canonical form
+or None, in which case the request has no semantic key beyond its exact
+hash. They are conservative by construction:
+
+- Bash commands are canonicalized only when they contain no characters the
+  shell would interpret (expansions, globs, redirections, pipelines, command
+  lists, comments). Quoting still decides how the shell reads the command
+  word: `time ls` runs the keyword and `'time' ls` the binary,
+  `A=1 ls` is an assignment and `'A=1' ls` a command, `\\rm` bypasses
+  aliases. So a command is only canonicalized when its first word is
+  unquoted and unescaped, is no assignment and is no shell reserved word
+  or builtin. The remaining words are plain arguments, so commands with
+  equal token lists run identically.
+- Flags are reordered only for commands listed in ORDER_INSENSITIVE_FLAGS,
+  and only in the leading run of options where every flag is a listed
+  boolean flag whose position cannot change the result.
+- Paths only lose inner `.` segments and repeated slashes, or are made
+  absolute with the request's working directory. `..` is never collapsed and
+  a trailing slash is kept, since both interact with symlinks. A final `.`
+  is kept too: `cp -r src/. dst` copies the contents of src where
+  `cp -r src/ dst` copies src itself, and rm refuses `dir/.`. Bash arguments
+  are treated as paths only for commands in PATH_OPERAND_COMMANDS, whose
+  operands are always file names; elsewhere an argument may be a program
+  looked up on PATH (nohup, env, sudo, xargs) or a pattern (grep), and
+  `./x` is never rewritten to `x`.
+- Generated temp-file names (tempfile, mktemp) under /tmp and /var/tmp are
+  replaced by a placeholder; they are the only case where two keys may
+  name different files.
+
+The dispatcher consults semantic keys only after the policy rules have
+evaluated the exact command text, so canonicalization never changes a
+rule-based decision; it can only reuse pattern or expert decisions.
+
+Features:
+- Per-tool canonicalizer registry (Bash, Write/Edit/MultiEdit/Read)
+- Semantic hash next to the exact command hash
+- Replay of recorded requests to measure the cache hit rate gain
+"""
+
+import hashlib
+import json
+import re
+import shlex
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Protocol
+
+# Characters the shell interprets outside of plain words and quotes
+_SHELL_SPECIAL = frozenset('$`;|&<>(){}*?[]~!#\n\r')
+
+# Characters that quote or escape a shell word
+_QUOTING = frozenset('\'"\\')
+
+# Bash reserved words and builtins: the shell handles these itself, some
+# re-parse or run their arguments (eval, exec, command, builtin, time)
+SHELL_BUILTINS: FrozenSet[str] = frozenset({
+    '!', '[[', ']]', 'case', 'coproc', 'do', 'done', 'elif', 'else', 'esac', 'fi', 'for', 'function',
+    'if', 'in', 'select', 'then', 'time', 'until', 'while',
+    '.', ':', '[', 'alias', 'bg', 'bind', 'break', 'builtin', 'caller', 'cd', 'command', 'compgen',
+    'complete', 'compopt', 'continue', 'declare', 'dirs', 'disown', 'echo', 'enable', 'eval', 'exec',
+    'exit', 'export', 'false', 'fc', 'fg', 'getopts', 'hash', 'help', 'history', 'jobs', 'kill', 'let',
+    'local', 'logout', 'mapfile', 'popd', 'printf', 'pushd', 'pwd', 'read', 'readarray', 'readonly',
+    'return', 'set', 'shift', 'shopt', 'source', 'suspend', 'test', 'times', 'trap', 'true', 'type',
+    'typeset', 'ulimit', 'umask', 'unalias', 'unset', 'wait'
+})
+
+# Generated temp names: tempfile (tmp + 8 chars) and mktemp (tmp.XXXXXXXXXX)
+_TEMP_NAME = re.compile(r'^(/tmp|/var/tmp)/(tmp[a-z0-9_]{8}|tmp\.[A-Za-z0-9]{10})(?=/|$)')
+TEMP_PLACEHOLDER = '<tmp>'
+
+# Commands whose absolute-path arguments always name files, never programs
+# to run or patterns, so path spelling can be normalized
+PATH_OPERAND_COMMANDS: FrozenSet[str] = frozenset({
+    'ls', 'cat', 'rm', 'rmdir', 'mkdir', 'touch', 'cp', 'mv', 'stat', 'du', 'wc', 'head', 'tail', 'file'
+})
+
+# Boolean short flags whose order and repetition never change the command's
+# behaviour. Flags that take values or override each other (ls -1/-C,
+# ls -t/-S, rm -f/-i, grep -E/-F) are deliberately absent.
+ORDER_INSENSITIVE_FLAGS: Dict[str, FrozenSet[str]] = {
+    'ls': frozenset('ahlrt'),
+    'rm': frozenset('rRfv'),
+    'mkdir': frozenset('pv'),
+    'cp': frozenset('rRpv'),
+    'grep': frozenset('inrvwsH'),
+    'wc': frozenset('lwc'),
+}
+
+
+class CommandCanonicalizer(Protocol):
+    """Maps a tool input to a canonical string, or None if it cannot safely"""
+    
+    def canonicalize(self, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Optional[str]:
+        ...
+
+
+def normalize_path(path: str, cwd: Optional[str] = None) -> str:
+    """
+    Spelling-only path normalization
+    
+    Removes inner `.` segments and repeated slashes, and makes relative
+    paths absolute when the working directory is known. Keeps `..`, a final
+    `.` component and whether the path ends in a slash.
+    """
+    if cwd and not path.startswith('/'):
+        path = f"{cwd.rstrip('/')}/{path}"
+    
+    absolute = path.startswith('/')
+    stripped = path.rstrip('/')
+    trailing = path.endswith('/') and bool(stripped)
+    dot_tail = stripped == '.' or stripped.endswith('/.')
+    segments = [segment for segment in path.split('/') if segment not in ('', '.')]
+    normalized = '/'.join(segments)
+    if absolute:
+        normalized = '/' + normalized
+    if not segments:
+        normalized = ('/.' if dot_tail else '/') if absolute else '.'
+    else:
+        if dot_tail:
+            normalized += '/.'
+        if trailing:
+            normalized += '/'
+    
+    return _TEMP_NAME.sub(lambda m: f"{m.group(1)}/{TEMP_PLACEHOLDER}", normalized)
+
+
+class BashCanonicalizer:
+    """Canonical argv for simple Bash commands"""
+    
+    def canonicalize(self, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Optional[str]:
+        command = tool_input.get('command')
+        if not isinstance(command, str) or any(ch in _SHELL_SPECIAL for ch in command):
+            return None
+        
+        try:
+            argv = shlex.split(command, posix=True)
+        except ValueError:
+            return None  # Unbalanced quotes
+        if not argv:
+            return None
+        
+        # The shell reads the command word by its spelling, not its value
+        if any(ch in _QUOTING for ch in command.split(None, 1)[0]):
+            return None
+        if '=' in argv[0] or argv[0] in SHELL_BUILTINS:
+            return None
+        
+        if argv[0] in PATH_OPERAND_COMMANDS:
+            argv = argv[:1] + [normalize_path(arg) if arg.startswith('/') else arg for arg in argv[1:]]
+        argv = self._normalize_flags(argv)
+        
+        # Other inputs (e.g. timeout, description) are kept exactly
+        extras = {key: value for key, value in tool_input.items() if key != 'command'}
+        return json.dumps([argv, extras], sort_keys=True, default=str)
+    
+    def _normalize_flags(self, argv: List[str]) -> List[str]:
+        """Merge and sort the leading boolean flags of order-insensitive commands"""
+        allowed = ORDER_INSENSITIVE_FLAGS.get(argv[0])
+        if allowed is None:
+            return argv
+        
+        flags = set()
+        index = 1
+        while index < len(argv):
+            arg = argv[index]
+            if arg == '--' or not arg.startswith('-') or arg.startswith('--') or arg == '-':
+                break
+            if not set(arg[1:]) <= allowed:
+                return argv  # Unknown or value-taking flag: leave the command as written
+            flags.update(arg[1:])
+            index += 1
+        
+        if not flags:
+            return argv
+        return [argv[0], '-' + ''.join(sorted(flags))] + argv[index:]
+
+
+class FilePathCanonicalizer:
+    """Canonical file path for file tools; other inputs are kept exactly"""
+    
+    def canonicalize(self, tool_input: Dict[str, Any], context: Dict[str, Any]) -> Optional[str]:
+        file_path = tool_input.get('file_path')
+        if not isinstance(file_path, str) or not file_path:
+            return None
+        
+        canonical = dict(tool_input)
+        canonical['file_path'] = normalize_path(file_path, context.get('cwd'))
+        return json.dumps(canonical, sort_keys=True, default=str)
+
+
+_CANONICALIZERS: Dict[str, CommandCanonicalizer] = {}
+
+
+def register_canonicalizer(tool_name: str, canonicalizer: Optional[CommandCanonicalizer]):
+    """Register (or with None, remove) the canonicalizer for a tool"""
+    if canonicalizer is None:
+        _CANONICALIZERS.pop(tool_name, None)
+    else:
+        _CANONICALIZERS[tool_name] = canonicalizer
+
+
+def get_canonicalizer(tool_name: str) -> Optional[CommandCanonicalizer]:
+    return _CANONICALIZERS.get(tool_name)
+
+
+register_canonicalizer('Bash', BashCanonicalizer())
+for _tool_name in ('Write', 'Edit', 'MultiEdit', 'Read'):
+    register_canonicalizer(_tool_name, FilePathCanonicalizer())
+
+
+def exact_content(tool_name: str, tool_input: Dict[str, Any]) -> str:
+    """Exact request content: key order is irrelevant, everything else counts"""
+    return f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
+
+
+def hash_content(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def semantic_hash(tool_name: str, tool_input: Dict[str, Any],
+                  context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Semantic cache key for a request
+    
+    Returns:
+        Hash of the canonical form, or None if the tool has no canonicalizer
+        or the input cannot be canonicalized safely
+    """
+    canonicalizer = _CANONICALIZERS.get(tool_name)
+    if canonicalizer is None:
+        return None
+    try:
+        canonical = canonicalizer.canonicalize(tool_input, context or {})
+    except Exception:
+        return None
+    if canonical is None:
+        return None
+    return hash_content(f"{tool_name}:semantic:{canonical}")
+
+
+def replay_cache_keys(requests: Iterable[Any], max_size: int = 10000) -> Dict[str, Any]:
+    """
+    Replay recorded requests through exact-key and semantic-key LRU caches
+    
+    Every request is assumed cacheable, so hit rates are upper bounds; the
+    difference between them is the gain from semantic keys.
+    
+    Args:
+        requests: Objects with command_hash and semantic_hash (ValidationRequest)
+        max_size: Simulated memory cache size
+    
+    Returns:
+        Distinct key counts and hit rates for both keying schemes
+    """
+    caches = {'exact': OrderedDict(), 'semantic': OrderedDict()}
+    hits = {'exact': 0, 'semantic': 0}
+    keys = {'exact': set(), 'semantic': set()}
+    total = 0
+    
+    for request in requests:
+        total += 1
+        # Without a semantic key the dispatcher only has the exact hash
+        request_keys = {
+            'exact': request.command_hash,
+            'semantic': request.semantic_hash or request.command_hash
+        }
+        for scheme, key in request_keys.items():
+            cache = caches[scheme]
+            keys[scheme].add(key)
+            if key in cache:
+                cache.move_to_end(key)
+                hits[scheme] += 1
+                continue
+            cache[key] = None
+            if len(cache) > max_size:
+                cache.popitem(last=False)
+    
+    return {
+        'requests': total,
+        'exact_keys': len(keys['exact']),
+        'semantic_keys': len(keys['semantic']),
+        'exact_hit_rate': hits['exact'] / total if total else 0.0,
+        'semantic_hit_rate': hits['semantic'] / total if total else 0.0
+    }
@@ -0,0 +1,357 @@
+"""
+Learning from Expert Decisions
+
+Tails VALIDATION_DECISION_MADE events from the event store, joins each to
+the VALIDATION_REQUEST_SUBMITTED event it answers, and feeds the decision
+back into the speed layer so repeats of an escalated command stop paying
+for the full pipeline. Only decisions recorded by a trusted validator
+component count, and never one made by the agent that submitted the
+request: any authenticated agent can append events through the HTTP API.
+
+- The memory cache gets the decision with a TTL scaled by the decision's
+  confidence, under the request's semantic key, which the dispatcher only
+  consults after the policy rules. Requests without a semantic key (shell
+  syntax, tools without a canonicalizer) are never cached: under the exact
+  hash the learned decision would override the policy rules.
+- Identical expert decisions seen repeatedly for one pattern (the same
+  semantic key) become candidate policy rules. Candidates are proposed for
+  review, never installed automatically.
+- Every approve/block decision becomes a training example for the pattern
+  model.
+
+Everything runs in a background task off the validation path. Like the
+projection runner, the learner reads by sequence, polls when idle, and on
+start replays the store from the beginning, skipping cache entries whose
+TTL has already run out.
+
+Features:
+- Sequence-cursor tailing with batched reads
+- Confidence-scaled memory cache TTLs
+- Candidate rule proposals, optionally written as a rule file for review
+- Bounded training example buffer for the pattern model
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from lighthouse.event_store.models import Event, EventFilter, EventQuery, EventType
+
+from .model_training import TRAINING_LABELS, TRUSTED_DECISION_SOURCES, TrainingExample, is_trusted_decision
+from .models import ValidationConfidence, ValidationDecision, ValidationRequest, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# Numeric weight of confidence levels for TTL scaling
+CONFIDENCE_SCALE = {
+    ValidationConfidence.HIGH.value: 1.0,
+    ValidationConfidence.MEDIUM.value: 0.7,
+    ValidationConfidence.LOW.value: 0.4,
+    ValidationConfidence.UNKNOWN.value: 0.0
+}
+
+
+def confidence_score(value: Any) -> float:
+    """Decision confidence as 0.0-1.0; expert decisions without one count as certain"""
+    if value is None:
+        return 1.0
+    if isinstance(value, (int, float)):
+        return min(max(float(value), 0.0), 1.0)
+    return CONFIDENCE_SCALE.get(str(value).lower(), 0.0)
+
+
+def confidence_level(score: float) -> ValidationConfidence:
+    if score >= 0.9:
+        return ValidationConfidence.HIGH
+    elif score >= 0.6:
+        return ValidationConfidence.MEDIUM
+    elif score > 0.0:
+        return ValidationConfidence.LOW
+    return ValidationConfidence.UNKNOWN
+
+
+class DecisionLearner:
+    """Feeds expert decisions from the event store back into the speed layer"""
+    
+    def __init__(self,
+                 event_store: Any,
+                 memory_cache: Any,
+                 text_features: Callable[[ValidationRequest], str],
+                 base_ttl_seconds: int = 3600,
+                 min_ttl_seconds: int = 60,
+                 min_cache_confidence: float = 0.5,
+                 rule_proposal_threshold: int = 3,
+                 proposals_path: Optional[str] = None,
+                 max_training_examples: int = 10000,
+                 max_pending_requests: int = 10000,
+                 batch_size: int = 500,
+                 poll_interval: float = 1.0,
+                 trusted_sources: frozenset = TRUSTED_DECISION_SOURCES):
+        """
+        Initialize decision learner
+        
+        Args:
+            event_store: Event store to tail
+            memory_cache: Speed layer memory cache to populate
+            text_features: Maps a request to the pattern model's input text
+            base_ttl_seconds: Cache TTL of a fully confident decision
+            min_ttl_seconds: Shortest TTL worth caching
+            min_cache_confidence: Decisions below this confidence are not cached
+            rule_proposal_threshold: Identical decisions needed to propose a rule
+            proposals_path: Optional rule file the candidates are written to
+            max_training_examples: Size of the training example buffer
+            max_pending_requests: Requests remembered while awaiting a decision
+            batch_size: Maximum events read per store query
+            poll_interval: Seconds between polls when idle
+            trusted_sources: Source components whose decisions are learned from
+        """
+        self.event_store = event_store
+        self.memory_cache = memory_cache
+        self.text_features = text_features
+        self.base_ttl_seconds = base_ttl_seconds
+        self.min_ttl_seconds = min_ttl_seconds
+        self.min_cache_confidence = min_cache_confidence
+        self.rule_proposal_threshold = rule_proposal_threshold
+        self.proposals_path = proposals_path
+        self.max_pending_requests = max_pending_requests
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.trusted_sources = trusted_sources
+        
+        self.cursor = 0  # Last event sequence consumed
+        self._pending: OrderedDict = OrderedDict()  # request_id -> ValidationRequest
+        self._patterns: OrderedDict = OrderedDict()  # pattern key -> decision history
+        self._candidate_rules: Dict[str, Dict[str, Any]] = {}
+        self._proposals_changed = False
+        self._training_examples: Deque[TrainingExample] = deque(maxlen=max_training_examples)
+        
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        
+        self._stats = {
+            'decisions_consumed': 0,
+            'unmatched_decisions': 0,
+            'untrusted_decisions': 0,
+            'cache_fills': 0,
+            'uncacheable': 0,
+            'expired_on_replay': 0,
+            'rule_proposals': 0,
+            'training_examples_added': 0
+        }
+    
+    async def start(self):
+        """Replay the store and start tailing it"""
+        if self._running:
+            return
+        
+        await self.catch_up()
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Decision learner started at sequence {self.cursor}")
+    
+    async def stop(self):
+        """Stop tailing"""
+        if not self._running:
+            return
+        
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def catch_up(self) -> int:
+        """
+        Consume all available events after the cursor
+        
+        Returns:
+            Number of decisions learned from
+        """
+        learned = 0
+        
+        while True:
+            events = await self._read_batch()
+            for event in events:
+                learned += await self._consume(event)
+                self.cursor = max(self.cursor, event.sequence or 0)
+            if len(events) < self.batch_size:
+                break
+        
+        if self.proposals_path and self._proposals_changed:
+            self._proposals_changed = False
+            await asyncio.to_thread(self._write_proposals, self.get_candidate_rules())
+        
+        return learned
+    
+    async def _run(self):
+        while self._running:
+            try:
+                await self.catch_up()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Decision learner failed to read events: {e}")
+            
+            await asyncio.sleep(self.poll_interval)
+    
+    async def _read_batch(self) -> List[Event]:
+        event_filter = EventFilter(
+            event_types=[EventType.VALIDATION_REQUEST_SUBMITTED, EventType.VALIDATION_DECISION_MADE],
+            after_sequence=self.cursor or None
+        )
+        result = await self.event_store.query(
+            EventQuery(filter=event_filter, limit=self.batch_size, order_by="sequence")
+        )
+        return result.events
+    
+    async def _consume(self, event: Event) -> int:
+        request_id = event.data.get('request_id')
+        
+        if event.event_type == EventType.VALIDATION_REQUEST_SUBMITTED:
+            try:
+                self._pending[request_id] = ValidationRequest(
+                    tool_name=event.data['tool_name'],
+                    tool_input=event.data['tool_input'],
+                    agent_id=event.source_agent or 'unknown',
+                    request_id=request_id,
+                    # The cwd resolves relative file paths in the semantic key
+                    context=event.data.get('context') or {}
+                )
+            except (KeyError, TypeError) as e:
+                logger.debug(f"Skipping malformed validation request event {event.event_id}: {e}")
+                return 0
+            if len(self._pending) > self.max_pending_requests:
+                self._pending.popitem(last=False)
+            return 0
+        
+        request = self._pending.get(request_id)
+        if request is not None and not is_trusted_decision(event, request, self.trusted_sources):
+            # Keep the request pending for the real validator's decision
+            self._stats['untrusted_decisions'] += 1
+            return 0
+        
+        self._pending.pop(request_id, None)
+        decision = event.data.get('decision')
+        if request is None or decision not in TRAINING_LABELS:
+            self._stats['unmatched_decisions'] += 1
+            return 0
+        
+        self._stats['decisions_consumed'] += 1
+        decision = ValidationDecision(decision)
+        score = confidence_score(event.data.get('confidence'))
+        
+        await self._fill_memory_cache(request, decision, score, event)
+        self._record_pattern(request, decision)
+        
+        self._training_examples.append((self.text_features(request), decision.value))
+        self._stats['training_examples_added'] += 1
+        return 1
+    
+    async def _fill_memory_cache(self, request: ValidationRequest, decision: ValidationDecision,
+                                 score: float, event: Event):
+        """Cache the decision for the TTL its confidence earns, minus its age"""
+        if request.semantic_hash is None:
+            self._stats['uncacheable'] += 1
+            return
+        if score < self.min_cache_confidence:
+            return
+        
+        age = max((datetime.now(timezone.utc) - event.timestamp).total_seconds(), 0.0)
+        ttl = int(self.base_ttl_seconds * score - age)
+        if ttl < self.min_ttl_seconds:
+            self._stats['expired_on_replay'] += 1
+            return
+        
+        result = ValidationResult(
+            decision=decision,
+            confidence=confidence_level(score),
+            reason=f"Learned expert decision: {event.data.get('reason', 'no reason given')}",
+            request_id=request.request_id,
+            processing_time_ms=0.0
+        )
+        await self.memory_cache.set(request.semantic_hash, result, ttl_seconds=ttl)
+        self._stats['cache_fills'] += 1
+    
+    def _record_pattern(self, request: ValidationRequest, decision: ValidationDecision):
+        """Count identical decisions per pattern and propose a rule once they repeat"""
+        key = request.semantic_hash or request.command_hash
+        history = self._patterns.get(key)
+        if history is None:
+            history = {'decision': decision, 'count': 0, 'conflicted': False,
+                       'tool_name': request.tool_name, 'commands': []}
+            self._patterns[key] = history
+            if len(self._patterns) > self.max_pending_requests:
+                self._patterns.popitem(last=False)
+        self._patterns.move_to_end(key)
+        
+        if history['decision'] != decision:
+            # Experts disagree on this pattern: withdraw any proposal
+            history['conflicted'] = True
+            if self._candidate_rules.pop(key, None) is not None:
+                self._proposals_changed = True
+            return
+        
+        history['count'] += 1
+        if request.command_text not in history['commands'] and len(history['commands']) < 5:
+            history['commands'].append(request.command_text)
+        
+        if not history['conflicted'] and history['count'] >= self.rule_proposal_threshold:
+            if key not in self._candidate_rules:
+                self._stats['rule_proposals'] += 1
+            self._candidate_rules[key] = self._build_rule(key, history)
+            self._proposals_changed = True
+    
+    def _build_rule(self, key: str, history: Dict[str, Any]) -> Dict[str, Any]:
+        """Policy rule matching exactly the command spellings seen for a pattern"""
+        alternatives = '|'.join(re.escape(command) for command in history['commands'])
+        return {
+            'rule_id': f"learned_{key[:12]}",
+            # Case-sensitive and anchored to the whole command text, since
+            # rules are compiled with IGNORECASE | MULTILINE
+            'pattern': rf"\A(?-i:(?:{alternatives}))\Z",
+            'decision': history['decision'].value,
+            'confidence': 'medium',
+            'reason': f"Proposed from {history['count']} identical expert decisions",
+            'priority': 50,
+            'tool_names': [history['tool_name']]
+        }
+    
+    def get_candidate_rules(self) -> List[Dict[str, Any]]:
+        """Proposed rules in policy rule file format"""
+        return [dict(rule) for rule in self._candidate_rules.values()]
+    
+    def _write_proposals(self, rules: List[Dict[str, Any]]):
+        directory = os.path.dirname(self.proposals_path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'rules': rules, 'generated_at': time.time()}, f, indent=2)
+            os.replace(tmp_path, self.proposals_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def training_snapshot(self) -> List[TrainingExample]:
+        """Copy of the buffered training examples"""
+        return list(self._training_examples)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get learner statistics"""
+        return dict(
+            self._stats,
+            running=self._running,
+            cursor=self.cursor,
+            pending_requests=len(self._pending),
+            candidate_rules=len(self._candidate_rules),
+            training_examples=len(self._training_examples)
+        )
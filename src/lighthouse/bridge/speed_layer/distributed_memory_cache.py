@@ -20,7 +20,7 @@ import time
 from collections import OrderedDict
 from typing import Dict, List, Optional, Set, Tuple
 
-from .memory_cache import BloomFilter  # Reuse existing Bloom filter
+from .bloom_filter import CountingBloomFilter
 from .models import CacheEntry, ValidationRequest, ValidationResult
 from .redis_cache import RedisDistributedCache, RedisConfig, create_redis_cache
 
@@ -60,8 +60,9 @@ class DistributedMemoryCache:
         self._hot_entries: Dict[str, CacheEntry] = {}
         self._lock = threading.RLock()
         
-        # Bloom filter for fast negative lookups
-        self._bloom_filter = BloomFilter(capacity=max_size * 2)
+        # Bloom filter of locally resident keys; it only gates the local tier,
+        # since other instances may have cached a key in Redis
+        self._bloom_filter = CountingBloomFilter(capacity=max_size * 2)
         
         # Redis distributed cache (tier 2 - persistent)
         self._redis_cache: Optional[RedisDistributedCache] = None
@@ -78,6 +79,7 @@ class DistributedMemoryCache:
         self.total_misses = 0
         self.evictions = 0
         self.sync_operations = 0
+        self.bloom_bypasses = 0
         
         # Background synchronization
         self._sync_task: Optional[asyncio.Task] = None
@@ -124,45 +126,50 @@ class DistributedMemoryCache:
         Returns:
             ValidationResult if found, None otherwise
         """
-        # Fast negative lookup with Bloom filter
-        if not self._bloom_filter.might_contain(command_hash):
-            self.total_misses += 1
-            return None
+        # Fast negative lookup for the local tier with the Bloom filter
+        if self._bloom_filter.is_saturated:
+            self.bloom_bypasses += 1
+            check_local = True
+        else:
+            check_local = self._bloom_filter.might_contain(command_hash)
         
         # Tier 1: Local memory cache
-        with self._lock:
-            # Check hot entries first
-            if command_hash in self._hot_entries:
-                entry = self._hot_entries[command_hash]
-                if not entry.is_expired:
-                    self.local_hits += 1
-                    result = entry.access()
-                    result.cache_hit = True
-                    result.cache_layer = "memory_hot"
-                    return result
-                else:
-                    # Remove expired hot entry
-                    del self._hot_entries[command_hash]
-            
-            # Check main local cache
-            if command_hash in self._cache:
-                entry = self._cache[command_hash]
-                if not entry.is_expired:
-                    # Move to front (LRU)
-                    self._cache.move_to_end(command_hash)
-                    self.local_hits += 1
-                    result = entry.access()
-                    result.cache_hit = True
-                    result.cache_layer = "memory"
-                    
-                    # Promote to hot entries if accessed frequently
-                    if entry.is_hot and command_hash not in self._hot_entries:
-                        self._hot_entries[command_hash] = entry
-                    
-                    return result
-                else:
-                    # Remove expired entry
-                    del self._cache[command_hash]
+        if check_local:
+            with self._lock:
+                # Check hot entries first
+                if command_hash in self._hot_entries:
+                    entry = self._hot_entries[command_hash]
+                    if not entry.is_expired:
+                        self.local_hits += 1
+                        result = entry.access()
+                        result.cache_hit = True
+                        result.cache_layer = "memory_hot"
+                        return result
+                    else:
+                        # Remove expired hot entry
+                        del self._hot_entries[command_hash]
+                        self._forget(command_hash)
+                
+                # Check main local cache
+                if command_hash in self._cache:
+                    entry = self._cache[command_hash]
+                    if not entry.is_expired:
+                        # Move to front (LRU)
+                        self._cache.move_to_end(command_hash)
+                        self.local_hits += 1
+                        result = entry.access()
+                        result.cache_hit = True
+                        result.cache_layer = "memory"
+                        
+                        # Promote to hot entries if accessed frequently
+                        if entry.is_hot and command_hash not in self._hot_entries:
+                            self._hot_entries[command_hash] = entry
+                        
+                        return result
+                    else:
+                        # Remove expired entry
+                        del self._cache[command_hash]
+                        self._forget(command_hash)
         
         # Tier 2: Redis distributed cache
         if self._redis_cache:
@@ -206,8 +213,9 @@ class DistributedMemoryCache:
             
             # Store in local cache
             with self._lock:
-                # Add to Bloom filter
-                self._bloom_filter.add(command_hash)
+                # Add to Bloom filter (once per resident key)
+                if command_hash not in self._cache and command_hash not in self._hot_entries:
+                    self._bloom_filter.add(command_hash)
                 
                 # Store in main cache
                 self._cache[command_hash] = entry
@@ -226,9 +234,11 @@ class DistributedMemoryCache:
                         for key, cache_entry in list(self._cache.items()):
                             if key not in self._hot_entries:
                                 del self._cache[key]
+                                self._forget(key)
                                 self.evictions += 1
                                 break
                     else:
+                        self._forget(oldest_key)
                         self.evictions += 1
             
             # Store in Redis distributed cache
@@ -254,13 +264,15 @@ class DistributedMemoryCache:
             )
             
             with self._lock:
-                self._bloom_filter.add(command_hash)
+                if command_hash not in self._cache and command_hash not in self._hot_entries:
+                    self._bloom_filter.add(command_hash)
                 self._cache[command_hash] = entry
                 
                 # Enforce size limit
                 if len(self._cache) > self.max_size:
                     oldest_key, _ = self._cache.popitem(last=False)
                     if oldest_key not in self._hot_entries:
+                        self._forget(oldest_key)
                         self.evictions += 1
                     
         except Exception as e:
@@ -280,10 +292,10 @@ class DistributedMemoryCache:
         
         # Remove from local cache
         with self._lock:
-            if command_hash in self._cache:
-                del self._cache[command_hash]
-            if command_hash in self._hot_entries:
-                del self._hot_entries[command_hash]
+            removed = self._cache.pop(command_hash, None) is not None
+            removed = self._hot_entries.pop(command_hash, None) is not None or removed
+            if removed:
+                self._forget(command_hash)
         
         # Remove from Redis
         if self._redis_cache:
@@ -296,6 +308,11 @@ class DistributedMemoryCache:
         
         return success
     
+    def _forget(self, command_hash: str):
+        """Drop a removed key from the Bloom filter once it is no longer resident"""
+        if command_hash not in self._cache and command_hash not in self._hot_entries:
+            self._bloom_filter.remove(command_hash)
+    
     async def clear_all(self) -> bool:
         """Clear all cached entries"""
         try:
@@ -328,6 +345,8 @@ class DistributedMemoryCache:
                 'evictions': self.evictions,
                 'sync_operations': self.sync_operations,
                 'bloom_filter_size': self._bloom_filter.item_count,
+                'bloom_filter_fill_ratio': self._bloom_filter.fill_ratio,
+                'bloom_bypasses': self.bloom_bypasses,
                 'local_hit_rate': self.local_hits / (self.local_hits + self.redis_hits + self.total_misses) if (self.local_hits + self.redis_hits + self.total_misses) > 0 else 0,
                 'overall_hit_rate': (self.local_hits + self.redis_hits) / (self.local_hits + self.redis_hits + self.total_misses) if (self.local_hits + self.redis_hits + self.total_misses) > 0 else 0
             }
@@ -377,8 +396,10 @@ class DistributedMemoryCache:
             # Remove expired entries
             for key in expired_keys:
                 with self._lock:
-                    self._cache.pop(key, None)
-                    self._hot_entries.pop(key, None)
+                    removed = self._cache.pop(key, None) is not None
+                    removed = self._hot_entries.pop(key, None) is not None or removed
+                    if removed:
+                        self._forget(key)
             
             if expired_keys:
                 logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
@@ -0,0 +1,208 @@
+"""
+L0 Hot Result Cache for the Speed Layer
+
+A small fixed-size table in front of every other tier, answering repeats of
+the hottest commands without awaiting anything. All operations are plain
+synchronous code on the event loop, so the table needs no locks.
+
+The table is set-associative: a key hashes to one set of a few slots. When
+the set is full, TinyLFU admission decides whether the newcomer replaces
+the set's least frequently used entry, using access frequencies estimated
+by a count-min sketch that is periodically halved so old popularity fades.
+One-off commands therefore cannot flush out hot ones.
+
+Entries carry a TTL and the policy rule set version they were decided
+under; an entry from an older rule set reads as a miss, so a policy change
+invalidates the whole table at once.
+
+Features:
+- Fixed-size set-associative table keyed by the full command hash
+- Count-min frequency sketch with aging (TinyLFU admission)
+- Per-entry TTL and rule set version
+- Hit ratio and admission statistics
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+_MASK_64 = (1 << 64) - 1
+# Salts the sketch hash so its indexes are independent of the set index,
+# which uses the low bits of the plain key hash
+_SKETCH_SALT = 0x9E3779B97F4A7C15
+_COUNTER_MAX = 15
+_HALVE = bytes(i >> 1 for i in range(256))
+
+
+class FrequencySketch:
+    """Count-min sketch of recent access frequencies with periodic halving"""
+    
+    def __init__(self, width: int = 1024, depth: int = 4, sample_factor: int = 10):
+        """
+        Initialize frequency sketch
+        
+        Args:
+            width: Counters per row (rounded up to a power of two)
+            depth: Number of rows
+            sample_factor: Counters are halved after width * sample_factor
+                increments
+        """
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self.depth = depth
+        self.sample_size = self.width * sample_factor
+        self._mask = self.width - 1
+        self._rows = [bytearray(self.width) for _ in range(depth)]
+        self._additions = 0
+        self.resets = 0
+    
+    def _indexes(self, key: str) -> List[int]:
+        h = hash((_SKETCH_SALT, key)) & _MASK_64
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        mask = self._mask
+        return [(h1 + i * h2) & mask for i in range(self.depth)]
+    
+    def increment(self, key: str):
+        """Record one access"""
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < _COUNTER_MAX:
+                row[index] += 1
+        
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._reset()
+    
+    def estimate(self, key: str) -> int:
+        """Estimated recent access count (never an underestimate before aging)"""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+    
+    def _reset(self):
+        """Halve every counter so frequencies reflect recent traffic"""
+        self._rows = [row.translate(_HALVE) for row in self._rows]
+        self._additions //= 2
+        self.resets += 1
+
+
+class HotResultCache:
+    """Fixed-size L0 table of validation results with TinyLFU admission"""
+    
+    def __init__(self, capacity: int = 256, ways: int = 4, ttl_seconds: float = 30.0):
+        """
+        Initialize hot result cache
+        
+        Args:
+            capacity: Total slots (rounded up to a power-of-two number of sets)
+            ways: Slots per set
+            ttl_seconds: Lifetime of an entry
+        """
+        sets = 1 << max(-(-capacity // ways) - 1, 1).bit_length()
+        self.ways = ways
+        self.capacity = sets * ways
+        self.ttl_seconds = ttl_seconds
+        self._set_mask = sets - 1
+        
+        # Parallel slot arrays; a set is slots [i * ways, (i + 1) * ways)
+        self._keys: List[Optional[str]] = [None] * self.capacity
+        self._values: List[Any] = [None] * self.capacity
+        self._expires: List[float] = [0.0] * self.capacity
+        self._versions: List[int] = [0] * self.capacity
+        
+        self.sketch = FrequencySketch(width=self.capacity * 4)
+        
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stale_version': 0,
+            'admissions': 0,
+            'rejections': 0,
+            'evictions': 0
+        }
+    
+    def _slot_range(self, key: str) -> range:
+        start = (hash(key) & self._set_mask) * self.ways
+        return range(start, start + self.ways)
+    
+    def get(self, key: str, version: int) -> Optional[Any]:
+        """
+        Look up a result decided under the given rule set version
+        
+        Every lookup counts towards the key's admission frequency.
+        """
+        self.sketch.increment(key)
+        
+        for slot in self._slot_range(key):
+            if self._keys[slot] != key:
+                continue
+            if self._versions[slot] != version:
+                self._stats['stale_version'] += 1
+                self._clear_slot(slot)
+            elif self._expires[slot] <= time.monotonic():
+                self._stats['expired'] += 1
+                self._clear_slot(slot)
+            else:
+                self._stats['hits'] += 1
+                return self._values[slot]
+            break
+        
+        self._stats['misses'] += 1
+        return None
+    
+    def put(self, key: str, value: Any, version: int) -> bool:
+        """
+        Offer a result to the table
+        
+        Returns:
+            True if the result was stored
+        """
+        now = time.monotonic()
+        slots = self._slot_range(key)
+        
+        # The key's own slot wins over any free or dead slot in the set
+        victim = next((slot for slot in slots if self._keys[slot] == key), None)
+        if victim is None:
+            victim = next((slot for slot in slots if self._keys[slot] is None or
+                           self._versions[slot] != version or self._expires[slot] <= now), None)
+        
+        if victim is None:
+            # Full set: the newcomer must be more frequent than the coldest entry
+            victim = min(slots, key=lambda slot: self.sketch.estimate(self._keys[slot]))
+            if self.sketch.estimate(key) <= self.sketch.estimate(self._keys[victim]):
+                self._stats['rejections'] += 1
+                return False
+            self._stats['evictions'] += 1
+        
+        if self._keys[victim] != key:
+            self._stats['admissions'] += 1
+        self._keys[victim] = key
+        self._values[victim] = value
+        self._expires[victim] = now + self.ttl_seconds
+        self._versions[victim] = version
+        return True
+    
+    def _clear_slot(self, slot: int):
+        self._keys[slot] = None
+        self._values[slot] = None
+    
+    def clear(self):
+        """Drop every entry (frequencies are kept)"""
+        self._keys = [None] * self.capacity
+        self._values = [None] * self.capacity
+    
+    def __len__(self) -> int:
+        return sum(key is not None for key in self._keys)
+    
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self._stats['hits'] + self._stats['misses']
+        return self._stats['hits'] / lookups if lookups else 0.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get L0 cache statistics"""
+        return dict(
+            self._stats,
+            hit_ratio=self.hit_ratio,
+            size=len(self),
+            capacity=self.capacity,
+            ttl_seconds=self.ttl_seconds,
+            sketch_resets=self.sketch.resets
+        )
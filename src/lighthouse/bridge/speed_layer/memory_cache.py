@@ -6,13 +6,12 @@ Provides sub-millisecond lookups for hot validation requests.
 
 Features:
 - LRU eviction with hot entry protection
-- Bloom filter for fast negative lookups
+- Counting Bloom filter of resident keys for fast negative lookups
 - Automatic cache warming from historical data
 - Thread-safe operations
 """
 
 import asyncio
-import hashlib
 import logging
 import threading
 import time
@@ -25,58 +24,12 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+from .bloom_filter import CountingBloomFilter
 from .models import CacheEntry, ValidationRequest, ValidationResult
 
 logger = logging.getLogger(__name__)
 
 
-class BloomFilter:
-    """Simple Bloom filter for fast negative lookups"""
-    
-    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
-        """Initialize Bloom filter with given capacity and error rate"""
-        import math
-        
-        self.capacity = capacity
-        self.error_rate = error_rate
-        
-        # Calculate optimal bit array size and number of hash functions
-        self.bit_array_size = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
-        self.hash_count = int(self.bit_array_size * math.log(2) / capacity)
-        
-        # Use a set of integers to represent bit array (Python optimization)
-        self.bit_array: Set[int] = set()
-        self.item_count = 0
-    
-    def _hash(self, item: str) -> List[int]:
-        """Generate multiple hash values for an item"""
-        hashes = []
-        for i in range(self.hash_count):
-            # Use different salts for each hash function
-            salted_item = f"{item}:{i}"
-            hash_value = int(hashlib.md5(salted_item.encode()).hexdigest(), 16)
-            hashes.append(hash_value % self.bit_array_size)
-        return hashes
-    
-    def add(self, item: str):
-        """Add item to Bloom filter"""
-        for hash_value in self._hash(item):
-            self.bit_array.add(hash_value)
-        self.item_count += 1
-    
-    def might_contain(self, item: str) -> bool:
-        """Check if item might be in the set (no false negatives)"""
-        for hash_value in self._hash(item):
-            if hash_value not in self.bit_array:
-                return False
-        return True
-    
-    def clear(self):
-        """Clear the Bloom filter"""
-        self.bit_array.clear()
-        self.item_count = 0
-
-
 class MemoryRuleCache:
     """High-performance in-memory cache for validation rules"""
     
@@ -97,12 +50,13 @@ class MemoryRuleCache:
         self._lock = threading.RLock()
         
         # Bloom filter for fast negative lookups
-        self._bloom_filter = BloomFilter(capacity=max_size * 2)
+        self._bloom_filter = CountingBloomFilter(capacity=max_size * 2)
         
         # Statistics
         self.hits = 0
         self.misses = 0
         self.evictions = 0
+        self.bloom_bypasses = 0
         
         # Redis backup (if available)
         self._redis_client: Optional[object] = None
@@ -130,7 +84,9 @@ class MemoryRuleCache:
         Maintains LRU order and updates access statistics.
         """
         # Fast negative lookup with Bloom filter
-        if not self._bloom_filter.might_contain(command_hash):
+        if self._bloom_filter.is_saturated:
+            self.bloom_bypasses += 1
+        elif not self._bloom_filter.might_contain(command_hash):
             self.misses += 1
             return None
         
@@ -144,6 +100,7 @@ class MemoryRuleCache:
                 else:
                     # Remove expired hot entry
                     del self._hot_entries[command_hash]
+                    self._forget(command_hash)
             
             # Check main cache
             if command_hash in self._cache:
@@ -152,6 +109,7 @@ class MemoryRuleCache:
                 # Check expiration
                 if entry.is_expired:
                     del self._cache[command_hash]
+                    self._forget(command_hash)
                     self.misses += 1
                     return None
                 
@@ -198,12 +156,16 @@ class MemoryRuleCache:
         )
         
         with self._lock:
-            # Add to Bloom filter
-            self._bloom_filter.add(command_hash)
+            # Add to Bloom filter (once per resident key)
+            if command_hash not in self._cache and command_hash not in self._hot_entries:
+                self._bloom_filter.add(command_hash)
+            else:
+                self._cache.pop(command_hash, None)
             
             # Evict oldest entries if at capacity
             while len(self._cache) >= self.max_size:
                 oldest_key, oldest_entry = self._cache.popitem(last=False)
+                self._forget(oldest_key)
                 self.evictions += 1
                 logger.debug(f"Evicted {oldest_key} (age: {time.time() - oldest_entry.created_at:.1f}s)")
             
@@ -256,9 +218,15 @@ class MemoryRuleCache:
                     del self._cache[key]
                 if key in self._hot_entries:
                     del self._hot_entries[key]
+                self._forget(key)
             
             logger.info(f"Invalidated {len(keys_to_remove)} entries matching pattern: {pattern}")
     
+    def _forget(self, command_hash: str):
+        """Drop a removed key from the Bloom filter once it is no longer resident"""
+        if command_hash not in self._cache and command_hash not in self._hot_entries:
+            self._bloom_filter.remove(command_hash)
+    
     def clear(self):
         """Clear all cache entries"""
         with self._lock:
@@ -298,6 +266,8 @@ class MemoryRuleCache:
                 'misses': self.misses,
                 'evictions': self.evictions,
                 'bloom_filter_size': self._bloom_filter.item_count,
+                'bloom_filter_fill_ratio': self._bloom_filter.fill_ratio,
+                'bloom_bypasses': self.bloom_bypasses,
                 'redis_available': self._redis_client is not None
             }
     
@@ -336,8 +306,10 @@ class MemoryRuleCache:
                     
                     # Remove expired entries
                     for key in expired_keys:
-                        self._cache.pop(key, None)
-                        self._hot_entries.pop(key, None)
+                        removed = self._cache.pop(key, None) is not None
+                        removed = self._hot_entries.pop(key, None) is not None or removed
+                        if removed:
+                            self._forget(key)
                 
                 if expired_keys:
                     logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
@@ -0,0 +1,446 @@
+"""
+Off-Loop Pattern Model Training
+
+Trains pattern cache models in a separate process, so fitting and pickling
+never block validation traffic on the bridge's event loop.
+
+A training run works on a snapshot of labelled examples (expert decisions
+from the event store), holds a slice of it back, fits a pipeline on the
+rest and writes a versioned model artifact. Listeners (the dispatcher) are
+then notified, load the artifact in the background and shadow-evaluate it
+against the model currently serving on the held-back examples. Only a
+candidate that is at least as accurate is promoted.
+
+Features:
+- Single-process training worker (spawned, one run at a time)
+- Versioned artifacts written atomically (pattern_model_v<N>.pkl) into a
+  directory only the bridge's user can write, since artifacts are unpickled
+- Snapshot of expert decisions joined from the event store
+- Shadow evaluation metrics recorded for every candidate
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import re
+import shutil
+import stat
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .models import ValidationDecision, ValidationRequest
+
+logger = logging.getLogger(__name__)
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+    SKLEARN_AVAILABLE = True
+except ImportError:
+    SKLEARN_AVAILABLE = False
+
+# (text features, decision label)
+TrainingExample = Tuple[str, str]
+
+ARTIFACT_PATTERN = re.compile(r'^pattern_model_v(\d+)\.pkl$')
+
+# Expert decisions that make usable labels
+TRAINING_LABELS = frozenset([ValidationDecision.APPROVED.value, ValidationDecision.BLOCKED.value])
+
+# Components whose decision events are expert verdicts. Any authenticated
+# agent can append events through the HTTP API (source_component
+# "http_server"), so decisions from anywhere else are ignored.
+TRUSTED_DECISION_SOURCES = frozenset(['bridge_aggregate', 'expert_coordinator'])
+
+
+def is_trusted_decision(event: Any, request: ValidationRequest,
+                        trusted_sources: frozenset = TRUSTED_DECISION_SOURCES) -> bool:
+    """Whether a decision event is a trusted validator's verdict on another agent's request"""
+    if event.source_component not in trusted_sources:
+        return False
+    return request.agent_id not in (event.source_agent, event.data.get('validator_id'))
+
+
+@dataclass
+class ModelArtifact:
+    """A trained model written to disk, with the examples held back from it"""
+    
+    version: int
+    path: str
+    training_samples: int
+    holdout_texts: List[str]
+    holdout_labels: List[str]
+    metrics: Dict[str, float]
+    created_at: float = field(default_factory=time.time)
+    
+    @property
+    def model_version(self) -> str:
+        return f"ml_v{self.version}"
+
+
+@dataclass
+class ShadowEvaluation:
+    """Candidate and serving model scored on the same held-back examples"""
+    
+    version: int
+    samples: int
+    candidate_accuracy: float
+    current_accuracy: Optional[float]
+    agreement_rate: Optional[float]
+    promoted: bool
+    reason: str
+    evaluated_at: float = field(default_factory=time.time)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def build_pipeline() -> 'Pipeline':
+    """Pattern model pipeline; log loss so predict_proba is available"""
+    return Pipeline([
+        ('vectorizer', TfidfVectorizer(max_features=1000, ngram_range=(1, 2))),
+        ('classifier', SGDClassifier(loss='log_loss', random_state=42, max_iter=1000))
+    ])
+
+
+def is_fitted(model: Any) -> bool:
+    return model is not None and hasattr(model, 'classes_')
+
+
+def train_model_artifact(examples: List[TrainingExample], artifact_dir: str, version: int,
+                         holdout_fraction: float = 0.2) -> ModelArtifact:
+    """
+    Fit a model on a snapshot and write it as a versioned artifact
+    
+    Runs in the training worker process.
+    
+    Args:
+        examples: Labelled examples
+        artifact_dir: Directory for model artifacts
+        version: Artifact version number
+        holdout_fraction: Share of examples held back for shadow evaluation
+    
+    Returns:
+        The written artifact
+    """
+    texts, labels = zip(*examples)
+    if len(set(labels)) < 2:
+        raise ValueError("Training snapshot needs at least two decision classes")
+    
+    train_texts, holdout_texts, train_labels, holdout_labels = train_test_split(
+        list(texts), list(labels), test_size=holdout_fraction, random_state=42
+    )
+    
+    fit_start = time.time()
+    model = build_pipeline()
+    model.fit(train_texts, train_labels)
+    fit_ms = (time.time() - fit_start) * 1000
+    
+    predictions = model.predict(holdout_texts)
+    holdout_accuracy = sum(p == l for p, l in zip(predictions, holdout_labels)) / len(holdout_labels)
+    
+    metrics = {
+        'fit_ms': fit_ms,
+        'holdout_accuracy': float(holdout_accuracy),
+        'holdout_samples': len(holdout_labels)
+    }
+    
+    path = Path(artifact_dir) / f"pattern_model_v{version}.pkl"
+    write_artifact(str(path), {
+        'model': model,
+        'version': f"ml_v{version}",
+        'training_samples': len(train_texts),
+        'metrics': metrics,
+        'saved_at': time.time()
+    })
+    
+    return ModelArtifact(
+        version=version,
+        path=str(path),
+        training_samples=len(train_texts),
+        holdout_texts=list(holdout_texts),
+        holdout_labels=list(holdout_labels),
+        metrics=metrics
+    )
+
+
+def write_artifact(path: str, model_data: Dict[str, Any]):
+    """Pickle to a temp file and rename, so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(model_data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def publish_artifact(artifact_path: str, model_path: str):
+    """Atomically copy a promoted artifact to a configured model path"""
+    directory = os.path.dirname(model_path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        shutil.copyfile(artifact_path, tmp_path)
+        os.replace(tmp_path, model_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def ensure_private_dir(path: str) -> str:
+    """
+    Create a directory with mode 0700, or check that an existing one is private
+    
+    Model artifacts are unpickled, so anyone who can write to their
+    directory can run code in the bridge.
+    
+    Raises:
+        PermissionError: If the path is not a directory owned by this user
+            and closed to writes by other users
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Model artifact path {path} is not a directory")
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        raise PermissionError(f"Model artifact directory {path} is not owned by this user")
+    if info.st_mode & 0o022:
+        raise PermissionError(f"Model artifact directory {path} is writable by other users")
+    return path
+
+
+def load_model_file(path: str) -> Tuple[Any, Optional[str]]:
+    """
+    Load a model artifact or a bare pickled pipeline
+    
+    Returns:
+        (model, version string if the file records one)
+    """
+    with open(path, 'rb') as f:
+        model_data = pickle.load(f)
+    if isinstance(model_data, dict) and 'model' in model_data:
+        return model_data['model'], model_data.get('version')
+    return model_data, None
+
+
+def shadow_evaluate(version: int, candidate: Any, current: Any, texts: List[str], labels: List[str],
+                    min_accuracy: float = 0.8) -> ShadowEvaluation:
+    """
+    Score a candidate against the serving model on held-back examples
+    
+    The candidate is promoted when it reaches min_accuracy and is at least
+    as accurate as the serving model (if there is one).
+    """
+    if not texts:
+        return ShadowEvaluation(version=version, samples=0, candidate_accuracy=0.0, current_accuracy=None,
+                                agreement_rate=None, promoted=False, reason="no held-back examples")
+    
+    candidate_predictions = list(candidate.predict(texts))
+    candidate_accuracy = sum(p == l for p, l in zip(candidate_predictions, labels)) / len(labels)
+    
+    current_accuracy = None
+    agreement_rate = None
+    if is_fitted(current):
+        try:
+            current_predictions = list(current.predict(texts))
+            current_accuracy = sum(p == l for p, l in zip(current_predictions, labels)) / len(labels)
+            agreement_rate = sum(
+                c == p for c, p in zip(candidate_predictions, current_predictions)
+            ) / len(labels)
+        except Exception as e:
+            logger.warning(f"Serving model failed shadow evaluation: {e}")
+    
+    if candidate_accuracy < min_accuracy:
+        promoted, reason = False, f"accuracy {candidate_accuracy:.3f} below {min_accuracy:.3f}"
+    elif current_accuracy is not None and candidate_accuracy < current_accuracy:
+        promoted, reason = False, f"accuracy {candidate_accuracy:.3f} below serving {current_accuracy:.3f}"
+    else:
+        promoted, reason = True, "promoted"
+    
+    return ShadowEvaluation(
+        version=version,
+        samples=len(labels),
+        candidate_accuracy=float(candidate_accuracy),
+        current_accuracy=None if current_accuracy is None else float(current_accuracy),
+        agreement_rate=None if agreement_rate is None else float(agreement_rate),
+        promoted=promoted,
+        reason=reason
+    )
+
+
+async def snapshot_expert_decisions(event_store: Any,
+                                    text_features: Callable[[ValidationRequest], str],
+                                    max_examples: int = 10000) -> List[TrainingExample]:
+    """
+    Labelled examples from the event store
+    
+    Joins VALIDATION_DECISION_MADE events to the VALIDATION_REQUEST_SUBMITTED
+    events they answer, keeping the most recent max_examples approve/block
+    decisions made by trusted validators.
+    
+    Args:
+        event_store: Event store to read
+        text_features: Maps a request to the model's input text
+        max_examples: Snapshot size limit
+    """
+    from lighthouse.event_store.models import EventFilter, EventQuery, EventType
+    
+    pending: Dict[str, ValidationRequest] = {}
+    examples: List[TrainingExample] = []
+    offset = 0
+    
+    while True:
+        query = EventQuery(
+            filter=EventFilter(event_types=[
+                EventType.VALIDATION_REQUEST_SUBMITTED, EventType.VALIDATION_DECISION_MADE
+            ]),
+            offset=offset,
+            limit=10000
+        )
+        result = await event_store.query(query)
+        
+        for event in result.events:
+            request_id = event.data.get('request_id')
+            if event.event_type == EventType.VALIDATION_REQUEST_SUBMITTED:
+                pending[request_id] = ValidationRequest(
+                    tool_name=event.data['tool_name'],
+                    tool_input=event.data['tool_input'],
+                    agent_id=event.source_agent or 'unknown',
+                    request_id=request_id,
+                    context=event.data.get('context') or {}
+                )
+            else:
+                request = pending.get(request_id)
+                if request is None or not is_trusted_decision(event, request):
+                    continue
+                del pending[request_id]
+                decision = event.data.get('decision')
+                if decision in TRAINING_LABELS:
+                    examples.append((text_features(request), decision))
+        
+        if not result.has_more or not result.events:
+            break
+        offset += len(result.events)
+    
+    return examples[-max_examples:]
+
+
+class ModelTrainingWorker:
+    """Trains pattern models in a separate process and announces new artifacts"""
+    
+    def __init__(self, artifact_dir: Optional[str] = None, min_examples: int = 20,
+                 holdout_fraction: float = 0.2):
+        """
+        Initialize training worker
+        
+        Args:
+            artifact_dir: Directory for versioned model artifacts; must be
+                private to this user. A fresh private temporary directory
+                is created when not given.
+            min_examples: Smallest snapshot worth training on
+            holdout_fraction: Share of each snapshot held back for shadow evaluation
+        """
+        self.artifact_dir = artifact_dir
+        self.min_examples = min_examples
+        self.holdout_fraction = holdout_fraction
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._training_lock = asyncio.Lock()
+        self._listeners: List[Callable[[ModelArtifact], Awaitable[Any]]] = []
+        self._last_version: Optional[int] = None
+        
+        self._stats = {
+            'runs': 0,
+            'failures': 0,
+            'skipped': 0,
+            'last_version': None,
+            'last_training_ms': 0.0
+        }
+    
+    def add_listener(self, callback: Callable[[ModelArtifact], Awaitable[Any]]):
+        """Register an async callback invoked with each new artifact"""
+        self._listeners.append(callback)
+    
+    async def train(self, examples: List[TrainingExample]) -> Optional[ModelArtifact]:
+        """
+        Train on a snapshot in the worker process and notify listeners
+        
+        Returns:
+            The new artifact, or None if training was skipped or failed
+        """
+        if not SKLEARN_AVAILABLE or len(examples) < self.min_examples:
+            self._stats['skipped'] += 1
+            return None
+        
+        async with self._training_lock:
+            start_time = time.time()
+            try:
+                version = await asyncio.to_thread(self._next_version)
+                loop = asyncio.get_running_loop()
+                artifact = await loop.run_in_executor(
+                    self._get_executor(), train_model_artifact,
+                    list(examples), self.artifact_dir, version, self.holdout_fraction
+                )
+            except Exception as e:
+                self._stats['failures'] += 1
+                logger.error(f"Pattern model training failed: {e}")
+                return None
+            
+            self._last_version = artifact.version
+            self._stats['runs'] += 1
+            self._stats['last_version'] = artifact.version
+            self._stats['last_training_ms'] = (time.time() - start_time) * 1000
+            logger.info(f"Trained pattern model v{artifact.version} on {artifact.training_samples} examples "
+                        f"(holdout accuracy {artifact.metrics['holdout_accuracy']:.3f})")
+        
+        for listener in self._listeners:
+            try:
+                await listener(artifact)
+            except Exception as e:
+                logger.error(f"Model artifact listener failed: {e}")
+        
+        return artifact
+    
+    def _next_version(self) -> int:
+        """Continue numbering after the newest artifact on disk"""
+        if self.artifact_dir is None:
+            # mkdtemp creates an unguessable directory with mode 0700
+            self.artifact_dir = tempfile.mkdtemp(prefix='lighthouse_pattern_models_')
+        ensure_private_dir(self.artifact_dir)
+        
+        if self._last_version is None:
+            versions = [
+                int(match.group(1)) for match in map(ARTIFACT_PATTERN.match, os.listdir(self.artifact_dir))
+                if match
+            ]
+            self._last_version = max(versions, default=0)
+        return self._last_version + 1
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked: the parent runs an event loop and threads
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+    
+    async def close(self):
+        """Stop the worker process, abandoning queued runs"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self._stats, artifact_dir=self.artifact_dir)
@@ -4,14 +4,16 @@ Speed Layer Data Models
 Core data structures for the speed layer validation system.
 """
 
-import hashlib
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from functools import cached_property
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel
 
+from .canonicalize import exact_content, hash_content, semantic_hash
+
 
 class ValidationDecision(str, Enum):
     """Validation decision outcomes"""
@@ -49,9 +51,17 @@ class ValidationRequest:
     
     def __post_init__(self):
         """Generate command hash for caching"""
-        content = f"{self.tool_name}:{str(sorted(self.tool_input.items()))}"
-        hash_value = hashlib.sha256(content.encode()).hexdigest()[:16]
-        object.__setattr__(self, 'command_hash', hash_value)
+        object.__setattr__(self, 'command_hash', hash_content(exact_content(self.tool_name, self.tool_input)))
+    
+    @cached_property
+    def semantic_hash(self) -> Optional[str]:
+        """
+        Cache key shared by semantically equivalent requests
+        
+        Computed on first use, since only requests that miss the exact
+        caches need it. None if the tool input cannot be canonicalized.
+        """
+        return semantic_hash(self.tool_name, self.tool_input, self.context)
     
     @property
     def is_bash_command(self) -> bool:
@@ -99,6 +109,16 @@ class ValidationResult:
     # Performance data
     timestamp: float = field(default_factory=time.time)
     
+    def for_request(self, request_id: str, processing_time_ms: Optional[float] = None) -> 'ValidationResult':
+        """Copy of this result answering another request with the same decision"""
+        return replace(
+            self,
+            request_id=request_id,
+            processing_time_ms=self.processing_time_ms if processing_time_ms is None else processing_time_ms,
+            expert_context=dict(self.expert_context) if self.expert_context is not None else None,
+            security_concerns=list(self.security_concerns)
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
         return {
@@ -126,6 +146,7 @@ class CacheEntry:
     access_count: int = 0
     last_accessed: float = field(default_factory=time.time)
     ttl_seconds: int = 300  # 5 minutes default
+    rule_set_version: Optional[int] = None  # Policy rule set the decision was made under
     
     @property
     def is_expired(self) -> bool:
@@ -259,6 +280,8 @@ class SpeedLayerMetrics:
     # Request counts
     total_requests: int = 0
     memory_cache_hits: int = 0
+    semantic_cache_hits: int = 0  # Memory hits found under the semantic key
+    coalesced_requests: int = 0  # Requests answered by an identical in-flight request
     policy_cache_hits: int = 0
     pattern_cache_hits: int = 0
     expert_escalations: int = 0
@@ -302,6 +325,8 @@ class SpeedLayerMetrics:
             'avg_response_time_ms': self.avg_response_time_ms,
             'p99_response_time_ms': self.p99_response_time_ms,
             'memory_cache_hits': self.memory_cache_hits,
+            'semantic_cache_hits': self.semantic_cache_hits,
+            'coalesced_requests': self.coalesced_requests,
             'policy_cache_hits': self.policy_cache_hits,
             'pattern_cache_hits': self.pattern_cache_hits,
             'expert_escalations': self.expert_escalations,
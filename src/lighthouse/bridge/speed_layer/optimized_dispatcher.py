@@ -6,30 +6,43 @@ Uses optimized cache components and advanced performance techniques.
 
 Performance Optimizations:
 - Async-first architecture with minimal blocking operations
-- Lock-free hot paths for common operations
-- Vectorized batch processing
+- Lock-free L0 table of hot results keyed by the full command hash, with
+  TinyLFU admission and invalidation on policy rule changes; agent-specific
+  pattern tier decisions stay in the memory tier under the agent's key
+- Micro-batched pattern tier: requests arriving within a short window are
+  scored with one model call
 - Circuit breaker with smart backoff
 - Performance-aware request routing
 - Real-time performance monitoring and auto-tuning
+- Pattern model retraining in a separate process from expert decisions
+- Expert decisions from the event store fed back into the memory cache,
+  candidate policy rules and the pattern model's training set
 """
 
 import asyncio
 import logging
 import time
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from collections import deque, defaultdict
 
 from .models import (
     ValidationRequest, ValidationResult, ValidationDecision, 
-    ValidationConfidence, SpeedLayerMetrics
+    ValidationConfidence, SpeedLayerMetrics, PatternPrediction
 )
 from .optimized_memory_cache import OptimizedMemoryCache
 from .optimized_policy_cache import OptimizedPolicyCache  
 from .optimized_pattern_cache import OptimizedPatternCache
+from .model_training import ModelArtifact, ModelTrainingWorker, snapshot_expert_decisions
+from .decision_learner import DecisionLearner
+from .hot_cache import HotResultCache
 
 logger = logging.getLogger(__name__)
 
+# Result layers whose decision depends on the requesting agent: the pattern
+# model has agent features, so its results are cached and shared per agent
+_AGENT_SPECIFIC_LAYERS = frozenset({'pattern', 'memory_agent'})
+
 
 class AdaptiveCircuitBreaker:
     """Smart circuit breaker that adapts based on performance metrics"""
@@ -175,9 +188,31 @@ class OptimizedSpeedLayerDispatcher:
                  max_memory_cache_size: int = 10000,
                  policy_config_path: Optional[str] = None,
                  ml_model_path: Optional[str] = None,
-                 expert_timeout: float = 30.0):
+                 expert_timeout: float = 30.0,
+                 pattern_batch_window_ms: float = 2.0,
+                 pattern_batch_max_size: int = 64,
+                 event_store: Optional[Any] = None,
+                 model_artifact_dir: Optional[str] = None,
+                 retrain_interval_seconds: float = 3600.0,
+                 rule_proposals_path: Optional[str] = None,
+                 hot_cache_size: int = 256,
+                 hot_cache_ttl_seconds: float = 30.0):
         """
         Initialize optimized speed layer dispatcher
+        
+        Args:
+            max_memory_cache_size: Memory cache capacity
+            policy_config_path: Policy rule file
+            ml_model_path: Path to pre-trained ML model
+            expert_timeout: Expert escalation timeout in seconds
+            pattern_batch_window_ms: How long the pattern tier collects a batch
+            pattern_batch_max_size: Largest batch scored in one model call
+            event_store: Source of expert decisions for pattern model retraining
+            model_artifact_dir: Directory for versioned pattern model artifacts
+            retrain_interval_seconds: How often the pattern model is retrained
+            rule_proposals_path: Rule file for policy rules proposed from expert decisions
+            hot_cache_size: Slots in the L0 hot result table
+            hot_cache_ttl_seconds: Lifetime of an L0 entry
         """
         
         # Initialize optimized cache layers
@@ -188,6 +223,23 @@ class OptimizedSpeedLayerDispatcher:
             confidence_threshold=0.8
         )
         
+        # Pattern model retraining; new artifacts are loaded and swapped in
+        # by the pattern cache without blocking validation
+        self.event_store = event_store
+        self.retrain_interval_seconds = retrain_interval_seconds
+        self.training_worker = ModelTrainingWorker(artifact_dir=model_artifact_dir)
+        self.training_worker.add_listener(self._on_model_artifact)
+        
+        # Learning from expert decisions recorded in the event store
+        self.decision_learner: Optional[DecisionLearner] = None
+        if event_store is not None:
+            self.decision_learner = DecisionLearner(
+                event_store,
+                self.memory_cache,
+                text_features=self.pattern_cache.feature_extractor.extract_text_features,
+                proposals_path=rule_proposals_path
+            )
+        
         # Expert escalation
         self.expert_timeout = expert_timeout
         self._expert_queue: asyncio.Queue = asyncio.Queue(maxsize=100)
@@ -205,9 +257,20 @@ class OptimizedSpeedLayerDispatcher:
         self.metrics = SpeedLayerMetrics()
         self.profiler = PerformanceProfiler()
         
-        # Performance optimization
-        self._hot_request_patterns: Dict[str, ValidationResult] = {}
-        self._request_batching: Dict[str, List[Tuple[ValidationRequest, asyncio.Future]]] = {}
+        # L0: results of the hottest requests, consulted before any tier
+        self.hot_cache = HotResultCache(capacity=hot_cache_size, ttl_seconds=hot_cache_ttl_seconds)
+        
+        # Single-flight: identical concurrent requests share one validation;
+        # key -> (validation task, agent it was started for)
+        self._in_flight: Dict[str, Tuple[asyncio.Task, str]] = {}
+        
+        # Pattern tier micro-batching, served by _batch_processing_loop
+        self._pattern_batch_queue: asyncio.Queue = asyncio.Queue()
+        self._pattern_batch_window = pattern_batch_window_ms / 1000.0
+        self._pattern_batch_max_size = pattern_batch_max_size
+        self._batch_loop_running = False
+        self._pattern_batches = 0
+        self._pattern_batched_requests = 0
         
         # Background tasks
         self._background_tasks: Set[asyncio.Task] = set()
@@ -251,6 +314,12 @@ class OptimizedSpeedLayerDispatcher:
             memory_task, policy_task, pattern_task, perf_task, batch_task
         ])
         
+        # Learn from expert decisions and retrain the pattern model
+        if self.decision_learner is not None:
+            await self.decision_learner.start()
+        if self.event_store is not None:
+            self._background_tasks.add(asyncio.create_task(self._model_training_loop()))
+        
         logger.info("Optimized Speed Layer Dispatcher started successfully")
     
     async def stop(self):
@@ -265,6 +334,11 @@ class OptimizedSpeedLayerDispatcher:
         if self._background_tasks:
             await asyncio.gather(*self._background_tasks, return_exceptions=True)
         
+        await self.policy_cache.stop_watching()
+        if self.decision_learner is not None:
+            await self.decision_learner.stop()
+        await self.training_worker.close()
+        
         logger.info("Optimized Speed Layer Dispatcher stopped")
     
     async def validate_request(self, request: ValidationRequest) -> ValidationResult:
@@ -279,23 +353,88 @@ class OptimizedSpeedLayerDispatcher:
         
         self.metrics.total_requests += 1
         
-        # Hot pattern check (lock-free)
-        pattern_key = f"{request.tool_name}:{request.command_hash[:4]}"
-        if pattern_key in self._hot_request_patterns:
-            result = self._hot_request_patterns[pattern_key]
-            # Clone result with new request_id
-            hot_result = ValidationResult(
-                decision=result.decision,
-                confidence=result.confidence,
-                reason=result.reason + " [hot pattern]",
-                request_id=request.request_id,
-                processing_time_ms=0.1,
-                cache_hit=True,
-                cache_layer="hot_pattern"
-            )
+        # L0 hot result check (lock-free); entries decided under an older
+        # policy rule set read as misses
+        flight_key = self._get_flight_key(request)
+        rule_set_version = self.policy_cache.rule_set_version
+        result = self.hot_cache.get(flight_key, rule_set_version)
+        if result is not None:
+            hot_result = result.for_request(request.request_id, (time.time() - start_time) * 1000)
+            hot_result.reason = result.reason + " [hot pattern]"
+            hot_result.cache_hit = True
+            hot_result.cache_layer = "hot_pattern"
             self._record_performance(start_time, "hot_pattern")
             return hot_result
         
+        # Identical requests already being validated share that validation;
+        # shielded so a cancelled caller does not cancel it for the others.
+        # A decision the pattern tier made for another agent is not shared:
+        # the request joins (or starts) a validation for its own agent
+        key = flight_key
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            task, leader_agent = flight
+            result = await asyncio.shield(task)
+            if leader_agent != request.agent_id and self._depends_on_agent(result):
+                key = self._get_agent_key(request)
+                flight = self._in_flight.get(key)
+                result = await asyncio.shield(flight[0]) if flight is not None else None
+            if result is not None:
+                self.metrics.coalesced_requests += 1
+                return result.for_request(request.request_id, (time.time() - start_time) * 1000)
+        
+        task = asyncio.create_task(self._validate_through_tiers(request, start_time))
+        self._in_flight[key] = (task, request.agent_id)
+        task.add_done_callback(lambda done: self._end_flight(key, done, rule_set_version))
+        return await asyncio.shield(task)
+    
+    def _get_flight_key(self, request: ValidationRequest) -> str:
+        """
+        Key shared by requests that get the same decision from every tier
+        
+        The pattern tier is the exception: its decisions depend on the agent
+        and are only reused under the agent key (see _depends_on_agent).
+        """
+        if self.policy_cache.decisions_depend_on_agent:
+            return self._get_agent_key(request)
+        return request.command_hash
+    
+    def _get_agent_key(self, request: ValidationRequest) -> str:
+        """Key shared only by identical requests from the same agent"""
+        return f"{request.command_hash}:{request.agent_id}"
+    
+    def _depends_on_agent(self, result: ValidationResult) -> bool:
+        """Whether a result may differ for another agent sending the same command"""
+        return result.cache_layer in _AGENT_SPECIFIC_LAYERS
+    
+    def _end_flight(self, flight_key: str, task: asyncio.Task, rule_set_version: int):
+        flight = self._in_flight.get(flight_key)
+        if flight is not None and flight[0] is task:
+            del self._in_flight[flight_key]
+        
+        if not task.cancelled() and task.exception() is None:
+            self._offer_hot_result(flight_key, task.result(), rule_set_version)
+    
+    def _offer_hot_result(self, key: str, result: ValidationResult, rule_set_version: int):
+        """Offer a definite, confident decision to the L0 table"""
+        if result.decision not in (ValidationDecision.APPROVED, ValidationDecision.BLOCKED):
+            return
+        if result.confidence in (ValidationConfidence.LOW, ValidationConfidence.UNKNOWN):
+            return  # Error fallbacks and safe defaults are not worth repeating
+        if self._depends_on_agent(result):
+            return  # L0 keys do not include the agent
+        if self.policy_cache.rule_set_version != rule_set_version:
+            return  # The rules changed while the request was being validated
+        
+        # Stored as a copy so callers mutating their result cannot change it
+        self.hot_cache.put(key, result.for_request(result.request_id), rule_set_version)
+    
+    async def _validate_through_tiers(self, request: ValidationRequest, start_time: float) -> ValidationResult:
+        """Run a request through the memory, policy, pattern and expert tiers"""
+        # Decisions cached under the exact hash are consulted ahead of the
+        # policy rules, so they are tagged with the rule set they were made
+        # under and ignored once it has been swapped out
+        rule_set_version = self.policy_cache.rule_set_version
         try:
             # Tier 1: Optimized Memory Cache (<1ms)
             result = await self._try_optimized_memory_cache(request, start_time)
@@ -307,12 +446,34 @@ class OptimizedSpeedLayerDispatcher:
             result = await self._try_optimized_policy_cache(request, start_time)
             if result:
                 self.metrics.policy_cache_hits += 1
+                await self.memory_cache.set(request.command_hash, result, ttl_seconds=300,
+                                            rule_set_version=rule_set_version)
                 return self._finalize_result(result, start_time, "policy")
             
-            # Tier 3: Optimized Pattern Cache (<10ms)
+            # Memory cache under the semantic key; checked after the policy
+            # rules so a canonicalized key never bypasses a rule decision
+            result = await self._try_semantic_memory_cache(request, start_time)
+            if result:
+                self.metrics.memory_cache_hits += 1
+                self.metrics.semantic_cache_hits += 1
+                return self._finalize_result(result, start_time, "memory")
+            
+            # Tier 3: Optimized Pattern Cache (<10ms); the model looks at the
+            # agent, so its decisions are cached for that agent only
+            result = await self._try_agent_memory_cache(request, start_time)
+            if result:
+                self.metrics.memory_cache_hits += 1
+                return self._finalize_result(result, start_time, "memory")
+            
             result = await self._try_optimized_pattern_cache(request, start_time)
             if result:
                 self.metrics.pattern_cache_hits += 1
+                # Also cached for semantically equivalent commands
+                await self.memory_cache.set(self._get_agent_key(request), result, ttl_seconds=600,
+                                            rule_set_version=rule_set_version)
+                if request.semantic_hash is not None:
+                    await self.memory_cache.set(f"{request.semantic_hash}:{request.agent_id}", result,
+                                                ttl_seconds=600)
                 return self._finalize_result(result, start_time, "pattern")
             
             # Tier 4: Expert Escalation (up to 30s)
@@ -339,7 +500,8 @@ class OptimizedSpeedLayerDispatcher:
             return None
         
         try:
-            result = await self.memory_cache.get(request.command_hash)
+            result = await self.memory_cache.get(request.command_hash,
+                                                 rule_set_version=self.policy_cache.rule_set_version)
             if result:
                 response_time_ms = (time.time() - start_time) * 1000
                 self.circuit_breakers['memory'].record_success(response_time_ms)
@@ -357,6 +519,57 @@ class OptimizedSpeedLayerDispatcher:
         
         return None
     
+    async def _try_semantic_memory_cache(self, request: ValidationRequest, start_time: float) -> Optional[ValidationResult]:
+        """Look up a decision made for a semantically equivalent command"""
+        if request.semantic_hash is None or not self.circuit_breakers['memory'].can_execute():
+            return None
+        
+        try:
+            result = await self.memory_cache.get(request.semantic_hash)
+            if result:
+                response_time_ms = (time.time() - start_time) * 1000
+                self.circuit_breakers['memory'].record_success(response_time_ms)
+                self.profiler.record_layer_time('memory', response_time_ms)
+                
+                result.cache_hit = True
+                result.cache_layer = "memory_semantic"
+                return result
+            
+        except Exception as e:
+            response_time_ms = (time.time() - start_time) * 1000
+            logger.warning(f"Semantic memory cache error: {e}")
+            self.circuit_breakers['memory'].record_failure(response_time_ms)
+            self.metrics.cache_errors += 1
+        
+        return None
+    
+    async def _try_agent_memory_cache(self, request: ValidationRequest, start_time: float) -> Optional[ValidationResult]:
+        """Look up a pattern tier decision made earlier for this agent"""
+        if not self.circuit_breakers['memory'].can_execute():
+            return None
+        
+        try:
+            result = await self.memory_cache.get(self._get_agent_key(request),
+                                                 rule_set_version=self.policy_cache.rule_set_version)
+            if not result and request.semantic_hash is not None:
+                result = await self.memory_cache.get(f"{request.semantic_hash}:{request.agent_id}")
+            if result:
+                response_time_ms = (time.time() - start_time) * 1000
+                self.circuit_breakers['memory'].record_success(response_time_ms)
+                self.profiler.record_layer_time('memory', response_time_ms)
+                
+                result.cache_hit = True
+                result.cache_layer = "memory_agent"
+                return result
+            
+        except Exception as e:
+            response_time_ms = (time.time() - start_time) * 1000
+            logger.warning(f"Agent memory cache error: {e}")
+            self.circuit_breakers['memory'].record_failure(response_time_ms)
+            self.metrics.cache_errors += 1
+        
+        return None
+    
     async def _try_optimized_policy_cache(self, request: ValidationRequest, start_time: float) -> Optional[ValidationResult]:
         """Try optimized policy cache with performance tracking"""
         if not self.circuit_breakers['policy'].can_execute():
@@ -370,10 +583,6 @@ class OptimizedSpeedLayerDispatcher:
                 response_time_ms = (time.time() - policy_start) * 1000
                 self.circuit_breakers['policy'].record_success(response_time_ms)
                 self.profiler.record_layer_time('policy', response_time_ms)
-                
-                # Cache in memory for future requests
-                await self.memory_cache.set(request.command_hash, result, ttl_seconds=300)
-                
                 return result
             
         except Exception as e:
@@ -391,7 +600,7 @@ class OptimizedSpeedLayerDispatcher:
         
         try:
             pattern_start = time.time()
-            prediction = await self.pattern_cache.predict(request)
+            prediction = await self._predict_pattern(request)
             
             # Convert prediction to result
             processing_time_ms = (time.time() - pattern_start) * 1000
@@ -401,10 +610,6 @@ class OptimizedSpeedLayerDispatcher:
             if prediction.confidence_score >= 0.7:
                 self.circuit_breakers['pattern'].record_success(processing_time_ms)
                 self.profiler.record_layer_time('pattern', processing_time_ms)
-                
-                # Cache in memory and policy layers
-                await self.memory_cache.set(request.command_hash, result, ttl_seconds=600)
-                
                 return result
             else:
                 # Low confidence, escalate to expert
@@ -418,6 +623,15 @@ class OptimizedSpeedLayerDispatcher:
         
         return None
     
+    async def _predict_pattern(self, request: ValidationRequest) -> PatternPrediction:
+        """Queue a request for the next pattern batch, or predict directly if batching is not running"""
+        if not self._batch_loop_running:
+            return await self.pattern_cache.predict(request)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pattern_batch_queue.put_nowait((request, future))
+        return await future
+    
     async def _escalate_to_expert_optimized(self, request: ValidationRequest, start_time: float) -> ValidationResult:
         """Optimized expert escalation with timeout and fallback"""
         if not self.circuit_breakers['expert'].can_execute():
@@ -479,18 +693,12 @@ class OptimizedSpeedLayerDispatcher:
         self.profiler.record_layer_time(layer, response_time_ms)
     
     def _finalize_result(self, result: ValidationResult, start_time: float, layer: str) -> ValidationResult:
-        """Finalize result with performance tracking and hot pattern caching"""
+        """Finalize result with performance tracking"""
         processing_time_ms = (time.time() - start_time) * 1000
         result.processing_time_ms = processing_time_ms
         
         self._record_performance(start_time, layer)
         
-        # Cache hot patterns for ultra-fast future access
-        if result.decision in [ValidationDecision.APPROVED, ValidationDecision.BLOCKED]:
-            pattern_key = f"{result.request_id[:8]}:cache"  # Simplified pattern key
-            if len(self._hot_request_patterns) < 100:
-                self._hot_request_patterns[pattern_key] = result
-        
         return result
     
     async def _performance_monitoring_loop(self):
@@ -527,18 +735,102 @@ class OptimizedSpeedLayerDispatcher:
                 await asyncio.sleep(30.0)
     
     async def _batch_processing_loop(self):
-        """Process similar requests in batches for efficiency"""
+        """
+        Score pattern tier requests in micro-batches
+        
+        The first queued request opens a batch; requests arriving within the
+        batch window join it, up to the maximum batch size. The batch is
+        scored with one pattern cache call and each waiting request's future
+        receives its own prediction.
+        """
+        self._batch_loop_running = True
+        try:
+            while not self._shutdown_event.is_set():
+                batch = await self._collect_pattern_batch()
+                requests = [request for request, _ in batch]
+                
+                try:
+                    predictions = await self.pattern_cache.predict_batch(requests)
+                except Exception as e:
+                    logger.error(f"Batch processing error: {e}")
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                self._pattern_batches += 1
+                self._pattern_batched_requests += len(batch)
+                for (_, future), prediction in zip(batch, predictions):
+                    if not future.done():
+                        future.set_result(prediction)
+                        
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._batch_loop_running = False
+            # Requests still queued fail over to the expert tier
+            while not self._pattern_batch_queue.empty():
+                _, future = self._pattern_batch_queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Pattern batching stopped"))
+    
+    async def _collect_pattern_batch(self) -> List[Tuple[ValidationRequest, asyncio.Future]]:
+        """Wait for one queued request, then gather more until the window closes or the batch is full"""
+        queue = self._pattern_batch_queue
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self._pattern_batch_window
+        
+        while len(batch) < self._pattern_batch_max_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
+    async def _model_training_loop(self):
+        """Periodically retrain the pattern model in the training worker"""
         while not self._shutdown_event.is_set():
             try:
-                # Batch processing would be implemented here
-                # For now, just sleep to maintain loop structure
-                await asyncio.sleep(1.0)
+                await asyncio.sleep(self.retrain_interval_seconds)
+                await self.retrain_pattern_model()
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Batch processing error: {e}")
-                await asyncio.sleep(5.0)
+                logger.error(f"Pattern model training error: {e}")
+    
+    async def retrain_pattern_model(self) -> Optional[ModelArtifact]:
+        """
+        Train a pattern model on a snapshot of expert decisions
+        
+        Uses the decision learner's buffer when it is running, and reads the
+        event store otherwise.
+        
+        Returns:
+            The new artifact, or None if there was too little data
+        """
+        if self.event_store is None:
+            return None
+        
+        if self.decision_learner is not None and self.decision_learner.get_stats()['running']:
+            examples = self.decision_learner.training_snapshot()
+        else:
+            examples = await snapshot_expert_decisions(
+                self.event_store, self.pattern_cache.feature_extractor.extract_text_features
+            )
+        return await self.training_worker.train(examples)
+    
+    async def _on_model_artifact(self, artifact: ModelArtifact):
+        """Training worker notification: shadow-evaluate and maybe swap in the new model"""
+        await self.pattern_cache.load_model_artifact(artifact)
     
     def _create_rate_limit_result(self, request: ValidationRequest) -> ValidationResult:
         """Create rate limit exceeded result"""
@@ -597,7 +889,18 @@ class OptimizedSpeedLayerDispatcher:
                 'policy': self.policy_cache.get_stats(),
                 'pattern': self.pattern_cache.get_stats()
             },
-            'hot_patterns': len(self._hot_request_patterns),
+            'hot_patterns': len(self.hot_cache),
+            'hot_cache': self.hot_cache.get_stats(),
+            'in_flight_requests': len(self._in_flight),
+            'coalesced_requests': self.metrics.coalesced_requests,
+            'pattern_batching': {
+                'batches': self._pattern_batches,
+                'avg_batch_size': self._pattern_batched_requests / self._pattern_batches if self._pattern_batches else 0,
+                'queued': self._pattern_batch_queue.qsize()
+            },
+            'model_training': self.training_worker.get_stats(),
+            'learning': self.decision_learner.get_stats() if self.decision_learner else None,
+            'expert_escalation_rate': self.metrics.expert_escalations / max(self.metrics.total_requests, 1),
             'adaptive_throttling': self._adaptive_throttling,
             'optimization_suggestions': self.profiler.get_optimization_suggestions()
         }
@@ -6,96 +6,27 @@ Uses async locks, pre-allocated structures, and optimized algorithms.
 
 Performance Optimizations:
 - Async locks instead of threading locks
-- FastHash instead of MD5 for Bloom filter  
+- Counting Bloom filter tracking resident keys (evicted and expired keys are
+  removed), bypassed if it ever saturates
 - Pre-allocated circular buffers
 - Lock-free hot path for common cases
+- Entries tagged with the policy rule set version they were decided under,
+  read as misses once the rules change
 - Batch operations for reduced lock contention
 """
 
 import asyncio
-import hashlib
 import logging
 import time
-try:
-    import xxhash
-    HAS_XXHASH = True
-except ImportError:
-    HAS_XXHASH = False
 from collections import OrderedDict, deque
 from typing import Dict, List, Optional, Set, Tuple
 
+from .bloom_filter import CountingBloomFilter
 from .models import CacheEntry, ValidationRequest, ValidationResult
 
 logger = logging.getLogger(__name__)
 
 
-class FastBloomFilter:
-    """Optimized Bloom filter using xxHash for speed"""
-    
-    def __init__(self, capacity: int = 10000, error_rate: float = 0.01):
-        import math
-        
-        self.capacity = capacity
-        self.error_rate = error_rate
-        
-        # Calculate optimal bit array size and number of hash functions
-        self.bit_array_size = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
-        self.hash_count = min(int(self.bit_array_size * math.log(2) / capacity), 8)  # Cap at 8 hashes
-        
-        # Use bitarray for memory efficiency (fallback to set if not available)
-        try:
-            import bitarray
-            self.bit_array = bitarray.bitarray(self.bit_array_size)
-            self.bit_array.setall(0)
-            self._use_bitarray = True
-        except ImportError:
-            self.bit_array = set()
-            self._use_bitarray = False
-        
-        self.item_count = 0
-    
-    def _fast_hash(self, item: str, seed: int) -> int:
-        """Fast hash using xxHash (falls back to builtin hash)"""
-        if HAS_XXHASH:
-            try:
-                return xxhash.xxh32(item.encode(), seed=seed).intdigest() % self.bit_array_size
-            except:
-                pass
-        
-        # Fallback to Python's builtin hash
-        return hash(f"{item}:{seed}") % self.bit_array_size
-    
-    def add(self, item: str):
-        """Add item to Bloom filter"""
-        for i in range(self.hash_count):
-            hash_value = self._fast_hash(item, i)
-            if self._use_bitarray:
-                self.bit_array[hash_value] = 1
-            else:
-                self.bit_array.add(hash_value)
-        self.item_count += 1
-    
-    def might_contain(self, item: str) -> bool:
-        """Check if item might be in the set (no false negatives)"""
-        for i in range(self.hash_count):
-            hash_value = self._fast_hash(item, i)
-            if self._use_bitarray:
-                if not self.bit_array[hash_value]:
-                    return False
-            else:
-                if hash_value not in self.bit_array:
-                    return False
-        return True
-    
-    def clear(self):
-        """Clear the Bloom filter"""
-        if self._use_bitarray:
-            self.bit_array.setall(0)
-        else:
-            self.bit_array.clear()
-        self.item_count = 0
-
-
 class OptimizedMemoryCache:
     """Ultra-fast memory cache optimized for <1ms response times"""
     
@@ -116,15 +47,18 @@ class OptimizedMemoryCache:
         self._read_lock = asyncio.Lock()  # Async lock for concurrent reads
         self._write_lock = asyncio.Lock()  # Separate write lock to minimize contention
         
-        # Optimized Bloom filter
-        self._bloom_filter = FastBloomFilter(capacity=max_size * 2)
+        # Counting Bloom filter over resident keys
+        self._bloom_filter = CountingBloomFilter(capacity=max_size * 2)
         
         # Pre-allocated statistics (lock-free atomic operations)
         self._stats = {
             'hits': 0,
             'misses': 0, 
             'evictions': 0,
-            'hot_promotions': 0
+            'hot_promotions': 0,
+            'bloom_rejections': 0,
+            'bloom_bypasses': 0,
+            'stale_rule_set': 0
         }
         
         # Batch operations queue for reducing lock contention
@@ -135,23 +69,35 @@ class OptimizedMemoryCache:
         self._last_cleanup_time = time.time()
         self._cleanup_interval = 60.0  # seconds
     
-    async def get(self, command_hash: str) -> Optional[ValidationResult]:
+    async def get(self, command_hash: str, rule_set_version: Optional[int] = None) -> Optional[ValidationResult]:
         """
         Ultra-fast cache get with <1ms target
         
+        With rule_set_version, only entries decided under that policy rule
+        set are returned; entries from other rule sets are dropped.
+        
         Optimizations:
         - Fast negative lookup with optimized Bloom filter
         - Hot cache check without locks
         - Minimal lock contention
         """
         # Ultra-fast negative lookup - no locks needed
-        if not self._bloom_filter.might_contain(command_hash):
+        if self._bloom_filter.is_saturated:
+            self._stats['bloom_bypasses'] += 1
+        elif not self._bloom_filter.might_contain(command_hash):
+            self._stats['bloom_rejections'] += 1
             self._stats['misses'] += 1
             return None
         
         # Check hot entries first (lock-free for performance)
         if command_hash in self._hot_entries:
             entry = self._hot_entries[command_hash]
+            if not self._is_current(entry, rule_set_version):
+                del self._hot_entries[command_hash]
+                self._forget(command_hash)
+                self._stats['stale_rule_set'] += 1
+                self._stats['misses'] += 1
+                return None
             if not entry.is_expired:
                 self._stats['hits'] += 1
                 return entry.access()
@@ -164,7 +110,12 @@ class OptimizedMemoryCache:
             if command_hash in self._cache:
                 entry = self._cache[command_hash]
                 
-                # Quick expiration check
+                # Quick expiration and rule set check
+                if not self._is_current(entry, rule_set_version):
+                    self._batch_queue.append(('remove', command_hash))
+                    self._stats['stale_rule_set'] += 1
+                    self._stats['misses'] += 1
+                    return None
                 if entry.is_expired:
                     # Queue removal for batch processing
                     self._batch_queue.append(('remove', command_hash))
@@ -187,25 +138,35 @@ class OptimizedMemoryCache:
         self._stats['misses'] += 1
         return None
     
-    async def set(self, command_hash: str, result: ValidationResult, ttl_seconds: int = 300):
+    async def set(self, command_hash: str, result: ValidationResult, ttl_seconds: int = 300,
+                  rule_set_version: Optional[int] = None):
         """
         Fast cache set with batched operations
+        
+        Args:
+            command_hash: Cache key
+            result: Decision to cache
+            ttl_seconds: Entry lifetime
+            rule_set_version: Policy rule set the decision was made under
         """
         entry = CacheEntry(
             result=result,
             created_at=time.time(),
-            ttl_seconds=ttl_seconds
+            ttl_seconds=ttl_seconds,
+            rule_set_version=rule_set_version
         )
         
-        # Add to Bloom filter immediately (no lock needed)
-        self._bloom_filter.add(command_hash)
-        
         # Use minimal locking with batch processing
         async with self._write_lock:
+            # Each resident key is counted in the Bloom filter once
+            if command_hash not in self._cache and command_hash not in self._hot_entries:
+                self._bloom_filter.add(command_hash)
+            
             # Fast eviction check
-            if len(self._cache) >= self.max_size:
+            if len(self._cache) >= self.max_size and command_hash not in self._cache:
                 # Remove oldest entry
                 oldest_key, oldest_entry = self._cache.popitem(last=False)
+                self._forget(oldest_key)
                 self._stats['evictions'] += 1
             
             # Add new entry
@@ -215,10 +176,20 @@ class OptimizedMemoryCache:
         if self._batch_task is None or self._batch_task.done():
             self._batch_task = asyncio.create_task(self._process_batch_operations())
     
+    @staticmethod
+    def _is_current(entry: CacheEntry, rule_set_version: Optional[int]) -> bool:
+        return rule_set_version is None or entry.rule_set_version == rule_set_version
+    
+    def _forget(self, command_hash: str):
+        """Drop a removed key from the Bloom filter once it is no longer resident"""
+        if command_hash not in self._cache and command_hash not in self._hot_entries:
+            self._bloom_filter.remove(command_hash)
+    
     async def _remove_expired_hot_entry(self, command_hash: str):
         """Remove expired hot entry asynchronously"""
         if command_hash in self._hot_entries:
             del self._hot_entries[command_hash]
+            self._forget(command_hash)
     
     async def _process_batch_operations(self):
         """Process batched operations to reduce lock contention"""
@@ -241,6 +212,7 @@ class OptimizedMemoryCache:
                         command_hash = operation[1]
                         if command_hash in self._cache:
                             del self._cache[command_hash]
+                            self._forget(command_hash)
                     
                     elif operation[0] == 'promote':
                         command_hash, entry = operation[1], operation[2]
@@ -283,8 +255,10 @@ class OptimizedMemoryCache:
                 if expired_keys:
                     async with self._write_lock:
                         for key in expired_keys:
-                            self._cache.pop(key, None)
-                            self._hot_entries.pop(key, None)
+                            removed = self._cache.pop(key, None) is not None
+                            removed = self._hot_entries.pop(key, None) is not None or removed
+                            if removed:
+                                self._forget(key)
                     
                     logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
                 
@@ -311,7 +285,11 @@ class OptimizedMemoryCache:
             'misses': self._stats['misses'],
             'evictions': self._stats['evictions'],
             'hot_promotions': self._stats['hot_promotions'],
-            'bloom_filter_size': self._bloom_filter.item_count
+            'bloom_filter_size': self._bloom_filter.item_count,
+            'bloom_filter_fill_ratio': self._bloom_filter.fill_ratio,
+            'bloom_rejections': self._stats['bloom_rejections'],
+            'bloom_bypasses': self._stats['bloom_bypasses'],
+            'stale_rule_set': self._stats['stale_rule_set']
         }
     
     def clear(self):
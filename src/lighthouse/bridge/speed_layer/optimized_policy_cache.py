@@ -6,23 +6,35 @@ Uses compiled rule trie, vectorized pattern matching, and pre-computed decisions
 
 Performance Optimizations:
 - Rule compilation into decision tree/trie structure
-- Vectorized regex matching with pre-compiled patterns
-- Hot rule caching and statistical optimization
+- One combined matcher per tool: a single literal prefilter scan over the
+  command, then confirmation regexes only for rules whose literals occur
+- Precomputed priority order, swapped atomically on rule reload
+- Versioned rule sets: the rule file is watched (inotify, or polling) and
+  recompiled in a worker thread, then swapped in without a restart
+- Hot rule statistics
 - Parallel rule evaluation for independent rules
-- Decision memoization based on request fingerprints
+- Decision memoization based on request fingerprints; a reload drops only
+  decisions made by changed rules or ones a changed rule may now outrank
 """
 
 import asyncio
+import hashlib
 import logging
 import re
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple, Union
 import json
 from pathlib import Path
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 from .models import PolicyRule, ValidationRequest, ValidationResult, ValidationDecision, ValidationConfidence
+from .rule_watcher import RuleFileWatcher
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +59,159 @@ class CompiledRule:
     last_matched: float = 0.0
 
 
+# Shortest literal worth prefiltering on
+MIN_PREFILTER_LITERAL = 2
+
+_REPEAT_OPS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+if hasattr(sre_parse, 'POSSESSIVE_REPEAT'):
+    _REPEAT_OPS.add(sre_parse.POSSESSIVE_REPEAT)
+
+
+def extract_required_literals(pattern: re.Pattern) -> Optional[FrozenSet[str]]:
+    """
+    Find literals at least one of which occurs in every match of a regex
+    
+    Literals are lower-cased ASCII strings. Returns None when no useful set
+    can be derived (e.g. `.*`); such rules must always be confirmed.
+    """
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    return _required_literals(list(parsed))
+
+
+def _literal_set_quality(literals: Optional[FrozenSet[str]]) -> int:
+    return min(len(literal) for literal in literals) if literals else 0
+
+
+def _required_literals(items: List) -> Optional[FrozenSet[str]]:
+    """Best required-literal set for a parsed regex sequence"""
+    best: Optional[FrozenSet[str]] = None
+    run: List[str] = []
+    
+    def consider(candidate: Optional[FrozenSet[str]]):
+        nonlocal best
+        if (_literal_set_quality(candidate) >= MIN_PREFILTER_LITERAL and
+                _literal_set_quality(candidate) > _literal_set_quality(best)):
+            best = candidate
+    
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if op is sre_parse.AT:
+            continue  # Zero-width anchors keep literals on both sides adjacent
+        
+        if run:
+            consider(frozenset([''.join(run)]))
+            run = []
+        
+        if op is sre_parse.SUBPATTERN:
+            consider(_required_literals(list(av[-1])))
+        elif op is sre_parse.BRANCH:
+            branches = [_required_literals(list(branch)) for branch in av[1]]
+            if all(branches):
+                consider(frozenset().union(*branches))
+        elif op in _REPEAT_OPS and av[0] >= 1:
+            consider(_required_literals(list(av[2])))
+        elif op is getattr(sre_parse, 'ATOMIC_GROUP', None):
+            consider(_required_literals(list(av)))
+    
+    if run:
+        consider(frozenset([''.join(run)]))
+    return best
+
+
+class MultiRuleMatcher:
+    """
+    Combined matcher for all rules applicable to one tool
+    
+    Each rule's regex is reduced to a set of required literals. One scan
+    with a lookahead alternation of every literal (longest first) finds the
+    longest literal starting at each position of the command; literals
+    that are prefixes of it are implied. Only rules with a literal present,
+    plus rules without a usable literal, are confirmed with their own regex.
+    The result is every matching rule in precomputed priority order.
+    """
+    
+    def __init__(self, rules: Sequence['CompiledRule']):
+        # Stable sort keeps load order among rules of equal priority
+        self.rules: List['CompiledRule'] = sorted(rules, key=lambda r: r.priority, reverse=True)
+        self.rule_ids: List[str] = [rule.rule_id for rule in self.rules]
+        
+        literal_ranks: Dict[str, Set[int]] = defaultdict(set)
+        always: List[int] = []
+        for rank, rule in enumerate(self.rules):
+            literals = (extract_required_literals(rule.compiled_pattern)
+                        if rule.compiled_pattern is not None else None)
+            if literals:
+                for literal in literals:
+                    literal_ranks[literal].add(rank)
+            else:
+                always.append(rank)
+        
+        self._always: FrozenSet[int] = frozenset(always)
+        
+        # A found literal implies every literal that is a prefix of it
+        self._implied: Dict[str, FrozenSet[int]] = {
+            literal: frozenset().union(*(
+                ranks for other, ranks in literal_ranks.items() if literal.startswith(other)
+            ))
+            for literal in literal_ranks
+        }
+        
+        self._scanner: Optional[re.Pattern] = None
+        if literal_ranks:
+            alternation = '|'.join(
+                re.escape(literal) for literal in sorted(literal_ranks, key=len, reverse=True)
+            )
+            self._scanner = re.compile(f'(?=({alternation}))')
+    
+    @property
+    def prefiltered_rules(self) -> int:
+        return len(self.rules) - len(self._always)
+    
+    def candidate_ranks(self, text: str) -> List[int]:
+        """Ranks of rules that may match the text, in priority order"""
+        if self._scanner is None:
+            return sorted(self._always)
+        
+        # Case-insensitive rules can match non-ASCII characters that fold to
+        # ASCII letters; only prefilter text where lower() is exact
+        if not text.isascii():
+            return list(range(len(self.rules)))
+        
+        candidates = set(self._always)
+        implied = self._implied
+        for found in set(self._scanner.findall(text.lower())):
+            candidates |= implied[found]
+        return sorted(candidates)
+    
+    def match(self, text: str, agent_id: str, first_only: bool = False) -> List['CompiledRule']:
+        """
+        Rules matching a command and agent, highest priority first
+        
+        Args:
+            text: Command text
+            agent_id: Requesting agent, checked against agent patterns
+            first_only: Stop after the highest-priority match
+        """
+        matches = []
+        rules = self.rules
+        for rank in self.candidate_ranks(text):
+            rule = rules[rank]
+            if rule.agent_patterns_compiled and not any(
+                    pattern.search(agent_id) for pattern in rule.agent_patterns_compiled):
+                continue
+            if rule.compiled_pattern is not None and not rule.compiled_pattern.search(text):
+                continue
+            matches.append(rule)
+            if first_only:
+                break
+        return matches
+
+
 class RuleTrie:
     """
     Optimized trie structure for fast rule matching
@@ -58,8 +223,11 @@ class RuleTrie:
         self.global_rules: List[CompiledRule] = []  # Rules that apply to all tools
         self.hot_rules: Dict[str, CompiledRule] = {}  # Frequently matched rules
         
-        # Performance optimization: pre-sorted by priority
-        self._rules_sorted = False
+        # Combined matchers per tool (None: tools without specific rules),
+        # built by compile()
+        self._matchers: Dict[Optional[str], MultiRuleMatcher] = {}
+        self._compiled = False
+        self.has_agent_scoped_rules = False
     
     def add_rule(self, compiled_rule: CompiledRule):
         """Add compiled rule to trie structure"""
@@ -71,36 +239,54 @@ class RuleTrie:
             # Global rule applies to all tools
             self.global_rules.append(compiled_rule)
         
-        self._rules_sorted = False
+        self._compiled = False
+    
+    def compile(self):
+        """Build the combined matcher for every tool (and for unlisted tools)"""
+        self._matchers = {
+            tool_name: MultiRuleMatcher(tool_rules + self.global_rules)
+            for tool_name, tool_rules in self.tool_rules.items()
+        }
+        self._matchers[None] = MultiRuleMatcher(self.global_rules)
+        self.has_agent_scoped_rules = any(
+            rule.agent_patterns_compiled for rule in self.all_rules()
+        )
+        self._compiled = True
+    
+    def matcher_for(self, tool_name: str) -> MultiRuleMatcher:
+        """Combined matcher for a tool's tool-specific and global rules"""
+        if not self._compiled:
+            self.compile()
+        matcher = self._matchers.get(tool_name)
+        return matcher if matcher is not None else self._matchers[None]
     
     def get_applicable_rules(self, tool_name: str) -> List[CompiledRule]:
-        """Get rules applicable to a specific tool (O(1) + rule count)"""
-        if not self._rules_sorted:
-            self._sort_rules_by_priority()
-        
-        # Combine tool-specific and global rules
-        applicable_rules = []
-        
-        # Add tool-specific rules
-        if tool_name in self.tool_rules:
-            applicable_rules.extend(self.tool_rules[tool_name])
-        
-        # Add global rules
-        applicable_rules.extend(self.global_rules)
-        
-        # Hot rules first (if any match)
-        hot_applicable = [rule for rule in self.hot_rules.values() 
-                         if not rule.tool_names_set or tool_name in rule.tool_names_set]
-        
-        return hot_applicable + applicable_rules
+        """Get rules applicable to a specific tool, highest priority first"""
+        return self.matcher_for(tool_name).rules
+    
+    def match(self, tool_name: str, text: str, agent_id: str,
+              first_only: bool = False) -> List[CompiledRule]:
+        """All rules matching a request, highest priority first"""
+        return self.matcher_for(tool_name).match(text, agent_id, first_only)
     
-    def _sort_rules_by_priority(self):
-        """Sort all rules by priority for optimal evaluation order"""
+    def all_rules(self) -> List[CompiledRule]:
+        """Every rule in the trie once, in load order within each tool"""
+        seen: Dict[int, CompiledRule] = {}
         for tool_rules in self.tool_rules.values():
-            tool_rules.sort(key=lambda r: r.priority, reverse=True)
-        
-        self.global_rules.sort(key=lambda r: r.priority, reverse=True)
-        self._rules_sorted = True
+            for rule in tool_rules:
+                seen.setdefault(id(rule), rule)
+        for rule in self.global_rules:
+            seen.setdefault(id(rule), rule)
+        return list(seen.values())
+    
+    def get_matcher_stats(self) -> Dict[str, Dict[str, int]]:
+        """Rule and prefiltered rule counts per tool matcher ('*' for other tools)"""
+        if not self._compiled:
+            self.compile()
+        return {
+            tool_name or '*': {'rules': len(matcher.rules), 'prefiltered': matcher.prefiltered_rules}
+            for tool_name, matcher in self._matchers.items()
+        }
     
     def update_hot_rules(self):
         """Update hot rules cache based on usage statistics"""
@@ -131,21 +317,50 @@ class RuleTrie:
         }
 
 
+def rule_digest(rule_data: Dict) -> str:
+    """Stable digest of a rule definition, used to detect changed rules"""
+    canonical = json.dumps(rule_data, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+@dataclass
+class CompiledRuleSet:
+    """A compiled rule trie ready to be swapped in"""
+    rule_trie: RuleTrie
+    digests: Dict[str, str]  # rule_id -> definition digest
+    compile_ms: float
+
+
 class OptimizedPolicyCache:
     """Ultra-fast policy engine cache with <5ms response times"""
     
-    def __init__(self, rule_config_path: Optional[str] = None):
+    def __init__(self, rule_config_path: Optional[str] = None, watch_rule_file: bool = True):
         """
         Initialize optimized policy cache
         
         Args:
             rule_config_path: Path to policy rule configuration
+            watch_rule_file: Reload the rule set when the configuration file changes
         """
         self.rule_trie = RuleTrie()
         self.rule_config_path = rule_config_path
+        self.watch_rule_file = watch_rule_file
+        
+        # Versioned rule set; the version increases with every swap
+        self.rule_set_version = 0
+        self._rule_digests: Dict[str, str] = {}
+        self._watcher: Optional[RuleFileWatcher] = None
+        self._rule_set_stats = {
+            'reloads': 0,
+            'reload_failures': 0,
+            'last_compile_ms': 0.0,
+            'last_swap_ms': 0.0,
+            'memo_invalidations': 0,
+            'last_swapped': None
+        }
         
-        # Memoization cache for request fingerprints
-        self._decision_memo: Dict[str, Tuple[ValidationResult, float]] = {}
+        # Memoization cache for request fingerprints: (result, time, producing rule)
+        self._decision_memo: Dict[str, Tuple[ValidationResult, float, CompiledRule]] = {}
         self._memo_max_size = 1000
         self._memo_ttl = 300  # 5 minutes
         
@@ -171,79 +386,58 @@ class OptimizedPolicyCache:
         # Fast path: Check memoized decisions
         request_fingerprint = self._get_request_fingerprint(request)
         if request_fingerprint in self._decision_memo:
-            cached_result, cache_time = self._decision_memo[request_fingerprint]
+            cached_result, cache_time, _ = self._decision_memo[request_fingerprint]
             if time.time() - cache_time < self._memo_ttl:
                 return cached_result
             else:
                 # Remove expired memoized result
                 del self._decision_memo[request_fingerprint]
         
-        # Get applicable rules (O(1) lookup by tool)
-        applicable_rules = self.rule_trie.get_applicable_rules(request.tool_name)
-        
-        if not applicable_rules:
-            return None
-        
-        # Vectorized evaluation of applicable rules
-        for rule in applicable_rules:
-            eval_start = time.time()
-            
-            if await self._rule_matches_fast(rule, request):
-                # Create result
-                result = ValidationResult(
-                    decision=rule.decision,
-                    confidence=rule.confidence,
-                    reason=f"Policy rule {rule.rule_id}: {rule.reason}",
-                    request_id=request.request_id,
-                    processing_time_ms=1.0,
-                    cache_layer="policy"
-                )
-                
-                # Update rule statistics
-                eval_time_ms = (time.time() - eval_start) * 1000
-                rule.match_count += 1
-                rule.last_matched = time.time()
-                rule.avg_eval_time_ms = (
-                    (rule.avg_eval_time_ms * (rule.match_count - 1) + eval_time_ms) / 
-                    rule.match_count
-                )
-                
-                # Memoize result for future requests
-                if len(self._decision_memo) < self._memo_max_size:
-                    self._decision_memo[request_fingerprint] = (result, time.time())
-                
-                # Record evaluation time
-                total_time_ms = (time.time() - start_time) * 1000
-                self._eval_times.append(total_time_ms)
-                
-                logger.debug(f"Rule {rule.rule_id} matched in {total_time_ms:.2f}ms")
-                return result
+        # Highest-priority matching rule from the tool's combined matcher
+        matches = self.rule_trie.match(
+            request.tool_name, request.command_text, request.agent_id, first_only=True
+        )
         
-        # No rules matched
         total_time_ms = (time.time() - start_time) * 1000
         self._eval_times.append(total_time_ms)
         
-        return None
-    
-    async def _rule_matches_fast(self, rule: CompiledRule, request: ValidationRequest) -> bool:
-        """
-        Optimized rule matching with minimal overhead
-        """
-        # Fast agent pattern check
-        if rule.agent_patterns_compiled:
-            agent_match = any(
-                pattern.search(request.agent_id) 
-                for pattern in rule.agent_patterns_compiled
-            )
-            if not agent_match:
-                return False
+        if not matches:
+            return None
         
-        # Fast pattern matching
-        if rule.compiled_pattern:
-            text_to_match = request.command_text
-            return bool(rule.compiled_pattern.search(text_to_match))
+        rule = matches[0]
+        result = ValidationResult(
+            decision=rule.decision,
+            confidence=rule.confidence,
+            reason=f"Policy rule {rule.rule_id}: {rule.reason}",
+            request_id=request.request_id,
+            processing_time_ms=1.0,
+            cache_layer="policy"
+        )
         
-        return True
+        # Update rule statistics
+        rule.match_count += 1
+        rule.last_matched = time.time()
+        rule.avg_eval_time_ms = (
+            (rule.avg_eval_time_ms * (rule.match_count - 1) + total_time_ms) / 
+            rule.match_count
+        )
+        
+        # Memoize result for future requests
+        if len(self._decision_memo) < self._memo_max_size:
+            self._decision_memo[request_fingerprint] = (result, time.time(), rule)
+        
+        logger.debug(f"Rule {rule.rule_id} matched in {total_time_ms:.2f}ms")
+        return result
+    
+    @property
+    def decisions_depend_on_agent(self) -> bool:
+        """True if some rule applies only to certain agents"""
+        return self.rule_trie.has_agent_scoped_rules
+    
+    def match_rule_ids(self, request: ValidationRequest) -> List[str]:
+        """IDs of all rules matching a request, highest priority first"""
+        matches = self.rule_trie.match(request.tool_name, request.command_text, request.agent_id)
+        return [rule.rule_id for rule in matches]
     
     def _get_request_fingerprint(self, request: ValidationRequest) -> str:
         """Generate fast fingerprint for request memoization"""
@@ -251,26 +445,62 @@ class OptimizedPolicyCache:
         return f"{request.tool_name}:{request.agent_id[:8]}:{request.command_hash[:8]}"
     
     async def _load_rules(self):
-        """Load and compile rules from configuration"""
-        if not self.rule_config_path or not Path(self.rule_config_path).exists():
+        """Load and compile rules from configuration, then watch it for changes"""
+        if (not self.rule_config_path or not Path(self.rule_config_path).exists() or
+                not await self.reload_rules()):
             await self._load_default_rules()
-            return
         
-        try:
-            async with self._compilation_lock:
-                with open(self.rule_config_path, 'r') as f:
-                    config = json.load(f)
-                
-                for rule_data in config.get('rules', []):
-                    compiled_rule = self._compile_rule(rule_data)
-                    if compiled_rule:
-                        self.rule_trie.add_rule(compiled_rule)
-                
-                logger.info(f"Loaded {len(config.get('rules', []))} policy rules")
+        if self.rule_config_path and self.watch_rule_file:
+            await self.start_watching()
+    
+    async def reload_rules(self) -> bool:
+        """
+        Re-read the rule file, compile it off the event loop and swap it in
         
-        except Exception as e:
-            logger.error(f"Failed to load rules from {self.rule_config_path}: {e}")
-            await self._load_default_rules()
+        The current rule set stays active if the file cannot be read.
+        
+        Returns:
+            True if a new rule set was installed
+        """
+        async with self._compilation_lock:
+            try:
+                rules_data = await asyncio.to_thread(self._read_rule_file)
+                rule_set = await asyncio.to_thread(self._compile_rule_set, rules_data)
+            except Exception as e:
+                self._rule_set_stats['reload_failures'] += 1
+                logger.error(f"Failed to load rules from {self.rule_config_path}: {e}")
+                return False
+            
+            invalidated = self._swap_rule_set(rule_set)
+        
+        logger.info(
+            f"Loaded {len(rules_data)} policy rules as rule set v{self.rule_set_version} "
+            f"(compile {rule_set.compile_ms:.1f}ms, {invalidated} memoized decisions dropped)"
+        )
+        return True
+    
+    def _read_rule_file(self) -> List[Dict]:
+        with open(self.rule_config_path, 'r') as f:
+            config = json.load(f)
+        rules_data = config.get('rules', [])
+        if not isinstance(rules_data, list):
+            raise ValueError("'rules' must be a list")
+        return rules_data
+    
+    async def start_watching(self):
+        """Start reloading the rule set whenever the rule file changes"""
+        if self._watcher is None and self.rule_config_path:
+            if not Path(self.rule_config_path).parent.exists():
+                logger.warning(f"Not watching {self.rule_config_path}: directory does not exist")
+                return
+            self._watcher = RuleFileWatcher(self.rule_config_path, self.reload_rules)
+            await self._watcher.start()
+    
+    async def stop_watching(self):
+        """Stop the rule file watcher"""
+        if self._watcher is not None:
+            await self._watcher.stop()
+            self._watcher = None
     
     async def _load_default_rules(self):
         """Load default security rules for fast startup"""
@@ -303,13 +533,101 @@ class OptimizedPolicyCache:
         ]
         
         async with self._compilation_lock:
-            for rule_data in default_rules:
-                compiled_rule = self._compile_rule(rule_data)
-                if compiled_rule:
-                    self.rule_trie.add_rule(compiled_rule)
+            self._install_rules(default_rules)
         
         logger.info(f"Loaded {len(default_rules)} default policy rules")
     
+    def _install_rules(self, rules_data: List[Dict]):
+        """Compile a rule set on the calling thread and swap it in"""
+        self._swap_rule_set(self._compile_rule_set(rules_data))
+    
+    def _compile_rule_set(self, rules_data: List[Dict]) -> CompiledRuleSet:
+        """Compile rules into a new trie; safe to run in a worker thread"""
+        start_time = time.perf_counter()
+        
+        rule_trie = RuleTrie()
+        digests = {}
+        for rule_data in rules_data:
+            compiled_rule = self._compile_rule(rule_data)
+            if compiled_rule:
+                rule_trie.add_rule(compiled_rule)
+                digests[compiled_rule.rule_id] = rule_digest(rule_data)
+        rule_trie.compile()
+        
+        return CompiledRuleSet(
+            rule_trie=rule_trie,
+            digests=digests,
+            compile_ms=(time.perf_counter() - start_time) * 1000
+        )
+    
+    def _swap_rule_set(self, rule_set: CompiledRuleSet) -> int:
+        """
+        Swap in a compiled rule set and drop memoized decisions it affects
+        
+        Runs without awaiting, so evaluations see either the old trie and
+        memo or the new trie with the affected decisions already gone.
+        Evaluations in flight keep using the trie they started with.
+        
+        Returns:
+            Number of memoized decisions invalidated
+        """
+        start_time = time.perf_counter()
+        
+        old_digests = self._rule_digests
+        changed_ids = {
+            rule_id for rule_id in old_digests.keys() | rule_set.digests.keys()
+            if old_digests.get(rule_id) != rule_set.digests.get(rule_id)
+        }
+        
+        self.rule_trie = rule_set.rule_trie
+        self._rule_digests = rule_set.digests
+        self.rule_set_version += 1
+        invalidated = self._invalidate_memo(changed_ids, rule_set.rule_trie)
+        
+        stats = self._rule_set_stats
+        stats['reloads'] += 1
+        stats['last_compile_ms'] = rule_set.compile_ms
+        stats['last_swap_ms'] = (time.perf_counter() - start_time) * 1000
+        stats['memo_invalidations'] += invalidated
+        stats['last_swapped'] = time.time()
+        return invalidated
+    
+    def _invalidate_memo(self, changed_ids: Set[str], rule_trie: RuleTrie) -> int:
+        """
+        Drop memoized decisions a rule set change may have altered
+        
+        A decision is stale if the rule that made it was changed or removed,
+        or if a new or changed rule applicable to the same tool has equal or
+        higher priority and could now match first. Decisions made by
+        unchanged, still-winning rules survive the reload.
+        """
+        if not changed_ids or not self._decision_memo:
+            return 0
+        
+        changed_rules = [rule for rule in rule_trie.all_rules() if rule.rule_id in changed_ids]
+        outranking_priority: Dict[str, Optional[int]] = {}
+        
+        stale = []
+        for key, (_, _, rule) in self._decision_memo.items():
+            if rule.rule_id in changed_ids:
+                stale.append(key)
+                continue
+            
+            tool_name = key.split(':', 1)[0]
+            if tool_name not in outranking_priority:
+                outranking_priority[tool_name] = max(
+                    (changed.priority for changed in changed_rules
+                     if not changed.tool_names_set or tool_name in changed.tool_names_set),
+                    default=None
+                )
+            threshold = outranking_priority[tool_name]
+            if threshold is not None and threshold >= rule.priority:
+                stale.append(key)
+        
+        for key in stale:
+            del self._decision_memo[key]
+        return len(stale)
+    
     def _compile_rule(self, rule_data: Dict) -> Optional[CompiledRule]:
         """Compile a rule for fast evaluation"""
         try:
@@ -372,7 +690,7 @@ class OptimizedPolicyCache:
                 
                 # Clean up old memoized decisions
                 expired_keys = []
-                for key, (_, cache_time) in self._decision_memo.items():
+                for key, (_, cache_time, _) in self._decision_memo.items():
                     if current_time - cache_time > self._memo_ttl:
                         expired_keys.append(key)
                 
@@ -402,6 +720,12 @@ class OptimizedPolicyCache:
         
         return {
             'total_rules': total_rules,
+            'matchers': self.rule_trie.get_matcher_stats(),
+            'rule_set': {
+                'version': self.rule_set_version,
+                **self._rule_set_stats,
+                'watcher': self._watcher.get_stats() if self._watcher else None
+            },
             'hot_rules': len(self.rule_trie.hot_rules),
             'memoized_decisions': len(self._decision_memo),
             'avg_eval_time_ms': avg_eval_time,
@@ -8,7 +8,7 @@ Features:
 - Pre-trained models for command classification
 - Feature extraction from request context
 - Confidence-based decision making  
-- Online learning from expert decisions
+- Online learning from expert decisions, trained off the event loop
 - Model versioning and rollback
 """
 
@@ -33,8 +33,6 @@ try:
     from sklearn.feature_extraction.text import TfidfVectorizer
     from sklearn.linear_model import SGDClassifier
     from sklearn.pipeline import Pipeline
-    from sklearn.model_selection import train_test_split
-    from sklearn.metrics import classification_report
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
@@ -44,6 +42,7 @@ from .models import (
     PatternPrediction, ValidationRequest, ValidationResult,
     ValidationDecision, ValidationConfidence
 )
+from .model_training import ModelTrainingWorker, is_fitted, load_model_file, publish_artifact, shadow_evaluate
 
 
 class FeatureExtractor:
@@ -166,13 +165,24 @@ class SimplePatternClassifier:
 class MLPatternClassifier:
     """Machine learning-based pattern classifier using scikit-learn"""
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None,
+                 training_worker: Optional[ModelTrainingWorker] = None):
         self.feature_extractor = FeatureExtractor()
         self.model_path = model_path
         self.model = None
         self.model_version = "ml_v1.0"
         self.training_data = []
         
+        # Retraining runs in the worker process; artifacts sit next to the model file
+        self.training_worker = training_worker or ModelTrainingWorker(
+            artifact_dir=str(Path(model_path).parent / 'pattern_models') if model_path else None,
+            min_examples=50
+        )
+        self.min_promotion_accuracy = 0.8
+        self.shadow_evaluations = []
+        self._trained_examples = 0
+        self._retraining = False
+        
         # Initialize model pipeline
         if SKLEARN_AVAILABLE:
             self.model = Pipeline([
@@ -198,24 +208,6 @@ class MLPatternClassifier:
         except Exception as e:
             logger.error(f"Failed to load model from {model_path}: {e}")
     
-    def _save_model(self, model_path: str):
-        """Save trained model to disk"""
-        try:
-            model_data = {
-                'model': self.model,
-                'version': self.model_version,
-                'training_samples': len(self.training_data),
-                'saved_at': time.time()
-            }
-            
-            with open(model_path, 'wb') as f:
-                pickle.dump(model_data, f)
-            
-            logger.info(f"Saved ML model to {model_path}")
-            
-        except Exception as e:
-            logger.error(f"Failed to save model to {model_path}: {e}")
-    
     def add_training_example(self, request: ValidationRequest, decision: ValidationDecision):
         """Add training example for online learning"""
         text_features = self.feature_extractor.extract_text_features(request)
@@ -226,33 +218,49 @@ class MLPatternClassifier:
             asyncio.create_task(self._retrain_model())
     
     async def _retrain_model(self):
-        """Retrain model with accumulated examples"""
+        """
+        Retrain model with accumulated examples
+        
+        Fitting and artifact writing happen in the training worker process;
+        the candidate is loaded and shadow-evaluated on worker threads and
+        replaces the serving model only if it is at least as accurate.
+        """
         if not self.training_data or not SKLEARN_AVAILABLE:
             return
+        if self._retraining or len(self.training_data) == self._trained_examples:
+            return
         
+        self._retraining = True
         try:
-            texts, labels = zip(*self.training_data)
+            snapshot = list(self.training_data)
+            artifact = await self.training_worker.train(snapshot)
+            if artifact is None:
+                return
+            self._trained_examples = len(snapshot)
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                texts, labels, test_size=0.2, random_state=42
+            candidate, _ = await asyncio.to_thread(load_model_file, artifact.path)
+            current = self.model if is_fitted(self.model) else None
+            evaluation = await asyncio.to_thread(
+                shadow_evaluate, artifact.version, candidate, current,
+                artifact.holdout_texts, artifact.holdout_labels, self.min_promotion_accuracy
             )
+            self.shadow_evaluations = (self.shadow_evaluations + [evaluation])[-20:]
             
-            # Train model
-            self.model.fit(X_train, y_train)
-            
-            # Evaluate
-            y_pred = self.model.predict(X_test)
-            report = classification_report(y_test, y_pred, output_dict=True)
+            logger.info(f"Model retrained. Shadow accuracy: {evaluation.candidate_accuracy:.3f} ({evaluation.reason})")
+            if not evaluation.promoted:
+                return
             
-            logger.info(f"Model retrained. Accuracy: {report['accuracy']:.3f}")
+            self.model = candidate
+            self.model_version = artifact.model_version
             
-            # Save model if configured
+            # Publish to the configured model path if set
             if self.model_path:
-                self._save_model(self.model_path)
+                await asyncio.to_thread(publish_artifact, artifact.path, self.model_path)
             
         except Exception as e:
             logger.error(f"Model retraining failed: {e}")
+        finally:
+            self._retraining = False
     
     def predict(self, request: ValidationRequest) -> PatternPrediction:
         """Predict using ML model"""
@@ -420,6 +428,8 @@ class MLPatternCache:
         # Add training data stats if available
         if hasattr(self.classifier, 'training_data'):
             stats['training_examples'] = len(self.classifier.training_data)
+        if hasattr(self.classifier, 'shadow_evaluations'):
+            stats['shadow_evaluations'] = [evaluation.to_dict() for evaluation in self.classifier.shadow_evaluations[-5:]]
         
         return stats
     
@@ -0,0 +1,212 @@
+"""
+Rule File Watcher for Speed Layer
+
+Notifies the policy cache when its rule file changes so a new rule set can
+be compiled and swapped in without restarting the bridge.
+
+On Linux the watcher uses inotify through libc on the file's parent
+directory, which also catches editors and deploy tools that replace the
+file by renaming a temporary file over it. Elsewhere, or when inotify is
+unavailable, it falls back to polling the file's mtime, size and inode.
+
+Features:
+- inotify watching (no extra dependencies) with a polling fallback
+- Debouncing of bursts of events from a single write
+- Change callback awaited on the event loop, one reload at a time
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """libc with inotify support, or None on platforms without it"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class RuleFileWatcher:
+    """Watches one file and calls back after it changes"""
+    
+    def __init__(self,
+                 path: str,
+                 on_change: Callable[[], Awaitable[None]],
+                 poll_interval: float = 2.0,
+                 debounce_seconds: float = 0.05,
+                 use_inotify: bool = True):
+        """
+        Initialize rule file watcher
+        
+        Args:
+            path: File to watch
+            on_change: Coroutine function awaited after the file changes
+            poll_interval: Seconds between checks when polling
+            debounce_seconds: Quiet period before a burst of events triggers a reload
+            use_inotify: Try inotify before falling back to polling
+        """
+        self.path = Path(path).resolve()
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce_seconds = debounce_seconds
+        self.use_inotify = use_inotify
+        
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._poll_task: Optional[asyncio.Task] = None
+        self._notify_task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+        
+        # Statistics
+        self.mode = "stopped"
+        self.changes_detected = 0
+        self.callback_errors = 0
+    
+    @property
+    def running(self) -> bool:
+        return self.mode != "stopped"
+    
+    async def start(self):
+        """Start watching; uses inotify when available, polling otherwise"""
+        if self.running:
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        if self.use_inotify and self._start_inotify():
+            self.mode = "inotify"
+        else:
+            self.mode = "polling"
+            self._poll_task = asyncio.create_task(self._poll_loop(self._file_signature()))
+        
+        self._notify_task = asyncio.create_task(self._notify_loop())
+        logger.info(f"Watching rule file {self.path} ({self.mode})")
+    
+    async def stop(self):
+        """Stop watching and release the inotify descriptor"""
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        
+        tasks = [task for task in (self._poll_task, self._notify_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        self._poll_task = None
+        self._notify_task = None
+        self.mode = "stopped"
+    
+    def _start_inotify(self) -> bool:
+        """Register an inotify watch on the parent directory"""
+        libc = _load_libc()
+        if libc is None:
+            return False
+        
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            logger.debug(f"inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+            return False
+        
+        watch = libc.inotify_add_watch(fd, str(self.path.parent).encode(), _WATCH_MASK)
+        if watch < 0:
+            logger.debug(f"inotify_add_watch failed: {os.strerror(ctypes.get_errno())}")
+            os.close(fd)
+            return False
+        
+        self._fd = fd
+        self._loop.add_reader(fd, self._on_readable)
+        return True
+    
+    def _on_readable(self):
+        """Drain inotify events and flag a change if one names the rule file"""
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"Rule file watcher read failed: {e}")
+            return
+        
+        target = self.path.name.encode()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            start = offset + _EVENT_HEADER.size
+            name = data[start:start + name_len].rstrip(b'\0')
+            offset = start + name_len
+            if name == target:
+                self._changed.set()
+    
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    
+    async def _poll_loop(self, last_signature: Optional[Tuple[int, int, int]]):
+        """Fallback: compare the file's stat signature every poll interval"""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            signature = self._file_signature()
+            if signature != last_signature:
+                last_signature = signature
+                self._changed.set()
+    
+    async def _notify_loop(self):
+        """Debounce change flags and await the callback for each settled change"""
+        while True:
+            await self._changed.wait()
+            
+            # Let a burst of events from one write settle into one reload
+            while self._changed.is_set():
+                self._changed.clear()
+                await asyncio.sleep(self.debounce_seconds)
+            
+            if not self.path.exists():
+                continue  # Deleted, or mid-rename; wait for the new file
+            
+            self.changes_detected += 1
+            try:
+                await self.on_change()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.callback_errors += 1
+                logger.error(f"Rule reload after change to {self.path} failed: {e}")
+    
+    def get_stats(self) -> dict:
+        """Get watcher statistics"""
+        return {
+            'path': str(self.path),
+            'mode': self.mode,
+            'changes_detected': self.changes_detected,
+            'callback_errors': self.callback_errors
+        }
@@ -182,6 +182,18 @@ class Event(BaseModel):
             return self.data.get('path') or self.data.get('file_path')
         return None
     
+    def get_file_paths(self) -> List[str]:
+        """Get every path a file operation touches, including both ends of moves and copies"""
+        if not self.is_file_operation():
+            return []
+        
+        paths = []
+        for key in ('path', 'file_path', 'old_path', 'new_path', 'source_path', 'dest_path'):
+            path = self.data.get(key)
+            if path and path not in paths:
+                paths.append(path)
+        return paths
+    
     def to_msgpack(self) -> bytes:
         """Serialize event to MessagePack for storage."""
         data = self.model_dump(exclude_unset=True)
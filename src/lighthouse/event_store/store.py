@@ -1,6 +1,7 @@
 """Core Event Store implementation with append-only logging."""
 
 import asyncio
+import bisect
 import json
 import logging
 import os
@@ -8,11 +9,17 @@ import secrets
 import time
 import hmac
 from pathlib import Path
-from typing import AsyncIterator, Dict, List, Optional, Set
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import gzip
 import hashlib
 from datetime import datetime, timezone
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writers are not guarded
+    fcntl = None
+
 import aiofiles
 import msgpack
 from pydantic import ValidationError
@@ -38,8 +45,29 @@ class EventStoreError(Exception):
     pass
 
 
+class StreamVersionConflict(EventStoreError):
+    """Raised when a compare-and-append finds the aggregate stream has moved on."""
+    
+    def __init__(self, aggregate_id: str, expected_version: int, actual_version: int):
+        super().__init__(
+            f"Stream {aggregate_id} is at version {actual_version}, expected {expected_version}"
+        )
+        self.aggregate_id = aggregate_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+
+
 class EventStore:
-    """High-performance file-based event store with security and atomic guarantees."""
+    """
+    High-performance file-based event store with security and atomic guarantees.
+    
+    Sequences, stream versions and the index live in memory, so a data
+    directory has a single writer: the first append takes an exclusive
+    lock on the directory (held until shutdown), and appends from a store
+    in another process (or another EventStore on the same directory) fail
+    while it is held. Several workers share one instance to write
+    concurrently. Other instances can still read the directory.
+    """
     
     def __init__(self, data_dir: str = "./data/events", 
                  auth_secret: Optional[str] = None,
@@ -80,7 +108,24 @@ class EventStore:
         self.current_log_file = None
         self.current_log_path = None
         self.write_lock = asyncio.Lock()
+        # Exclusive lock on the data directory, taken by the first append
+        self._writer_lock_file = None
+        self._log_snapshot: Tuple[Tuple[str, int], ...] = ()
         self._index: Dict[str, Set[int]] = {}  # Simple in-memory index
+        self._current_log_offset = 0
+        
+        # Aggregate stream versions: sequence of each aggregate's latest event
+        self._stream_versions: Dict[str, int] = {}
+        
+        # Path postings for file events: (aggregate_id, path) -> ascending
+        # sequences, covering both ends of moves and copies
+        self._path_postings: Dict[Tuple[str, str], List[int]] = {}
+        # File event sequence -> (log file name, record offset) and paths touched
+        self._record_locations: Dict[int, Tuple[str, int]] = {}
+        self._sequence_paths: Dict[int, Tuple[str, ...]] = {}
+        # Per-aggregate file event sequences with the running maximum event
+        # time (epoch micros), so a time window maps to a sequence suffix
+        self._file_timeline: Dict[str, Tuple[List[int], List[int]]] = {}
         
         # Performance tracking
         self._append_times = []
@@ -97,6 +142,7 @@ class EventStore:
             await self._recover_state()
             await self._open_current_log_file()
             await self._rebuild_index()
+            self._log_snapshot = self._snapshot_logs()
             self.status = "healthy-secure"  # Indicate security is enabled
         except Exception as e:
             self.status = "failed"
@@ -111,6 +157,7 @@ class EventStore:
                     self.current_log_file = None
                     # Release file handle tracking
                     self.resource_limiter.track_file_handle(increment=False)
+                self._release_writer_lock()
                 self.status = "shutdown"
         except Exception as e:
             raise EventStoreError(f"Failed to shutdown cleanly: {e}")
@@ -151,6 +198,8 @@ class EventStore:
         
         try:
             async with self.write_lock:
+                self._acquire_writer_lock()
+                
                 # Assign sequence number
                 self.current_sequence += 1
                 event.sequence = self.current_sequence
@@ -162,7 +211,9 @@ class EventStore:
                 record = self._create_record(event_data)
                 
                 # Write to current log file
+                location = (self.current_log_path.name, self._current_log_offset)
                 await self.current_log_file.write(record)
+                self._current_log_offset += len(record)
                 
                 # Sync based on policy per ADR-002
                 if self.sync_policy == "fsync":
@@ -173,7 +224,7 @@ class EventStore:
                     os.fdatasync(self.current_log_file.fileno())
                 
                 # Update index
-                self._update_index(event)
+                self._update_index(event, location)
                 
                 # Check if rotation needed
                 await self._check_rotation()
@@ -187,11 +238,21 @@ class EventStore:
             self._error_counts["append"] += 1
             raise EventStoreError(f"Failed to append event: {e}")
     
-    async def append_batch(self, batch: EventBatch, agent_id: Optional[str] = None) -> None:
-        """Atomically append multiple events with security validation per ADR-003."""
+    async def append_batch(self, batch: EventBatch, agent_id: Optional[str] = None,
+                           expected_version: Optional[int] = None) -> None:
+        """
+        Atomically append multiple events with security validation per ADR-003.
+        
+        With expected_version, the batch is only written if its aggregate's
+        stream version still equals it (see compare_and_append).
+        """
         if not batch.events:
             raise EventStoreError("Cannot append empty batch")
         
+        aggregate_id = batch.events[0].aggregate_id
+        if expected_version is not None and any(e.aggregate_id != aggregate_id for e in batch.events):
+            raise EventStoreError("Compare-and-append batches must target a single aggregate")
+        
         # Security validation
         try:
             # Validate entire batch for security issues
@@ -222,6 +283,13 @@ class EventStore:
         
         try:
             async with self.write_lock:
+                self._acquire_writer_lock()
+                
+                if expected_version is not None:
+                    actual_version = self._stream_versions.get(aggregate_id, 0)
+                    if actual_version != expected_version:
+                        raise StreamVersionConflict(aggregate_id, expected_version, actual_version)
+                
                 start_sequence = self.current_sequence + 1
                 
                 # Additional batch size validation (already checked in security validation)
@@ -240,8 +308,15 @@ class EventStore:
                     records.append(record)
                 
                 # Write all records atomically
+                locations = []
+                offset = self._current_log_offset
+                for record in records:
+                    locations.append((self.current_log_path.name, offset))
+                    offset += len(record)
+                
                 batch_data = b''.join(records)
                 await self.current_log_file.write(batch_data)
+                self._current_log_offset = offset
                 
                 # Sync once for entire batch per ADR-003
                 if self.sync_policy == "fsync":
@@ -253,8 +328,8 @@ class EventStore:
                 
                 # Update sequence and index
                 self.current_sequence += len(batch.events)
-                for event in batch.events:
-                    self._update_index(event)
+                for event, location in zip(batch.events, locations):
+                    self._update_index(event, location)
                 
                 await self._check_rotation()
                 
@@ -263,10 +338,36 @@ class EventStore:
             if len(self._append_times) > 1000:
                 self._append_times = self._append_times[-1000:]
                 
+        except StreamVersionConflict:
+            raise
         except Exception as e:
             self._error_counts["append"] += 1
             raise EventStoreError(f"Failed to append batch: {e}")
     
+    async def compare_and_append(self, events: List[Event], expected_version: int,
+                                 agent_id: Optional[str] = None) -> int:
+        """
+        Append events to one aggregate's stream if it is still at a known version.
+        
+        The stream version is the sequence of the aggregate's latest event
+        (0 for an empty stream). The check and the write happen under the
+        write lock, so of two writers that read the same version only the
+        first succeeds; the other gets StreamVersionConflict and no events
+        are written. Writers must share this instance: the version is only
+        known in this process, and the directory lock rejects appends
+        through any other store on the same data directory.
+        
+        Returns:
+            The new stream version
+        """
+        await self.append_batch(EventBatch(events=events), agent_id=agent_id,
+                                expected_version=expected_version)
+        return self._stream_versions[events[0].aggregate_id]
+    
+    def get_stream_version(self, aggregate_id: str) -> int:
+        """Sequence of the aggregate's latest event, or 0 if it has none."""
+        return self._stream_versions.get(aggregate_id, 0)
+    
     async def query(self, query: EventQuery, agent_id: Optional[str] = None) -> QueryResult:
         """Query events with security authorization and filtering."""
         # Security authorization
@@ -328,6 +429,85 @@ class EventStore:
             self._error_counts["query"] += 1
             raise EventStoreError(f"Query failed: {e}")
     
+    def get_path_sequences(self, aggregate_id: str, path: str) -> List[int]:
+        """Sequences of file events touching a path, in order, from the postings index."""
+        return list(self._path_postings.get((aggregate_id, path), ()))
+    
+    async def get_path_events(self, aggregate_id: str, path: str,
+                              limit: Optional[int] = None) -> List[Event]:
+        """Get file events touching a path (including moves and copies) without a log scan."""
+        sequences = self._path_postings.get((aggregate_id, path), [])
+        if limit is not None:
+            sequences = sequences[:limit]
+        return await self.get_events_by_sequence(sequences)
+    
+    def get_recent_path_postings(self, aggregate_id: str, since: datetime) -> Dict[str, List[int]]:
+        """
+        Group file event sequences at or after a point in time by path.
+        
+        Answered from the index alone. The window maps to a suffix of the
+        aggregate's file events through their running maximum event time, so
+        it can include a few earlier events that were appended late; callers
+        should check timestamps of the events they load.
+        """
+        sequences, max_times = self._file_timeline.get(aggregate_id, ([], []))
+        start = bisect.bisect_left(max_times, _epoch_micros(since))
+        
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for sequence in sequences[start:]:
+            for path in self._sequence_paths[sequence]:
+                postings[path].append(sequence)
+        return dict(postings)
+    
+    async def get_events_by_sequence(self, sequences: Iterable[int]) -> List[Event]:
+        """
+        Load indexed file events by sequence, reading only their records.
+        
+        Sequences that are not indexed (non-file events) are skipped.
+        """
+        by_log: Dict[str, List[int]] = defaultdict(list)
+        for sequence in sorted(set(sequences)):
+            location = self._record_locations.get(sequence)
+            if location:
+                by_log[location[0]].append(location[1])
+        
+        if not by_log:
+            return []
+        
+        # Make buffered appends to the current log visible to readers
+        if self.current_log_file and self.current_log_path.name in by_log:
+            async with self.write_lock:
+                await self.current_log_file.flush()
+        
+        events = []
+        for log_name, offsets in by_log.items():
+            for record in await self._read_records(self.data_dir / log_name, offsets):
+                event = self._decode_record(record[4:36], record[36:])
+                if event is not None:
+                    events.append(event)
+        
+        events.sort(key=lambda e: e.sequence or 0)
+        return events
+    
+    async def _read_records(self, log_path: Path, offsets: List[int]) -> List[bytes]:
+        """Read raw records at the given offsets of one log file."""
+        if log_path.suffix == '.gz':
+            content = await self._read_log_content(log_path)
+            records = []
+            for offset in offsets:
+                length = int.from_bytes(content[offset:offset+4], 'big')
+                records.append(content[offset:offset + 36 + length])
+            return records
+        
+        records = []
+        async with aiofiles.open(log_path, 'rb') as f:
+            for offset in offsets:
+                await f.seek(offset)
+                header = await f.read(36)
+                length = int.from_bytes(header[:4], 'big')
+                records.append(header + await f.read(length))
+        return records
+    
     async def get_health(self) -> SystemHealth:
         """Get current system health status."""
         try:
@@ -420,6 +600,45 @@ class EventStore:
     
     # Private implementation methods
     
+    def _acquire_writer_lock(self) -> None:
+        """Become the data directory's only writer (called under write_lock)."""
+        if self._writer_lock_file is not None or fcntl is None:
+            return
+        
+        lock_file = open(self.data_dir / "writer.lock", "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise EventStoreError(
+                f"Event store {self.data_dir} is being written by another store instance"
+            )
+        
+        # A writer that has since shut down may have appended after this
+        # store read the logs; its sequences and versions would be stale
+        if self._snapshot_logs() != self._log_snapshot:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            lock_file.close()
+            raise EventStoreError(
+                f"Event store {self.data_dir} changed since it was opened; reopen it before writing"
+            )
+        
+        lock_file.truncate(0)
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._writer_lock_file = lock_file
+    
+    def _release_writer_lock(self) -> None:
+        if self._writer_lock_file is not None:
+            fcntl.flock(self._writer_lock_file.fileno(), fcntl.LOCK_UN)
+            self._writer_lock_file.close()
+            self._writer_lock_file = None
+    
+    def _snapshot_logs(self) -> Tuple[Tuple[str, int], ...]:
+        # Empty logs are skipped: every store opens (and creates) one
+        sizes = ((path.name, path.stat().st_size) for path in self.data_dir.glob("events_*.log*"))
+        return tuple(sorted(entry for entry in sizes if entry[1]))
+    
     def _create_record(self, event_data: bytes) -> bytes:
         """Create length-prefixed record with HMAC authentication per ADR-002."""
         # Calculate HMAC for authentication (not just integrity)
@@ -449,7 +668,8 @@ class EventStore:
     
     async def _open_current_log_file(self) -> None:
         """Open current log file for writing with security validation."""
-        log_number = len(list(self.data_dir.glob("events_*.log"))) + 1
+        # Count compressed logs too so a new log never reuses a rotated log's name
+        log_number = len(list(self.data_dir.glob("events_*.log*"))) + 1
         
         # Validate log file path for security
         log_filename = f"events_{log_number:06d}.log"
@@ -477,6 +697,7 @@ class EventStore:
             self.current_log_file = await aiofiles.open(
                 self.current_log_path, 'ab'
             )
+            self._current_log_offset = self.current_log_path.stat().st_size
         except Exception as e:
             # Release file handle on failure
             self.resource_limiter.track_file_handle(increment=False)
@@ -501,6 +722,10 @@ class EventStore:
         # Compress if enabled
         if self.compression_enabled:
             await self._compress_log_file(self.current_log_path)
+            self._relocate_records(
+                self.current_log_path.name,
+                self.current_log_path.with_suffix('.log.gz').name
+            )
         
         # Open new log file (will increment file handle tracking)
         await self._open_current_log_file()
@@ -518,27 +743,36 @@ class EventStore:
     
     async def _read_log_file(self, log_path: Path, event_filter: Optional[EventFilter] = None) -> AsyncIterator[Event]:
         """Read and parse events from log file."""
+        content = await self._read_log_content(log_path)
+        async for event in self._parse_log_content(content, event_filter):
+            yield event
+    
+    async def _read_log_content(self, log_path: Path) -> bytes:
+        """Read a whole log file, decompressing rotated logs."""
         if log_path.suffix == '.gz':
-            # Decompress and read
             with gzip.open(log_path, 'rb') as f:
-                content = f.read()
-            async for event in self._parse_log_content(content, event_filter):
-                yield event
-        else:
-            # Read directly
-            async with aiofiles.open(log_path, 'rb') as f:
-                content = await f.read()
-            async for event in self._parse_log_content(content, event_filter):
-                yield event
+                return f.read()
+        
+        async with aiofiles.open(log_path, 'rb') as f:
+            return await f.read()
     
     async def _parse_log_content(self, content: bytes, event_filter: Optional[EventFilter] = None) -> AsyncIterator[Event]:
         """Parse log file content into events."""
+        for _, event in self._iter_log_records(content):
+            # Apply filter
+            if event_filter is None or self._matches_filter(event, event_filter):
+                yield event
+    
+    def _iter_log_records(self, content: bytes) -> Iterator[Tuple[int, Event]]:
+        """Yield (record offset, event) for authenticated, valid records."""
         offset = 0
         
         while offset < len(content):
             if offset + 4 > len(content):
                 break
             
+            record_offset = offset
+            
             # Read length
             length = int.from_bytes(content[offset:offset+4], 'big')
             offset += 4
@@ -553,20 +787,21 @@ class EventStore:
             event_data = content[offset:offset+length]
             offset += length
             
-            # Verify HMAC authentication
-            expected_hmac = hmac.new(self.hmac_secret, event_data, hashlib.sha256).digest()
-            if not hmac.compare_digest(expected_checksum, expected_hmac):
-                continue  # Skip unauthenticated record
-            
-            try:
-                # Deserialize event
-                event = Event.from_msgpack(event_data)
-                
-                # Apply filter
-                if event_filter is None or self._matches_filter(event, event_filter):
-                    yield event
-            except (ValidationError, ValueError):
-                continue  # Skip invalid events
+            event = self._decode_record(expected_checksum, event_data)
+            if event is not None:
+                yield record_offset, event
+    
+    def _decode_record(self, checksum: bytes, event_data: bytes) -> Optional[Event]:
+        """Authenticate and deserialize one record (None if rejected)."""
+        # Verify HMAC authentication
+        expected_hmac = hmac.new(self.hmac_secret, event_data, hashlib.sha256).digest()
+        if not hmac.compare_digest(checksum, expected_hmac):
+            return None  # Skip unauthenticated record
+        
+        try:
+            return Event.from_msgpack(event_data)
+        except (ValidationError, ValueError):
+            return None  # Skip invalid events
     
     def _matches_filter(self, event: Event, event_filter: EventFilter) -> bool:
         """Check if event matches filter criteria."""
@@ -597,6 +832,9 @@ class EventStore:
         if event_filter.before_sequence and (event.sequence is None or event.sequence >= event_filter.before_sequence):
             return False
         
+        if event_filter.file_paths and event.get_file_path() not in event_filter.file_paths:
+            return False
+        
         if event_filter.correlation_id and event.correlation_id != event_filter.correlation_id:
             return False
         
@@ -605,7 +843,7 @@ class EventStore:
         
         return True
     
-    def _update_index(self, event: Event) -> None:
+    def _update_index(self, event: Event, location: Optional[Tuple[str, int]] = None) -> None:
         """Update in-memory index for fast queries."""
         # Index by event type
         if event.event_type.value not in self._index:
@@ -617,6 +855,34 @@ class EventStore:
         if aggregate_key not in self._index:
             self._index[aggregate_key] = set()
         self._index[aggregate_key].add(event.sequence)
+        if event.aggregate_id and event.sequence > self._stream_versions.get(event.aggregate_id, 0):
+            self._stream_versions[event.aggregate_id] = event.sequence
+        
+        # Path postings for file events
+        paths = event.get_file_paths()
+        if not paths or location is None:
+            return
+        
+        for path in paths:
+            postings = self._path_postings.setdefault((event.aggregate_id, path), [])
+            if postings and postings[-1] >= event.sequence:
+                bisect.insort(postings, event.sequence)
+            else:
+                postings.append(event.sequence)
+        
+        self._record_locations[event.sequence] = location
+        self._sequence_paths[event.sequence] = tuple(paths)
+        
+        sequences, max_times = self._file_timeline.setdefault(event.aggregate_id, ([], []))
+        event_time = _epoch_micros(event.timestamp)
+        sequences.append(event.sequence)
+        max_times.append(max(event_time, max_times[-1]) if max_times else event_time)
+    
+    def _relocate_records(self, old_name: str, new_name: str) -> None:
+        """Point indexed records at a log file's new (rotated) name."""
+        for sequence, (name, offset) in self._record_locations.items():
+            if name == old_name:
+                self._record_locations[sequence] = (new_name, offset)
     
     async def _get_log_files_for_query(self, query: EventQuery) -> List[Path]:
         """Get relevant log files for query based on index."""
@@ -628,8 +894,21 @@ class EventStore:
     async def _rebuild_index(self) -> None:
         """Rebuild index from all log files."""
         self._index = {}
+        self._stream_versions = {}
+        self._path_postings = {}
+        self._record_locations = {}
+        self._sequence_paths = {}
+        self._file_timeline = {}
         
         log_files = sorted(self.data_dir.glob("events_*.log*"))
         for log_file in log_files:
-            async for event in self._read_log_file(log_file):
-                self._update_index(event)
\ No newline at end of file
+            content = await self._read_log_content(log_file)
+            for offset, event in self._iter_log_records(content):
+                self._update_index(event, (log_file.name, offset))
+
+
+def _epoch_micros(timestamp: datetime) -> int:
+    """Microseconds since the epoch; naive timestamps are taken as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return int(timestamp.timestamp() * 1_000_000)
@@ -257,11 +257,11 @@ async def test_component_memory_usage():
     # Test FUSE components (mocked)
     with PerformanceTimer("fuse_components_memory", {"component": "fuse"}):
         from lighthouse.bridge.fuse_mount import LighthouseFUSE, FUSEMountManager
-        from lighthouse.bridge.event_store import ProjectAggregate, EventStream
+        from lighthouse.bridge.event_store import ContentBlobStore, ProjectAggregate, EventStream
         from lighthouse.bridge.ast_anchoring import ASTAnchorManager, TreeSitterParser
         
         # Create components (but don't mount)
-        project_aggregate = ProjectAggregate("memory_test")
+        project_aggregate = ProjectAggregate("memory_test", blob_store=ContentBlobStore())
         event_stream = EventStream(fuse_mount_path="/tmp/test")
         parser = TreeSitterParser()
         ast_manager = ASTAnchorManager(parser)
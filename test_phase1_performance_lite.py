@@ -340,8 +340,9 @@ async def test_component_startup_performance():
     
     # Test event store components
     with PerformanceTimer("project_aggregate_startup", {"component": "project_aggregate"}):
+        from lighthouse.bridge.event_store.blob_store import ContentBlobStore
         from lighthouse.bridge.event_store.project_aggregate import ProjectAggregate
-        project_aggregate = ProjectAggregate("startup_test")
+        project_aggregate = ProjectAggregate("startup_test", blob_store=ContentBlobStore())
     
     # Test expert coordination components (without FUSE)
     with PerformanceTimer("expert_coordinator_startup", {"component": "expert_coordinator"}):
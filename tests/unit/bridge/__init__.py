@@ -0,0 +1 @@
+"""Unit tests for Lighthouse bridge components."""
@@ -0,0 +1,37 @@
+"""Shared fixtures for speed layer dispatcher tests."""
+
+import asyncio
+
+import pytest_asyncio
+
+from lighthouse.bridge.speed_layer.models import (
+    ValidationConfidence, ValidationDecision, ValidationRequest, ValidationResult
+)
+from lighthouse.bridge.speed_layer.optimized_dispatcher import OptimizedSpeedLayerDispatcher
+
+
+def bash(command, request_id, agent_id="agent"):
+    return ValidationRequest(tool_name="Bash", tool_input={'command': command},
+                             agent_id=agent_id, request_id=request_id)
+
+
+@pytest_asyncio.fixture
+async def stub_expert():
+    """Dispatcher with default rules whose pattern tier abstains and whose expert approves after a short wait"""
+    dispatcher = OptimizedSpeedLayerDispatcher()
+    await dispatcher.policy_cache._load_default_rules()
+    calls = []
+
+    async def no_prediction(request, start_time):
+        return None
+
+    async def expert(request, start_time):
+        calls.append(request.request_id)
+        await asyncio.sleep(0.05)
+        return ValidationResult(decision=ValidationDecision.APPROVED, confidence=ValidationConfidence.HIGH,
+                                reason="expert approved", request_id=request.request_id,
+                                processing_time_ms=50.0, security_concerns=["none"])
+
+    dispatcher._try_optimized_pattern_cache = no_prediction
+    dispatcher._escalate_to_expert_optimized = expert
+    return dispatcher, calls
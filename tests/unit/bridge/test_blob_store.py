@@ -0,0 +1,185 @@
+"""Unit tests for the content-addressed blob store."""
+
+import hashlib
+import os
+from datetime import datetime
+
+import pytest
+
+from lighthouse.bridge.event_store.blob_store import BlobNotFound, ContentBlobStore
+from lighthouse.bridge.event_store.project_aggregate import ProjectAggregate
+from lighthouse.bridge.event_store.project_state import ProjectState
+from lighthouse.bridge.event_store.time_travel import TimeTravelDebugger
+from lighthouse.event_store.models import Event, EventType
+
+
+class TestContentBlobStore:
+    """Test deduplication, compression and persistence."""
+    
+    def test_put_returns_sha256_and_dedupes(self):
+        store = ContentBlobStore()
+        content = "print('hello')\n" * 100
+        
+        content_hash, size = store.put(content)
+        again_hash, _ = store.put(content)
+        
+        assert content_hash == hashlib.sha256(content.encode()).hexdigest()
+        assert again_hash == content_hash
+        assert size == len(content.encode())
+        assert store.get_stats()['blobs'] == 1
+        assert store.dedup_hits == 1
+        assert store.get_text(content_hash) == content
+    
+    def test_compressible_content_is_stored_smaller(self):
+        store = ContentBlobStore()
+        store.put("x" * 10000)
+        
+        stats = store.get_stats()
+        assert stats['stored_bytes'] < stats['logical_bytes']
+    
+    def test_persistent_blobs_survive_restart(self, tmp_path):
+        content_hash, _ = ContentBlobStore(blob_dir=tmp_path).put("persisted")
+        
+        assert ContentBlobStore(blob_dir=tmp_path).get_text(content_hash) == "persisted"
+    
+    def test_sync_policy_syncs_blob_and_directories(self, tmp_path, monkeypatch):
+        synced = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, 'fsync', lambda fd: synced.append(fd) or real_fsync(fd))
+        
+        ContentBlobStore(blob_dir=tmp_path / "plain").put("unsynced")
+        assert synced == []
+        
+        store = ContentBlobStore(blob_dir=tmp_path / "synced", sync_policy="fsync")
+        store.put("first")
+        # Blob file, its new shard directory and the blob directory
+        assert len(synced) == 3
+        store.put("first")
+        assert len(synced) == 3
+    
+    def test_aggregate_requires_blob_store(self):
+        with pytest.raises(ValueError):
+            ProjectAggregate("project", blob_store=None)
+    
+    def test_missing_blob_raises(self):
+        with pytest.raises(BlobNotFound):
+            ContentBlobStore().get_bytes("0" * 64)
+
+
+class TestBlobBackedFileVersions:
+    """Test that file events reference content by hash."""
+    
+    @pytest.mark.asyncio
+    async def test_modification_event_carries_hash_only(self):
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        
+        event = await aggregate.handle_file_modification("/src/app.py", "a = 1\n", "agent")
+        
+        assert 'content' not in event.data
+        assert event.data['size'] == 6
+        assert aggregate.blob_store.get_text(event.data['content_hash']) == "a = 1\n"
+        assert aggregate.current_state.get_file_content("/src/app.py") == "a = 1\n"
+    
+    def test_versions_load_content_lazily(self):
+        store = ContentBlobStore()
+        content_hash, size = store.put("lazy")
+        state = ProjectState("project", blob_store=store)
+        
+        state.apply_event(Event(
+            event_type=EventType.FILE_CREATED,
+            aggregate_id="project",
+            sequence=1,
+            timestamp=datetime.utcnow(),
+            data={'path': '/a.txt', 'content_hash': content_hash, 'size': size}
+        ))
+        
+        version = state.get_file('/a.txt')
+        assert version._content is None
+        assert version.content == "lazy"
+    
+    def test_legacy_inline_content_moves_into_store(self):
+        store = ContentBlobStore()
+        state = ProjectState("project", blob_store=store)
+        
+        state.apply_event(Event(
+            event_type=EventType.FILE_CREATED,
+            aggregate_id="project",
+            sequence=1,
+            data={'path': '/old.txt', 'content': 'inline', 'size': 6}
+        ))
+        
+        version = state.get_file('/old.txt')
+        assert version._content is None
+        assert store.get_text(version.content_hash) == 'inline'
+        assert version.content == 'inline'
+
+
+class TestDeltaEncodedVersions:
+    """Test line deltas with periodic keyframes."""
+    
+    def test_versions_are_deltas_between_keyframes(self):
+        store = ContentBlobStore(keyframe_interval=4, decoded_cache_size=0)
+        lines = [f"line {i}\n" for i in range(200)]
+        
+        hashes = []
+        previous = None
+        for version in range(9):
+            lines[version] = f"changed {version}\n"
+            previous, _ = store.put("".join(lines), base_hash=previous)
+            hashes.append((previous, "".join(lines)))
+        
+        assert [store.is_keyframe(h) for h, _ in hashes] == [
+            True, False, False, False, True, False, False, False, True
+        ]
+        for content_hash, content in hashes:
+            assert store.get_text(content_hash) == content
+        
+        stats = store.get_stats()
+        assert stats['deltas'] == 6
+        assert stats['stored_bytes'] < stats['logical_bytes'] / 3
+    
+    def test_delta_chain_reconstructs_from_disk(self, tmp_path):
+        store = ContentBlobStore(blob_dir=tmp_path)
+        original = "".join(f"value_{i} = {i * 7919}\n" for i in range(100))
+        edited = original.replace("value_50 =", "renamed_50 =")
+        first, _ = store.put(original)
+        second, _ = store.put(edited, base_hash=first)
+        
+        reopened = ContentBlobStore(blob_dir=tmp_path)
+        assert not reopened.is_keyframe(second)
+        assert reopened.get_text(second) == edited
+
+
+class FakeEventStore:
+    def __init__(self, events):
+        self.events = events
+        self.queries = 0
+    
+    async def query_events(self, event_filter):
+        self.queries += 1
+        return [event for event in self.events if event_filter.matches_event(event)]
+
+
+class TestTimeTravelDiff:
+    """Test diffs resolved from file history and stored deltas."""
+    
+    @pytest.mark.asyncio
+    async def test_generate_diff_uses_file_history(self):
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        first = await aggregate.handle_file_modification("/a.py", "x = 1\ny = 2\n", "agent")
+        first.sequence = 1
+        first.timestamp = datetime(2024, 1, 1, 10)
+        second = await aggregate.handle_file_modification("/a.py", "x = 1\ny = 3\n", "agent")
+        second.sequence = 2
+        second.timestamp = datetime(2024, 1, 1, 11)
+        
+        event_store = FakeEventStore([first, second])
+        debugger = TimeTravelDebugger(event_store, blob_store=aggregate.blob_store)
+        
+        diff = await debugger.generate_diff(
+            "/a.py", "project", datetime(2024, 1, 1, 10, 30), datetime(2024, 1, 1, 12)
+        )
+        
+        assert "-y = 2" in diff['unified_diff']
+        assert "+y = 3" in diff['unified_diff']
+        assert event_store.queries == 1
@@ -0,0 +1,81 @@
+"""Unit tests for the counting Bloom filter and its use by the memory caches."""
+
+import pytest
+
+from lighthouse.bridge.speed_layer.bloom_filter import CountingBloomFilter
+from lighthouse.bridge.speed_layer.memory_cache import MemoryRuleCache
+from lighthouse.bridge.speed_layer.models import (
+    ValidationConfidence, ValidationDecision, ValidationResult
+)
+from lighthouse.bridge.speed_layer.optimized_memory_cache import OptimizedMemoryCache
+
+
+def result(request_id="req"):
+    return ValidationResult(decision=ValidationDecision.APPROVED, confidence=ValidationConfidence.HIGH,
+                            reason="cached", request_id=request_id, processing_time_ms=0.1)
+
+
+class TestCountingBloomFilter:
+    """Test membership, removal and fill accounting."""
+    
+    def test_add_remove_and_fill_ratio(self):
+        bloom = CountingBloomFilter(capacity=1000)
+        keys = [f"hash-{i}" for i in range(500)]
+        for key in keys:
+            bloom.add(key)
+        
+        assert all(bloom.might_contain(key) for key in keys)
+        assert 0 < bloom.fill_ratio < 0.5
+        
+        for key in keys[:250]:
+            assert bloom.remove(key)
+        
+        assert all(bloom.might_contain(key) for key in keys[250:])
+        false_positives = sum(bloom.might_contain(key) for key in keys[:250])
+        assert false_positives < 10
+        assert bloom.item_count == 250
+        
+        for key in keys[250:]:
+            bloom.remove(key)
+        assert bloom.fill_ratio == 0.0
+        assert not bloom.remove("never-added")
+    
+    def test_saturation_is_reported(self):
+        bloom = CountingBloomFilter(capacity=10)
+        assert not bloom.is_saturated
+        for i in range(1000):
+            bloom.add(f"hash-{i}")
+        
+        assert bloom.is_saturated
+        assert bloom.get_stats()['estimated_false_positive_rate'] > 0.5
+
+
+class TestCacheFilterResidency:
+    """Test that evicted and expired keys leave the caches' filters."""
+    
+    @pytest.mark.asyncio
+    async def test_optimized_cache_filter_tracks_lru_churn(self):
+        cache = OptimizedMemoryCache(max_size=100)
+        for i in range(2000):
+            await cache.set(f"hash-{i}", result())
+        
+        bloom = cache._bloom_filter
+        assert bloom.item_count == 100
+        assert not bloom.is_saturated
+        assert await cache.get("hash-1999") is not None
+        
+        rejected = sum(not bloom.might_contain(f"hash-{i}") for i in range(1000))
+        assert rejected > 950
+        assert cache.get_stats()['bloom_filter_fill_ratio'] < 0.5
+    
+    def test_memory_cache_forgets_expired_and_overwritten_keys(self):
+        cache = MemoryRuleCache(max_size=10)
+        cache._redis_client = None
+        cache.set("stale", result(), ttl_seconds=-1)
+        cache.set("kept", result())
+        cache.set("kept", result())
+        
+        assert cache.get("stale") is None
+        assert cache._bloom_filter.item_count == 1
+        assert not cache._bloom_filter.might_contain("stale")
+        assert cache.get("kept") is not None
@@ -0,0 +1,71 @@
+"""Unit tests for the byte-bounded LRU cache."""
+
+import time
+
+from lighthouse.bridge.event_store.bounded_cache import BoundedCache, ENTRY_OVERHEAD_BYTES
+
+
+def cache_for(entries, **kwargs):
+    """Cache with room for `entries` values of 1000 bytes"""
+    return BoundedCache(max_bytes=entries * (1000 + ENTRY_OVERHEAD_BYTES), **kwargs)
+
+
+class TestBoundedCache:
+    """Test LRU eviction, byte accounting, watermarks and TTL."""
+    
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = cache_for(3)
+        for key in "abc":
+            cache.put(key, key.upper(), size=1000)
+        
+        assert cache.get("a") == "A"  # 'b' becomes least recently used
+        cache.put("d", "D", size=1000)
+        
+        assert "b" not in cache
+        assert [key for key, _ in cache.items()] == ["c", "a", "d"]
+        assert cache.bytes == 3 * (1000 + ENTRY_OVERHEAD_BYTES)
+        assert cache.get_stats()['evictions'] == 1
+    
+    def test_large_value_evicts_several_and_oversized_is_rejected(self):
+        cache = cache_for(3, sizer=len)
+        for key in "abc":
+            cache.put(key, "x" * 1000)
+        
+        assert cache.put("big", "x" * 2000)
+        assert len(cache) == 2
+        assert not cache.put("huge", "x" * 10_000)
+        assert "huge" not in cache
+        assert cache.get_stats()['rejections'] == 1
+    
+    def test_watermark_staleness_and_invalidation(self):
+        cache = cache_for(10)
+        cache.put("p:/a.py", "history-a", watermark=5)
+        cache.put("p:/b.py", "history-b", watermark=9)
+        
+        assert cache.get("p:/a.py", min_watermark=5) == "history-a"
+        assert cache.get("p:/a.py", min_watermark=6) is None
+        assert "p:/a.py" not in cache
+        
+        assert cache.invalidate_below(10) == 1
+        assert len(cache) == 0
+        
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['invalidations'] == 2
+    
+    def test_ttl_expiry(self):
+        cache = cache_for(10, ttl=0.01)
+        cache.put("key", "value")
+        time.sleep(0.02)
+        
+        assert cache.get("key") is None
+        assert cache.get_stats()['expirations'] == 1
+        assert cache.bytes == 0
+    
+    def test_entry_limit(self):
+        cache = cache_for(10, max_entries=2)
+        for key in "abc":
+            cache.put(key, key)
+        
+        assert [key for key, _ in cache.items()] == ["b", "c"]
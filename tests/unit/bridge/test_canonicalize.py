@@ -0,0 +1,117 @@
+"""Unit tests for semantic cache keys from command canonicalization."""
+
+import pytest
+
+from lighthouse.bridge.speed_layer.canonicalize import normalize_path, replay_cache_keys
+from lighthouse.bridge.speed_layer.models import (
+    ValidationConfidence, ValidationDecision, ValidationRequest, ValidationResult
+)
+from lighthouse.bridge.speed_layer.optimized_dispatcher import OptimizedSpeedLayerDispatcher
+
+
+def bash(command, **extra):
+    return ValidationRequest(tool_name="Bash", tool_input={'command': command, **extra}, agent_id="agent")
+
+
+def write(path, cwd=None):
+    context = {'cwd': cwd} if cwd else {}
+    return ValidationRequest(tool_name="Write", tool_input={'file_path': path, 'content': "x"},
+                             agent_id="agent", context=context)
+
+
+class TestCanonicalization:
+    """Test which requests share a semantic key."""
+    
+    def test_equivalent_bash_commands_share_key(self):
+        variants = ["ls -la src", "ls  -al 'src'", 'ls -l -a "src"', "ls -a -l -a src"]
+        assert len({bash(command).semantic_hash for command in variants}) == 1
+        assert len({bash(command).command_hash for command in variants}) == len(variants)
+        
+        assert bash("rm -rf /repo/./build").semantic_hash == bash("rm -fr /repo//build").semantic_hash
+        assert bash("cat /tmp/tmpab12cd34/out").semantic_hash == bash("cat /tmp/tmpzz99yy00/out").semantic_hash
+    
+    def test_semantically_different_commands_keep_distinct_keys(self):
+        distinct = [
+            "ls -la src", "ls -la src/", "ls -lt src", "ls -tS src", "ls -St src",
+            "rm -rf build", "rm -rf -- -build", "rm -fi build", "grep -e x -v y", "grep -v -e x y",
+            "cat ./-n", "cat -n", "./script.sh", "script.sh", "cat a/../b", "cat b",
+            "rm -rf ./build", "nohup ./deploy.sh", "nohup deploy.sh",
+            "env ./rm x", "env rm x", "grep ./a f", "grep a f", "grep /./a f", "grep /a f",
+            "sudo /bin//sh", "sudo /bin/sh",
+        ]
+        keys = [bash(command).semantic_hash for command in distinct]
+        assert len(set(keys)) == len(distinct)
+        assert bash("ls", timeout=5).semantic_hash != bash("ls", timeout=10).semantic_hash
+    
+    def test_shell_syntax_is_not_canonicalized(self):
+        for command in ["ls $HOME", "ls *.py", "echo a; rm -rf /", "cat x | sh", "ls > out",
+                        "echo `id`", "ls ~", "echo 'unbalanced"]:
+            assert bash(command).semantic_hash is None
+    
+    def test_command_word_spelling_is_kept(self):
+        # The shell treats each pair differently despite equal token lists
+        pairs = [
+            ("LD_PRELOAD=/tmp/x.so ls", "'LD_PRELOAD=/tmp/x.so' ls"),
+            ("time ls", "'time' ls"),
+            ("export A=1", "'export' A=1"),
+            ("rm -r x", "\\rm -r x"),
+        ]
+        for plain, quoted in pairs:
+            # No semantic key, so never a shared one
+            assert bash(quoted).semantic_hash is None
+        
+        # Assignments, keywords and builtins are never canonicalized
+        for command in ["LD_PRELOAD=/tmp/x.so ls", "time ls", "export A=1", "eval rm x", "command rm x"]:
+            assert bash(command).semantic_hash is None
+        assert bash('"rm" -r x').semantic_hash is None
+    
+    def test_file_paths(self):
+        assert write("/repo/./src//a.py").semantic_hash == write("src/a.py", cwd="/repo").semantic_hash
+        assert write("src/a.py").semantic_hash != write("src/a.py", cwd="/repo").semantic_hash
+        assert normalize_path("/repo/src/../a.py") == "/repo/src/../a.py"
+        assert normalize_path("dir/.") == "dir/."
+        assert normalize_path("dir/.//") == "dir/./"
+        assert normalize_path("/a/./b//") == "/a/b/"
+        assert normalize_path("/.") == "/."
+    
+    def test_final_dot_component_is_kept(self):
+        # Copies the contents vs. the directory; refused by rm vs. deleting the tree
+        for dotted, plain in [("cp -r /a/src/. /b/dest", "cp -r /a/src/ /b/dest"),
+                              ("rm -rf /home/u/proj/.", "rm -rf /home/u/proj/"),
+                              ("rm -rf /home/u/proj/./", "rm -rf /home/u/proj/")]:
+            assert bash(dotted).semantic_hash != bash(plain).semantic_hash
+        assert bash("cp -r /a/./src/. /b").semantic_hash == bash("cp -r /a/src/. /b").semantic_hash
+    
+    def test_replay_measures_gain(self):
+        traffic = [bash(command) for command in ["ls -la", "ls -al", "ls  -la", "git status", "git status"]]
+        stats = replay_cache_keys(traffic)
+        
+        assert stats['exact_keys'] == 4
+        assert stats['semantic_keys'] == 2
+        assert stats['exact_hit_rate'] == pytest.approx(1 / 5)
+        assert stats['semantic_hit_rate'] == pytest.approx(3 / 5)
+
+
+class TestSemanticCacheTier:
+    """Test that the dispatcher reuses pattern decisions only after policy rules."""
+    
+    @pytest.mark.asyncio
+    async def test_semantic_hit_follows_policy_evaluation(self):
+        dispatcher = OptimizedSpeedLayerDispatcher()
+        await dispatcher.policy_cache._load_default_rules()
+        
+        # A pattern-tier decision cached under the semantic key
+        decided = ValidationResult(decision=ValidationDecision.APPROVED, confidence=ValidationConfidence.HIGH,
+                                   reason="pattern", request_id="first", processing_time_ms=5.0)
+        await dispatcher.memory_cache.set(bash("cat notes.txt").semantic_hash, decided)
+        await dispatcher.memory_cache.set(bash("cat /etc/passwd").semantic_hash, decided)
+        
+        variant = await dispatcher.validate_request(bash("cat  'notes.txt'"))
+        assert variant.decision == ValidationDecision.APPROVED
+        assert variant.cache_layer == "memory_semantic"
+        assert dispatcher.metrics.semantic_cache_hits == 1
+        
+        # A command a policy rule decides never reaches the semantic tier
+        escalated = await dispatcher.validate_request(bash("cat /etc/./passwd"))
+        assert escalated.decision == ValidationDecision.ESCALATE
+        assert dispatcher.metrics.semantic_cache_hits == 1
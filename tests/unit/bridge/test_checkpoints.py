@@ -0,0 +1,113 @@
+"""Unit tests for time travel state checkpoints."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from lighthouse.bridge.event_store.blob_store import ContentBlobStore
+from lighthouse.bridge.event_store.checkpoints import CheckpointStore
+from lighthouse.bridge.event_store.project_state import ProjectState
+from lighthouse.bridge.event_store.time_travel import TimeTravelDebugger
+from lighthouse.event_store.models import Event, EventType
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def file_events(count, blob_store):
+    events = []
+    for i in range(count):
+        content_hash, size = blob_store.put(f"version {i}\n")
+        events.append(Event(
+            event_type=EventType.FILE_MODIFIED if i else EventType.FILE_CREATED,
+            aggregate_id="project",
+            sequence=i + 1,
+            timestamp=START + timedelta(minutes=i),
+            data={'path': f'/src/file_{i % 5}.py', 'content_hash': content_hash, 'size': size}
+        ))
+    return events
+
+
+class RecordingEventStore:
+    def __init__(self, events):
+        self.events = events
+        self.returned = []
+    
+    async def query_events(self, event_filter):
+        events = [event for event in self.events if event_filter.matches_event(event)]
+        self.returned.append(len(events))
+        return events
+
+
+class TestProjectStateSnapshot:
+    """Test compact ProjectState serialization."""
+    
+    def test_round_trip_preserves_state(self):
+        blob_store = ContentBlobStore()
+        state = ProjectState("project", blob_store=blob_store)
+        for event in file_events(12, blob_store):
+            state.apply_event(event)
+        
+        restored = ProjectState.from_snapshot(state.to_snapshot(), blob_store=blob_store)
+        
+        assert restored.to_dict() == state.to_dict()
+        assert len(restored.get_file_history('/src/file_1.py')) == 3
+        assert restored.get_file('/src/file_1.py') is restored.get_file_history('/src/file_1.py')[-1]
+
+
+class TestCheckpointedRebuild:
+    """Test that rebuilds start from the nearest checkpoint."""
+    
+    @pytest.mark.asyncio
+    async def test_rebuild_replays_only_interval_after_checkpoint(self):
+        blob_store = ContentBlobStore()
+        event_store = RecordingEventStore(file_events(50, blob_store))
+        debugger = TimeTravelDebugger(event_store, blob_store=blob_store)
+        debugger.checkpoint_event_interval = 10
+        
+        await debugger.rebuild_at_timestamp(START + timedelta(minutes=49), "project")
+        assert debugger.checkpoint_store.get_stats()['checkpoints'] == 5
+        
+        state = await debugger.rebuild_at_timestamp(START + timedelta(minutes=25, seconds=30), "project")
+        
+        assert event_store.returned[-1] == 6  # Events 21..26 after checkpoint at 20
+        assert state.last_event_sequence == 26
+        assert state.get_file_content('/src/file_0.py') == "version 25\n"
+    
+    @pytest.mark.asyncio
+    async def test_timestamps_between_same_events_share_cache_entry(self):
+        blob_store = ContentBlobStore()
+        debugger = TimeTravelDebugger(RecordingEventStore(file_events(5, blob_store)), blob_store)
+        
+        first = await debugger.rebuild_at_timestamp(START + timedelta(minutes=2, seconds=10), "project")
+        second = await debugger.rebuild_at_timestamp(START + timedelta(minutes=2, seconds=50), "project")
+        
+        assert first is second
+    
+    def test_checkpoints_persist_across_restart(self, tmp_path):
+        blob_store = ContentBlobStore()
+        state = ProjectState("project", blob_store=blob_store)
+        for event in file_events(8, blob_store):
+            state.apply_event(event)
+        CheckpointStore(checkpoint_dir=tmp_path).save(state)
+        
+        reopened = CheckpointStore(checkpoint_dir=tmp_path)
+        checkpoint = reopened.find_at_or_before("project", START + timedelta(hours=1))
+        
+        assert checkpoint.sequence == 8
+        assert reopened.find_at_or_before("project", START) is None
+        assert reopened.load(checkpoint, blob_store).get_file_content('/src/file_2.py') == "version 7\n"
+    
+    @pytest.mark.parametrize("project_id", ["team/app", "team_app", "50%/x", ".."])
+    def test_recovered_index_keeps_project_id(self, tmp_path, project_id):
+        blob_store = ContentBlobStore()
+        state = ProjectState(project_id, blob_store=blob_store)
+        for event in file_events(3, blob_store):
+            state.apply_event(event)
+        CheckpointStore(checkpoint_dir=tmp_path).save(state)
+        
+        reopened = CheckpointStore(checkpoint_dir=tmp_path)
+        checkpoint = reopened.find_at_or_before(project_id, START + timedelta(hours=1))
+        
+        assert checkpoint.project_id == project_id
+        assert [path.parent.parent for path in tmp_path.rglob('*.ckpt')] == [tmp_path]
+        assert reopened.load(checkpoint, blob_store).get_file_content('/src/file_2.py') == "version 2\n"
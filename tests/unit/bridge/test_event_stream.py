@@ -0,0 +1,239 @@
+"""Unit tests for bridge event stream fan-out and delivery."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from lighthouse.bridge.event_store.event_stream import EventStream, SubscriptionIndex
+from lighthouse.event_store.models import Event, EventFilter, EventType
+
+
+def make_event(event_type=EventType.FILE_MODIFIED, aggregate_id="project_a",
+               source_agent="agent_1", **data) -> Event:
+    return Event(
+        event_type=event_type,
+        aggregate_id=aggregate_id,
+        source_agent=source_agent,
+        data=data or {"path": "/src/main.py"}
+    )
+
+
+@pytest.fixture
+def stream():
+    return EventStream(fuse_mount_path=None)
+
+
+class TestSubscriptionIndex:
+    """Test candidate selection in the fan-out index."""
+    
+    def test_candidates_limited_to_matching_buckets(self, stream):
+        sub_project = stream.subscribe("a", EventFilter(aggregate_ids=["project_a"]))
+        sub_other = stream.subscribe("b", EventFilter(aggregate_ids=["project_b"]))
+        sub_agent = stream.subscribe("c", EventFilter(agent_ids=["agent_2"]))
+        sub_type = stream.subscribe("d", EventFilter(event_types=[EventType.FILE_MODIFIED]))
+        sub_all = stream.subscribe("e", EventFilter())
+        
+        candidates = {
+            s.subscription_id
+            for s in stream._subscription_index.candidates(make_event())
+        }
+        
+        assert candidates == {sub_project, sub_type, sub_all}
+        assert sub_other not in candidates
+        assert sub_agent not in candidates
+    
+    def test_remove_clears_buckets(self):
+        index = SubscriptionIndex()
+        stream = EventStream(fuse_mount_path=None)
+        sub_id = stream.subscribe("a", EventFilter(event_types=[EventType.FILE_CREATED]))
+        subscription = stream.subscriptions[sub_id]
+        
+        index.add(subscription)
+        assert len(index) == 1
+        
+        index.remove(subscription)
+        assert len(index) == 0
+        assert index.candidates(make_event(EventType.FILE_CREATED)) == []
+
+
+@pytest.mark.asyncio
+class TestEventStreamDelivery:
+    """Test decoupled per-subscription delivery."""
+    
+    async def test_publish_delivers_via_drain_task(self, stream):
+        received = []
+        stream.subscribe("a", EventFilter(aggregate_ids=["project_a"]), callback=received.append)
+        
+        await stream.publish_event(make_event())
+        await stream.publish_event(make_event(aggregate_id="project_b"))
+        
+        assert await stream.flush()
+        assert len(received) == 1
+        assert received[0].aggregate_id == "project_a"
+        
+        await stream.stop()
+    
+    async def test_slow_subscriber_does_not_block_publish(self, stream):
+        gate = asyncio.Event()
+        
+        class SlowSocket:
+            async def send(self, message):
+                await gate.wait()
+        
+        stream.subscribe("slow", EventFilter())
+        stream.add_websocket_connection("slow", SlowSocket())
+        fast = []
+        stream.subscribe("fast", EventFilter(), callback=fast.append)
+        
+        for _ in range(5):
+            await asyncio.wait_for(stream.publish_event(make_event()), timeout=0.1)
+        
+        await asyncio.sleep(0.01)
+        assert len(fast) == 5
+        
+        gate.set()
+        assert await stream.flush()
+        await stream.stop()
+    
+    async def test_flush_waits_for_send_in_flight(self, stream):
+        gate = asyncio.Event()
+        sent = []
+        
+        class SlowSocket:
+            async def send(self, message):
+                await gate.wait()
+                sent.append(message)
+        
+        stream.subscribe("slow", EventFilter())
+        stream.add_websocket_connection("slow", SlowSocket())
+        await stream.publish_event(make_event())
+        await asyncio.sleep(0.01)
+        
+        # The ring is empty, but the event is still being sent
+        assert not stream._delivery_rings[next(iter(stream.subscriptions))]
+        assert not await stream.flush(timeout=0.05)
+        
+        gate.set()
+        assert await stream.flush()
+        assert len(sent) == 1
+        await stream.stop()
+    
+    async def test_ring_overflow_drops_oldest(self, stream):
+        sub_id = stream.subscribe("a", EventFilter(), buffer_size=3)
+        
+        for i in range(5):
+            await stream.publish_event(make_event(path=f"/f{i}.py"))
+        
+        subscription = stream.subscriptions[sub_id]
+        assert subscription.events_dropped == 2
+        assert stream.stats.dropped_events == 2
+        
+        await stream.stop()
+
+
+@pytest.mark.asyncio
+class TestFrameCache:
+    """Test serialize-once delivery of fanned-out events."""
+    
+    async def test_event_encoded_once_for_all_websockets(self, stream):
+        sent = []
+        
+        class RecordingSocket:
+            async def send(self, message):
+                sent.append(message)
+        
+        for i in range(5):
+            stream.subscribe(f"agent_{i}", EventFilter())
+            stream.add_websocket_connection(f"agent_{i}", RecordingSocket())
+        
+        event = make_event()
+        await stream.publish_event(event)
+        assert len(stream.frame_cache) == 1
+        assert await stream.flush()
+        
+        assert stream.frame_cache.encodes == 1
+        assert len(sent) == 5
+        assert all(message is sent[0] for message in sent)
+        assert json.loads(sent[0]) == {'type': 'event', 'event': event.to_dict()}
+        
+        # Evicted once every subscriber has drained it
+        assert len(stream.frame_cache) == 0
+        await stream.stop()
+    
+    async def test_framings_share_the_event_encoding(self, stream):
+        frame = stream.get_event_frame(make_event(content="x" * 10000))
+        
+        assert json.loads(frame.websocket_text)['event'] == json.loads(frame.event_json)
+        assert frame.ndjson_line == frame.event_json + '\n'
+
+
+class FakeEventStore:
+    """Minimal store exposing the query API used for catch-up reads."""
+    
+    def __init__(self):
+        self.events = []
+    
+    async def query(self, query):
+        matching = [
+            e for e in self.events
+            if query.filter.after_sequence is None or e.sequence > query.filter.after_sequence
+        ]
+        return SimpleNamespace(events=matching[:query.limit])
+
+
+@pytest.mark.asyncio
+class TestFlowControl:
+    """Test credit-based delivery and catch-up from the event store."""
+    
+    async def test_delivery_bounded_by_credits(self, stream):
+        received = []
+        sub_id = stream.subscribe("expert", EventFilter(), callback=received.append,
+                                  flow_control=True, initial_credits=2)
+        
+        for seq in range(1, 5):
+            event = make_event()
+            event.sequence = seq
+            await stream.publish_event(event)
+        
+        await asyncio.sleep(0.01)
+        assert [e.sequence for e in received] == [1, 2]
+        
+        stream.grant_credits(sub_id, 2, ack_sequence=2)
+        await asyncio.sleep(0.01)
+        assert [e.sequence for e in received] == [1, 2, 3, 4]
+        
+        stats = stream.get_stream_stats()['subscriptions'][0]
+        assert stats['lag'] == 2
+        assert stats['delivery_lag'] == 0
+        await stream.stop()
+    
+    async def test_slow_consumer_catches_up_without_loss(self):
+        store = FakeEventStore()
+        stream = EventStream(fuse_mount_path=None, event_store=store)
+        received = []
+        sub_id = stream.subscribe("expert", EventFilter(), callback=received.append,
+                                  buffer_size=3, flow_control=True)
+        
+        for seq in range(1, 11):
+            event = make_event()
+            event.sequence = seq
+            store.events.append(event)
+            await stream.publish_event(event)
+        
+        subscription = stream.subscriptions[sub_id]
+        assert subscription.catching_up
+        assert subscription.events_dropped == 0
+        
+        stream.grant_credits(sub_id, 100)
+        await asyncio.sleep(0.01)
+        
+        assert [e.sequence for e in received] == list(range(1, 11))
+        assert not subscription.catching_up
+        
+        stats = stream.get_stream_stats()
+        assert stats['overall_stats']['catch_up_switches'] == 1
+        assert stats['overall_stats']['catch_up_events'] == 10
+        assert stats['subscriptions'][0]['catch_up_reads'] == 1
+        await stream.stop()
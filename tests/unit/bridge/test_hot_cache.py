@@ -0,0 +1,202 @@
+"""Unit tests for the L0 hot result cache and its use by the dispatcher."""
+
+import pytest
+
+from lighthouse.bridge.speed_layer.hot_cache import FrequencySketch, HotResultCache
+from lighthouse.bridge.speed_layer.models import ValidationConfidence, ValidationDecision, ValidationResult
+
+from .conftest import bash
+
+
+class TestFrequencySketch:
+    """Test frequency estimation and aging."""
+    
+    def test_estimates_counts(self):
+        sketch = FrequencySketch(width=256)
+        for _ in range(5):
+            sketch.increment("hot")
+        sketch.increment("warm")
+        
+        assert sketch.estimate("hot") >= 5
+        assert sketch.estimate("warm") >= 1
+        assert sketch.estimate("hot") > sketch.estimate("warm")
+    
+    def test_counters_halve_after_sample(self):
+        sketch = FrequencySketch(width=16, sample_factor=1)
+        for _ in range(8):
+            sketch.increment("hot")
+        assert sketch.estimate("hot") == 8
+        
+        for i in range(8):
+            sketch.increment(f"cold-{i}")
+        assert sketch.resets == 1
+        assert sketch.estimate("hot") <= 5
+    
+    def test_set_neighbours_spread_over_sketch(self):
+        cache = HotResultCache(capacity=256, ways=4)
+        keys = [f"cmd-{i}" for i in range(20000)]
+        neighbours = [key for key in keys if cache._slot_range(key) == cache._slot_range(keys[0])][:64]
+        
+        # Keys competing for one set must not also share sketch counters;
+        # reusing the set index bits leaves them only width / sets row-0 counters
+        row_zero = {cache.sketch._indexes(key)[0] for key in neighbours}
+        assert len(row_zero) > cache.sketch.width // (cache.capacity // cache.ways)
+
+
+class TestHotResultCache:
+    """Test lookup, TTL, versioning and TinyLFU admission."""
+    
+    def test_hit_and_version_invalidation(self):
+        cache = HotResultCache(capacity=16)
+        cache.get("key", 1)
+        assert cache.put("key", "result", 1)
+        
+        assert cache.get("key", 1) == "result"
+        assert cache.get("key", 2) is None
+        assert len(cache) == 0
+        
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['stale_version']) == (1, 2, 1)
+        assert stats['hit_ratio'] == pytest.approx(1 / 3)
+    
+    def test_entries_expire(self):
+        cache = HotResultCache(capacity=16, ttl_seconds=0.0)
+        cache.put("key", "result", 1)
+        
+        assert cache.get("key", 1) is None
+        assert cache.get_stats()['expired'] == 1
+    
+    def test_full_set_admits_only_more_frequent_keys(self):
+        # A single set, so every key competes for the same slots
+        cache = HotResultCache(capacity=2, ways=2)
+        cache._set_mask = 0
+        # A tiny cache gets a 16-counter sketch where these keys can collide;
+        # a wide one keeps the estimates exact under any hash seed
+        cache.sketch = FrequencySketch(width=1 << 16)
+        for key in ("a", "b"):
+            for _ in range(3):
+                cache.get(key, 1)
+            cache.put(key, key, 1)
+        
+        cache.get("once", 1)
+        assert not cache.put("once", "once", 1)
+        assert cache.get_stats()['rejections'] == 1
+        
+        for _ in range(6):
+            cache.get("popular", 1)
+        assert cache.put("popular", "popular", 1)
+        assert cache.get("popular", 1) == "popular"
+        assert cache.get_stats()['evictions'] == 1
+    
+    def test_reinsert_reuses_the_keys_slot(self):
+        cache = HotResultCache(capacity=4, ways=4)
+        cache._set_mask = 0
+        for key in ("k1", "k2", "k3"):
+            cache.put(key, key, 1)
+        cache._clear_slot(0)
+        
+        assert cache.put("k2", "again", 1)
+        assert cache._keys.count("k2") == 1
+        assert cache.get("k2", 1) == "again"
+        assert len(cache) == 2
+    
+    def test_table_size_is_fixed(self):
+        cache = HotResultCache(capacity=64)
+        for i in range(1000):
+            cache.get(f"key-{i}", 1)
+            cache.put(f"key-{i}", i, 1)
+        
+        assert len(cache) <= cache.capacity == 64
+
+
+class TestDispatcherHotCache:
+    """Test that the dispatcher serves repeats from the L0 table."""
+    
+    @pytest.mark.asyncio
+    async def test_repeat_is_served_from_l0(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        first = await dispatcher.validate_request(bash("npm test", "req-1"))
+        second = await dispatcher.validate_request(bash("npm test", "req-2"))
+        
+        assert calls == ["req-1"]
+        assert first.cache_layer != "hot_pattern"
+        assert second.cache_layer == "hot_pattern"
+        assert second.cache_hit
+        assert second.request_id == "req-2"
+        assert second.decision == ValidationDecision.APPROVED
+        
+        stats = dispatcher.get_performance_stats()['hot_cache']
+        assert stats['hits'] == 1
+        assert stats['hit_ratio'] == pytest.approx(0.5)
+    
+    @pytest.mark.asyncio
+    async def test_distinct_commands_do_not_share_entries(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        await dispatcher.validate_request(bash("npm test", "req-1"))
+        result = await dispatcher.validate_request(bash("npm run lint", "req-2"))
+        
+        assert result.cache_layer != "hot_pattern"
+    
+    @pytest.mark.asyncio
+    async def test_pattern_decisions_stay_out_of_l0(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        async def agent_aware_prediction(request, start_time):
+            decision = ValidationDecision.BLOCKED if "system" in request.agent_id else ValidationDecision.APPROVED
+            return ValidationResult(decision=decision, confidence=ValidationConfidence.HIGH,
+                                    reason="pattern", request_id=request.request_id,
+                                    processing_time_ms=1.0, cache_layer="pattern")
+        
+        dispatcher._try_optimized_pattern_cache = agent_aware_prediction
+        await dispatcher.validate_request(bash("make build", "req-1", agent_id="dev"))
+        result = await dispatcher.validate_request(bash("make build", "req-2", agent_id="system"))
+        
+        assert len(dispatcher.hot_cache) == 0
+        assert result.decision == ValidationDecision.BLOCKED
+    
+    @pytest.mark.asyncio
+    async def test_policy_change_invalidates(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        await dispatcher.validate_request(bash("deploy now", "req-1"))
+        dispatcher.policy_cache._install_rules([
+            {'rule_id': 'no_deploy', 'pattern': r'deploy', 'decision': 'blocked',
+             'confidence': 'high', 'priority': 10}
+        ])
+        result = await dispatcher.validate_request(bash("deploy now", "req-2"))
+        
+        assert result.decision == ValidationDecision.BLOCKED
+        assert result.cache_layer != "hot_pattern"
+        assert dispatcher.hot_cache.get_stats()['stale_version'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_results_decided_across_a_swap_are_not_cached(self, stub_expert):
+        dispatcher, calls = stub_expert
+        expert = dispatcher._escalate_to_expert_optimized
+        
+        async def expert_during_reload(request, start_time):
+            dispatcher.policy_cache._install_rules([])
+            return await expert(request, start_time)
+        
+        dispatcher._escalate_to_expert_optimized = expert_during_reload
+        await dispatcher.validate_request(bash("npm test", "req-1"))
+        
+        assert len(dispatcher.hot_cache) == 0
+    
+    @pytest.mark.asyncio
+    async def test_low_confidence_results_are_not_cached(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        async def unsure_expert(request, start_time):
+            calls.append(request.request_id)
+            return ValidationResult(decision=ValidationDecision.BLOCKED, confidence=ValidationConfidence.LOW,
+                                    reason="safe default", request_id=request.request_id,
+                                    processing_time_ms=1.0)
+        
+        dispatcher._escalate_to_expert_optimized = unsure_expert
+        await dispatcher.validate_request(bash("npm test", "req-1"))
+        await dispatcher.validate_request(bash("npm test", "req-2"))
+        
+        assert len(dispatcher.hot_cache) == 0
@@ -0,0 +1,149 @@
+"""Unit tests for off-loop pattern model training and promotion."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+import pytest_asyncio
+
+from lighthouse.bridge.speed_layer.model_training import (
+    SKLEARN_AVAILABLE, ModelTrainingWorker, ensure_private_dir, load_model_file, snapshot_expert_decisions,
+    train_model_artifact
+)
+from lighthouse.bridge.speed_layer.models import ValidationDecision, ValidationRequest
+from lighthouse.bridge.speed_layer.optimized_pattern_cache import OptimizedPatternCache
+from lighthouse.event_store.models import Event, EventType
+from lighthouse.event_store.store import EventStore
+
+pytestmark = pytest.mark.skipif(not SKLEARN_AVAILABLE, reason="scikit-learn not installed")
+
+
+def examples(count=60, flip=False):
+    rows = []
+    for i in range(count):
+        rows.append((f"Bash rm -rf build{i} agent", 'approved' if flip else 'blocked'))
+        rows.append((f"Bash cat notes{i}.txt agent", 'blocked' if flip else 'approved'))
+    return rows
+
+
+@pytest_asyncio.fixture
+async def event_store():
+    temp_dir = tempfile.mkdtemp()
+    store = EventStore(data_dir=temp_dir, allowed_base_dirs=[temp_dir, "/tmp"])
+    await store.initialize()
+    store.authenticate_agent("test-agent", store.create_agent_token("test-agent"), "agent")
+    yield store
+    await store.shutdown()
+    shutil.rmtree(temp_dir)
+
+
+class TestTrainingArtifacts:
+    """Test versioned artifacts and shadow-evaluated promotion."""
+    
+    def test_artifact_is_versioned_and_loadable(self, tmp_path):
+        artifact = train_model_artifact(examples(), str(tmp_path), version=3)
+        
+        assert artifact.path == str(tmp_path / "pattern_model_v3.pkl")
+        assert artifact.metrics['holdout_accuracy'] == 1.0
+        assert artifact.training_samples + len(artifact.holdout_labels) == 120
+        
+        model, version = load_model_file(artifact.path)
+        assert version == "ml_v3"
+        assert list(model.predict(["Bash rm -rf build999 agent"])) == ['blocked']
+        assert [p.name for p in tmp_path.iterdir()] == ["pattern_model_v3.pkl"]
+    
+    @pytest.mark.asyncio
+    async def test_worker_process_trains_and_cache_promotes(self, tmp_path):
+        cache = OptimizedPatternCache()
+        await cache._train_simple_model()
+        worker = ModelTrainingWorker(artifact_dir=str(tmp_path))
+        worker.add_listener(cache.load_model_artifact)
+        
+        try:
+            artifact = await worker.train(examples())
+            assert artifact.version == 1
+            assert cache.model_version == "ml_v1"
+            
+            request = ValidationRequest(tool_name="Bash", tool_input={'command': "rm -rf build7"}, agent_id="agent")
+            prediction = await cache.predict(request)
+            assert prediction.decision == ValidationDecision.BLOCKED
+            assert prediction.model_version == "ml_v1"
+            
+            # A worse candidate is recorded but not promoted
+            worse = await worker.train(examples(flip=True)[:40] + examples()[:80])
+            assert worse.version == 2
+            stats = cache.get_stats()
+            assert stats['model_version'] == "ml_v1"
+            assert [e['promoted'] for e in stats['shadow_evaluations']] == [True, False]
+            rejected = stats['shadow_evaluations'][1]
+            assert rejected['candidate_accuracy'] < rejected['current_accuracy']
+        finally:
+            await worker.close()
+    
+    @pytest.mark.asyncio
+    async def test_small_snapshots_are_skipped(self, tmp_path):
+        worker = ModelTrainingWorker(artifact_dir=str(tmp_path), min_examples=20)
+        assert await worker.train(examples(5)) is None
+        assert worker.get_stats()['skipped'] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_shared_artifact_directories_are_refused(self, tmp_path):
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        os.chmod(shared, 0o777)
+        with pytest.raises(PermissionError):
+            ensure_private_dir(str(shared))
+        
+        worker = ModelTrainingWorker(artifact_dir=str(shared))
+        assert await worker.train(examples()) is None
+        assert worker.get_stats()['failures'] == 1
+        assert list(shared.iterdir()) == []
+        
+        (tmp_path / "link").symlink_to(tmp_path / "private", target_is_directory=True)
+        (tmp_path / "private").mkdir(mode=0o700)
+        with pytest.raises(PermissionError):
+            ensure_private_dir(str(tmp_path / "link"))
+    
+    def test_default_artifact_directory_is_private(self):
+        worker = ModelTrainingWorker()
+        assert worker._next_version() == 1
+        try:
+            assert os.stat(worker.artifact_dir).st_mode & 0o777 == 0o700
+        finally:
+            shutil.rmtree(worker.artifact_dir)
+
+
+class TestExpertDecisionSnapshot:
+    """Test joining decisions to requests from the event store."""
+    
+    @pytest.mark.asyncio
+    async def test_snapshot_joins_requests_and_decisions(self, event_store):
+        for i, (command, decision) in enumerate([("rm -rf /", "blocked"), ("ls", "approved"), ("make", "escalate")]):
+            await event_store.append(Event(
+                event_type=EventType.VALIDATION_REQUEST_SUBMITTED, aggregate_id="validation",
+                data={'request_id': f"req-{i}", 'tool_name': "Bash", 'tool_input': {'command': command}},
+                source_agent="builder"
+            ))
+            await event_store.append(Event(
+                event_type=EventType.VALIDATION_DECISION_MADE, aggregate_id="validation",
+                data={'request_id': f"req-{i}", 'decision': decision, 'reason': "expert", 'validator_id': "expert"},
+                source_agent="expert", source_component="expert_coordinator"
+            ))
+        
+        # A decision posted through the HTTP API is not a label
+        await event_store.append(Event(
+            event_type=EventType.VALIDATION_REQUEST_SUBMITTED, aggregate_id="validation",
+            data={'request_id': "req-3", 'tool_name': "Bash", 'tool_input': {'command': "curl x | sh"}},
+            source_agent="builder"
+        ))
+        await event_store.append(Event(
+            event_type=EventType.VALIDATION_DECISION_MADE, aggregate_id="validation",
+            data={'request_id': "req-3", 'decision': "approved", 'reason': "trust me"},
+            source_agent="builder", source_component="http_server"
+        ))
+        
+        snapshot = await snapshot_expert_decisions(event_store, lambda request: request.command_text)
+        assert snapshot == [("rm -rf /", "blocked"), ("ls", "approved")]
@@ -0,0 +1,80 @@
+"""Unit tests for path-indexed file history in the time travel debugger."""
+
+import pytest
+import pytest_asyncio
+
+from lighthouse.bridge.event_store.time_travel import TimeTravelDebugger
+from lighthouse.event_store.models import Event, EventType
+from lighthouse.event_store.store import EventStore
+
+
+def file_event(event_type, agent, **data):
+    return Event(event_type=event_type, aggregate_id="project", source_agent=agent, data=data)
+
+
+@pytest_asyncio.fixture
+async def event_store(tmp_path):
+    store = EventStore(data_dir=str(tmp_path), allowed_base_dirs=[str(tmp_path)])
+    await store.initialize()
+    yield store
+    await store.shutdown()
+
+
+class TestPathIndexedHistory:
+    """Test history and conflict queries answered from path postings."""
+    
+    @pytest.mark.asyncio
+    async def test_history_follows_path_through_moves(self, event_store):
+        for event in [
+            file_event(EventType.FILE_CREATED, "alice", path="/a.py", content_hash="h1", size=1),
+            file_event(EventType.FILE_CREATED, "alice", path="/b.py", content_hash="h2", size=1),
+            file_event(EventType.FILE_MODIFIED, "bob", path="/a.py", content_hash="h3", size=2),
+            file_event(EventType.FILE_MOVED, "bob", old_path="/a.py", new_path="/c.py"),
+        ]:
+            await event_store.append(event)
+        
+        debugger = TimeTravelDebugger(event_store)
+        history = await debugger.get_file_history("/a.py", "project")
+        
+        assert [entry.operation for entry in history] == ["created", "modified", "moved"]
+        assert [entry.agent_id for entry in history] == ["alice", "bob", "bob"]
+        assert debugger._history_entry_at(history, history[1].timestamp).content_hash == "h3"
+        assert debugger._history_entry_at(history, history[-1].timestamp) is None
+    
+    @pytest.mark.asyncio
+    async def test_conflicts_group_recent_events_by_path(self, event_store):
+        for event in [
+            file_event(EventType.FILE_MODIFIED, "alice", path="/shared.py"),
+            file_event(EventType.FILE_MODIFIED, "alice", path="/solo.py"),
+            file_event(EventType.FILE_MODIFIED, "bob", path="/shared.py"),
+            file_event(EventType.FILE_MODIFIED, "alice", path="/mine.py"),
+            file_event(EventType.FILE_MODIFIED, "alice", path="/mine.py"),
+        ]:
+            await event_store.append(event)
+        
+        conflicts = await TimeTravelDebugger(event_store).analyze_concurrency_conflicts("project")
+        
+        assert [c['file_path'] for c in conflicts] == ["/shared.py"]
+        assert sorted(conflicts[0]['agents']) == ["alice", "bob"]
+        assert conflicts[0]['events'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cached_history_is_invalidated_by_new_path_events(self, event_store):
+        await event_store.append(file_event(EventType.FILE_CREATED, "alice", path="/a.py", size=1))
+        await event_store.append(file_event(EventType.FILE_CREATED, "alice", path="/b.py", size=1))
+        
+        debugger = TimeTravelDebugger(event_store)
+        assert len(await debugger.get_file_history("/a.py", "project")) == 1
+        assert len(await debugger.get_file_history("/a.py", "project")) == 1
+        
+        # An event on another path leaves the cached history valid
+        await event_store.append(file_event(EventType.FILE_MODIFIED, "bob", path="/b.py", size=2))
+        assert len(await debugger.get_file_history("/a.py", "project")) == 1
+        
+        await event_store.append(file_event(EventType.FILE_MODIFIED, "bob", path="/a.py", size=2))
+        history = await debugger.get_file_history("/a.py", "project")
+        
+        assert [entry.agent_id for entry in history] == ["alice", "bob"]
+        stats = debugger.get_cache_stats()['file_history']
+        assert stats['hits'] == 2
+        assert stats['invalidations'] == 1
@@ -0,0 +1,135 @@
+"""Unit tests for micro-batched scoring in the pattern tier."""
+
+import asyncio
+import logging
+
+import pytest
+
+from lighthouse.bridge.speed_layer.models import ValidationRequest
+from lighthouse.bridge.speed_layer.optimized_dispatcher import OptimizedSpeedLayerDispatcher
+from lighthouse.bridge.speed_layer import optimized_pattern_cache
+from lighthouse.bridge.speed_layer.optimized_pattern_cache import (
+    FEATURE_NAMES, SKLEARN_AVAILABLE, FastFeatureExtractor, FastPatternClassifier, OptimizedPatternCache
+)
+
+
+def bash(command, request_id="req"):
+    return ValidationRequest(tool_name="Bash", tool_input={'command': command},
+                             agent_id="agent", request_id=request_id)
+
+
+def count_transforms(cache):
+    vectorizer = cache.ml_model.named_steps['vectorizer']
+    calls = []
+    transform = vectorizer.transform
+    
+    def counting_transform(texts):
+        calls.append(len(texts))
+        return transform(texts)
+    
+    vectorizer.transform = counting_transform
+    return calls
+
+
+class TestFastPatternClassifier:
+    """Test fixed-order feature vectors and dot-product scoring."""
+    
+    def test_vector_and_dict_agree(self):
+        extractor = FastFeatureExtractor()
+        request = ValidationRequest(tool_name="Bash", tool_input={'command': "sudo format /etc/disk; ls"},
+                                    agent_id="system_agent")
+        vector = extractor.extract_feature_vector(request)
+        features = extractor.extract_features_fast(request)
+        
+        assert list(features) == list(FEATURE_NAMES)
+        assert list(features.values()) == list(vector)
+        # Overlapping keywords count like substring checks: "format" also contains "rm"
+        assert features['dangerous_keyword_count'] == 3.0
+        assert features['safe_keyword_count'] == 1.0
+        assert features['has_system_path'] == features['has_special_chars'] == features['is_system_agent'] == 1.0
+    
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_batch_scoring(self, monkeypatch, use_numpy):
+        if not use_numpy:
+            monkeypatch.setattr(optimized_pattern_cache, "HAS_NUMPY", False)
+        classifier = FastPatternClassifier()
+        requests = [
+            ValidationRequest(tool_name="Read", tool_input={'file_path': "/src/app.py"}, agent_id="agent"),
+            bash("sudo rm -rf /etc/nginx"),
+            bash("npm test && npm run build"),
+        ]
+        
+        batch = classifier.predict_batch(requests)
+        assert [p.decision.value for p in batch] == ["approved", "blocked", "escalate"]
+        assert batch[1].top_features[0][0] == 'dangerous_keyword_count'
+        assert len(batch[0].feature_vector) == len(FEATURE_NAMES)
+        
+        # Cached predictions come back unchanged
+        assert classifier.predict(requests[1]) is batch[1]
+
+
+@pytest.mark.skipif(not SKLEARN_AVAILABLE, reason="scikit-learn not installed")
+class TestBatchPrediction:
+    """Test that a batch is vectorized and scored with one model call."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_matches_single_predictions(self):
+        cache = OptimizedPatternCache()
+        await cache._train_simple_model()
+        requests = [bash(f"rm -rf build-{i}") for i in range(5)] + [bash(f"ls -la src/{i}") for i in range(5)]
+        
+        calls = count_transforms(cache)
+        batch = await cache.predict_batch(requests)
+        assert calls == [10]
+        assert all(prediction.feature_vector == [] for prediction in batch)
+        
+        fresh = OptimizedPatternCache()
+        await fresh._train_simple_model()
+        singles = [await fresh.predict(request) for request in requests]
+        assert [p.decision for p in batch] == [p.decision for p in singles]
+        assert [p.confidence_score for p in batch] == pytest.approx([p.confidence_score for p in singles])
+        assert cache.get_stats()['model_predictions'] == 10
+    
+    @pytest.mark.asyncio
+    async def test_dense_vectors_only_when_debugging(self, caplog):
+        cache = OptimizedPatternCache()
+        await cache._train_simple_model()
+        
+        with caplog.at_level(logging.DEBUG, logger="lighthouse.bridge.speed_layer.optimized_pattern_cache"):
+            prediction = await cache.predict(bash("sudo rm important.txt"))
+        assert len(prediction.feature_vector) == len(cache.ml_model.named_steps['vectorizer'].vocabulary_)
+
+
+class TestDispatcherMicroBatching:
+    """Test that concurrent pattern tier requests share batches."""
+    
+    @pytest.mark.asyncio
+    async def test_burst_is_scored_in_batches(self):
+        dispatcher = OptimizedSpeedLayerDispatcher(pattern_batch_window_ms=20, pattern_batch_max_size=64)
+        await dispatcher.pattern_cache._train_simple_model()
+        batch_sizes = []
+        predict_batch = dispatcher.pattern_cache.predict_batch
+        
+        async def recording_predict_batch(requests):
+            batch_sizes.append(len(requests))
+            return await predict_batch(requests)
+        
+        dispatcher.pattern_cache.predict_batch = recording_predict_batch
+        loop_task = asyncio.create_task(dispatcher._batch_processing_loop())
+        await asyncio.sleep(0)
+        
+        try:
+            requests = [bash(f"cat notes-{i}.txt", f"req-{i}") for i in range(100)]
+            predictions = await asyncio.gather(*(dispatcher._predict_pattern(r) for r in requests))
+            
+            assert batch_sizes == [64, 36]
+            expected = await dispatcher.pattern_cache.predict_batch(requests)
+            assert [p.decision for p in predictions] == [p.decision for p in expected]
+            assert dispatcher.get_performance_stats()['pattern_batching']['batches'] == 2
+        finally:
+            loop_task.cancel()
+            await asyncio.gather(loop_task, return_exceptions=True)
+        
+        # Without the batch loop the tier predicts directly
+        assert not dispatcher._batch_loop_running
+        assert (await dispatcher._predict_pattern(bash("ls"))) is not None
@@ -0,0 +1,110 @@
+"""Unit tests for persistent maps and copy-on-write project states."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from lighthouse.bridge.event_store.persistent_map import PersistentMap, PersistentSet
+from lighthouse.bridge.event_store.project_state import ProjectState
+from lighthouse.event_store.models import Event, EventType
+
+
+class CollidingKey:
+    """Key type with heavy hash collisions"""
+    
+    def __init__(self, value):
+        self.value = value
+    
+    def __hash__(self):
+        return self.value % 3
+    
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.value == self.value
+
+
+class TestPersistentMap:
+    """Test dict semantics, fork isolation and structural diff."""
+    
+    def test_matches_dict_under_random_operations(self):
+        rng = random.Random(7)
+        for make_key in (lambda n: n, CollidingKey):
+            persistent, reference = PersistentMap(), {}
+            for i in range(2000):
+                key = make_key(rng.randrange(300))
+                if rng.random() < 0.65:
+                    persistent[key] = i
+                    reference[key] = i
+                else:
+                    assert persistent.pop(key, None) == reference.pop(key, None)
+                assert len(persistent) == len(reference)
+            assert dict(persistent.items()) == reference
+    
+    def test_fork_is_isolated(self):
+        original = PersistentMap((f"/file_{i}", i) for i in range(1000))
+        fork = original.fork()
+        
+        fork["/file_1"] = "changed"
+        del fork["/file_2"]
+        original["/new"] = True
+        
+        assert original["/file_1"] == 1 and "/file_2" in original
+        assert "/new" not in fork
+        assert len(original) == 1001 and len(fork) == 999
+    
+    def test_diff_reports_only_changes(self):
+        original = PersistentMap((f"/file_{i}", i) for i in range(5000))
+        fork = original.fork()
+        fork["/file_10"] = -1
+        del fork["/file_20"]
+        fork["/added"] = 0
+        
+        assert sorted(original.diff(fork), key=str) == sorted([
+            ("/file_10", 10, -1),
+            ("/file_20", 20, None),
+            ("/added", None, 0)
+        ], key=str)
+    
+    def test_persistent_set(self):
+        paths = PersistentSet(["/a"])
+        fork = paths.fork()
+        fork.add("/b")
+        paths.discard("/a")
+        
+        assert set(paths) == set()
+        assert set(fork) == {"/a", "/b"}
+
+
+def file_event(sequence, path, content_hash):
+    return Event(
+        event_type=EventType.FILE_MODIFIED,
+        aggregate_id="project",
+        sequence=sequence,
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=sequence),
+        data={'path': path, 'content_hash': content_hash, 'size': 1}
+    )
+
+
+class TestProjectStateFork:
+    """Test copy-on-write ProjectState forks."""
+    
+    def test_fork_shares_unchanged_state(self):
+        state = ProjectState("project")
+        state.apply_event(file_event(1, "/src/a.py", "h1"))
+        state.apply_event(file_event(2, "/src/b.py", "h2"))
+        
+        fork = state.fork()
+        fork.apply_event(file_event(3, "/src/a.py", "h3"))
+        fork.apply_event(file_event(4, "/docs/c.md", "h4"))
+        
+        assert state.get_file_hash("/src/a.py") == "h1"
+        assert len(state.get_file_history("/src/a.py")) == 1
+        assert state.directories["/"].children == {"src"}
+        assert fork.directories["/"].children == {"src", "docs"}
+        assert fork.get_file("/src/b.py") is state.get_file("/src/b.py")
+        
+        assert state.diff(fork) == {
+            'added': ["/docs/c.md"],
+            'removed': [],
+            'modified': ["/src/a.py"],
+            'directories_added': ["/docs"],
+            'directories_removed': []
+        }
@@ -0,0 +1,100 @@
+"""Unit tests for the persistent named pipe writer."""
+
+import os
+
+import pytest
+
+from lighthouse.bridge.event_store.pipe_writer import NamedPipeWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    pipe_writer = NamedPipeWriter(tmp_path / "streams" / "file_changes", max_pending=4)
+    pipe_writer.ensure_fifo()
+    yield pipe_writer
+    pipe_writer.close()
+
+
+def open_reader(writer):
+    return os.open(writer.pipe_path, os.O_RDONLY | os.O_NONBLOCK)
+
+
+class TestNamedPipeWriter:
+    """Test FIFO lifecycle, batching and drop accounting."""
+    
+    def test_no_reader_keeps_messages_pending(self, writer):
+        assert writer.enqueue('{"a": 1}')
+        
+        assert writer.flush() == 0
+        assert not writer.is_open
+        assert writer.pending == 1
+    
+    def test_batched_write_keeps_fd_open(self, writer):
+        reader = open_reader(writer)
+        try:
+            for i in range(3):
+                writer.enqueue(f'{{"n": {i}}}')
+            
+            assert writer.flush() == 3
+            assert writer.is_open
+            assert writer.batches_written == 1
+            
+            writer.enqueue('{"n": 3}')
+            assert writer.flush() == 1
+            assert writer.reader_attaches == 1
+            
+            data = os.read(reader, 4096)
+            assert data.splitlines() == [b'{"n": 0}', b'{"n": 1}', b'{"n": 2}', b'{"n": 3}']
+        finally:
+            os.close(reader)
+    
+    def test_reader_detach_and_reattach(self, writer):
+        reader = open_reader(writer)
+        writer.enqueue('first')
+        assert writer.flush() == 1
+        os.close(reader)
+        
+        writer.enqueue('lost reader')
+        assert writer.flush() == 0
+        assert writer.reader_detaches == 1
+        assert not writer.is_open
+        
+        reader = open_reader(writer)
+        try:
+            assert writer.flush() == 1
+            assert writer.reader_attaches == 2
+            assert os.read(reader, 4096) == b'lost reader\n'
+        finally:
+            os.close(reader)
+    
+    def test_overflow_drops_oldest(self, writer):
+        for i in range(6):
+            writer.enqueue(str(i))
+        
+        assert writer.pending == 4
+        assert writer.messages_dropped == 2
+        assert writer.get_stats()['messages_dropped'] == 2
+    
+    def test_overflow_never_drops_a_partly_written_message(self, tmp_path):
+        writer = NamedPipeWriter(tmp_path / "stream", max_pending=1)
+        writer.ensure_fifo()
+        reader = open_reader(writer)
+        try:
+            big = b'x' * (1 << 20)
+            writer.enqueue(big)
+            assert writer.flush() == 0  # Larger than the pipe buffer
+            assert writer._partial_offset > 0
+            
+            assert not writer.enqueue('newer')
+            assert writer.pending == 1
+            assert writer.messages_dropped == 1
+            
+            received = b''
+            while writer.pending:
+                received += os.read(reader, 1 << 20)
+                writer.flush()
+            received += os.read(reader, 1 << 20)
+            assert received == big + b'\n'
+        finally:
+            os.close(reader)
+            writer.close()
@@ -0,0 +1,94 @@
+"""Unit tests for the combined per-tool policy rule matcher."""
+
+import asyncio
+import re
+
+import pytest
+
+from lighthouse.bridge.speed_layer.models import ValidationDecision, ValidationRequest
+from lighthouse.bridge.speed_layer.optimized_policy_cache import (
+    OptimizedPolicyCache, RuleTrie, extract_required_literals
+)
+
+
+RULES = [
+    {'rule_id': 'block_rm', 'pattern': r'rm\s+-rf\s+/', 'decision': 'blocked',
+     'confidence': 'high', 'priority': 1000},
+    {'rule_id': 'block_sudo', 'pattern': r'(sudo\s+rm|chmod\s+777)', 'decision': 'blocked',
+     'confidence': 'high', 'priority': 900},
+    {'rule_id': 'escalate_etc', 'pattern': r'/etc/', 'decision': 'escalate',
+     'confidence': 'high', 'priority': 800},
+    {'rule_id': 'escalate_rm', 'pattern': r'\brm\b', 'decision': 'escalate',
+     'confidence': 'medium', 'priority': 500, 'tool_names': ['Bash']},
+    {'rule_id': 'ci_only', 'pattern': r'deploy', 'decision': 'approved',
+     'confidence': 'high', 'priority': 400, 'agent_patterns': ['^ci-']},
+    {'rule_id': 'allow_reads', 'pattern': r'.*', 'decision': 'approved',
+     'confidence': 'medium', 'priority': 1, 'tool_names': ['Read', 'Bash']},
+]
+
+
+def brute_force(rules, tool_name, text, agent_id):
+    """Reference: every applicable rule checked one at a time"""
+    applicable = [r for r in rules if not r.tool_names_set or tool_name in r.tool_names_set]
+    applicable.sort(key=lambda r: r.priority, reverse=True)
+    return [
+        r.rule_id for r in applicable
+        if (not r.agent_patterns_compiled or any(p.search(agent_id) for p in r.agent_patterns_compiled))
+        and (r.compiled_pattern is None or r.compiled_pattern.search(text))
+    ]
+
+
+class TestRequiredLiterals:
+    """Test literal extraction from rule regexes."""
+    
+    def test_extracts_longest_run_and_branch_sets(self):
+        def literals(pattern):
+            return extract_required_literals(re.compile(pattern, re.IGNORECASE))
+        
+        assert literals(r'rm\s+-RF\s+/') == {'-rf'}
+        assert literals(r'(sudo\s+rm|chmod\s+777)') == {'sudo', 'chmod'}
+        assert literals(r'\bcurl\b.*\|\s*sh') == {'curl'}
+        assert literals(r'(a|bc)') is None
+        assert literals(r'.*') is None
+        assert literals(r'(?:secret)?key') == {'key'}
+
+
+class TestMultiRuleMatcher:
+    """Test that the combined matcher agrees with rule-by-rule evaluation."""
+    
+    @pytest.mark.asyncio
+    async def test_matches_agree_with_brute_force(self):
+        cache = OptimizedPolicyCache()
+        await asyncio.sleep(0)
+        compiled = [cache._compile_rule(rule) for rule in RULES]
+        trie = RuleTrie()
+        for rule in compiled:
+            trie.add_rule(rule)
+        
+        commands = [
+            "rm -rf /", "sudo rm file", "SUDO  RM x", "cat /etc/passwd", "rm file",
+            "firmware update", "deploy app", "chmod 777 /etc/hosts", "ls -la",
+            "echo ſudo rm", "RM -RF /tmp",
+        ]
+        for tool_name in ["Bash", "Read", "Write"]:
+            for agent_id in ["ci-runner", "agent-1"]:
+                for text in commands:
+                    expected = brute_force(compiled, tool_name, text, agent_id)
+                    matched = [r.rule_id for r in trie.match(tool_name, text, agent_id)]
+                    assert matched == expected, (tool_name, agent_id, text)
+    
+    @pytest.mark.asyncio
+    async def test_evaluate_uses_priority_and_reload_swaps(self):
+        cache = OptimizedPolicyCache()
+        await asyncio.sleep(0)
+        cache._install_rules(RULES)
+        
+        request = ValidationRequest(tool_name="Bash", tool_input={'command': 'sudo rm /etc/x'}, agent_id="a")
+        assert cache.match_rule_ids(request) == ['block_sudo', 'escalate_etc', 'escalate_rm', 'allow_reads']
+        assert (await cache.evaluate(request)).decision == ValidationDecision.BLOCKED
+        
+        old_trie = cache.rule_trie
+        cache._install_rules(RULES[2:])
+        assert cache.rule_trie is not old_trie
+        assert cache.match_rule_ids(request) == ['escalate_etc', 'escalate_rm', 'allow_reads']
+        assert cache.get_stats()['matchers']['Bash'] == {'rules': 4, 'prefiltered': 3}
@@ -0,0 +1,155 @@
+"""Unit tests for versioned policy rule sets and hot reload."""
+
+import asyncio
+import json
+
+import pytest
+
+from lighthouse.bridge.speed_layer.models import ValidationDecision, ValidationRequest
+from lighthouse.bridge.speed_layer.optimized_dispatcher import OptimizedSpeedLayerDispatcher
+from lighthouse.bridge.speed_layer.optimized_policy_cache import OptimizedPolicyCache
+from lighthouse.bridge.speed_layer.rule_watcher import RuleFileWatcher
+
+
+RULES = [
+    {'rule_id': 'block_rm', 'pattern': r'rm\s+-rf', 'decision': 'blocked',
+     'confidence': 'high', 'priority': 1000},
+    {'rule_id': 'escalate_etc', 'pattern': r'/etc/', 'decision': 'escalate',
+     'confidence': 'high', 'priority': 800},
+    {'rule_id': 'allow_reads', 'pattern': r'.*', 'decision': 'approved',
+     'confidence': 'medium', 'priority': 1, 'tool_names': ['Read']},
+]
+
+
+def request(tool_name, command):
+    key = 'command' if tool_name == 'Bash' else 'file_path'
+    return ValidationRequest(tool_name=tool_name, tool_input={key: command}, agent_id="agent")
+
+
+def write_rules(path, rules):
+    path.write_text(json.dumps({'rules': rules}))
+
+
+async def wait_for(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestVersionedRuleSets:
+    """Test rule set swaps and selective memo invalidation."""
+    
+    @pytest.mark.asyncio
+    async def test_reload_drops_only_decisions_of_changed_rules(self):
+        cache = OptimizedPolicyCache()
+        await asyncio.sleep(0)
+        cache._install_rules(RULES)
+        version = cache.rule_set_version
+        
+        rm, etc, read = request("Bash", "rm -rf x"), request("Bash", "cat /etc/x"), request("Read", "/a.py")
+        for req in (rm, etc, read):
+            await cache.evaluate(req)
+        assert len(cache._decision_memo) == 3
+        
+        # Changing the low-priority Read rule cannot affect the Bash decisions
+        changed = [dict(rule) for rule in RULES]
+        changed[2]['decision'] = 'escalate'
+        cache._install_rules(changed)
+        
+        assert cache.rule_set_version == version + 1
+        assert set(cache._decision_memo) == {cache._get_request_fingerprint(rm),
+                                             cache._get_request_fingerprint(etc)}
+        assert (await cache.evaluate(read)).decision == ValidationDecision.ESCALATE
+        
+        stats = cache.get_stats()['rule_set']
+        assert stats['version'] == version + 1
+        assert stats['memo_invalidations'] == 1
+        assert stats['last_compile_ms'] > 0
+    
+    @pytest.mark.asyncio
+    async def test_added_rule_invalidates_decisions_it_may_outrank(self):
+        cache = OptimizedPolicyCache()
+        await asyncio.sleep(0)
+        cache._install_rules(RULES)
+        
+        etc, rm = request("Bash", "cat /etc/x"), request("Bash", "rm -rf x")
+        assert (await cache.evaluate(etc)).decision == ValidationDecision.ESCALATE
+        await cache.evaluate(rm)
+        
+        block_etc = {'rule_id': 'block_etc', 'pattern': r'/etc/', 'decision': 'blocked',
+                     'confidence': 'high', 'priority': 900}
+        cache._install_rules(RULES + [block_etc])
+        
+        # The decision by a higher-priority unchanged rule survives
+        assert set(cache._decision_memo) == {cache._get_request_fingerprint(rm)}
+        assert (await cache.evaluate(etc)).decision == ValidationDecision.BLOCKED
+
+
+class TestRuleFileReload:
+    """Test watching the rule file and reloading off the hot path."""
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    async def test_file_change_swaps_rule_set(self, tmp_path, use_inotify):
+        rule_file = tmp_path / "rules.json"
+        write_rules(rule_file, RULES)
+        
+        cache = OptimizedPolicyCache(rule_config_path=str(rule_file), watch_rule_file=False)
+        await wait_for(lambda: cache.rule_set_version == 1)
+        cache._watcher = RuleFileWatcher(str(rule_file), cache.reload_rules,
+                                         poll_interval=0.02, use_inotify=use_inotify)
+        await cache._watcher.start()
+        
+        try:
+            etc = request("Bash", "cat /etc/x")
+            assert (await cache.evaluate(etc)).decision == ValidationDecision.ESCALATE
+            
+            # Replace the file atomically, as deploy tooling does
+            changed = [dict(rule) for rule in RULES]
+            changed[1]['decision'] = 'blocked'
+            staging = tmp_path / "rules.json.tmp"
+            write_rules(staging, changed)
+            staging.replace(rule_file)
+            
+            await wait_for(lambda: cache.rule_set_version == 2)
+            assert (await cache.evaluate(etc)).decision == ValidationDecision.BLOCKED
+            
+            # A broken file keeps the current rule set
+            rule_file.write_text("{not json")
+            await wait_for(lambda: cache.get_stats()['rule_set']['reload_failures'] == 1)
+            assert cache.rule_set_version == 2
+        finally:
+            await cache.stop_watching()
+
+
+class TestDispatcherReload:
+    """Test that a reload reaches decisions cached ahead of the policy tier."""
+    
+    @pytest.mark.asyncio
+    async def test_reload_changes_dispatcher_decisions(self, tmp_path):
+        rule_file = tmp_path / "rules.json"
+        deploy = {'rule_id': 'deploy', 'pattern': r'make\s+deploy', 'decision': 'approved',
+                  'confidence': 'high', 'priority': 500}
+        write_rules(rule_file, [deploy])
+        
+        dispatcher = OptimizedSpeedLayerDispatcher(policy_config_path=str(rule_file))
+        await wait_for(lambda: dispatcher.policy_cache.rule_set_version == 1)
+        
+        try:
+            for _ in range(2):
+                result = await dispatcher.validate_request(request("Bash", "make deploy"))
+                assert result.decision == ValidationDecision.APPROVED
+            
+            write_rules(rule_file, [dict(deploy, decision='blocked')])
+            assert await dispatcher.policy_cache.reload_rules()
+            
+            layers = []
+            for _ in range(3):
+                result = await dispatcher.validate_request(request("Bash", "make deploy"))
+                assert result.decision == ValidationDecision.BLOCKED
+                layers.append(result.cache_layer)
+            assert layers[0] not in ("memory", "hot_pattern")
+            assert dispatcher.memory_cache.get_stats()['stale_rule_set'] == 1
+        finally:
+            await dispatcher.policy_cache.stop_watching()
@@ -0,0 +1,123 @@
+"""Unit tests for the ProjectState path index."""
+
+from datetime import datetime, timedelta
+
+from lighthouse.bridge.event_store.project_state import ProjectState
+from lighthouse.event_store.models import Event, EventType
+
+
+def apply(state, event_type, **data):
+    state.apply_event(Event(
+        event_type=event_type,
+        aggregate_id="project",
+        sequence=state.last_event_sequence + 1,
+        data=data
+    ))
+
+
+class TestProjectStatePathIndex:
+    """Test listings and counts maintained at apply time."""
+    
+    def build_state(self):
+        state = ProjectState("project")
+        for path in ["/README.md", "/src/app.py", "/src/lib/util.py", "/src/lib/io.py", "/docs/index.md"]:
+            apply(state, EventType.FILE_CREATED, path=path, content_hash=path, size=1)
+        return state
+    
+    def test_listings(self):
+        state = self.build_state()
+        
+        assert sorted(state.list_files('/src')) == ["/src/app.py", "/src/lib/io.py", "/src/lib/util.py"]
+        assert sorted(state.list_files('/src/lib/')) == ["/src/lib/io.py", "/src/lib/util.py"]
+        assert sorted(state.list_directories('/')) == ["/docs", "/src"]
+        assert state.list_directories('/src') == ["/src/lib"]
+        assert sorted(state.list_directory_entries('/')) == ["README.md", "docs", "src"]
+        assert sorted(state.list_directory_entries('/src')) == ["app.py", "lib"]
+        assert state.directories['/src'].children == {"app.py", "lib"}
+    
+    def test_counts_follow_deletes_and_moves(self):
+        state = self.build_state()
+        assert state.count_files('/src') == 3
+        
+        apply(state, EventType.FILE_DELETED, path="/src/lib/io.py")
+        apply(state, EventType.FILE_MOVED, old_path="/src/lib/util.py", new_path="/docs/util.py")
+        
+        assert state.count_files('/src') == 1
+        assert state.count_files('/src/lib') == 0
+        assert state.count_files('/docs') == 2
+        assert state.count_files() == 4
+        assert state.list_files('/src/lib') == []
+        assert sorted(state.list_directory_entries('/src')) == ["app.py", "lib"]
+    
+    def test_fork_keeps_index_isolated(self):
+        state = self.build_state()
+        fork = state.fork()
+        apply(fork, EventType.FILE_CREATED, path="/src/lib/new.py", content_hash="n", size=1)
+        
+        assert state.count_files('/src/lib') == 2
+        assert fork.count_files('/src/lib') == 3
+        assert "new.py" not in state.list_directory_entries('/src/lib')
+
+
+def sequenced(sequence, event_type, **data):
+    return Event(event_type=event_type, aggregate_id="project", sequence=sequence, data=data)
+
+
+class TestApplyEvents:
+    """Test batched event application."""
+    
+    def test_batch_matches_single_event_application(self):
+        events = [
+            sequenced(1, EventType.FILE_CREATED, path="/src/a.py", content_hash="a1", size=1),
+            sequenced(2, EventType.AGENT_HEARTBEAT),
+            sequenced(3, EventType.FILE_MOVED, old_path="/src/a.py", new_path="/lib/a.py"),
+            sequenced(4, EventType.VALIDATION_REQUEST_SUBMITTED, request_id="r1", tool_name="Bash"),
+            sequenced(5, EventType.VALIDATION_DECISION_MADE, request_id="r1", decision="approved"),
+        ]
+        single, batched = ProjectState("project"), ProjectState("project")
+        for event in events:
+            single.apply_event(event)
+        
+        assert batched.apply_events(events) == 5
+        assert batched.apply_events(events[:2]) == 0  # Duplicates are skipped
+        assert batched.to_dict()['files'] == single.to_dict()['files']
+        assert sorted(batched.directories) == sorted(single.directories)
+        assert batched.validation_requests == single.validation_requests
+        assert batched.version == single.version == 5
+    
+    def test_directory_times_coalesce_within_a_batch(self):
+        start = datetime(2024, 1, 1)
+        events = [sequenced(1, EventType.FILE_CREATED, path="/src/a.py", content_hash="a0", size=1)]
+        events += [
+            sequenced(i, EventType.FILE_MODIFIED, path="/src/a.py", content_hash=f"a{i}", size=1)
+            for i in range(2, 50)
+        ]
+        for i, event in enumerate(events):
+            event.timestamp = start + timedelta(seconds=i)
+        
+        state = ProjectState("project")
+        state.apply_events(events[:1])
+        before = state.fork()
+        
+        state.apply_events(events[1:])
+        assert state.directories['/src'].last_modified == events[-1].timestamp
+        assert before.directories['/src'].last_modified == events[0].timestamp
+        assert len(state.get_file_history("/src/a.py")) == 49
+        assert state._directory_touches == {}
+    
+    def test_failure_keeps_preceding_events(self):
+        state = ProjectState("project")
+        events = [
+            sequenced(1, EventType.FILE_CREATED, path="/a.py", content_hash="a", size=1),
+            sequenced(2, EventType.FILE_CREATED, content_hash="missing path", size=1),
+            sequenced(3, EventType.FILE_CREATED, path="/b.py", content_hash="b", size=1),
+        ]
+        
+        try:
+            state.apply_events(events)
+        except KeyError:
+            pass
+        
+        assert state.last_event_sequence == 1
+        assert state.get_file_hash("/a.py") == "a"
+        assert state.get_file("/b.py") is None
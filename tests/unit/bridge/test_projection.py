@@ -0,0 +1,289 @@
+"""Unit tests for the live projection runner."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from lighthouse.bridge.event_store.blob_store import ContentBlobStore
+from lighthouse.bridge.event_store.checkpoints import CheckpointStore
+from lighthouse.bridge.event_store.project_aggregate import ConcurrencyConflict, ProjectAggregate
+from lighthouse.bridge.event_store.projection import ProjectionRunner
+from lighthouse.event_store.models import Event, EventType, QueryResult
+from lighthouse.event_store.store import EventStore
+
+
+class SequencingEventStore:
+    """Minimal store: assigns sequences on append and serves tail queries"""
+    
+    def __init__(self):
+        self.events = []
+        self.queries = 0
+    
+    async def append(self, event, agent_id=None):
+        event.sequence = len(self.events) + 1
+        # Readers get their own copy, as with a real store
+        self.events.append(Event(**event.model_dump()))
+    
+    async def query(self, query):
+        self.queries += 1
+        events = [e for e in self.events if query.filter.matches_event(e)][:query.limit]
+        return QueryResult(
+            events=events,
+            total_count=len(events),
+            has_more=False,
+            query=query,
+            execution_time_ms=0.0
+        )
+
+
+@pytest_asyncio.fixture
+async def event_store(tmp_path):
+    store = EventStore(data_dir=str(tmp_path), allowed_base_dirs=[str(tmp_path)])
+    await store.initialize()
+    yield store
+    await store.shutdown()
+
+
+def file_event(path, content_hash):
+    return Event(
+        event_type=EventType.FILE_MODIFIED,
+        aggregate_id="project",
+        data={'path': path, 'content_hash': content_hash, 'size': 1}
+    )
+
+
+class TestProjectionRunner:
+    """Test incremental tailing, checkpoint resume and local event dedupe."""
+    
+    @pytest.mark.asyncio
+    async def test_external_appends_reach_the_aggregate(self):
+        store = SequencingEventStore()
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        runner = ProjectionRunner(store, aggregate, CheckpointStore(), batch_size=2)
+        
+        for i in range(5):
+            await store.append(file_event(f"/src/file_{i}.py", f"h{i}"))
+        
+        assert await runner.catch_up() == 5
+        assert runner.cursor == 5
+        assert aggregate.current_state.get_file_hash("/src/file_4.py") == "h4"
+        
+        await store.append(file_event("/src/file_0.py", "changed"))
+        assert await runner.catch_up() == 1
+        assert aggregate.current_state.get_file_hash("/src/file_0.py") == "changed"
+    
+    @pytest.mark.asyncio
+    async def test_restart_resumes_from_checkpoint(self, tmp_path):
+        store = SequencingEventStore()
+        for i in range(10):
+            await store.append(file_event(f"/src/file_{i % 3}.py", f"h{i}"))
+        
+        first = ProjectionRunner(store, ProjectAggregate("project", blob_store=ContentBlobStore()),
+                                 CheckpointStore(checkpoint_dir=tmp_path),
+                                 checkpoint_every_events=1)
+        await first.catch_up()
+        
+        for i in range(10, 12):
+            await store.append(file_event("/src/file_0.py", f"h{i}"))
+        
+        # A second worker sharing the checkpoint directory
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        second = ProjectionRunner(store, aggregate, CheckpointStore(checkpoint_dir=tmp_path))
+        assert second.resume_from_checkpoint()
+        assert second.cursor == 10
+        
+        assert await second.catch_up() == 2
+        assert aggregate.current_state.get_file_hash("/src/file_0.py") == "h11"
+        assert len(aggregate.current_state.get_file_history("/src/file_0.py")) == 6
+    
+    @pytest.mark.asyncio
+    async def test_local_events_are_committed_and_not_reapplied(self):
+        store = SequencingEventStore()
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        runner = ProjectionRunner(store, aggregate, CheckpointStore())
+        
+        await aggregate.handle_file_modification("/src/app.py", "print('hi')\n", "agent")
+        assert await runner.commit_pending() == 1
+        await runner.catch_up()
+        
+        state = aggregate.current_state
+        assert runner.cursor == 1
+        assert not state.unsequenced_event_ids
+        assert len(state.get_file_history("/src/app.py")) == 1
+        assert state.get_file_content("/src/app.py") == "print('hi')\n"
+    
+    @pytest.mark.asyncio
+    async def test_notify_wakes_running_tail(self):
+        store = SequencingEventStore()
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        runner = ProjectionRunner(store, aggregate, CheckpointStore(), poll_interval=60)
+        await runner.start()
+        
+        try:
+            await store.append(file_event("/README.md", "readme"))
+            runner.notify()
+            for _ in range(100):
+                if runner.cursor == 1:
+                    break
+                await asyncio.sleep(0.01)
+            
+            assert aggregate.current_state.get_file_hash("/README.md") == "readme"
+        finally:
+            await runner.stop()
+
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_wait_for_local_events_to_commit(self, tmp_path):
+        store = SequencingEventStore()
+        await store.append(file_event("/src/a.py", "a"))
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        checkpoints = CheckpointStore(checkpoint_dir=tmp_path)
+        runner = ProjectionRunner(store, aggregate, checkpoints, checkpoint_every_events=1)
+        await runner.catch_up()
+        assert checkpoints.latest("project").sequence == 1
+        
+        await aggregate.handle_file_modification("/src/b.py", "b\n", "agent")
+        await store.append(file_event("/src/c.py", "c"))
+        await runner.catch_up()
+        assert checkpoints.latest("project").sequence == 1
+        assert runner.checkpoints_deferred == 1
+        
+        await runner.commit_pending()
+        await runner.catch_up()
+        assert checkpoints.latest("project").sequence == 3
+
+
+class FailingEventStore(SequencingEventStore):
+    """Sequencing store whose appends fail once `failing` is set"""
+    
+    failing = False
+    
+    async def append(self, event, agent_id=None):
+        if self.failing:
+            raise RuntimeError("disk full")
+        await super().append(event, agent_id)
+
+
+class TestOptimisticCommits:
+    """Test per-path versions and compare-and-append commits between workers."""
+    
+    @pytest.mark.asyncio
+    async def test_path_version_guards_commands(self):
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        await aggregate.handle_file_modification("/src/app.py", "v1\n", "alice")
+        assert aggregate.get_path_version("/src/app.py") == 1
+        
+        await aggregate.handle_file_modification("/src/app.py", "v2\n", "alice", expected_path_version=1)
+        with pytest.raises(ConcurrencyConflict) as conflict:
+            await aggregate.handle_file_deletion("/src/app.py", "bob", expected_path_version=1)
+        assert conflict.value.path == "/src/app.py"
+        assert conflict.value.actual_sequence == 2
+        
+        await aggregate.handle_file_move("/src/app.py", "/src/main.py", "bob", expected_path_version=2)
+        assert aggregate.get_path_version("/src/app.py") == 3
+        assert aggregate.get_path_version("/src/main.py") == 1
+    
+    @pytest.mark.asyncio
+    async def test_lost_race_rebases_other_paths_and_rejects_conflicts(self, event_store):
+        blob_store = ContentBlobStore()
+        workers = []
+        for _ in range(2):
+            aggregate = ProjectAggregate("project", blob_store=blob_store)
+            workers.append((aggregate, ProjectionRunner(event_store, aggregate, CheckpointStore())))
+        (alice, alice_runner), (bob, bob_runner) = workers
+        
+        await alice.handle_file_modification("/src/shared.py", "v0\n", "alice")
+        await alice_runner.commit_pending()
+        await bob_runner.catch_up()
+        
+        # Both workers decide on version 1 of the shared file
+        await alice.handle_file_modification("/src/shared.py", "alice\n", "alice", expected_path_version=1)
+        await bob.handle_file_modification("/src/shared.py", "bob\n", "bob", expected_path_version=1)
+        await bob.handle_file_modification("/src/bob.py", "bob\n", "bob")
+        
+        assert await alice_runner.commit_pending() == 1
+        assert await bob_runner.commit_pending() == 1
+        assert bob_runner.commit_conflicts == 1
+        assert bob_runner.commit_retries == 1
+        
+        await alice_runner.catch_up()
+        for aggregate, runner in workers:
+            state = aggregate.current_state
+            assert runner.cursor == event_store.get_stream_version("project") == 3
+            assert state.get_file_content("/src/shared.py") == "alice\n"
+            assert state.get_file_content("/src/bob.py") == "bob\n"
+            assert state.get_path_version("/src/shared.py") == 2
+            assert len(state.get_file_history("/src/shared.py")) == 2
+            assert not state.unsequenced_event_ids
+    
+    @pytest.mark.asyncio
+    async def test_failed_commit_rolls_back_read_model(self, event_store, tmp_path):
+        blob_store = ContentBlobStore()
+        aggregate = ProjectAggregate("project", blob_store=blob_store)
+        runner = ProjectionRunner(event_store, aggregate, CheckpointStore(checkpoint_dir=tmp_path))
+        await aggregate.handle_file_modification("/src/a.py", "a\n", "agent")
+        await runner.commit_pending()
+        
+        await aggregate.handle_file_modification("/src/b.py", "b\n", "agent")
+        runner._write_checkpoint()
+        assert runner.checkpoints_deferred == 1
+        
+        async def fail(*args, **kwargs):
+            raise RuntimeError("disk full")
+        event_store.compare_and_append = fail
+        assert await runner.commit_pending() == 0
+        assert runner.commit_errors == 1
+        assert aggregate.current_state.get_file_content("/src/b.py") is None
+        assert not aggregate.current_state.unsequenced_event_ids
+        
+        # A fresh worker sharing the checkpoints sees only what the store has
+        fresh = ProjectAggregate("project", blob_store=blob_store)
+        fresh_runner = ProjectionRunner(event_store, fresh, CheckpointStore(checkpoint_dir=tmp_path))
+        fresh_runner.resume_from_checkpoint()
+        await fresh_runner.catch_up()
+        assert fresh.current_state.get_file_content("/src/a.py") == "a\n"
+        assert fresh.current_state.get_file_content("/src/b.py") is None
+    
+    @pytest.mark.asyncio
+    async def test_failed_plain_append_rolls_back_unwritten_events(self):
+        store = FailingEventStore()
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        runner = ProjectionRunner(store, aggregate, CheckpointStore())
+        await aggregate.handle_file_modification("/src/a.py", "a\n", "agent")
+        assert await runner.commit_pending() == 1
+        
+        store.failing = True
+        await aggregate.handle_file_modification("/src/b.py", "b\n", "agent")
+        assert await runner.commit_pending() == 0
+        assert runner.commit_errors == 1
+        
+        store.failing = False
+        await runner.catch_up()
+        state = aggregate.current_state
+        assert state.get_file_content("/src/a.py") == "a\n"
+        assert state.get_file_content("/src/b.py") is None
+        assert not state.unsequenced_event_ids
+    
+    @pytest.mark.asyncio
+    async def test_only_committed_events_are_published_with_sequences(self, event_store):
+        published = []
+        
+        async def publish(event):
+            published.append(event.sequence)
+        
+        aggregate = ProjectAggregate("project", blob_store=ContentBlobStore())
+        runner = ProjectionRunner(event_store, aggregate, CheckpointStore(), publisher=publish)
+        await aggregate.handle_file_modification("/src/a.py", "a\n", "agent")
+        await aggregate.handle_file_modification("/src/b.py", "b\n", "agent")
+        assert published == []
+        
+        assert await runner.commit_pending() == 2
+        assert published == [1, 2]
+        
+        async def fail(*args, **kwargs):
+            raise RuntimeError("disk full")
+        event_store.compare_and_append = fail
+        await aggregate.handle_file_modification("/src/c.py", "c\n", "agent")
+        assert await runner.commit_pending() == 0
+        assert published == [1, 2]
@@ -0,0 +1,162 @@
+"""Unit tests for the shared-memory event ring transport."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from lighthouse.bridge.event_store.event_stream import EventStream
+from lighthouse.bridge.event_store.shared_memory_ring import (
+    RingOverrun, SharedMemoryEventRing, SharedMemoryRingReader
+)
+from lighthouse.event_store.models import Event, EventFilter, EventType
+
+
+def make_event(sequence, **data) -> Event:
+    return Event(
+        event_type=EventType.FILE_MODIFIED,
+        aggregate_id="project_a",
+        sequence=sequence,
+        data=data or {"path": f"/src/f{sequence}.py"}
+    )
+
+
+class FakeEventStore:
+    def __init__(self, events):
+        self.events = events
+    
+    async def query(self, query):
+        after = query.filter.after_sequence or 0
+        matching = [e for e in self.events if e.sequence > after]
+        return SimpleNamespace(events=matching[:query.limit])
+
+
+@pytest.fixture
+def ring():
+    shm_ring = SharedMemoryEventRing(slot_count=8, slot_size=1024)
+    yield shm_ring
+    shm_ring.close()
+
+
+@pytest.mark.asyncio
+class TestSharedMemoryRing:
+    """Test producer/consumer behaviour of the shared-memory ring."""
+    
+    async def test_reader_receives_published_events(self, ring):
+        reader = SharedMemoryRingReader(ring.name, consumer_slot=0)
+        try:
+            for seq in range(1, 4):
+                ring.publish(make_event(seq))
+            
+            events = await reader.read()
+            assert [e.sequence for e in events] == [1, 2, 3]
+            assert events[0].data == {"path": "/src/f1.py"}
+            assert ring.get_stats()['consumer_lag'] == {0: 0}
+        finally:
+            reader.close()
+    
+    async def test_lapped_reader_without_store_raises(self, ring):
+        reader = SharedMemoryRingReader(ring.name)
+        try:
+            for seq in range(1, 20):
+                ring.publish(make_event(seq))
+            
+            with pytest.raises(RingOverrun):
+                await reader.read()
+        finally:
+            reader.close()
+    
+    async def test_lapped_reader_recovers_from_store(self, ring):
+        published = [make_event(seq) for seq in range(1, 21)]
+        reader = SharedMemoryRingReader(ring.name, event_store=FakeEventStore(published))
+        try:
+            for event in published:
+                ring.publish(event)
+            
+            received = []
+            while True:
+                events = await reader.read(max_events=6)
+                if not events:
+                    break
+                received.extend(events)
+            
+            assert [e.sequence for e in received] == list(range(1, 21))
+            assert reader.overruns == 1
+            
+            more = make_event(21)
+            ring.publish(more)
+            assert [e.sequence for e in await reader.read()] == [21]
+        finally:
+            reader.close()
+    
+    async def test_reader_attached_at_head_recovers_only_later_events(self, ring):
+        published = [make_event(seq) for seq in range(1, 21)]
+        store = FakeEventStore(published)
+        for event in published[:5]:
+            ring.publish(event)
+        
+        reader = SharedMemoryRingReader(ring.name, event_store=store, start_at_head=True)
+        try:
+            assert reader.last_event_sequence == 5
+            for event in published[5:]:
+                ring.publish(event)
+            
+            received = []
+            while True:
+                events = await reader.read(max_events=6)
+                if not events:
+                    break
+                received.extend(events)
+            
+            assert [e.sequence for e in received] == list(range(6, 21))
+            assert reader.overruns == 1
+        finally:
+            reader.close()
+    
+    async def test_reader_attached_to_empty_ring_recovers_after_store_head(self, ring):
+        published = [make_event(seq) for seq in range(1, 31)]
+        store = FakeEventStore(published)
+        store.current_sequence = 10
+        
+        reader = SharedMemoryRingReader(ring.name, event_store=store, start_at_head=True)
+        try:
+            for event in published[10:]:
+                ring.publish(event)
+            
+            received = []
+            while True:
+                events = await reader.read(max_events=8)
+                if not events:
+                    break
+                received.extend(events)
+            
+            assert [e.sequence for e in received] == list(range(11, 31))
+        finally:
+            reader.close()
+    
+    async def test_oversize_event_loaded_from_store(self, ring):
+        big = make_event(2, content="x" * 4096)
+        published = [make_event(1), big, make_event(3)]
+        reader = SharedMemoryRingReader(ring.name, event_store=FakeEventStore(published))
+        try:
+            for event in published:
+                ring.publish(event)
+            
+            received = await reader.read()
+            received += await reader.read()
+            assert [e.sequence for e in received] == [1, 2, 3]
+            assert ring.oversize_events == 1
+        finally:
+            reader.close()
+    
+    async def test_event_stream_publishes_to_ring(self):
+        stream = EventStream(fuse_mount_path=None)
+        name = stream.enable_shared_memory_transport(slot_count=16, slot_size=2048)
+        reader = SharedMemoryRingReader(name, event_filter=EventFilter(aggregate_ids=["project_a"]))
+        try:
+            await stream.publish_event(make_event(1))
+            events = await reader.read()
+            assert [e.sequence for e in events] == [1]
+            assert stream.get_stream_stats()['shared_memory_ring']['events_published'] == 1
+        finally:
+            reader.close()
+            await stream.stop()
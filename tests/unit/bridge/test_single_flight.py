@@ -0,0 +1,87 @@
+"""Unit tests for single-flight coalescing of identical validation requests."""
+
+import asyncio
+
+import pytest
+
+from lighthouse.bridge.speed_layer.models import ValidationConfidence, ValidationDecision, ValidationResult
+
+from .conftest import bash
+
+
+class TestSingleFlight:
+    """Test that concurrent identical requests share one validation."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_run_once(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        requests = [bash("npm test", f"req-{i}", f"agent-{i}") for i in range(30)]
+        results = await asyncio.gather(*(dispatcher.validate_request(r) for r in requests))
+        
+        assert calls == ["req-0"]
+        assert [result.request_id for result in results] == [r.request_id for r in requests]
+        assert all(result.decision == ValidationDecision.APPROVED for result in results)
+        assert results[1].security_concerns is not results[2].security_concerns
+        assert dispatcher.metrics.coalesced_requests == 29
+        assert dispatcher._in_flight == {}
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_waiters(self, stub_expert):
+        dispatcher, calls = stub_expert
+        
+        leader = asyncio.create_task(dispatcher.validate_request(bash("git status", "req-a", "a")))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(dispatcher.validate_request(bash("git status", "req-b", "b")))
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        assert (await waiter).request_id == "req-b"
+        assert calls == ["req-a"]
+    
+    @pytest.mark.asyncio
+    async def test_agent_scoped_rules_keep_agents_apart(self, stub_expert):
+        dispatcher, calls = stub_expert
+        await asyncio.sleep(0)
+        dispatcher.policy_cache._install_rules([
+            {'rule_id': 'ci_deploy', 'pattern': r'deploy', 'decision': 'approved',
+             'confidence': 'high', 'priority': 10, 'agent_patterns': ['^ci-']}
+        ])
+        
+        await asyncio.gather(
+            dispatcher.validate_request(bash("make build", "req-1", "ci-1")),
+            dispatcher.validate_request(bash("make build", "req-2", "dev-1")),
+        )
+        assert sorted(calls) == ["req-1", "req-2"]
+    
+    @pytest.mark.asyncio
+    async def test_pattern_decisions_are_shared_only_within_an_agent(self, stub_expert):
+        dispatcher, calls = stub_expert
+        predictions = []
+        
+        async def agent_aware_prediction(request, start_time):
+            predictions.append(request.request_id)
+            await asyncio.sleep(0.05)
+            decision = ValidationDecision.BLOCKED if "system" in request.agent_id else ValidationDecision.APPROVED
+            return ValidationResult(decision=decision, confidence=ValidationConfidence.HIGH,
+                                    reason="pattern", request_id=request.request_id,
+                                    processing_time_ms=1.0, cache_layer="pattern")
+        
+        dispatcher._try_optimized_pattern_cache = agent_aware_prediction
+        requests = [bash("make build", f"req-{i}", agent)
+                    for i, agent in enumerate(["dev-1", "system-1", "system-1", "dev-1"])]
+        results = await asyncio.gather(*(dispatcher.validate_request(r) for r in requests))
+        
+        assert sorted(predictions) == ["req-0", "req-1"]
+        assert [r.decision for r in results] == [
+            ValidationDecision.APPROVED, ValidationDecision.BLOCKED,
+            ValidationDecision.BLOCKED, ValidationDecision.APPROVED
+        ]
+        assert dispatcher.metrics.coalesced_requests == 2
+        
+        # Later repeats reuse the decision for the same agent only
+        later = await dispatcher.validate_request(bash("make build", "req-4", "system-1"))
+        other = await dispatcher.validate_request(bash("make build", "req-5", "human-1"))
+        assert later.decision == ValidationDecision.BLOCKED
+        assert other.decision == ValidationDecision.APPROVED
+        assert sorted(predictions) == ["req-0", "req-1", "req-5"]
@@ -9,7 +9,7 @@ from pathlib import Path
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from lighthouse.event_store.store import EventStore, EventStoreError
+from lighthouse.event_store.store import EventStore, EventStoreError, StreamVersionConflict
 from lighthouse.event_store.models import (
     Event, EventType, EventFilter, EventQuery, EventBatch
 )
@@ -285,6 +285,112 @@ class TestEventStore:
         assert store.current_sequence == 1
 
 
+def file_event(event_type, **data):
+    return Event(event_type=event_type, aggregate_id="project", data=data)
+
+
+@pytest.mark.asyncio
+class TestPathPostings:
+    """Test the path postings index for file events."""
+    
+    async def test_path_events_include_moves_and_copies(self, temp_event_store):
+        """File history by path reads only that path's records."""
+        store = temp_event_store
+        agent = store.test_agent_id
+        
+        await store.append(file_event(EventType.FILE_CREATED, path="/a.py", content_hash="1"), agent_id=agent)
+        await store.append(file_event(EventType.FILE_CREATED, path="/b.py", content_hash="2"), agent_id=agent)
+        await store.append(file_event(EventType.COMMAND_RECEIVED), agent_id=agent)
+        await store.append_batch(EventBatch(events=[
+            file_event(EventType.FILE_MODIFIED, path="/a.py", content_hash="3"),
+            file_event(EventType.FILE_MOVED, old_path="/a.py", new_path="/c.py"),
+            file_event(EventType.FILE_COPIED, source_path="/b.py", dest_path="/a.py"),
+        ]), agent_id=agent)
+        
+        assert store.get_path_sequences("project", "/a.py") == [1, 4, 5, 6]
+        assert store.get_path_sequences("project", "/c.py") == [5]
+        
+        events = await store.get_path_events("project", "/a.py")
+        assert [e.sequence for e in events] == [1, 4, 5, 6]
+        assert events[1].data["content_hash"] == "3"
+        assert [e.sequence for e in await store.get_path_events("project", "/b.py", limit=1)] == [2]
+    
+    async def test_recent_postings_group_by_path(self, temp_event_store):
+        """Recent activity is grouped from the index."""
+        store = temp_event_store
+        since = datetime.now(timezone.utc)
+        
+        for path in ["/a.py", "/b.py", "/a.py"]:
+            await store.append(file_event(EventType.FILE_MODIFIED, path=path), agent_id=store.test_agent_id)
+        
+        assert store.get_recent_path_postings("project", since) == {"/a.py": [1, 3], "/b.py": [2]}
+        assert store.get_recent_path_postings("other", since) == {}
+    
+    async def test_index_survives_rotation_and_rebuild(self, temp_event_store):
+        """Record locations follow rotated logs and are rebuilt on start."""
+        store = temp_event_store
+        store.max_file_size = 512
+        
+        for i in range(12):
+            await store.append(
+                file_event(EventType.FILE_MODIFIED, path=f"/f{i % 2}.py", content_hash="x" * 100),
+                agent_id=store.test_agent_id
+            )
+        assert list(store.data_dir.glob("*.log.gz"))
+        
+        events = await store.get_path_events("project", "/f1.py")
+        assert [e.sequence for e in events] == [2, 4, 6, 8, 10, 12]
+        
+        await store._rebuild_index()
+        events = await store.get_path_events("project", "/f0.py")
+        assert [e.sequence for e in events] == [1, 3, 5, 7, 9, 11]
+
+
+@pytest.mark.asyncio
+class TestCompareAndAppend:
+    """Test optimistic appends keyed by aggregate stream version."""
+    
+    async def test_append_requires_current_stream_version(self, temp_event_store):
+        """Only the first of two writers expecting the same version succeeds."""
+        store = temp_event_store
+        await store.append(file_event(EventType.FILE_CREATED, path="/a.py"))
+        await store.append(Event(event_type=EventType.FILE_CREATED, aggregate_id="other", data={}))
+        assert store.get_stream_version("project") == 1
+        
+        first = [file_event(EventType.FILE_MODIFIED, path="/a.py"), file_event(EventType.FILE_MODIFIED, path="/b.py")]
+        assert await store.compare_and_append(first, expected_version=1) == 4
+        assert [e.sequence for e in first] == [3, 4]
+        
+        with pytest.raises(StreamVersionConflict) as conflict:
+            await store.compare_and_append([file_event(EventType.FILE_DELETED, path="/a.py")], expected_version=1)
+        assert conflict.value.actual_version == 4
+        assert store.current_sequence == 4
+        
+        await store._rebuild_index()
+        assert store.get_stream_version("project") == 4
+        assert store.get_stream_version("missing") == 0
+    
+    async def test_second_store_on_the_directory_cannot_write(self, temp_event_store):
+        """Stream versions are per process, so a directory has one writing store."""
+        store = temp_event_store
+        data_dir = str(store.data_dir)
+        other = EventStore(data_dir=data_dir, allowed_base_dirs=[data_dir, "/tmp"])
+        await other.initialize()
+        
+        await store.append(file_event(EventType.FILE_CREATED, path="/a.py"))
+        with pytest.raises(EventStoreError, match="another store instance"):
+            await other.compare_and_append([file_event(EventType.FILE_DELETED, path="/a.py")],
+                                           expected_version=0)
+        
+        # Reading is still allowed; writing after the first store has
+        # closed needs a store that has seen its events
+        assert (await other.query(EventQuery())).events == []
+        await store.shutdown()
+        with pytest.raises(EventStoreError, match="changed since it was opened"):
+            await other.append(file_event(EventType.FILE_MODIFIED, path="/a.py"))
+        await other.shutdown()
+
+
 @pytest.mark.asyncio
 class TestEventStorePerformance:
     """Performance tests for event store."""